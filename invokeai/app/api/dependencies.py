@@ -10,27 +10,28 @@ from ..services.board_image_records.board_image_records_sqlite import SqliteBoar
 from ..services.board_images.board_images_default import BoardImagesService
 from ..services.board_records.board_records_sqlite import SqliteBoardRecordStorage
 from ..services.boards.boards_default import BoardService
+from ..services.conditioning_cache.conditioning_cache_memory import MemoryConditioningCache
 from ..services.config import InvokeAIAppConfig
 from ..services.download import DownloadQueueService
 from ..services.image_files.image_files_disk import DiskImageFileStorage
 from ..services.image_records.image_records_sqlite import SqliteImageRecordStorage
 from ..services.images.images_default import ImageService
-from ..services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
+from ..services.invocation_cache.invocation_cache_sqlite import SqliteInvocationCache
 from ..services.invocation_processor.invocation_processor_default import DefaultInvocationProcessor
 from ..services.invocation_queue.invocation_queue_memory import MemoryInvocationQueue
 from ..services.invocation_services import InvocationServices
 from ..services.invocation_stats.invocation_stats_default import InvocationStatsService
 from ..services.invoker import Invoker
-from ..services.item_storage.item_storage_sqlite import SqliteItemStorage
+from ..services.item_storage.item_storage_session_sqlite import SqliteSessionStorage
 from ..services.latents_storage.latents_storage_disk import DiskLatentsStorage
 from ..services.latents_storage.latents_storage_forward_cache import ForwardCacheLatentsStorage
 from ..services.model_install import ModelInstallService
 from ..services.model_manager.model_manager_default import ModelManagerService
+from ..services.model_prefetcher.model_prefetcher_default import DefaultModelPrefetcher
 from ..services.model_records import ModelRecordServiceSQL
 from ..services.names.names_default import SimpleNameService
 from ..services.session_processor.session_processor_default import DefaultSessionProcessor
 from ..services.session_queue.session_queue_sqlite import SqliteSessionQueue
-from ..services.shared.graph import GraphExecutionState
 from ..services.urls.urls_default import LocalUrlService
 from ..services.workflow_records.workflow_records_sqlite import SqliteWorkflowRecordsStorage
 from .events import FastAPIEventService
@@ -67,7 +68,11 @@ class ApiDependencies:
         logger.debug(f"Internet connectivity is {config.internet_available}")
 
         output_folder = config.output_path
-        image_files = DiskImageFileStorage(f"{output_folder}/images")
+        image_files = DiskImageFileStorage(
+            f"{output_folder}/images",
+            max_cache_bytes=int(config.image_cache_mb * 2**20),
+            max_writers=config.image_writers,
+        )
 
         db = init_db(config=config, logger=logger, image_files=image_files)
 
@@ -78,18 +83,29 @@ class ApiDependencies:
         board_images = BoardImagesService()
         board_records = SqliteBoardRecordStorage(db=db)
         boards = BoardService()
+        conditioning_cache = MemoryConditioningCache(max_cache_bytes=int(config.conditioning_cache_mb * 2**20))
         events = FastAPIEventService(event_handler_id)
-        graph_execution_manager = SqliteItemStorage[GraphExecutionState](db=db, table_name="graph_executions")
+        graph_execution_manager = SqliteSessionStorage(
+            db=db, table_name="graph_executions", checkpoint_interval=config.session_checkpoint_interval
+        )
         image_records = SqliteImageRecordStorage(db=db)
         images = ImageService()
-        invocation_cache = MemoryInvocationCache(max_cache_size=config.node_cache_size)
-        latents = ForwardCacheLatentsStorage(DiskLatentsStorage(f"{output_folder}/latents"))
+        invocation_cache = SqliteInvocationCache(
+            db=db,
+            max_cache_size=config.node_cache_size,
+            max_cache_bytes=int(config.node_cache_max_mb * 2**20),
+        )
+        latents = ForwardCacheLatentsStorage(
+            DiskLatentsStorage(f"{output_folder}/latents"),
+            max_cache_bytes=int(config.latents_cache_mb * 2**20),
+        )
         model_manager = ModelManagerService(config, logger)
         model_record_service = ModelRecordServiceSQL(db=db)
         download_queue_service = DownloadQueueService(event_bus=events)
         model_install_service = ModelInstallService(
             app_config=config, record_store=model_record_service, event_bus=events
         )
+        model_prefetcher = DefaultModelPrefetcher()
         names = SimpleNameService()
         performance_statistics = InvocationStatsService()
         processor = DefaultInvocationProcessor()
@@ -104,6 +120,7 @@ class ApiDependencies:
             board_images=board_images,
             board_records=board_records,
             boards=boards,
+            conditioning_cache=conditioning_cache,
             configuration=configuration,
             events=events,
             graph_execution_manager=graph_execution_manager,
@@ -114,6 +131,7 @@ class ApiDependencies:
             latents=latents,
             logger=logger,
             model_manager=model_manager,
+            model_prefetcher=model_prefetcher,
             model_records=model_record_service,
             download_queue=download_queue_service,
             model_install=model_install_service,
@@ -1,9 +1,7 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654)
 
 import asyncio
-import threading
-from queue import Empty, Queue
-from typing import Any
+from typing import Any, Optional
 
 from fastapi_events.dispatcher import dispatch
 
@@ -11,42 +9,45 @@ from ..services.events.events_base import EventServiceBase
 
 
 class FastAPIEventService(EventServiceBase):
+    """Dispatches events on the event loop the service was created on.
+
+    Events may be emitted from any thread. They are handed to the event loop with `call_soon_threadsafe`, so the
+    dispatching task wakes up as soon as an event arrives instead of polling for it.
+    """
+
     event_handler_id: int
-    __queue: Queue
-    __stop_event: threading.Event
+    __queue: asyncio.Queue[Optional[dict[str, Any]]]
+    __loop: asyncio.AbstractEventLoop
 
     def __init__(self, event_handler_id: int) -> None:
         self.event_handler_id = event_handler_id
-        self.__queue = Queue()
-        self.__stop_event = threading.Event()
-        asyncio.create_task(self.__dispatch_from_queue(stop_event=self.__stop_event))
+        self.__loop = asyncio.get_running_loop()
+        self.__queue = asyncio.Queue()
+        asyncio.create_task(self.__dispatch_from_queue())
 
         super().__init__()
 
     def stop(self, *args, **kwargs):
-        self.__stop_event.set()
-        self.__queue.put(None)
+        self.__put(None)
 
     def dispatch(self, event_name: str, payload: Any) -> None:
-        self.__queue.put({"event_name": event_name, "payload": payload})
+        self.__put({"event_name": event_name, "payload": payload})
+
+    def __put(self, event: Optional[dict[str, Any]]) -> None:
+        try:
+            self.__loop.call_soon_threadsafe(self.__queue.put_nowait, event)
+        except RuntimeError:
+            pass  # The event loop is closed, the app is shutting down
 
-    async def __dispatch_from_queue(self, stop_event: threading.Event):
+    async def __dispatch_from_queue(self):
         """Get events on from the queue and dispatch them, from the correct thread"""
-        while not stop_event.is_set():
-            try:
-                event = self.__queue.get(block=False)
-                if not event:  # Probably stopping
-                    continue
-
-                dispatch(
-                    event.get("event_name"),
-                    payload=event.get("payload"),
-                    middleware_id=self.event_handler_id,
-                )
-
-            except Empty:
-                await asyncio.sleep(0.1)
-                pass
-
-            except asyncio.CancelledError as e:
-                raise e  # Raise a proper error
+        while True:
+            event = await self.__queue.get()
+            if not event:  # Stopping
+                return
+
+            dispatch(
+                event.get("event_name"),
+                payload=event.get("payload"),
+                middleware_id=self.event_handler_id,
+            )
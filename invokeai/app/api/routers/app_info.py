@@ -11,6 +11,7 @@ from fastapi.routing import APIRouter
 from pydantic import BaseModel, Field
 
 from invokeai.app.invocations.upscale import ESRGAN_MODELS
+from invokeai.app.services.image_files.image_files_common import ImageFileCacheStatus
 from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
 from invokeai.backend.image_util.invisible_watermark import InvisibleWatermark
 from invokeai.backend.image_util.patchmatch import PatchMatch
@@ -157,8 +158,9 @@ async def set_log_level(
     responses={200: {"description": "The operation was successful"}},
 )
 async def clear_invocation_cache() -> None:
-    """Clears the invocation cache"""
+    """Clears the invocation cache, and the conditioning cache of the prompt nodes"""
     ApiDependencies.invoker.services.invocation_cache.clear()
+    ApiDependencies.invoker.services.conditioning_cache.clear()
 
 
 @app_router.put(
@@ -189,3 +191,13 @@ async def disable_invocation_cache() -> None:
 async def get_invocation_cache_status() -> InvocationCacheStatus:
     """Clears the invocation cache"""
     return ApiDependencies.invoker.services.invocation_cache.get_status()
+
+
+@app_router.get(
+    "/image_cache/status",
+    operation_id="get_image_cache_status",
+    responses={200: {"model": ImageFileCacheStatus}},
+)
+async def get_image_cache_status() -> ImageFileCacheStatus:
+    """Gets the status of the in-memory cache of decoded images"""
+    return ApiDependencies.invoker.services.image_files.get_cache_status()
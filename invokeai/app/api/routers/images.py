@@ -1,3 +1,4 @@
+import asyncio
 import io
 import traceback
 from typing import Optional
@@ -5,7 +6,7 @@ from typing import Optional
 from fastapi import Body, HTTPException, Path, Query, Request, Response, UploadFile
 from fastapi.responses import FileResponse
 from fastapi.routing import APIRouter
-from PIL import Image
+from PIL import Image, PngImagePlugin
 from pydantic import BaseModel, Field, ValidationError
 
 from invokeai.app.invocations.baseinvocation import MetadataField, MetadataFieldValidator
@@ -212,10 +213,15 @@ async def get_image_workflow(
 )
 async def get_image_full(
     image_name: str = Path(description="The name of full-resolution image file to get"),
-) -> FileResponse:
+) -> Response:
     """Gets a full-resolution image file"""
 
     try:
+        if ApiDependencies.invoker.services.images.is_pending(image_name):
+            # The image is still being written, serve it from memory without letting clients cache it
+            content = await asyncio.to_thread(encode_pending_image, image_name)
+            return Response(content, media_type="image/png", headers={"Cache-Control": "no-store"})
+
         path = ApiDependencies.invoker.services.images.get_path(image_name)
 
         if not ApiDependencies.invoker.services.images.validate_path(path):
@@ -233,6 +239,18 @@ async def get_image_full(
         raise HTTPException(status_code=404)
 
 
+def encode_pending_image(image_name: str) -> bytes:
+    """Encodes an image that is still being written, favoring speed over size"""
+    image = ApiDependencies.invoker.services.images.get_pil_image(image_name)
+    pnginfo = PngImagePlugin.PngInfo()
+    for key, value in image.info.items():
+        if isinstance(value, str):
+            pnginfo.add_text(key, value)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", pnginfo=pnginfo, compress_level=1)
+    return buffer.getvalue()
+
+
 @images_router.get(
     "/i/{image_name}/thumbnail",
     operation_id="get_image_thumbnail",
@@ -251,6 +269,10 @@ async def get_image_thumbnail(
     """Gets a thumbnail image file"""
 
     try:
+        if ApiDependencies.invoker.services.images.is_pending(image_name):
+            # Thumbnails are written first, this does not wait for long
+            await asyncio.to_thread(ApiDependencies.invoker.services.images.flush, image_name)
+
         path = ApiDependencies.invoker.services.images.get_path(image_name, thumbnail=True)
         if not ApiDependencies.invoker.services.images.validate_path(path):
             raise HTTPException(status_code=404)
@@ -323,13 +345,7 @@ async def delete_images_from_list(
     image_names: list[str] = Body(description="The list of names of images to delete", embed=True),
 ) -> DeleteImagesFromListResult:
     try:
-        deleted_images: list[str] = []
-        for image_name in image_names:
-            try:
-                ApiDependencies.invoker.services.images.delete(image_name)
-                deleted_images.append(image_name)
-            except Exception:
-                pass
+        deleted_images = ApiDependencies.invoker.services.images.delete_many(image_names)
         return DeleteImagesFromListResult(deleted_images=deleted_images)
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to delete images")
@@ -344,13 +360,9 @@ async def star_images_in_list(
     image_names: list[str] = Body(description="The list of names of images to star", embed=True),
 ) -> ImagesUpdatedFromListResult:
     try:
-        updated_image_names: list[str] = []
-        for image_name in image_names:
-            try:
-                ApiDependencies.invoker.services.images.update(image_name, changes=ImageRecordChanges(starred=True))
-                updated_image_names.append(image_name)
-            except Exception:
-                pass
+        updated_image_names = ApiDependencies.invoker.services.images.update_many(
+            image_names, changes=ImageRecordChanges(starred=True)
+        )
         return ImagesUpdatedFromListResult(updated_image_names=updated_image_names)
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to star images")
@@ -361,13 +373,9 @@ async def unstar_images_in_list(
     image_names: list[str] = Body(description="The list of names of images to unstar", embed=True),
 ) -> ImagesUpdatedFromListResult:
     try:
-        updated_image_names: list[str] = []
-        for image_name in image_names:
-            try:
-                ApiDependencies.invoker.services.images.update(image_name, changes=ImageRecordChanges(starred=False))
-                updated_image_names.append(image_name)
-            except Exception:
-                pass
+        updated_image_names = ApiDependencies.invoker.services.images.update_many(
+            image_names, changes=ImageRecordChanges(starred=False)
+        )
         return ImagesUpdatedFromListResult(updated_image_names=updated_image_names)
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to unstar images")
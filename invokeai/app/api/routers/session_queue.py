@@ -16,6 +16,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     SessionQueueItem,
     SessionQueueItemDTO,
     SessionQueueStatus,
+    SessionQueueWaitTimes,
 )
 from invokeai.app.services.shared.pagination import CursorPaginatedResults
 
@@ -182,6 +183,20 @@ async def get_queue_status(
     return SessionQueueAndProcessorStatus(queue=queue, processor=processor)
 
 
+@session_queue_router.get(
+    "/{queue_id}/wait_times",
+    operation_id="get_queue_wait_times",
+    responses={
+        200: {"model": SessionQueueWaitTimes},
+    },
+)
+async def get_queue_wait_times(
+    queue_id: str = Path(description="The queue id to perform this operation on"),
+) -> SessionQueueWaitTimes:
+    """Gets how long the queue items waited before being processed"""
+    return ApiDependencies.invoker.services.session_queue.get_wait_times(queue_id)
+
+
 @session_queue_router.get(
     "/{queue_id}/b/{batch_id}/status",
     operation_id="get_batch_status",
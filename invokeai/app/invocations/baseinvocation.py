@@ -52,6 +52,17 @@ class Classification(str, Enum, metaclass=MetaEnum):
     Prototype = "prototype"
 
 
+class InvocationResource(str, Enum, metaclass=MetaEnum):
+    """
+    The resources an Invocation needs while it executes, used to decide which invocations may execute at the same time.
+    - `GPU`: The invocation may use the GPU or load models. Only one such invocation executes at a time.
+    - `CPU`: The invocation only uses the CPU and may execute alongside any other invocation.
+    """
+
+    GPU = "gpu"
+    CPU = "cpu"
+
+
 class Input(str, Enum, metaclass=MetaEnum):
     """
     The type of input a field accepts.
@@ -559,12 +570,18 @@ class BaseInvocation(ABC, BaseModel):
     """
 
     _invocation_classes: ClassVar[set[BaseInvocation]] = set()
+    _resource: ClassVar[InvocationResource] = InvocationResource.GPU
 
     @classmethod
     def get_type(cls) -> str:
         """Gets the invocation's type, as provided by the `@invocation` decorator."""
         return cls.model_fields["type"].default
 
+    @classmethod
+    def get_resource(cls) -> InvocationResource:
+        """Gets the resources the invocation needs, as provided by the `@invocation` decorator."""
+        return cls._resource
+
     @classmethod
     def register_invocation(cls, invocation: BaseInvocation) -> None:
         """Registers an invocation."""
@@ -798,6 +815,7 @@ def invocation(
     version: Optional[str] = None,
     use_cache: Optional[bool] = True,
     classification: Classification = Classification.Stable,
+    resource: InvocationResource = InvocationResource.GPU,
 ) -> Callable[[Type[TBaseInvocation]], Type[TBaseInvocation]]:
     """
     Registers an invocation.
@@ -809,6 +827,7 @@ def invocation(
     :param Optional[str] version: Adds a version to the invocation. Must be a valid semver string. Defaults to None.
     :param Optional[bool] use_cache: Whether or not to use the invocation cache. Defaults to True. The user may override this in the workflow editor.
     :param Classification classification: The classification of the invocation. Defaults to FeatureClassification.Stable. Use Beta or Prototype if the invocation is unstable.
+    :param InvocationResource resource: The resources the invocation needs. Defaults to InvocationResource.GPU, which never executes alongside another GPU invocation. Use CPU if the invocation does not use the GPU or models.
     """
 
     def wrapper(cls: Type[TBaseInvocation]) -> Type[TBaseInvocation]:
@@ -851,6 +870,8 @@ def invocation(
         if use_cache is not None:
             cls.model_fields["use_cache"].default = use_cache
 
+        cls._resource = resource
+
         # Add the invocation type to the model.
 
         # You'd be tempted to just add the type field and rebuild the model, like this:
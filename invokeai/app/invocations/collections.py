@@ -7,11 +7,16 @@ from pydantic import ValidationInfo, field_validator
 from invokeai.app.invocations.primitives import IntegerCollectionOutput
 from invokeai.app.util.misc import SEED_MAX
 
-from .baseinvocation import BaseInvocation, InputField, InvocationContext, invocation
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, InvocationResource, invocation
 
 
 @invocation(
-    "range", title="Integer Range", tags=["collection", "integer", "range"], category="collections", version="1.0.0"
+    "range",
+    title="Integer Range",
+    tags=["collection", "integer", "range"],
+    category="collections",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class RangeInvocation(BaseInvocation):
     """Creates a range of numbers from start to stop with step"""
@@ -36,6 +41,7 @@ class RangeInvocation(BaseInvocation):
     tags=["collection", "integer", "size", "range"],
     category="collections",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class RangeOfSizeInvocation(BaseInvocation):
     """Creates a range from start to start + (size * step) incremented by step"""
@@ -57,6 +63,7 @@ class RangeOfSizeInvocation(BaseInvocation):
     category="collections",
     version="1.0.1",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class RandomRangeInvocation(BaseInvocation):
     """Creates a collection of random numbers"""
@@ -66,6 +66,25 @@ class CompelInvocation(BaseInvocation):
 
     @torch.no_grad()
     def invoke(self, context: InvocationContext) -> ConditioningOutput:
+        conditioning_cache = context.services.conditioning_cache
+        cache_key = conditioning_cache.create_key(
+            node=self.get_type(), prompt=self.prompt, clip=self.clip.model_dump(mode="json")
+        )
+        conditioning_data = conditioning_cache.get(cache_key)
+        if conditioning_data is None:
+            conditioning_data = self.encode_prompt(context)
+            conditioning_cache.save(cache_key, conditioning_data)
+
+        conditioning_name = f"{context.graph_execution_state_id}_{self.id}_conditioning"
+        context.services.latents.save(conditioning_name, conditioning_data)
+
+        return ConditioningOutput(
+            conditioning=ConditioningField(
+                conditioning_name=conditioning_name,
+            ),
+        )
+
+    def encode_prompt(self, context: InvocationContext) -> ConditioningFieldData:
         tokenizer_info = context.services.model_manager.get_model(
             **self.clip.tokenizer.model_dump(),
             context=context,
@@ -108,10 +127,13 @@ class CompelInvocation(BaseInvocation):
                 print(f'Warn: trigger: "{trigger}" not found')
 
         with (
-            ModelPatcher.apply_ti(tokenizer_info.context.model, text_encoder_info.context.model, ti_list) as (
-                tokenizer,
-                ti_manager,
-            ),
+            ModelPatcher.apply_ti(
+                tokenizer_info.context.model,
+                text_encoder_info.context.model,
+                ti_list,
+                cache=tokenizer_info.context.cache,
+                tokenizer_key=tokenizer_info.context.key,
+            ) as (tokenizer, ti_manager),
             text_encoder_info as text_encoder,
             # Apply the LoRA after text_encoder has been moved to its target device for faster patching.
             ModelPatcher.apply_lora_text_encoder(text_encoder, _lora_loader()),
@@ -140,7 +162,7 @@ class CompelInvocation(BaseInvocation):
 
         c = c.detach().to("cpu")
 
-        conditioning_data = ConditioningFieldData(
+        return ConditioningFieldData(
             conditionings=[
                 BasicConditioningInfo(
                     embeds=c,
@@ -149,15 +171,6 @@ class CompelInvocation(BaseInvocation):
             ]
         )
 
-        conditioning_name = f"{context.graph_execution_state_id}_{self.id}_conditioning"
-        context.services.latents.save(conditioning_name, conditioning_data)
-
-        return ConditioningOutput(
-            conditioning=ConditioningField(
-                conditioning_name=conditioning_name,
-            ),
-        )
-
 
 class SDXLPromptInvocationBase:
     def run_clip_compel(
@@ -168,6 +181,30 @@ class SDXLPromptInvocationBase:
         get_pooled: bool,
         lora_prefix: str,
         zero_on_empty: bool,
+    ):
+        conditioning_cache = context.services.conditioning_cache
+        cache_key = conditioning_cache.create_key(
+            node="sdxl_compel",
+            prompt=prompt,
+            clip=clip_field.model_dump(mode="json"),
+            get_pooled=get_pooled,
+            lora_prefix=lora_prefix,
+            zero_on_empty=zero_on_empty,
+        )
+        conditioning = conditioning_cache.get(cache_key)
+        if conditioning is None:
+            conditioning = self.encode_prompt(context, clip_field, prompt, get_pooled, lora_prefix, zero_on_empty)
+            conditioning_cache.save(cache_key, conditioning)
+        return conditioning
+
+    def encode_prompt(
+        self,
+        context: InvocationContext,
+        clip_field: ClipField,
+        prompt: str,
+        get_pooled: bool,
+        lora_prefix: str,
+        zero_on_empty: bool,
     ):
         tokenizer_info = context.services.model_manager.get_model(
             **clip_field.tokenizer.model_dump(),
@@ -231,10 +268,13 @@ class SDXLPromptInvocationBase:
                 print(f'Warn: trigger: "{trigger}" not found')
 
         with (
-            ModelPatcher.apply_ti(tokenizer_info.context.model, text_encoder_info.context.model, ti_list) as (
-                tokenizer,
-                ti_manager,
-            ),
+            ModelPatcher.apply_ti(
+                tokenizer_info.context.model,
+                text_encoder_info.context.model,
+                ti_list,
+                cache=tokenizer_info.context.cache,
+                tokenizer_key=tokenizer_info.context.key,
+            ) as (tokenizer, ti_manager),
             text_encoder_info as text_encoder,
             # Apply the LoRA after text_encoder has been moved to its target device for faster patching.
             ModelPatcher.apply_lora(text_encoder, _lora_loader(), lora_prefix),
@@ -19,12 +19,15 @@ from .baseinvocation import (
     Input,
     InputField,
     InvocationContext,
+    InvocationResource,
     WithMetadata,
     invocation,
 )
 
 
-@invocation("show_image", title="Show Image", tags=["image"], category="image", version="1.0.0")
+@invocation(
+    "show_image", title="Show Image", tags=["image"], category="image", version="1.0.0", resource=InvocationResource.CPU
+)
 class ShowImageInvocation(BaseInvocation):
     """Displays a provided image using the OS image viewer, and passes it forward in the pipeline."""
 
@@ -50,6 +53,7 @@ class ShowImageInvocation(BaseInvocation):
     tags=["image"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class BlankImageInvocation(BaseInvocation, WithMetadata):
     """Creates a blank image and forwards it to the pipeline"""
@@ -86,6 +90,7 @@ class BlankImageInvocation(BaseInvocation, WithMetadata):
     tags=["image", "crop"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageCropInvocation(BaseInvocation, WithMetadata):
     """Crops an image to a specified box. The box can be outside of the image."""
@@ -126,6 +131,7 @@ class ImageCropInvocation(BaseInvocation, WithMetadata):
     category="image",
     tags=["image", "pad", "crop"],
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class CenterPadCropInvocation(BaseInvocation):
     """Pad or crop an image's sides from the center by specified pixels. Positive values are outside of the image."""
@@ -181,6 +187,7 @@ class CenterPadCropInvocation(BaseInvocation):
     tags=["image", "paste"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImagePasteInvocation(BaseInvocation, WithMetadata):
     """Pastes an image into another image."""
@@ -241,6 +248,7 @@ class ImagePasteInvocation(BaseInvocation, WithMetadata):
     tags=["image", "mask"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class MaskFromAlphaInvocation(BaseInvocation, WithMetadata):
     """Extracts the alpha channel of an image as a mask."""
@@ -279,6 +287,7 @@ class MaskFromAlphaInvocation(BaseInvocation, WithMetadata):
     tags=["image", "multiply"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageMultiplyInvocation(BaseInvocation, WithMetadata):
     """Multiplies two images together using `PIL.ImageChops.multiply()`."""
@@ -319,6 +328,7 @@ IMAGE_CHANNELS = Literal["A", "R", "G", "B"]
     tags=["image", "channel"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageChannelInvocation(BaseInvocation, WithMetadata):
     """Gets a channel from an image."""
@@ -358,6 +368,7 @@ IMAGE_MODES = Literal["L", "RGB", "RGBA", "CMYK", "YCbCr", "LAB", "HSV", "I", "F
     tags=["image", "convert"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageConvertInvocation(BaseInvocation, WithMetadata):
     """Converts an image to a different mode."""
@@ -394,6 +405,7 @@ class ImageConvertInvocation(BaseInvocation, WithMetadata):
     tags=["image", "blur"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageBlurInvocation(BaseInvocation, WithMetadata):
     """Blurs an image"""
@@ -436,6 +448,7 @@ class ImageBlurInvocation(BaseInvocation, WithMetadata):
     category="image",
     version="1.2.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class UnsharpMaskInvocation(BaseInvocation, WithMetadata):
     """Applies an unsharp mask filter to an image"""
@@ -513,6 +526,7 @@ PIL_RESAMPLING_MAP = {
     tags=["image", "resize"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageResizeInvocation(BaseInvocation, WithMetadata):
     """Resizes an image to specific dimensions"""
@@ -556,6 +570,7 @@ class ImageResizeInvocation(BaseInvocation, WithMetadata):
     tags=["image", "scale"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageScaleInvocation(BaseInvocation, WithMetadata):
     """Scales an image by a factor"""
@@ -604,6 +619,7 @@ class ImageScaleInvocation(BaseInvocation, WithMetadata):
     tags=["image", "lerp"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageLerpInvocation(BaseInvocation, WithMetadata):
     """Linear interpolation of all pixels of an image"""
@@ -644,6 +660,7 @@ class ImageLerpInvocation(BaseInvocation, WithMetadata):
     tags=["image", "ilerp"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageInverseLerpInvocation(BaseInvocation, WithMetadata):
     """Inverse linear interpolation of all pixels of an image"""
@@ -684,6 +701,7 @@ class ImageInverseLerpInvocation(BaseInvocation, WithMetadata):
     tags=["image", "nsfw"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageNSFWBlurInvocation(BaseInvocation, WithMetadata):
     """Add blur to NSFW-flagged images"""
@@ -732,6 +750,7 @@ class ImageNSFWBlurInvocation(BaseInvocation, WithMetadata):
     tags=["image", "watermark"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageWatermarkInvocation(BaseInvocation, WithMetadata):
     """Add an invisible watermark to an image"""
@@ -766,6 +785,7 @@ class ImageWatermarkInvocation(BaseInvocation, WithMetadata):
     tags=["image", "mask", "inpaint"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class MaskEdgeInvocation(BaseInvocation, WithMetadata):
     """Applies an edge mask to an image"""
@@ -818,6 +838,7 @@ class MaskEdgeInvocation(BaseInvocation, WithMetadata):
     tags=["image", "mask", "multiply"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class MaskCombineInvocation(BaseInvocation, WithMetadata):
     """Combine two masks together by multiplying them using `PIL.ImageChops.multiply()`."""
@@ -855,6 +876,7 @@ class MaskCombineInvocation(BaseInvocation, WithMetadata):
     tags=["image", "color"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ColorCorrectInvocation(BaseInvocation, WithMetadata):
     """
@@ -972,6 +994,7 @@ class ColorCorrectInvocation(BaseInvocation, WithMetadata):
     tags=["image", "hue"],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageHueAdjustmentInvocation(BaseInvocation, WithMetadata):
     """Adjusts the Hue of an image."""
@@ -1076,6 +1099,7 @@ CHANNEL_FORMATS = {
     ],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageChannelOffsetInvocation(BaseInvocation, WithMetadata):
     """Add or subtract a value from a specific color channel of an image."""
@@ -1147,6 +1171,7 @@ class ImageChannelOffsetInvocation(BaseInvocation, WithMetadata):
     ],
     category="image",
     version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class ImageChannelMultiplyInvocation(BaseInvocation, WithMetadata):
     """Scale a specific color channel of an image."""
@@ -1207,6 +1232,7 @@ class ImageChannelMultiplyInvocation(BaseInvocation, WithMetadata):
     category="primitives",
     version="1.2.0",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class SaveImageInvocation(BaseInvocation, WithMetadata):
     """Saves an image. Unlike an image primitive, this invocation stores a copy of the image."""
@@ -1243,6 +1269,7 @@ class SaveImageInvocation(BaseInvocation, WithMetadata):
     category="primitives",
     version="1.0.1",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class LinearUIOutputInvocation(BaseInvocation, WithMetadata):
     """Handles Linear UI Image Outputting tasks."""
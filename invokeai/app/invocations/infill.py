@@ -13,7 +13,7 @@ from invokeai.backend.image_util.cv2_inpaint import cv2_inpaint
 from invokeai.backend.image_util.lama import LaMA
 from invokeai.backend.image_util.patchmatch import PatchMatch
 
-from .baseinvocation import BaseInvocation, InputField, InvocationContext, WithMetadata, invocation
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, InvocationResource, WithMetadata, invocation
 from .image import PIL_RESAMPLING_MAP, PIL_RESAMPLING_MODES
 
 
@@ -118,7 +118,14 @@ def tile_fill_missing(im: Image.Image, tile_size: int = 16, seed: Optional[int]
     return si
 
 
-@invocation("infill_rgba", title="Solid Color Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.0")
+@invocation(
+    "infill_rgba",
+    title="Solid Color Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.0",
+    resource=InvocationResource.CPU,
+)
 class InfillColorInvocation(BaseInvocation, WithMetadata):
     """Infills transparent areas of an image with a solid color"""
 
@@ -154,7 +161,14 @@ class InfillColorInvocation(BaseInvocation, WithMetadata):
         )
 
 
-@invocation("infill_tile", title="Tile Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.1")
+@invocation(
+    "infill_tile",
+    title="Tile Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.1",
+    resource=InvocationResource.CPU,
+)
 class InfillTileInvocation(BaseInvocation, WithMetadata):
     """Infills transparent areas of an image with tiles of the image"""
 
@@ -192,7 +206,12 @@ class InfillTileInvocation(BaseInvocation, WithMetadata):
 
 
 @invocation(
-    "infill_patchmatch", title="PatchMatch Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.0"
+    "infill_patchmatch",
+    title="PatchMatch Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.0",
+    resource=InvocationResource.CPU,
 )
 class InfillPatchMatchInvocation(BaseInvocation, WithMetadata):
     """Infills transparent areas of an image using the PatchMatch algorithm"""
@@ -274,7 +293,14 @@ class LaMaInfillInvocation(BaseInvocation, WithMetadata):
         )
 
 
-@invocation("infill_cv2", title="CV2 Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.0")
+@invocation(
+    "infill_cv2",
+    title="CV2 Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.0",
+    resource=InvocationResource.CPU,
+)
 class CV2InfillInvocation(BaseInvocation, WithMetadata):
     """Infills transparent areas of an image using OpenCV Inpainting"""
 
@@ -722,7 +722,7 @@ class DenoiseLatentsInvocation(BaseInvocation):
                 set_seamless(unet_info.context.model, self.unet.seamless_axes),
                 unet_info as unet,
                 # Apply the LoRA after unet has been moved to its target device for faster patching.
-                ModelPatcher.apply_lora_unet(unet, _lora_loader()),
+                ModelPatcher.apply_lora_unet(unet, _lora_loader(), sticky=context.services.configuration.sticky_loras),
             ):
                 latents = latents.to(device=unet.device, dtype=unet.dtype)
                 if noise is not None:
@@ -8,10 +8,12 @@ from pydantic import ValidationInfo, field_validator
 from invokeai.app.invocations.primitives import FloatOutput, IntegerOutput
 from invokeai.app.shared.fields import FieldDescriptions
 
-from .baseinvocation import BaseInvocation, InputField, InvocationContext, invocation
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, InvocationResource, invocation
 
 
-@invocation("add", title="Add Integers", tags=["math", "add"], category="math", version="1.0.0")
+@invocation(
+    "add", title="Add Integers", tags=["math", "add"], category="math", version="1.0.0", resource=InvocationResource.CPU
+)
 class AddInvocation(BaseInvocation):
     """Adds two numbers"""
 
@@ -22,7 +24,14 @@ class AddInvocation(BaseInvocation):
         return IntegerOutput(value=self.a + self.b)
 
 
-@invocation("sub", title="Subtract Integers", tags=["math", "subtract"], category="math", version="1.0.0")
+@invocation(
+    "sub",
+    title="Subtract Integers",
+    tags=["math", "subtract"],
+    category="math",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class SubtractInvocation(BaseInvocation):
     """Subtracts two numbers"""
 
@@ -33,7 +42,14 @@ class SubtractInvocation(BaseInvocation):
         return IntegerOutput(value=self.a - self.b)
 
 
-@invocation("mul", title="Multiply Integers", tags=["math", "multiply"], category="math", version="1.0.0")
+@invocation(
+    "mul",
+    title="Multiply Integers",
+    tags=["math", "multiply"],
+    category="math",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class MultiplyInvocation(BaseInvocation):
     """Multiplies two numbers"""
 
@@ -44,7 +60,14 @@ class MultiplyInvocation(BaseInvocation):
         return IntegerOutput(value=self.a * self.b)
 
 
-@invocation("div", title="Divide Integers", tags=["math", "divide"], category="math", version="1.0.0")
+@invocation(
+    "div",
+    title="Divide Integers",
+    tags=["math", "divide"],
+    category="math",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class DivideInvocation(BaseInvocation):
     """Divides two numbers"""
 
@@ -62,6 +85,7 @@ class DivideInvocation(BaseInvocation):
     category="math",
     version="1.0.0",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class RandomIntInvocation(BaseInvocation):
     """Outputs a single random integer."""
@@ -80,6 +104,7 @@ class RandomIntInvocation(BaseInvocation):
     category="math",
     version="1.0.1",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class RandomFloatInvocation(BaseInvocation):
     """Outputs a single random float"""
@@ -100,6 +125,7 @@ class RandomFloatInvocation(BaseInvocation):
     tags=["math", "round", "integer", "float", "convert"],
     category="math",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class FloatToIntegerInvocation(BaseInvocation):
     """Rounds a float number to (a multiple of) an integer."""
@@ -121,7 +147,14 @@ class FloatToIntegerInvocation(BaseInvocation):
             return IntegerOutput(value=int(self.value / self.multiple) * self.multiple)
 
 
-@invocation("round_float", title="Round Float", tags=["math", "round"], category="math", version="1.0.0")
+@invocation(
+    "round_float",
+    title="Round Float",
+    tags=["math", "round"],
+    category="math",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class RoundInvocation(BaseInvocation):
     """Rounds a float to a specified number of decimal places."""
 
@@ -176,6 +209,7 @@ INTEGER_OPERATIONS_LABELS = {
     ],
     category="math",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class IntegerMathInvocation(BaseInvocation):
     """Performs integer math."""
@@ -250,6 +284,7 @@ FLOAT_OPERATIONS_LABELS = {
     tags=["math", "float", "add", "subtract", "multiply", "divide", "power", "root", "absolute value", "min", "max"],
     category="math",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class FloatMathInvocation(BaseInvocation):
     """Performs floating point math."""
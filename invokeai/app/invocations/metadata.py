@@ -7,6 +7,7 @@ from invokeai.app.invocations.baseinvocation import (
     BaseInvocationOutput,
     InputField,
     InvocationContext,
+    InvocationResource,
     MetadataField,
     OutputField,
     UIType,
@@ -56,7 +57,14 @@ class MetadataItemOutput(BaseInvocationOutput):
     item: MetadataItemField = OutputField(description="Metadata Item")
 
 
-@invocation("metadata_item", title="Metadata Item", tags=["metadata"], category="metadata", version="1.0.0")
+@invocation(
+    "metadata_item",
+    title="Metadata Item",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class MetadataItemInvocation(BaseInvocation):
     """Used to create an arbitrary metadata item. Provide "label" and make a connection to "value" to store that data as the value."""
 
@@ -72,7 +80,14 @@ class MetadataOutput(BaseInvocationOutput):
     metadata: MetadataField = OutputField(description="Metadata Dict")
 
 
-@invocation("metadata", title="Metadata", tags=["metadata"], category="metadata", version="1.0.0")
+@invocation(
+    "metadata",
+    title="Metadata",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class MetadataInvocation(BaseInvocation):
     """Takes a MetadataItem or collection of MetadataItems and outputs a MetadataDict."""
 
@@ -93,7 +108,14 @@ class MetadataInvocation(BaseInvocation):
         return MetadataOutput(metadata=MetadataField.model_validate(data))
 
 
-@invocation("merge_metadata", title="Metadata Merge", tags=["metadata"], category="metadata", version="1.0.0")
+@invocation(
+    "merge_metadata",
+    title="Metadata Merge",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class MergeMetadataInvocation(BaseInvocation):
     """Merged a collection of MetadataDict into a single MetadataDict."""
 
@@ -112,7 +134,14 @@ GENERATION_MODES = Literal[
 ]
 
 
-@invocation("core_metadata", title="Core Metadata", tags=["metadata"], category="metadata", version="1.0.1")
+@invocation(
+    "core_metadata",
+    title="Core Metadata",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.1",
+    resource=InvocationResource.CPU,
+)
 class CoreMetadataInvocation(BaseInvocation):
     """Collects core generation metadata into a MetadataField"""
 
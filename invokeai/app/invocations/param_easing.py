@@ -41,7 +41,7 @@ from matplotlib.ticker import MaxNLocator
 
 from invokeai.app.invocations.primitives import FloatCollectionOutput
 
-from .baseinvocation import BaseInvocation, InputField, InvocationContext, invocation
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, InvocationResource, invocation
 
 
 @invocation(
@@ -50,6 +50,7 @@ from .baseinvocation import BaseInvocation, InputField, InvocationContext, invoc
     tags=["math", "range"],
     category="math",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class FloatLinearRangeInvocation(BaseInvocation):
     """Creates a range"""
@@ -13,6 +13,7 @@ from .baseinvocation import (
     Input,
     InputField,
     InvocationContext,
+    InvocationResource,
     OutputField,
     UIComponent,
     invocation,
@@ -46,7 +47,12 @@ class BooleanCollectionOutput(BaseInvocationOutput):
 
 
 @invocation(
-    "boolean", title="Boolean Primitive", tags=["primitives", "boolean"], category="primitives", version="1.0.0"
+    "boolean",
+    title="Boolean Primitive",
+    tags=["primitives", "boolean"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class BooleanInvocation(BaseInvocation):
     """A boolean primitive value"""
@@ -63,6 +69,7 @@ class BooleanInvocation(BaseInvocation):
     tags=["primitives", "boolean", "collection"],
     category="primitives",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class BooleanCollectionInvocation(BaseInvocation):
     """A collection of boolean primitive values"""
@@ -95,7 +102,12 @@ class IntegerCollectionOutput(BaseInvocationOutput):
 
 
 @invocation(
-    "integer", title="Integer Primitive", tags=["primitives", "integer"], category="primitives", version="1.0.0"
+    "integer",
+    title="Integer Primitive",
+    tags=["primitives", "integer"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class IntegerInvocation(BaseInvocation):
     """An integer primitive value"""
@@ -112,6 +124,7 @@ class IntegerInvocation(BaseInvocation):
     tags=["primitives", "integer", "collection"],
     category="primitives",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class IntegerCollectionInvocation(BaseInvocation):
     """A collection of integer primitive values"""
@@ -143,7 +156,14 @@ class FloatCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("float", title="Float Primitive", tags=["primitives", "float"], category="primitives", version="1.0.0")
+@invocation(
+    "float",
+    title="Float Primitive",
+    tags=["primitives", "float"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class FloatInvocation(BaseInvocation):
     """A float primitive value"""
 
@@ -159,6 +179,7 @@ class FloatInvocation(BaseInvocation):
     tags=["primitives", "float", "collection"],
     category="primitives",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class FloatCollectionInvocation(BaseInvocation):
     """A collection of float primitive values"""
@@ -190,7 +211,14 @@ class StringCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("string", title="String Primitive", tags=["primitives", "string"], category="primitives", version="1.0.0")
+@invocation(
+    "string",
+    title="String Primitive",
+    tags=["primitives", "string"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class StringInvocation(BaseInvocation):
     """A string primitive value"""
 
@@ -206,6 +234,7 @@ class StringInvocation(BaseInvocation):
     tags=["primitives", "string", "collection"],
     category="primitives",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class StringCollectionInvocation(BaseInvocation):
     """A collection of string primitive values"""
@@ -251,7 +280,14 @@ class ImageCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("image", title="Image Primitive", tags=["primitives", "image"], category="primitives", version="1.0.0")
+@invocation(
+    "image",
+    title="Image Primitive",
+    tags=["primitives", "image"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class ImageInvocation(
     BaseInvocation,
 ):
@@ -275,6 +311,7 @@ class ImageInvocation(
     tags=["primitives", "image", "collection"],
     category="primitives",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class ImageCollectionInvocation(BaseInvocation):
     """A collection of image primitive values"""
@@ -337,7 +374,12 @@ class LatentsCollectionOutput(BaseInvocationOutput):
 
 
 @invocation(
-    "latents", title="Latents Primitive", tags=["primitives", "latents"], category="primitives", version="1.0.0"
+    "latents",
+    title="Latents Primitive",
+    tags=["primitives", "latents"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class LatentsInvocation(BaseInvocation):
     """A latents tensor primitive value"""
@@ -356,6 +398,7 @@ class LatentsInvocation(BaseInvocation):
     tags=["primitives", "latents", "collection"],
     category="primitives",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class LatentsCollectionInvocation(BaseInvocation):
     """A collection of latents tensor primitive values"""
@@ -409,7 +452,14 @@ class ColorCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("color", title="Color Primitive", tags=["primitives", "color"], category="primitives", version="1.0.0")
+@invocation(
+    "color",
+    title="Color Primitive",
+    tags=["primitives", "color"],
+    category="primitives",
+    version="1.0.0",
+    resource=InvocationResource.CPU,
+)
 class ColorInvocation(BaseInvocation):
     """A color primitive value"""
 
@@ -452,6 +502,7 @@ class ConditioningCollectionOutput(BaseInvocationOutput):
     tags=["primitives", "conditioning"],
     category="primitives",
     version="1.0.0",
+    resource=InvocationResource.CPU,
 )
 class ConditioningInvocation(BaseInvocation):
     """A conditioning tensor primitive value"""
@@ -468,6 +519,7 @@ class ConditioningInvocation(BaseInvocation):
     tags=["primitives", "conditioning", "collection"],
     category="primitives",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class ConditioningCollectionInvocation(BaseInvocation):
     """A collection of conditioning tensor primitive values"""
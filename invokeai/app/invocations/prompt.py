@@ -7,7 +7,7 @@ from pydantic import field_validator
 
 from invokeai.app.invocations.primitives import StringCollectionOutput
 
-from .baseinvocation import BaseInvocation, InputField, InvocationContext, UIComponent, invocation
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, InvocationResource, UIComponent, invocation
 
 
 @invocation(
@@ -17,6 +17,7 @@ from .baseinvocation import BaseInvocation, InputField, InvocationContext, UICom
     category="prompt",
     version="1.0.0",
     use_cache=False,
+    resource=InvocationResource.CPU,
 )
 class DynamicPromptInvocation(BaseInvocation):
     """Parses a prompt using adieyal/dynamicprompts' random or combinatorial generator"""
@@ -45,6 +46,7 @@ class DynamicPromptInvocation(BaseInvocation):
     tags=["prompt", "file"],
     category="prompt",
     version="1.0.1",
+    resource=InvocationResource.CPU,
 )
 class PromptsFromFileInvocation(BaseInvocation):
     """Loads prompts from a text file"""
@@ -11,6 +11,7 @@ from invokeai.app.invocations.baseinvocation import (
     Input,
     InputField,
     InvocationContext,
+    InvocationResource,
     OutputField,
     WithMetadata,
     invocation,
@@ -45,6 +46,7 @@ class CalculateImageTilesOutput(BaseInvocationOutput):
     category="tiles",
     version="1.0.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class CalculateImageTilesInvocation(BaseInvocation):
     """Calculate the coordinates and overlaps of tiles that cover a target image shape."""
@@ -79,6 +81,7 @@ class CalculateImageTilesInvocation(BaseInvocation):
     category="tiles",
     version="1.1.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class CalculateImageTilesEvenSplitInvocation(BaseInvocation):
     """Calculate the coordinates and overlaps of tiles that cover a target image shape."""
@@ -122,6 +125,7 @@ class CalculateImageTilesEvenSplitInvocation(BaseInvocation):
     category="tiles",
     version="1.0.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class CalculateImageTilesMinimumOverlapInvocation(BaseInvocation):
     """Calculate the coordinates and overlaps of tiles that cover a target image shape."""
@@ -173,6 +177,7 @@ class TileToPropertiesOutput(BaseInvocationOutput):
     category="tiles",
     version="1.0.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class TileToPropertiesInvocation(BaseInvocation):
     """Split a Tile into its individual properties."""
@@ -206,6 +211,7 @@ class PairTileImageOutput(BaseInvocationOutput):
     category="tiles",
     version="1.0.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class PairTileImageInvocation(BaseInvocation):
     """Pair an image with its tile properties."""
@@ -235,6 +241,7 @@ BLEND_MODES = Literal["Linear", "Seam"]
     category="tiles",
     version="1.1.0",
     classification=Classification.Beta,
+    resource=InvocationResource.CPU,
 )
 class MergeTilesToImageInvocation(BaseInvocation, WithMetadata):
     """Merge multiple tile images into a single image."""
@@ -10,12 +10,14 @@ from .board_image_records_base import BoardImageRecordStorageBase
 
 
 class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
+    _db: SqliteDatabase
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
     _lock: threading.RLock
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
+        self._db = db
         self._lock = db.lock
         self._conn = db.conn
         self._cursor = self._conn.cursor()
@@ -70,91 +72,79 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
     ) -> OffsetPaginatedResults[ImageRecord]:
         # TODO: this isn't paginated yet?
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT images.*
-                FROM board_images
-                INNER JOIN images ON board_images.image_name = images.image_name
-                WHERE board_images.board_id = ?
-                ORDER BY board_images.updated_at DESC;
-                """,
-                (board_id,),
-            )
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            images = [deserialize_image_record(dict(r)) for r in result]
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT images.*
+                    FROM board_images
+                    INNER JOIN images ON board_images.image_name = images.image_name
+                    WHERE board_images.board_id = ?
+                    ORDER BY board_images.updated_at DESC;
+                    """,
+                    (board_id,),
+                )
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                images = [deserialize_image_record(dict(r)) for r in result]
 
-            self._cursor.execute(
-                """--sql
-                SELECT COUNT(*) FROM images WHERE 1=1;
-                """
-            )
-            count = cast(int, self._cursor.fetchone()[0])
+                cursor.execute(
+                    """--sql
+                    SELECT COUNT(*) FROM images WHERE 1=1;
+                    """
+                )
+                count = cast(int, cursor.fetchone()[0])
 
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
         return OffsetPaginatedResults(items=images, offset=offset, limit=limit, total=count)
 
     def get_all_board_image_names_for_board(self, board_id: str) -> list[str]:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT image_name
-                FROM board_images
-                WHERE board_id = ?;
-                """,
-                (board_id,),
-            )
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            image_names = [r[0] for r in result]
-            return image_names
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT image_name
+                    FROM board_images
+                    WHERE board_id = ?;
+                    """,
+                    (board_id,),
+                )
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                image_names = [r[0] for r in result]
+                return image_names
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
 
     def get_board_for_image(
         self,
         image_name: str,
     ) -> Optional[str]:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT board_id
-                FROM board_images
-                WHERE image_name = ?;
-                """,
-                (image_name,),
-            )
-            result = self._cursor.fetchone()
-            if result is None:
-                return None
-            return cast(str, result[0])
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT board_id
+                    FROM board_images
+                    WHERE image_name = ?;
+                    """,
+                    (image_name,),
+                )
+                result = cursor.fetchone()
+                if result is None:
+                    return None
+                return cast(str, result[0])
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
 
     def get_image_count_for_board(self, board_id: str) -> int:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT COUNT(*) FROM board_images WHERE board_id = ?;
-                """,
-                (board_id,),
-            )
-            count = cast(int, self._cursor.fetchone()[0])
-            return count
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT COUNT(*) FROM board_images WHERE board_id = ?;
+                    """,
+                    (board_id,),
+                )
+                count = cast(int, cursor.fetchone()[0])
+                return count
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
@@ -18,12 +18,14 @@ from .board_records_common import (
 
 
 class SqliteBoardRecordStorage(BoardRecordStorageBase):
+    _db: SqliteDatabase
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
     _lock: threading.RLock
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
+        self._db = db
         self._lock = db.lock
         self._conn = db.conn
         self._cursor = self._conn.cursor()
@@ -75,22 +77,19 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         board_id: str,
     ) -> BoardRecord:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT *
-                FROM boards
-                WHERE board_id = ?;
-                """,
-                (board_id,),
-            )
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM boards
+                    WHERE board_id = ?;
+                    """,
+                    (board_id,),
+                )
 
-            result = cast(Union[sqlite3.Row, None], self._cursor.fetchone())
+                result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise BoardRecordNotFoundException from e
-        finally:
-            self._lock.release()
         if result is None:
             raise BoardRecordNotFoundException
         return BoardRecord(**dict(result))
@@ -139,63 +138,55 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         limit: int = 10,
     ) -> OffsetPaginatedResults[BoardRecord]:
         try:
-            self._lock.acquire()
-
-            # Get all the boards
-            self._cursor.execute(
-                """--sql
-                SELECT *
-                FROM boards
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?;
-                """,
-                (limit, offset),
-            )
+            with self._db.read() as cursor:
+                # Get all the boards
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM boards
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?;
+                    """,
+                    (limit, offset),
+                )
 
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            boards = [deserialize_board_record(dict(r)) for r in result]
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                boards = [deserialize_board_record(dict(r)) for r in result]
 
-            # Get the total number of boards
-            self._cursor.execute(
-                """--sql
-                SELECT COUNT(*)
-                FROM boards
-                WHERE 1=1;
-                """
-            )
+                # Get the total number of boards
+                cursor.execute(
+                    """--sql
+                    SELECT COUNT(*)
+                    FROM boards
+                    WHERE 1=1;
+                    """
+                )
 
-            count = cast(int, self._cursor.fetchone()[0])
+                count = cast(int, cursor.fetchone()[0])
 
-            return OffsetPaginatedResults[BoardRecord](items=boards, offset=offset, limit=limit, total=count)
+                return OffsetPaginatedResults[BoardRecord](items=boards, offset=offset, limit=limit, total=count)
 
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
 
     def get_all(
         self,
     ) -> list[BoardRecord]:
         try:
-            self._lock.acquire()
-
-            # Get all the boards
-            self._cursor.execute(
-                """--sql
-                SELECT *
-                FROM boards
-                ORDER BY created_at DESC
-                """
-            )
+            with self._db.read() as cursor:
+                # Get all the boards
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM boards
+                    ORDER BY created_at DESC
+                    """
+                )
 
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            boards = [deserialize_board_record(dict(r)) for r in result]
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                boards = [deserialize_board_record(dict(r)) for r in result]
 
-            return boards
+                return boards
 
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
@@ -0,0 +1,39 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class ConditioningCacheBase(ABC):
+    """
+    Base class for conditioning caches.
+
+    Prompt nodes keep the conditioning they encode in the cache, keyed by everything it depends on: the prompt, the
+    tokenizer and text encoder, the LoRAs and their weights, and the skipped layers. The textual inversions are given
+    by the prompt. When a prompt is encoded again, as by each session of a batch that only varies the seed, the
+    conditioning is taken from the cache without loading the text encoder.
+
+    Unlike the node cache, the cache does not depend on the conditioning saved by earlier sessions still existing.
+
+    Implementations should respect the `conditioning_cache_mb` configuration value, and skip all cache logic if the
+    value is set to 0.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Retrieves conditioning from the cache"""
+        pass
+
+    @abstractmethod
+    def save(self, key: str, conditioning: Any) -> None:
+        """Stores conditioning in the cache"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Clears the cache"""
+        pass
+
+    def create_key(self, **inputs: Any) -> str:
+        """Gets the key of the conditioning encoded from the given inputs, which must be serializable to JSON"""
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
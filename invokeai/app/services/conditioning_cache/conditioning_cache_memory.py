@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Optional
+
+from invokeai.app.services.latents_storage.latents_storage_forward_cache import get_size
+
+from .conditioning_cache_base import ConditioningCacheBase
+
+
+@dataclass
+class CachedConditioning:
+    conditioning: Any
+    size: int
+
+
+class MemoryConditioningCache(ConditioningCacheBase):
+    """Keeps the most recently used conditioning in memory, up to a size in bytes"""
+
+    _cache: OrderedDict[str, CachedConditioning]
+    _size: int
+    _max_cache_bytes: int
+    _lock: Lock
+
+    def __init__(self, max_cache_bytes: int = 64 * 2**20) -> None:
+        self._cache = OrderedDict()
+        self._size = 0
+        self._max_cache_bytes = max_cache_bytes
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self._max_cache_bytes == 0:
+            return None
+        with self._lock:
+            item = self._cache.get(key)
+            if item is None:
+                return None
+            self._cache.move_to_end(key)
+            return item.conditioning
+
+    def save(self, key: str, conditioning: Any) -> None:
+        if self._max_cache_bytes == 0:
+            return
+        size = get_size(conditioning)
+        with self._lock:
+            if size > self._max_cache_bytes:
+                return
+            self._delete(key)
+            self._cache[key] = CachedConditioning(conditioning, size)
+            self._size += size
+            while self._size > self._max_cache_bytes:
+                _, item = self._cache.popitem(last=False)
+                self._size -= item.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+
+    def _delete(self, key: str) -> None:
+        item = self._cache.pop(key, None)
+        if item is not None:
+            self._size -= item.size
@@ -260,6 +260,12 @@ class InvokeAIAppConfig(InvokeAISettings):
     vram                : float = Field(default=0.25, ge=0, description="Amount of VRAM reserved for model storage (floating point number, GB)", json_schema_extra=Categories.ModelCache, )
     lazy_offload        : bool = Field(default=True, description="Keep models in VRAM until their space is needed", json_schema_extra=Categories.ModelCache, )
     log_memory_usage    : bool = Field(default=False, description="If True, a memory snapshot will be captured before and after every model cache operation, and the result will be logged (at debug level). There is a time cost to capturing the memory snapshots, so it is recommended to only enable this feature if you are actively inspecting the model cache's behaviour.", json_schema_extra=Categories.ModelCache)
+    prefetch_depth      : int = Field(default=2, ge=0, description="How many pending queue items to load the models of into the RAM cache ahead of time, while the current item is processed. Models are only loaded into free room of the cache. Set to 0 to disable.", json_schema_extra=Categories.ModelCache)
+    eviction_policy     : Literal["lru", "reload_cost"] = Field(default="lru", description="Which models the RAM cache evicts first when it needs room: the least recently used ones (lru), or those quickest to load again for the room they take (reload_cost)", json_schema_extra=Categories.ModelCache)
+    cache_trace_path    : Optional[Path] = Field(default=None, description="If set, every model requested from the RAM cache is logged to this file, to compare eviction policies with scripts/replay_model_cache_trace.py", json_schema_extra=Categories.ModelCache)
+    convert_cache       : float = Field(default=10.0, gt=0, description="Maximum size of the cache of checkpoint models converted to diffusers format, on disk (floating point number, GB). The least recently used conversions are removed when it is full.", json_schema_extra=Categories.ModelCache)
+    convert_on_import   : bool = Field(default=True, description="Convert checkpoint models into the conversion cache in the background when they are added, so their first use doesn't wait for the conversion", json_schema_extra=Categories.ModelCache)
+    sticky_loras        : bool = Field(default=False, description="Leave the LoRAs applied to the UNet after a denoising node, so the next one using the same LoRAs with the same weights doesn't apply them again. The UNet's original weights are kept in RAM, and restored when other LoRAs are used.", json_schema_extra=Categories.ModelCache)
 
     # DEVICE
     device              : Literal["auto", "cpu", "cuda", "cuda:1", "mps"] = Field(default="auto", description="Generation device", json_schema_extra=Categories.Device)
@@ -274,11 +280,21 @@ class InvokeAIAppConfig(InvokeAISettings):
 
     # QUEUE
     max_queue_size      : int = Field(default=10000, gt=0, description="Maximum number of items in the session queue", json_schema_extra=Categories.Queue)
+    session_lanes       : int = Field(default=1, gt=0, description="How many queue items may be processed at the same time. Their nodes share the node workers, and nodes that use the GPU still execute one at a time.", json_schema_extra=Categories.Queue)
+    queue_scheduling    : Literal["priority", "round_robin", "fair"] = Field(default="priority", description='Which queue item is dequeued next: the first one of the highest priority (priority), the next one of each queue in turn (round_robin), or the next one of the batch that had the fewest items processed, so small batches are not held up by large ones (fair). Items enqueued at the front of their queue come first with every policy.', json_schema_extra=Categories.Queue)
+    max_in_flight_per_queue: int = Field(default=0, ge=0, description="How many queue items of the same queue may be processed at the same time, when there are several session lanes. 0 for no limit.", json_schema_extra=Categories.Queue)
 
     # NODES
     allow_nodes         : Optional[List[str]] = Field(default=None, description="List of nodes to allow. Omit to allow all.", json_schema_extra=Categories.Nodes)
     deny_nodes          : Optional[List[str]] = Field(default=None, description="List of nodes to deny. Omit to deny none.", json_schema_extra=Categories.Nodes)
-    node_cache_size     : int = Field(default=512, description="How many cached nodes to keep in memory", json_schema_extra=Categories.Nodes)
+    node_cache_size     : int = Field(default=512, description="How many cached nodes to keep", json_schema_extra=Categories.Nodes)
+    node_cache_max_mb   : float = Field(default=64, gt=0, description="Maximum total size of the cached node outputs, in megabytes. Outputs refer to images and latents by name, so they are small.", json_schema_extra=Categories.Nodes)
+    conditioning_cache_mb: float = Field(default=64, ge=0, description="Maximum memory used to keep the conditioning of recent prompts, in megabytes. Prompts encoded again with the same models, LoRAs and settings, as in a batch of seeds, are taken from it without loading the text encoder. Set to 0 to disable.", json_schema_extra=Categories.Nodes)
+    latents_cache_mb    : float = Field(default=512, ge=0, description="Maximum memory used to keep latents and conditioning in memory, in megabytes. Latents are written to disk in the background, and read back from disk once evicted.", json_schema_extra=Categories.Nodes)
+    image_cache_mb      : float = Field(default=512, ge=0, description="Maximum memory used to keep decoded images in memory, in megabytes. Images used by later nodes of the same session are kept in preference to others.", json_schema_extra=Categories.Nodes)
+    image_writers       : int = Field(default=2, ge=0, description="How many threads encode and write images in the background, while nodes keep executing. Set to 0 to write images before the node that created them completes.", json_schema_extra=Categories.Nodes)
+    node_workers        : int = Field(default=1, gt=0, description="How many nodes of a session may execute at the same time. Nodes that use the GPU always execute one at a time.", json_schema_extra=Categories.Nodes)
+    session_checkpoint_interval: int = Field(default=32, ge=0, description="After how many nodes the full state of a session is saved. In between, only the changes made by each node are saved. Set to 0 to save the full state after every node.", json_schema_extra=Categories.Nodes)
 
     # DEPRECATED FIELDS - STILL HERE IN ORDER TO OBTAN VALUES FROM PRE-3.1 CONFIG FILES
     always_use_cpu      : bool = Field(default=False, description="If true, use the CPU for rendering even if a GPU is available.", json_schema_extra=Categories.MemoryPerformance)
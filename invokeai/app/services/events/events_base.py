@@ -175,8 +175,9 @@ class EventServiceBase:
         base_model: BaseModelType,
         model_type: ModelType,
         submodel: SubModelType,
+        prefetch: bool = False,
     ) -> None:
-        """Emitted when a model is requested"""
+        """Emitted when a model is requested, or prefetched for a pending queue item"""
         self.__emit_queue_event(
             event_name="model_load_started",
             payload={
@@ -188,6 +189,7 @@ class EventServiceBase:
                 "base_model": base_model,
                 "model_type": model_type,
                 "submodel": submodel,
+                "prefetch": prefetch,
             },
         )
 
@@ -202,8 +204,9 @@ class EventServiceBase:
         model_type: ModelType,
         submodel: SubModelType,
         model_info: ModelInfo,
+        prefetch: bool = False,
     ) -> None:
-        """Emitted when a model is correctly loaded (returns model info)"""
+        """Emitted when a model is correctly loaded (returns model info), or prefetched for a pending queue item"""
         self.__emit_queue_event(
             event_name="model_load_completed",
             payload={
@@ -218,6 +221,7 @@ class EventServiceBase:
                 "hash": model_info.hash,
                 "location": str(model_info.location),
                 "precision": str(model_info.precision),
+                "prefetch": prefetch,
             },
         )
 
@@ -324,6 +328,18 @@ class EventServiceBase:
             },
         )
 
+    def emit_batch_enqueue_progress(self, queue_id: str, batch_id: str, enqueued: int, total: int) -> None:
+        """Emitted when a part of a batch was enqueued, and more is being enqueued"""
+        self.__emit_queue_event(
+            event_name="batch_enqueue_progress",
+            payload={
+                "queue_id": queue_id,
+                "batch_id": batch_id,
+                "enqueued": enqueued,
+                "total": total,
+            },
+        )
+
     def emit_queue_cleared(self, queue_id: str) -> None:
         """Emitted when the queue is cleared"""
         self.__emit_queue_event(
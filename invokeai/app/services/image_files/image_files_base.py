@@ -5,6 +5,7 @@ from typing import Optional
 from PIL.Image import Image as PILImageType
 
 from invokeai.app.invocations.baseinvocation import MetadataField
+from invokeai.app.services.image_files.image_files_common import ImageFileCacheStatus
 from invokeai.app.services.workflow_records.workflow_records_common import WorkflowWithoutID
 
 
@@ -45,7 +46,38 @@ class ImageFileStorageBase(ABC):
         """Deletes an image and its thumbnail (if one exists)."""
         pass
 
+    @abstractmethod
+    def delete_many(self, image_names: list[str]) -> list[str]:
+        """Deletes many images and their thumbnails, returning the names of those deleted. Images whose files could
+        not be deleted are left in place."""
+        pass
+
     @abstractmethod
     def get_workflow(self, image_name: str) -> Optional[WorkflowWithoutID]:
         """Gets the workflow of an image."""
         pass
+
+    @abstractmethod
+    def is_pending(self, image_name: str) -> bool:
+        """Checks if an image is still being written, in which case it is only available with `get()`."""
+        pass
+
+    @abstractmethod
+    def flush(self, image_name: Optional[str] = None) -> None:
+        """Waits for an image, or all images, to be written."""
+        pass
+
+    @abstractmethod
+    def pin(self, image_name: str, session_id: str) -> None:
+        """Keeps an image used by a session in memory, in preference to other images, until the session ends."""
+        pass
+
+    @abstractmethod
+    def unpin_session(self, session_id: str) -> None:
+        """Unpins all images pinned by a session."""
+        pass
+
+    @abstractmethod
+    def get_cache_status(self) -> ImageFileCacheStatus:
+        """Gets the status of the in-memory image cache."""
+        pass
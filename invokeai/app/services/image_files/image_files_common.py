@@ -1,3 +1,6 @@
+from pydantic import BaseModel, Field
+
+
 # TODO: Should these excpetions subclass existing python exceptions?
 class ImageFileNotFoundException(Exception):
     """Raised when an image file is not found in storage."""
@@ -18,3 +21,12 @@ class ImageFileDeleteException(Exception):
 
     def __init__(self, message="Image file not deleted"):
         super().__init__(message)
+
+
+class ImageFileCacheStatus(BaseModel):
+    size: int = Field(description="The number of images in the cache")
+    hits: int = Field(description="The number of cache hits")
+    misses: int = Field(description="The number of cache misses")
+    pinned: int = Field(description="The number of cached images pinned by sessions")
+    size_in_bytes: int = Field(description="The size of the decoded images in the cache, in bytes")
+    max_size_in_bytes: int = Field(description="The maximum size of the decoded images in the cache, in bytes")
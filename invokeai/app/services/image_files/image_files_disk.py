@@ -1,7 +1,9 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654) and the InvokeAI Team
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from queue import Queue
-from typing import Dict, Optional, Union
+from threading import BoundedSemaphore, Lock
+from typing import Optional, Union
 
 from PIL import Image, PngImagePlugin
 from PIL.Image import Image as PILImageType
@@ -13,22 +15,62 @@ from invokeai.app.services.workflow_records.workflow_records_common import Workf
 from invokeai.app.util.thumbnails import get_thumbnail_name, make_thumbnail
 
 from .image_files_base import ImageFileStorageBase
-from .image_files_common import ImageFileDeleteException, ImageFileNotFoundException, ImageFileSaveException
+from .image_files_common import (
+    ImageFileCacheStatus,
+    ImageFileDeleteException,
+    ImageFileNotFoundException,
+    ImageFileSaveException,
+)
+
+# Bytes per pixel of each band, for the modes that do not use one byte per band
+MODE_BAND_SIZES = {"I": 4, "F": 4, "I;16": 2, "I;16B": 2, "I;16L": 2, "I;16N": 2}
+
+# Threads moving the files of many images to the trash at once
+TRASH_WORKERS = 8
+
+
+def get_decoded_size(image: PILImageType) -> int:
+    """Gets the memory used by the pixels of a decoded image, in bytes"""
+    return image.width * image.height * len(image.getbands()) * MODE_BAND_SIZES.get(image.mode, 1)
 
 
 class DiskImageFileStorage(ImageFileStorageBase):
-    """Stores images on disk"""
+    """Stores images on disk.
+
+    Recently used images are kept decoded in memory, up to a size in bytes. Images pinned by a session are evicted
+    after all others, and unpinned when the session ends.
+
+    With `max_writers` > 0, images are encoded and written by a pool of background threads. Until written, images stay
+    in memory, where they are served from. Saving blocks when a number of writes are already pending, so memory use
+    is bounded when images are produced faster than they can be written. `flush()` waits for pending writes.
+    """
 
     __output_folder: Path
-    __cache_ids: Queue  # TODO: this is an incredibly naive cache
-    __cache: Dict[Path, PILImageType]
-    __max_cache_size: int
+    __cache: OrderedDict[str, tuple[PILImageType, int]]
+    __cache_size: int
+    __max_cache_bytes: int
+    __pins: dict[str, set[str]]
+    __pin_counts: dict[str, int]
+    __hits: int
+    __misses: int
+    __lock: Lock
+    __pending: dict[str, Future]
+    __pending_slots: Optional[BoundedSemaphore]
+    __writers: Optional[ThreadPoolExecutor]
     __invoker: Invoker
 
-    def __init__(self, output_folder: Union[str, Path]):
-        self.__cache = {}
-        self.__cache_ids = Queue()
-        self.__max_cache_size = 10  # TODO: get this from config
+    def __init__(self, output_folder: Union[str, Path], max_cache_bytes: int = 512 * 2**20, max_writers: int = 0):
+        self.__pending = {}
+        self.__pending_slots = BoundedSemaphore(max_writers * 4) if max_writers > 0 else None
+        self.__writers = ThreadPoolExecutor(max_writers, thread_name_prefix="image_writer") if max_writers > 0 else None
+        self.__cache = OrderedDict()
+        self.__cache_size = 0
+        self.__max_cache_bytes = max_cache_bytes
+        self.__pins = {}
+        self.__pin_counts = {}
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = Lock()
 
         self.__output_folder: Path = output_folder if isinstance(output_folder, Path) else Path(output_folder)
         self.__thumbnails_folder = self.__output_folder / "thumbnails"
@@ -38,16 +80,26 @@ class DiskImageFileStorage(ImageFileStorageBase):
     def start(self, invoker: Invoker) -> None:
         self.__invoker = invoker
 
+    def stop(self, invoker: Invoker) -> None:
+        # Pending writes are completed before shutting down
+        if self.__writers is not None:
+            self.__writers.shutdown(wait=True)
+
     def get(self, image_name: str) -> PILImageType:
         try:
-            image_path = self.get_path(image_name)
+            with self.__lock:
+                cache_item = self.__cache.get(image_name)
+                if cache_item is not None:
+                    self.__hits += 1
+                    self.__cache.move_to_end(image_name)
+                    return cache_item[0]
+                self.__misses += 1
 
-            cache_item = self.__get_cache(image_path)
-            if cache_item:
-                return cache_item
-
-            image = Image.open(image_path)
-            self.__set_cache(image_path, image)
+            image = Image.open(self.get_path(image_name))
+            # Decoded once here, instead of by every user of the cached image
+            image.load()
+            with self.__lock:
+                self.__set_cache(image_name, image)
             return image
         except FileNotFoundError as e:
             raise ImageFileNotFoundException from e
@@ -62,7 +114,6 @@ class DiskImageFileStorage(ImageFileStorageBase):
     ) -> None:
         try:
             self.__validate_storage_folders()
-            image_path = self.get_path(image_name)
 
             pnginfo = PngImagePlugin.PngInfo()
             info_dict = {}
@@ -78,42 +129,56 @@ class DiskImageFileStorage(ImageFileStorageBase):
 
             # When saving the image, the image object's info field is not populated. We need to set it
             image.info = info_dict
-            image.save(
-                image_path,
-                "PNG",
-                pnginfo=pnginfo,
-                compress_level=self.__invoker.services.configuration.png_compress_level,
-            )
 
-            thumbnail_name = get_thumbnail_name(image_name)
-            thumbnail_path = self.get_path(thumbnail_name, thumbnail=True)
-            thumbnail_image = make_thumbnail(image, thumbnail_size)
-            thumbnail_image.save(thumbnail_path)
+            if self.__writers is None or self.__pending_slots is None:
+                with self.__lock:
+                    self.__set_cache(image_name, image)
+                self.__write(image_name, image, pnginfo, thumbnail_size)
+                return
 
-            self.__set_cache(image_path, image)
-            self.__set_cache(thumbnail_path, thumbnail_image)
+            self.__pending_slots.acquire()
+            with self.__lock:
+                future = self.__writers.submit(self.__write, image_name, image, pnginfo, thumbnail_size)
+                # Marked pending before it is cached, so it is not evicted before it is written
+                self.__pending[image_name] = future
+                self.__set_cache(image_name, image)
+            future.add_done_callback(lambda f: self.__on_written(image_name, f))
         except Exception as e:
             raise ImageFileSaveException from e
 
     def delete(self, image_name: str) -> None:
         try:
+            self.flush(image_name)
             image_path = self.get_path(image_name)
 
             if image_path.exists():
                 send2trash(image_path)
-            if image_path in self.__cache:
-                del self.__cache[image_path]
+            with self.__lock:
+                self.__delete_cache(image_name)
 
             thumbnail_name = get_thumbnail_name(image_name)
             thumbnail_path = self.get_path(thumbnail_name, True)
 
             if thumbnail_path.exists():
                 send2trash(thumbnail_path)
-            if thumbnail_path in self.__cache:
-                del self.__cache[thumbnail_path]
         except Exception as e:
             raise ImageFileDeleteException from e
 
+    def delete_many(self, image_names: list[str]) -> list[str]:
+        image_names = list(dict.fromkeys(image_names))
+        with self.__lock:
+            futures = [self.__pending[image_name] for image_name in image_names if image_name in self.__pending]
+        wait(futures)
+
+        with ThreadPoolExecutor(TRASH_WORKERS, thread_name_prefix="image_trash") as executor:
+            trashed = list(executor.map(self.__trash, image_names))
+        deleted = [image_name for image_name, ok in zip(image_names, trashed, strict=True) if ok]
+
+        with self.__lock:
+            for image_name in deleted:
+                self.__delete_cache(image_name)
+        return deleted
+
     # TODO: make this a bit more flexible for e.g. cloud storage
     def get_path(self, image_name: str, thumbnail: bool = False) -> Path:
         path = self.__output_folder / image_name
@@ -142,14 +207,107 @@ class DiskImageFileStorage(ImageFileStorageBase):
         for folder in folders:
             folder.mkdir(parents=True, exist_ok=True)
 
-    def __get_cache(self, image_name: Path) -> Optional[PILImageType]:
-        return None if image_name not in self.__cache else self.__cache[image_name]
-
-    def __set_cache(self, image_name: Path, image: PILImageType):
-        if image_name not in self.__cache:
-            self.__cache[image_name] = image
-            self.__cache_ids.put(image_name)  # TODO: this should refresh position for LRU cache
-            if len(self.__cache) > self.__max_cache_size:
-                cache_id = self.__cache_ids.get()
-                if cache_id in self.__cache:
-                    del self.__cache[cache_id]
+    def is_pending(self, image_name: str) -> bool:
+        with self.__lock:
+            return image_name in self.__pending
+
+    def flush(self, image_name: Optional[str] = None) -> None:
+        with self.__lock:
+            if image_name is None:
+                futures = list(self.__pending.values())
+            else:
+                futures = [self.__pending[image_name]] if image_name in self.__pending else []
+        wait(futures)
+
+    def pin(self, image_name: str, session_id: str) -> None:
+        with self.__lock:
+            pinned = self.__pins.setdefault(session_id, set())
+            if image_name not in pinned:
+                pinned.add(image_name)
+                self.__pin_counts[image_name] = self.__pin_counts.get(image_name, 0) + 1
+
+    def unpin_session(self, session_id: str) -> None:
+        with self.__lock:
+            for image_name in self.__pins.pop(session_id, set()):
+                self.__pin_counts[image_name] -= 1
+                if self.__pin_counts[image_name] == 0:
+                    del self.__pin_counts[image_name]
+            self.__evict()
+
+    def get_cache_status(self) -> ImageFileCacheStatus:
+        with self.__lock:
+            return ImageFileCacheStatus(
+                hits=self.__hits,
+                misses=self.__misses,
+                size=len(self.__cache),
+                pinned=sum(1 for image_name in self.__cache if image_name in self.__pin_counts),
+                size_in_bytes=self.__cache_size,
+                max_size_in_bytes=self.__max_cache_bytes,
+            )
+
+    def __write(
+        self, image_name: str, image: PILImageType, pnginfo: PngImagePlugin.PngInfo, thumbnail_size: int
+    ) -> None:
+        # The thumbnail is written first, as it is requested as soon as the image is created
+        thumbnail_name = get_thumbnail_name(image_name)
+        thumbnail_path = self.get_path(thumbnail_name, thumbnail=True)
+        thumbnail_image = make_thumbnail(image, thumbnail_size)
+        thumbnail_image.save(thumbnail_path)
+
+        image.save(
+            self.get_path(image_name),
+            "PNG",
+            pnginfo=pnginfo,
+            compress_level=self.__invoker.services.configuration.png_compress_level,
+        )
+
+    def __trash(self, image_name: str) -> bool:
+        """Moves the files of an image and its thumbnail to the trash, returning whether it succeeded"""
+        try:
+            paths = [self.get_path(image_name), self.get_path(image_name, thumbnail=True)]
+            existing = [path for path in paths if path.exists()]
+            if existing:
+                send2trash(existing)
+            return True
+        except Exception as e:
+            self.__invoker.services.logger.error(f"Failed to delete image {image_name}: {e}")
+            return False
+
+    def __on_written(self, image_name: str, future: Future) -> None:
+        with self.__lock:
+            if self.__pending.get(image_name) is future:
+                del self.__pending[image_name]
+            # Written images may now be evicted
+            self.__evict()
+        if self.__pending_slots is not None:
+            self.__pending_slots.release()
+        error = future.exception()
+        if error is not None:
+            self.__invoker.services.logger.error(f"Failed to write image {image_name}: {error}")
+
+    def __set_cache(self, image_name: str, image: PILImageType) -> None:
+        self.__delete_cache(image_name)
+        size = get_decoded_size(image)
+        self.__cache[image_name] = (image, size)
+        self.__cache_size += size
+        self.__evict()
+
+    def __delete_cache(self, image_name: str) -> None:
+        cache_item = self.__cache.pop(image_name, None)
+        if cache_item is not None:
+            self.__cache_size -= cache_item[1]
+
+    def __evict(self) -> None:
+        """Evicts the least recently used images that have been written until the cache is within its size, unpinned
+        images first"""
+        for evict_pinned in (False, True):
+            if self.__cache_size <= self.__max_cache_bytes:
+                return
+            for image_name in list(self.__cache.keys()):
+                if image_name in self.__pending:
+                    # Served from memory until written
+                    continue
+                if evict_pinned or image_name not in self.__pin_counts:
+                    self.__delete_cache(image_name)
+                    if self.__cache_size <= self.__max_cache_bytes:
+                        return
@@ -32,6 +32,15 @@ class ImageRecordStorageBase(ABC):
         """Updates an image record."""
         pass
 
+    @abstractmethod
+    def update_many(
+        self,
+        image_names: list[str],
+        changes: ImageRecordChanges,
+    ) -> list[str]:
+        """Updates many image records in a single transaction, returning the names of those that exist."""
+        pass
+
     @abstractmethod
     def get_many(
         self,
@@ -53,8 +62,8 @@ class ImageRecordStorageBase(ABC):
         pass
 
     @abstractmethod
-    def delete_many(self, image_names: list[str]) -> None:
-        """Deletes many image records."""
+    def delete_many(self, image_names: list[str]) -> list[str]:
+        """Deletes many image records in a single transaction, returning the names of those deleted."""
         pass
 
     @abstractmethod
@@ -20,36 +20,43 @@ from .image_records_common import (
     deserialize_image_record,
 )
 
+# Image names bound per statement of the batch operations, under SQLite's limit on the number of variables
+BATCH_CHUNK_SIZE = 500
+
+
+def chunk_names(image_names: list[str]) -> list[list[str]]:
+    """Splits image names into chunks of BATCH_CHUNK_SIZE, without duplicates"""
+    unique_names = list(dict.fromkeys(image_names))
+    return [unique_names[i : i + BATCH_CHUNK_SIZE] for i in range(0, len(unique_names), BATCH_CHUNK_SIZE)]
+
 
 class SqliteImageRecordStorage(ImageRecordStorageBase):
+    _db: SqliteDatabase
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
     _lock: threading.RLock
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
+        self._db = db
         self._lock = db.lock
         self._conn = db.conn
         self._cursor = self._conn.cursor()
 
     def get(self, image_name: str) -> ImageRecord:
         try:
-            self._lock.acquire()
-
-            self._cursor.execute(
-                f"""--sql
-                SELECT {IMAGE_DTO_COLS} FROM images
-                WHERE image_name = ?;
-                """,
-                (image_name,),
-            )
+            with self._db.read() as cursor:
+                cursor.execute(
+                    f"""--sql
+                    SELECT {IMAGE_DTO_COLS} FROM images
+                    WHERE image_name = ?;
+                    """,
+                    (image_name,),
+                )
 
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
+                result = cast(Optional[sqlite3.Row], cursor.fetchone())
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordNotFoundException from e
-        finally:
-            self._lock.release()
 
         if not result:
             raise ImageRecordNotFoundException
@@ -58,29 +65,25 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
 
     def get_metadata(self, image_name: str) -> Optional[MetadataField]:
         try:
-            self._lock.acquire()
-
-            self._cursor.execute(
-                """--sql
-                SELECT metadata FROM images
-                WHERE image_name = ?;
-                """,
-                (image_name,),
-            )
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT metadata FROM images
+                    WHERE image_name = ?;
+                    """,
+                    (image_name,),
+                )
 
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
+                result = cast(Optional[sqlite3.Row], cursor.fetchone())
 
-            if not result:
-                raise ImageRecordNotFoundException
+                if not result:
+                    raise ImageRecordNotFoundException
 
-            as_dict = dict(result)
-            metadata_raw = cast(Optional[str], as_dict.get("metadata", None))
-            return MetadataFieldValidator.validate_json(metadata_raw) if metadata_raw is not None else None
+                as_dict = dict(result)
+                metadata_raw = cast(Optional[str], as_dict.get("metadata", None))
+                return MetadataFieldValidator.validate_json(metadata_raw) if metadata_raw is not None else None
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordNotFoundException from e
-        finally:
-            self._lock.release()
 
     def update(
         self,
@@ -140,6 +143,41 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         finally:
             self._lock.release()
 
+    def update_many(
+        self,
+        image_names: list[str],
+        changes: ImageRecordChanges,
+    ) -> list[str]:
+        # Only the fields that are set are changed, as in `update()`
+        columns = {
+            "image_category": changes.image_category,
+            "session_id": changes.session_id,
+            "is_intermediate": changes.is_intermediate,
+            "starred": changes.starred,
+        }
+        assignments = {column: value for column, value in columns.items() if value is not None}
+        set_clause = ", ".join(f"{column} = ?" for column in assignments)
+        updated: list[str] = []
+        try:
+            self._lock.acquire()
+            for chunk in chunk_names(image_names):
+                placeholders = ",".join("?" for _ in chunk)
+                self._cursor.execute(f"SELECT image_name FROM images WHERE image_name IN ({placeholders});", chunk)
+                existing = {r[0] for r in cast(list[sqlite3.Row], self._cursor.fetchall())}
+                updated.extend(image_name for image_name in chunk if image_name in existing)
+                if assignments:
+                    self._cursor.execute(
+                        f"UPDATE images SET {set_clause} WHERE image_name IN ({placeholders});",
+                        [*assignments.values(), *chunk],
+                    )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._conn.rollback()
+            raise ImageRecordSaveException from e
+        finally:
+            self._lock.release()
+        return updated
+
     def get_many(
         self,
         offset: int = 0,
@@ -150,90 +188,86 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         board_id: Optional[str] = None,
     ) -> OffsetPaginatedResults[ImageRecord]:
         try:
-            self._lock.acquire()
-
-            # Manually build two queries - one for the count, one for the records
-            count_query = """--sql
-            SELECT COUNT(*)
-            FROM images
-            LEFT JOIN board_images ON board_images.image_name = images.image_name
-            WHERE 1=1
-            """
-
-            images_query = f"""--sql
-            SELECT {IMAGE_DTO_COLS}
-            FROM images
-            LEFT JOIN board_images ON board_images.image_name = images.image_name
-            WHERE 1=1
-            """
-
-            query_conditions = ""
-            query_params: list[Union[int, str, bool]] = []
-
-            if image_origin is not None:
-                query_conditions += """--sql
-                AND images.image_origin = ?
-                """
-                query_params.append(image_origin.value)
-
-            if categories is not None:
-                # Convert the enum values to unique list of strings
-                category_strings = [c.value for c in set(categories)]
-                # Create the correct length of placeholders
-                placeholders = ",".join("?" * len(category_strings))
-
-                query_conditions += f"""--sql
-                AND images.image_category IN ( {placeholders} )
+            with self._db.read() as cursor:
+                # Manually build two queries - one for the count, one for the records
+                count_query = """--sql
+                SELECT COUNT(*)
+                FROM images
+                LEFT JOIN board_images ON board_images.image_name = images.image_name
+                WHERE 1=1
                 """
 
-                # Unpack the included categories into the query params
-                for c in category_strings:
-                    query_params.append(c)
-
-            if is_intermediate is not None:
-                query_conditions += """--sql
-                AND images.is_intermediate = ?
+                images_query = f"""--sql
+                SELECT {IMAGE_DTO_COLS}
+                FROM images
+                LEFT JOIN board_images ON board_images.image_name = images.image_name
+                WHERE 1=1
                 """
 
-                query_params.append(is_intermediate)
-
-            # board_id of "none" is reserved for images without a board
-            if board_id == "none":
-                query_conditions += """--sql
-                AND board_images.board_id IS NULL
-                """
-            elif board_id is not None:
-                query_conditions += """--sql
-                AND board_images.board_id = ?
+                query_conditions = ""
+                query_params: list[Union[int, str, bool]] = []
+
+                if image_origin is not None:
+                    query_conditions += """--sql
+                    AND images.image_origin = ?
+                    """
+                    query_params.append(image_origin.value)
+
+                if categories is not None:
+                    # Convert the enum values to unique list of strings
+                    category_strings = [c.value for c in set(categories)]
+                    # Create the correct length of placeholders
+                    placeholders = ",".join("?" * len(category_strings))
+
+                    query_conditions += f"""--sql
+                    AND images.image_category IN ( {placeholders} )
+                    """
+
+                    # Unpack the included categories into the query params
+                    for c in category_strings:
+                        query_params.append(c)
+
+                if is_intermediate is not None:
+                    query_conditions += """--sql
+                    AND images.is_intermediate = ?
+                    """
+
+                    query_params.append(is_intermediate)
+
+                # board_id of "none" is reserved for images without a board
+                if board_id == "none":
+                    query_conditions += """--sql
+                    AND board_images.board_id IS NULL
+                    """
+                elif board_id is not None:
+                    query_conditions += """--sql
+                    AND board_images.board_id = ?
+                    """
+                    query_params.append(board_id)
+
+                query_pagination = """--sql
+                ORDER BY images.starred DESC, images.created_at DESC LIMIT ? OFFSET ?
                 """
-                query_params.append(board_id)
-
-            query_pagination = """--sql
-            ORDER BY images.starred DESC, images.created_at DESC LIMIT ? OFFSET ?
-            """
-
-            # Final images query with pagination
-            images_query += query_conditions + query_pagination + ";"
-            # Add all the parameters
-            images_params = query_params.copy()
-            # Add the pagination parameters
-            images_params.extend([limit, offset])
-
-            # Build the list of images, deserializing each row
-            self._cursor.execute(images_query, images_params)
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            images = [deserialize_image_record(dict(r)) for r in result]
 
-            # Set up and execute the count query, without pagination
-            count_query += query_conditions + ";"
-            count_params = query_params.copy()
-            self._cursor.execute(count_query, count_params)
-            count = cast(int, self._cursor.fetchone()[0])
+                # Final images query with pagination
+                images_query += query_conditions + query_pagination + ";"
+                # Add all the parameters
+                images_params = query_params.copy()
+                # Add the pagination parameters
+                images_params.extend([limit, offset])
+
+                # Build the list of images, deserializing each row
+                cursor.execute(images_query, images_params)
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                images = [deserialize_image_record(dict(r)) for r in result]
+
+                # Set up and execute the count query, without pagination
+                count_query += query_conditions + ";"
+                count_params = query_params.copy()
+                cursor.execute(count_query, count_params)
+                count = cast(int, cursor.fetchone()[0])
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise e
-        finally:
-            self._lock.release()
 
         return OffsetPaginatedResults(items=images, offset=offset, limit=limit, total=count)
 
@@ -254,42 +288,37 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         finally:
             self._lock.release()
 
-    def delete_many(self, image_names: list[str]) -> None:
+    def delete_many(self, image_names: list[str]) -> list[str]:
+        deleted: list[str] = []
         try:
-            placeholders = ",".join("?" for _ in image_names)
-
             self._lock.acquire()
-
-            # Construct the SQLite query with the placeholders
-            query = f"DELETE FROM images WHERE image_name IN ({placeholders})"
-
-            # Execute the query with the list of IDs as parameters
-            self._cursor.execute(query, image_names)
-
+            for chunk in chunk_names(image_names):
+                placeholders = ",".join("?" for _ in chunk)
+                self._cursor.execute(f"SELECT image_name FROM images WHERE image_name IN ({placeholders});", chunk)
+                existing = {r[0] for r in cast(list[sqlite3.Row], self._cursor.fetchall())}
+                deleted.extend(image_name for image_name in chunk if image_name in existing)
+                self._cursor.execute(f"DELETE FROM images WHERE image_name IN ({placeholders});", chunk)
             self._conn.commit()
         except sqlite3.Error as e:
             self._conn.rollback()
             raise ImageRecordDeleteException from e
         finally:
             self._lock.release()
+        return deleted
 
     def get_intermediates_count(self) -> int:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT COUNT(*) FROM images
-                WHERE is_intermediate = TRUE;
-                """
-            )
-            count = cast(int, self._cursor.fetchone()[0])
-            self._conn.commit()
-            return count
+            with self._db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT COUNT(*) FROM images
+                    WHERE is_intermediate = TRUE;
+                    """
+                )
+                count = cast(int, cursor.fetchone()[0])
+                return count
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordDeleteException from e
-        finally:
-            self._lock.release()
 
     def delete_intermediates(self) -> list[str]:
         try:
@@ -385,9 +414,8 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
             self._lock.release()
 
     def get_most_recent_image_for_board(self, board_id: str) -> Optional[ImageRecord]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 """--sql
                 SELECT images.*
                 FROM images
@@ -399,9 +427,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
                 (board_id,),
             )
 
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
-        finally:
-            self._lock.release()
+            result = cast(Optional[sqlite3.Row], cursor.fetchone())
         if result is None:
             return None
 
@@ -20,10 +20,12 @@ class ImageServiceABC(ABC):
 
     _on_changed_callbacks: list[Callable[[ImageDTO], None]]
     _on_deleted_callbacks: list[Callable[[str], None]]
+    _on_deleted_many_callbacks: list[Callable[[list[str]], None]]
 
     def __init__(self) -> None:
         self._on_changed_callbacks = []
         self._on_deleted_callbacks = []
+        self._on_deleted_many_callbacks = []
 
     def on_changed(self, on_changed: Callable[[ImageDTO], None]) -> None:
         """Register a callback for when an image is changed"""
@@ -33,13 +35,25 @@ class ImageServiceABC(ABC):
         """Register a callback for when an image is deleted"""
         self._on_deleted_callbacks.append(on_deleted)
 
+    def on_deleted_many(self, on_deleted_many: Callable[[list[str]], None]) -> None:
+        """Register a callback for when images are deleted, called once with the names of all images deleted together"""
+        self._on_deleted_many_callbacks.append(on_deleted_many)
+
     def _on_changed(self, item: ImageDTO) -> None:
         for callback in self._on_changed_callbacks:
             callback(item)
 
     def _on_deleted(self, item_id: str) -> None:
+        self._on_deleted_many([item_id])
+
+    def _on_deleted_many(self, item_ids: list[str]) -> None:
+        if not item_ids:
+            return
+        for callback in self._on_deleted_many_callbacks:
+            callback(item_ids)
         for callback in self._on_deleted_callbacks:
-            callback(item_id)
+            for item_id in item_ids:
+                callback(item_id)
 
     @abstractmethod
     def create(
@@ -66,6 +80,15 @@ class ImageServiceABC(ABC):
         """Updates an image."""
         pass
 
+    @abstractmethod
+    def update_many(
+        self,
+        image_names: list[str],
+        changes: ImageRecordChanges,
+    ) -> list[str]:
+        """Updates many images at once, returning the names of those updated."""
+        pass
+
     @abstractmethod
     def get_pil_image(self, image_name: str) -> PILImageType:
         """Gets an image as a PIL image."""
@@ -101,6 +124,16 @@ class ImageServiceABC(ABC):
         """Validates an image's path."""
         pass
 
+    @abstractmethod
+    def is_pending(self, image_name: str) -> bool:
+        """Checks if an image is still being written, in which case its file is not available yet."""
+        pass
+
+    @abstractmethod
+    def flush(self, image_name: Optional[str] = None) -> None:
+        """Waits for an image, or all images, to be written."""
+        pass
+
     @abstractmethod
     def get_url(self, image_name: str, thumbnail: bool = False) -> str:
         """Gets an image's or thumbnail's URL."""
@@ -124,6 +157,11 @@ class ImageServiceABC(ABC):
         """Deletes an image."""
         pass
 
+    @abstractmethod
+    def delete_many(self, image_names: list[str]) -> list[str]:
+        """Deletes many images at once, returning the names of those deleted."""
+        pass
+
     @abstractmethod
     def delete_intermediates(self) -> int:
         """Deletes all intermediate images."""
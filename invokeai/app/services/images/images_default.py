@@ -108,6 +108,25 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem updating image record")
             raise e
 
+    def update_many(
+        self,
+        image_names: list[str],
+        changes: ImageRecordChanges,
+    ) -> list[str]:
+        try:
+            updated = self.__invoker.services.image_records.update_many(image_names, changes)
+            # The DTOs are only read back for the callbacks that take them
+            if self._on_changed_callbacks:
+                for image_name in updated:
+                    self._on_changed(self.get_dto(image_name))
+            return updated
+        except ImageRecordSaveException:
+            self.__invoker.services.logger.error("Failed to update image records")
+            raise
+        except Exception as e:
+            self.__invoker.services.logger.error("Problem updating image records")
+            raise e
+
     def get_pil_image(self, image_name: str) -> PILImageType:
         try:
             return self.__invoker.services.image_files.get(image_name)
@@ -181,6 +200,16 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem validating image path")
             raise e
 
+    def is_pending(self, image_name: str) -> bool:
+        return self.__invoker.services.image_files.is_pending(image_name)
+
+    def flush(self, image_name: Optional[str] = None) -> None:
+        try:
+            self.__invoker.services.image_files.flush(image_name)
+        except Exception as e:
+            self.__invoker.services.logger.error("Problem writing image files")
+            raise e
+
     def get_url(self, image_name: str, thumbnail: bool = False) -> str:
         try:
             return self.__invoker.services.urls.get_image_url(image_name, thumbnail)
@@ -242,38 +271,37 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem deleting image record and file")
             raise e
 
-    def delete_images_on_board(self, board_id: str):
+    def delete_many(self, image_names: list[str]) -> list[str]:
         try:
-            image_names = self.__invoker.services.board_image_records.get_all_board_image_names_for_board(board_id)
-            for image_name in image_names:
-                self.__invoker.services.image_files.delete(image_name)
-            self.__invoker.services.image_records.delete_many(image_names)
-            for image_name in image_names:
-                self._on_deleted(image_name)
+            # Records are only deleted with their files, so images whose files could not be deleted remain listed
+            files_deleted = self.__invoker.services.image_files.delete_many(image_names)
+            deleted = self.__invoker.services.image_records.delete_many(files_deleted)
+            self._on_deleted_many(deleted)
+            return deleted
         except ImageRecordDeleteException:
             self.__invoker.services.logger.error("Failed to delete image records")
             raise
-        except ImageFileDeleteException:
-            self.__invoker.services.logger.error("Failed to delete image files")
-            raise
         except Exception as e:
             self.__invoker.services.logger.error("Problem deleting image records and files")
             raise e
 
+    def delete_images_on_board(self, board_id: str):
+        try:
+            image_names = self.__invoker.services.board_image_records.get_all_board_image_names_for_board(board_id)
+            self.delete_many(image_names)
+        except Exception as e:
+            self.__invoker.services.logger.error("Problem deleting images on board")
+            raise e
+
     def delete_intermediates(self) -> int:
         try:
             image_names = self.__invoker.services.image_records.delete_intermediates()
-            count = len(image_names)
-            for image_name in image_names:
-                self.__invoker.services.image_files.delete(image_name)
-                self._on_deleted(image_name)
-            return count
+            self.__invoker.services.image_files.delete_many(image_names)
+            self._on_deleted_many(image_names)
+            return len(image_names)
         except ImageRecordDeleteException:
             self.__invoker.services.logger.error("Failed to delete image records")
             raise
-        except ImageFileDeleteException:
-            self.__invoker.services.logger.error("Failed to delete image files")
-            raise
         except Exception as e:
             self.__invoker.services.logger.error("Problem deleting image records and files")
             raise e
@@ -15,7 +15,7 @@ class InvocationCacheBase(ABC):
     Implementations should register for the `on_deleted` event of the `images` and `latents`
     services, and delete any cached outputs that reference the deleted image or latent.
 
-    See the memory implementation for an example.
+    See the memory and SQLite implementations for examples.
 
     Implementations should respect the `node_cache_size` configuration value, and skip all
     cache logic if the value is set to 0.
@@ -42,7 +42,7 @@ class InvocationCacheBase(ABC):
         pass
 
     @abstractmethod
-    def create_key(self, invocation: BaseInvocation) -> int:
+    def create_key(self, invocation: BaseInvocation) -> Union[int, str]:
         """Gets the key for the invocation's cache item"""
         pass
 
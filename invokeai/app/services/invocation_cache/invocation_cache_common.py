@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -7,3 +9,9 @@ class InvocationCacheStatus(BaseModel):
     misses: int = Field(description="The number of cache misses")
     enabled: bool = Field(description="Whether the invocation cache is enabled")
     max_size: int = Field(description="The maximum size of the invocation cache")
+    size_in_bytes: Optional[int] = Field(
+        default=None, description="The size of the cached outputs in bytes, if the cache tracks it"
+    )
+    max_size_in_bytes: Optional[int] = Field(
+        default=None, description="The maximum size of the cached outputs in bytes, if the cache tracks it"
+    )
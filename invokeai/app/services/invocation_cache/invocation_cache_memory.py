@@ -36,7 +36,7 @@ class MemoryInvocationCache(InvocationCacheBase):
         self._invoker = invoker
         if self._max_cache_size == 0:
             return
-        self._invoker.services.images.on_deleted(self._delete_by_match)
+        self._invoker.services.images.on_deleted_many(self._delete_by_matches)
         self._invoker.services.latents.on_deleted(self._delete_by_match)
 
     def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
@@ -115,17 +115,20 @@ class MemoryInvocationCache(InvocationCacheBase):
             )
 
     def _delete_by_match(self, to_match: str) -> None:
+        self._delete_by_matches([to_match])
+
+    def _delete_by_matches(self, to_match: list[str]) -> None:
         with self._lock:
             if self._max_cache_size == 0:
                 return
             keys_to_delete = set()
             for key, cached_item in self._cache.items():
-                if to_match in cached_item.invocation_output_json:
+                if any(m in cached_item.invocation_output_json for m in to_match):
                     keys_to_delete.add(key)
             if not keys_to_delete:
                 return
             for key in keys_to_delete:
                 self._delete(key)
             self._invoker.services.logger.debug(
-                f"Deleted {len(keys_to_delete)} cached invocation outputs for {to_match}"
+                f"Deleted {len(keys_to_delete)} cached invocation outputs for {len(to_match)} names"
             )
@@ -0,0 +1,358 @@
+import hashlib
+import io
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+import torch
+from pydantic import Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
+from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+
+# Fields that hold the name of an image or latents (conditioning and masks are stored with the latents)
+REFERENCE_FIELDS = {
+    "image_name": "image",
+    "latents_name": "latents",
+    "conditioning_name": "latents",
+    "mask_name": "latents",
+    "masked_latents_name": "latents",
+}
+
+# How many content digests of images and latents to remember
+MAX_DIGESTS = 4096
+
+
+@dataclass
+class CachedItem:
+    invocation_output: BaseInvocationOutput
+    size: int
+    references: set[str] = field(default_factory=set)
+
+
+class SqliteInvocationCache(InvocationCacheBase):
+    """
+    Stores invocation outputs in the database, keyed by a content hash of the invocation.
+
+    The key is the SHA-256 of the invocation's JSON without its id, in which the names of the images and latents it
+    takes as inputs are replaced by digests of their content. Keys are stable across restarts, and an invocation
+    hits the cache when its inputs have the same content as a previous one's, whatever names they were saved under.
+
+    Both the number of entries (`node_cache_size`) and the total size of the serialized outputs are limited, the
+    least recently used entries being evicted first. A reverse index maps the names of the images and latents
+    referenced by the outputs to their keys, so deleting an image or latents invalidates its entries directly.
+    """
+
+    _entries: OrderedDict[str, CachedItem]
+    _references: dict[str, set[str]]
+    _digests: OrderedDict[str, str]
+    _size: int
+    _max_cache_size: int
+    _max_cache_bytes: int
+    _disabled: bool
+    _hits: int
+    _misses: int
+    _invoker: Invoker
+
+    def __init__(self, db: SqliteDatabase, max_cache_size: int = 0, max_cache_bytes: int = 64 * 2**20) -> None:
+        self._lock = db.lock
+        self._conn = db.conn
+        self._cursor = self._conn.cursor()
+        self._entries = OrderedDict()
+        self._references = {}
+        self._digests = OrderedDict()
+        self._size = 0
+        self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._disabled = False
+        self._hits = 0
+        self._misses = 0
+
+    def start(self, invoker: Invoker) -> None:
+        self._invoker = invoker
+        if self._max_cache_size == 0:
+            return
+        self._load()
+        self._invoker.services.images.on_deleted_many(self._delete_by_references)
+        self._invoker.services.latents.on_deleted(self._delete_by_reference)
+
+    def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
+        with self._lock:
+            if self._max_cache_size == 0 or self._disabled:
+                return None
+            item = self._entries.get(str(key), None)
+            if item is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(str(key))
+            try:
+                self._cursor.execute(
+                    """--sql
+                    UPDATE invocation_cache
+                    SET accessed_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')
+                    WHERE key = ?;
+                    """,
+                    (str(key),),
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            return item.invocation_output
+
+    def save(self, key: Union[int, str], invocation_output: BaseInvocationOutput) -> None:
+        output_json = invocation_output.model_dump_json(warnings=False)
+        size = len(output_json.encode())
+        references = self._get_references(invocation_output.model_dump())
+        with self._lock:
+            if self._max_cache_size == 0 or self._disabled or str(key) in self._entries:
+                return
+            if size > self._max_cache_bytes:
+                return
+            try:
+                self._cursor.execute(
+                    """--sql
+                    INSERT OR REPLACE INTO invocation_cache (key, output, size)
+                    VALUES (?, ?, ?);
+                    """,
+                    (str(key), output_json, size),
+                )
+                self._cursor.executemany(
+                    """--sql
+                    INSERT OR IGNORE INTO invocation_cache_references (name, kind, key)
+                    VALUES (?, ?, ?);
+                    """,
+                    [(name, kind, str(key)) for name, kind in references.items()],
+                )
+                self._add(str(key), CachedItem(invocation_output, size, set(references)))
+                self._evict()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def delete(self, key: Union[int, str]) -> None:
+        with self._lock:
+            if self._max_cache_size == 0 or str(key) not in self._entries:
+                return
+            try:
+                self._delete([str(key)])
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def clear(self, *args, **kwargs) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            try:
+                self._cursor.execute("DELETE FROM invocation_cache;")
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._entries.clear()
+            self._references.clear()
+            self._size = 0
+            self._misses = 0
+            self._hits = 0
+
+    def create_key(self, invocation: BaseInvocation) -> str:
+        content = self._replace_references(invocation.model_dump(mode="json", exclude={"id"}, warnings=False))
+        return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    def disable(self) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            self._disabled = True
+
+    def enable(self) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            self._disabled = False
+
+    def get_status(self) -> InvocationCacheStatus:
+        with self._lock:
+            return InvocationCacheStatus(
+                hits=self._hits,
+                misses=self._misses,
+                enabled=not self._disabled and self._max_cache_size > 0,
+                size=len(self._entries),
+                max_size=self._max_cache_size,
+                size_in_bytes=self._size,
+                max_size_in_bytes=self._max_cache_bytes,
+            )
+
+    def _load(self) -> None:
+        """Loads the persisted entries, dropping those that can no longer be used."""
+        output_adapter: TypeAdapter[BaseInvocationOutput] = TypeAdapter(
+            Annotated[BaseInvocationOutput.get_outputs_union(), Field(discriminator="type")]
+        )
+        with self._lock:
+            try:
+                # Latents do not outlive the process, and images may have been deleted outside of the app
+                self._cursor.execute(
+                    """--sql
+                    DELETE FROM invocation_cache
+                    WHERE key IN (
+                        SELECT key FROM invocation_cache_references AS r
+                        WHERE r.kind != 'image'
+                        OR NOT EXISTS (SELECT 1 FROM images WHERE images.image_name = r.name)
+                    );
+                    """
+                )
+                self._cursor.execute(
+                    """--sql
+                    SELECT key, output, size FROM invocation_cache
+                    ORDER BY accessed_at;
+                    """
+                )
+                rows = self._cursor.fetchall()
+                self._cursor.execute("SELECT name, key FROM invocation_cache_references;")
+                references: dict[str, set[str]] = {}
+                for row in self._cursor.fetchall():
+                    references.setdefault(row["key"], set()).add(row["name"])
+
+                invalid: list[str] = []
+                for row in rows:
+                    try:
+                        output = output_adapter.validate_json(row["output"])
+                    except ValidationError:
+                        # The node that produced the output no longer exists or has changed
+                        invalid.append(row["key"])
+                        continue
+                    self._add(row["key"], CachedItem(output, row["size"], references.get(row["key"], set())))
+                self._delete(invalid)
+                # The limits may have been lowered since the entries were saved
+                self._evict()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        if self._entries:
+            self._invoker.services.logger.debug(f"Loaded {len(self._entries)} cached invocation outputs")
+
+    def _add(self, key: str, item: CachedItem) -> None:
+        self._entries[key] = item
+        self._size += item.size
+        for name in item.references:
+            self._references.setdefault(name, set()).add(key)
+
+    def _delete(self, keys: list[str]) -> None:
+        """Deletes entries from memory and the database. The references are deleted by cascade."""
+        for key in keys:
+            item = self._entries.pop(key, None)
+            if item is None:
+                continue
+            self._size -= item.size
+            for name in item.references:
+                keys_for_name = self._references.get(name)
+                if keys_for_name is not None:
+                    keys_for_name.discard(key)
+                    if not keys_for_name:
+                        del self._references[name]
+        self._cursor.executemany("DELETE FROM invocation_cache WHERE key = ?;", [(key,) for key in keys])
+
+    def _evict(self) -> None:
+        """Deletes the least recently used entries until the cache is within its limits."""
+        to_delete: list[str] = []
+        size = self._size
+        for key, item in self._entries.items():
+            if len(self._entries) - len(to_delete) <= self._max_cache_size and size <= self._max_cache_bytes:
+                break
+            to_delete.append(key)
+            size -= item.size
+        if to_delete:
+            self._delete(to_delete)
+
+    def _delete_by_reference(self, name: str) -> None:
+        self._delete_by_references([name])
+
+    def _delete_by_references(self, names: list[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._digests.pop(name, None)
+            if self._max_cache_size == 0:
+                return
+            keys = list({key for name in names for key in self._references.get(name, ())})
+            if not keys:
+                return
+            try:
+                self._delete(keys)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        self._invoker.services.logger.debug(f"Deleted {len(keys)} cached invocation outputs for {len(names)} names")
+
+    def _get_references(self, value: Any) -> dict[str, str]:
+        """Gets the names of the images and latents referenced by a dumped model, mapped to their kind."""
+        references: dict[str, str] = {}
+        if isinstance(value, dict):
+            for k, v in value.items():
+                if k in REFERENCE_FIELDS and isinstance(v, str):
+                    references[v] = REFERENCE_FIELDS[k]
+                else:
+                    references.update(self._get_references(v))
+        elif isinstance(value, list):
+            for v in value:
+                references.update(self._get_references(v))
+        return references
+
+    def _replace_references(self, value: Any) -> Any:
+        """Replaces the names of the images and latents in a dumped model with digests of their content."""
+        if isinstance(value, dict):
+            return {
+                k: self._get_digest(REFERENCE_FIELDS[k], v)
+                if k in REFERENCE_FIELDS and isinstance(v, str)
+                else self._replace_references(v)
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [self._replace_references(v) for v in value]
+        return value
+
+    def _get_digest(self, kind: str, name: str) -> str:
+        with self._lock:
+            digest = self._digests.get(name)
+            if digest is not None:
+                self._digests.move_to_end(name)
+                return digest
+
+        # Computed without holding the lock, as it loads the image or latents
+        try:
+            hasher = hashlib.sha256()
+            if kind == "image":
+                image = self._invoker.services.images.get_pil_image(name)
+                hasher.update(f"{image.mode}:{image.size}".encode())
+                hasher.update(image.tobytes())
+            else:
+                data = self._invoker.services.latents.get(name)
+                if isinstance(data, torch.Tensor):
+                    tensor = data.detach().cpu().contiguous()
+                    hasher.update(f"{tensor.dtype}:{tuple(tensor.shape)}".encode())
+                    hasher.update(tensor.flatten().view(torch.uint8).numpy().tobytes())
+                else:
+                    buffer = io.BytesIO()
+                    torch.save(data, buffer)
+                    hasher.update(buffer.getvalue())
+            digest = f"sha256:{hasher.hexdigest()}"
+        except Exception as e:
+            # Keying on the name is still correct, it only prevents hits for the same content under another name
+            self._invoker.services.logger.debug(f"Unable to compute the digest of {kind} {name}: {e}")
+            return name
+
+        with self._lock:
+            self._digests[name] = digest
+            while len(self._digests) > MAX_DIGESTS:
+                self._digests.popitem(last=False)
+        return digest
@@ -1,11 +1,19 @@
 import time
 import traceback
-from threading import BoundedSemaphore, Event, Thread
+from contextlib import nullcontext
+from threading import Event, Lock, Thread
 from typing import Optional
 
 import invokeai.backend.util.logging as logger
-from invokeai.app.invocations.baseinvocation import InvocationContext
+from invokeai.app.invocations.baseinvocation import (
+    BaseInvocation,
+    BaseInvocationOutput,
+    InvocationContext,
+    InvocationResource,
+)
+from invokeai.app.invocations.primitives import ImageField
 from invokeai.app.services.invocation_queue.invocation_queue_common import InvocationQueueItem
+from invokeai.app.services.shared.graph import GraphExecutionState
 
 from ..invoker import Invoker
 from .invocation_processor_base import InvocationProcessorABC
@@ -13,30 +21,44 @@ from .invocation_processor_common import CanceledException
 
 
 class DefaultInvocationProcessor(InvocationProcessorABC):
-    __invoker_thread: Thread
+    """Executes queued invocations on a pool of worker threads.
+
+    Every worker that finishes a node queues as many of the nodes that became ready as there are idle workers, so
+    independent branches of a session execute at the same time. Invocations that may use the GPU hold a shared lock
+    while they execute, so only CPU invocations overlap with each other and with a GPU invocation.
+    """
+
+    __invoker_threads: list[Thread]
     __stop_event: Event
     __invoker: Invoker
-    __threadLimit: BoundedSemaphore
+    __worker_count: int
+    __gpu_lock: Lock
+    # Held while a session is read, changed and written back, so workers finishing nodes of the same session do not
+    # overwrite each other's changes
+    __session_lock: Lock
 
     def start(self, invoker) -> None:
-        # if we do want multithreading at some point, we could make this configurable
-        self.__threadLimit = BoundedSemaphore(1)
         self.__invoker = invoker
+        self.__worker_count = invoker.services.configuration.node_workers
+        self.__gpu_lock = Lock()
+        self.__session_lock = Lock()
         self.__stop_event = Event()
-        self.__invoker_thread = Thread(
-            name="invoker_processor",
-            target=self.__process,
-            kwargs={"stop_event": self.__stop_event},
-        )
-        self.__invoker_thread.daemon = True  # TODO: make async and do not use threads
-        self.__invoker_thread.start()
+        self.__invoker_threads = []
+        for i in range(self.__worker_count):
+            thread = Thread(
+                name="invoker_processor" if i == 0 else f"invoker_processor_{i}",
+                target=self.__process,
+                kwargs={"stop_event": self.__stop_event},
+            )
+            thread.daemon = True  # TODO: make async and do not use threads
+            thread.start()
+            self.__invoker_threads.append(thread)
 
     def stop(self, *args, **kwargs) -> None:
         self.__stop_event.set()
 
     def __process(self, stop_event: Event):
         try:
-            self.__threadLimit.acquire()
             queue_item: Optional[InvocationQueueItem] = None
 
             while not stop_event.is_set():
@@ -94,9 +116,14 @@ class DefaultInvocationProcessor(InvocationProcessorABC):
                 )
 
                 # Invoke
+                resource_lock = (
+                    self.__gpu_lock if invocation.get_resource() is InvocationResource.GPU else nullcontext()
+                )
                 try:
                     graph_id = graph_execution_state.id
-                    with self.__invoker.services.performance_statistics.collect_stats(invocation, graph_id):
+                    with resource_lock, self.__invoker.services.performance_statistics.collect_stats(
+                        invocation, graph_id
+                    ):
                         # use the internal invoke_internal(), which wraps the node's invoke() method,
                         # which handles a few things:
                         # - nodes that require a value, but get it only from a connection
@@ -112,12 +139,17 @@ class DefaultInvocationProcessor(InvocationProcessorABC):
                             )
                         )
 
-                        # Check queue to see if this is canceled, and skip if so
-                        if self.__invoker.services.queue.is_canceled(graph_execution_state.id):
-                            continue
+                    # Check queue to see if this is canceled, and skip if so
+                    if self.__invoker.services.queue.is_canceled(graph_execution_state.id):
+                        continue
+
+                    with self.__session_lock:
+                        # Other workers may have completed nodes of this session in the meantime
+                        graph_execution_state = self.__invoker.services.graph_execution_manager.get(graph_id)
 
                         # Save outputs and history
                         graph_execution_state.complete(invocation.id, outputs)
+                        self.__pin_consumed_images(graph_execution_state, source_node_id, outputs)
 
                         # Save the state changes
                         self.__invoker.services.graph_execution_manager.set(graph_execution_state)
@@ -132,6 +164,8 @@ class DefaultInvocationProcessor(InvocationProcessorABC):
                             source_node_id=source_node_id,
                             result=outputs.model_dump(),
                         )
+
+                        self.__invoke_next(queue_item, graph_execution_state, invocation, source_node_id)
                     self.__invoker.services.performance_statistics.log_stats()
 
                 except KeyboardInterrupt:
@@ -145,45 +179,19 @@ class DefaultInvocationProcessor(InvocationProcessorABC):
                     error = traceback.format_exc()
                     logger.error(error)
 
-                    # Save error
-                    graph_execution_state.set_node_error(invocation.id, error)
+                    with self.__session_lock:
+                        graph_execution_state = self.__invoker.services.graph_execution_manager.get(
+                            graph_execution_state.id
+                        )
 
-                    # Save the state changes
-                    self.__invoker.services.graph_execution_manager.set(graph_execution_state)
+                        # Save error
+                        graph_execution_state.set_node_error(invocation.id, error)
 
-                    self.__invoker.services.logger.error("Error while invoking:\n%s" % e)
-                    # Send error event
-                    self.__invoker.services.events.emit_invocation_error(
-                        queue_batch_id=queue_item.session_queue_batch_id,
-                        queue_item_id=queue_item.session_queue_item_id,
-                        queue_id=queue_item.session_queue_id,
-                        graph_execution_state_id=graph_execution_state.id,
-                        node=invocation.model_dump(),
-                        source_node_id=source_node_id,
-                        error_type=e.__class__.__name__,
-                        error=error,
-                    )
-                    self.__invoker.services.performance_statistics.reset_stats(graph_execution_state.id)
-                    pass
-
-                # Check queue to see if this is canceled, and skip if so
-                if self.__invoker.services.queue.is_canceled(graph_execution_state.id):
-                    continue
+                        # Save the state changes
+                        self.__invoker.services.graph_execution_manager.set(graph_execution_state)
 
-                # Queue any further commands if invoking all
-                is_complete = graph_execution_state.is_complete()
-                if queue_item.invoke_all and not is_complete:
-                    try:
-                        self.__invoker.invoke(
-                            session_queue_batch_id=queue_item.session_queue_batch_id,
-                            session_queue_item_id=queue_item.session_queue_item_id,
-                            session_queue_id=queue_item.session_queue_id,
-                            graph_execution_state=graph_execution_state,
-                            workflow=queue_item.workflow,
-                            invoke_all=True,
-                        )
-                    except Exception as e:
                         self.__invoker.services.logger.error("Error while invoking:\n%s" % e)
+                        # Send error event
                         self.__invoker.services.events.emit_invocation_error(
                             queue_batch_id=queue_item.session_queue_batch_id,
                             queue_item_id=queue_item.session_queue_item_id,
@@ -192,17 +200,80 @@ class DefaultInvocationProcessor(InvocationProcessorABC):
                             node=invocation.model_dump(),
                             source_node_id=source_node_id,
                             error_type=e.__class__.__name__,
-                            error=traceback.format_exc(),
+                            error=error,
                         )
-                elif is_complete:
-                    self.__invoker.services.events.emit_graph_execution_complete(
-                        queue_batch_id=queue_item.session_queue_batch_id,
-                        queue_item_id=queue_item.session_queue_item_id,
-                        queue_id=queue_item.session_queue_id,
-                        graph_execution_state_id=graph_execution_state.id,
-                    )
+                        self.__invoker.services.performance_statistics.reset_stats(graph_execution_state.id)
+
+                        self.__invoke_next(queue_item, graph_execution_state, invocation, source_node_id)
 
         except KeyboardInterrupt:
             pass  # Log something? KeyboardInterrupt is probably not going to be seen by the processor
-        finally:
-            self.__threadLimit.release()
+
+    def __pin_consumed_images(
+        self, graph_execution_state: GraphExecutionState, source_node_id: str, outputs: BaseInvocationOutput
+    ) -> None:
+        """Pins the output images that later nodes of the session use, so they are not decoded again"""
+        for field_name, value in outputs:
+            images = value if isinstance(value, list) else [value]
+            if not any(isinstance(image, ImageField) for image in images):
+                continue
+            if not graph_execution_state.graph._get_output_edges(source_node_id, field_name):
+                continue
+            for image in images:
+                if isinstance(image, ImageField):
+                    self.__invoker.services.image_files.pin(image.image_name, graph_execution_state.id)
+
+    def __invoke_next(
+        self,
+        queue_item: InvocationQueueItem,
+        graph_execution_state: GraphExecutionState,
+        invocation: BaseInvocation,
+        source_node_id: str,
+    ) -> None:
+        """Queues the nodes that are ready to execute, or reports the session as complete. Must be called with the
+        session lock held."""
+
+        # Check queue to see if this is canceled, and skip if so
+        if self.__invoker.services.queue.is_canceled(graph_execution_state.id):
+            return
+
+        # Queue any further commands if invoking all
+        is_complete = graph_execution_state.is_complete()
+        if queue_item.invoke_all and not is_complete:
+            try:
+                # Queue a node for every idle worker, or until no more nodes are ready
+                while len(graph_execution_state.executing) < self.__worker_count:
+                    if not self.__invoker.invoke(
+                        session_queue_batch_id=queue_item.session_queue_batch_id,
+                        session_queue_item_id=queue_item.session_queue_item_id,
+                        session_queue_id=queue_item.session_queue_id,
+                        graph_execution_state=graph_execution_state,
+                        workflow=queue_item.workflow,
+                        invoke_all=True,
+                    ):
+                        break
+            except Exception as e:
+                self.__invoker.services.logger.error("Error while invoking:\n%s" % e)
+                self.__invoker.services.events.emit_invocation_error(
+                    queue_batch_id=queue_item.session_queue_batch_id,
+                    queue_item_id=queue_item.session_queue_item_id,
+                    queue_id=queue_item.session_queue_id,
+                    graph_execution_state_id=graph_execution_state.id,
+                    node=invocation.model_dump(),
+                    source_node_id=source_node_id,
+                    error_type=e.__class__.__name__,
+                    error=traceback.format_exc(),
+                )
+        elif is_complete and not graph_execution_state.executing:
+            # Nodes of a session that errored may still be executing, the last of them reports the session complete
+            try:
+                # The session's images are on disk by the time it is reported complete
+                self.__invoker.services.image_files.flush()
+            except Exception as e:
+                self.__invoker.services.logger.error(f"Error while writing images: {e}")
+            self.__invoker.services.events.emit_graph_execution_complete(
+                queue_batch_id=queue_item.session_queue_batch_id,
+                queue_item_id=queue_item.session_queue_item_id,
+                queue_id=queue_item.session_queue_id,
+                graph_execution_state_id=graph_execution_state.id,
+            )
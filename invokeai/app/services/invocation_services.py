@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from .board_images.board_images_base import BoardImagesServiceABC
     from .board_records.board_records_base import BoardRecordStorageBase
     from .boards.boards_base import BoardServiceABC
+    from .conditioning_cache.conditioning_cache_base import ConditioningCacheBase
     from .config import InvokeAIAppConfig
     from .download import DownloadQueueServiceBase
     from .events.events_base import EventServiceBase
@@ -24,6 +25,7 @@ if TYPE_CHECKING:
     from .latents_storage.latents_storage_base import LatentsStorageBase
     from .model_install import ModelInstallServiceBase
     from .model_manager.model_manager_base import ModelManagerServiceBase
+    from .model_prefetcher.model_prefetcher_base import ModelPrefetcherBase
     from .model_records import ModelRecordServiceBase
     from .names.names_base import NameServiceBase
     from .session_processor.session_processor_base import SessionProcessorBase
@@ -41,6 +43,7 @@ class InvocationServices:
     board_image_record_storage: "BoardImageRecordStorageBase"
     boards: "BoardServiceABC"
     board_records: "BoardRecordStorageBase"
+    conditioning_cache: "ConditioningCacheBase"
     configuration: "InvokeAIAppConfig"
     events: "EventServiceBase"
     graph_execution_manager: "ItemStorageABC[GraphExecutionState]"
@@ -50,6 +53,7 @@ class InvocationServices:
     latents: "LatentsStorageBase"
     logger: "Logger"
     model_manager: "ModelManagerServiceBase"
+    model_prefetcher: "ModelPrefetcherBase"
     model_records: "ModelRecordServiceBase"
     download_queue: "DownloadQueueServiceBase"
     model_install: "ModelInstallServiceBase"
@@ -69,6 +73,7 @@ class InvocationServices:
         board_image_records: "BoardImageRecordStorageBase",
         boards: "BoardServiceABC",
         board_records: "BoardRecordStorageBase",
+        conditioning_cache: "ConditioningCacheBase",
         configuration: "InvokeAIAppConfig",
         events: "EventServiceBase",
         graph_execution_manager: "ItemStorageABC[GraphExecutionState]",
@@ -78,6 +83,7 @@ class InvocationServices:
         latents: "LatentsStorageBase",
         logger: "Logger",
         model_manager: "ModelManagerServiceBase",
+        model_prefetcher: "ModelPrefetcherBase",
         model_records: "ModelRecordServiceBase",
         download_queue: "DownloadQueueServiceBase",
         model_install: "ModelInstallServiceBase",
@@ -95,6 +101,7 @@ class InvocationServices:
         self.board_image_records = board_image_records
         self.boards = boards
         self.board_records = board_records
+        self.conditioning_cache = conditioning_cache
         self.configuration = configuration
         self.events = events
         self.graph_execution_manager = graph_execution_manager
@@ -104,6 +111,7 @@ class InvocationServices:
         self.latents = latents
         self.logger = logger
         self.model_manager = model_manager
+        self.model_prefetcher = model_prefetcher
         self.model_records = model_records
         self.download_queue = download_queue
         self.model_install = model_install
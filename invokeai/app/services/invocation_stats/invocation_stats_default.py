@@ -1,4 +1,5 @@
 import time
+from threading import Lock
 from typing import Dict
 
 import psutil
@@ -26,6 +27,8 @@ class InvocationStatsService(InvocationStatsServiceBase):
         self._cache_stats: Dict[str, CacheStats] = {}
         self.ram_used: float = 0.0
         self.ram_changed: float = 0.0
+        # Nodes of a session may execute on several threads
+        self._lock = Lock()
 
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
@@ -82,20 +85,23 @@ class InvocationStatsService(InvocationStatsServiceBase):
         invocation: BaseInvocation,
         graph_execution_state_id: str,
     ) -> StatsContext:
-        if not self._stats.get(graph_execution_state_id):  # first time we're seeing this
-            self._stats[graph_execution_state_id] = NodeLog()
-            self._cache_stats[graph_execution_state_id] = CacheStats()
+        with self._lock:
+            if not self._stats.get(graph_execution_state_id):  # first time we're seeing this
+                self._stats[graph_execution_state_id] = NodeLog()
+                self._cache_stats[graph_execution_state_id] = CacheStats()
         return self.StatsContext(invocation, graph_execution_state_id, self._invoker.services.model_manager, self)
 
     def reset_all_stats(self):
         """Zero all statistics"""
-        self._stats = {}
+        with self._lock:
+            self._stats = {}
 
     def reset_stats(self, graph_execution_id: str):
-        try:
-            self._stats.pop(graph_execution_id)
-        except KeyError:
-            logger.warning(f"Attempted to clear statistics for unknown graph {graph_execution_id}")
+        with self._lock:
+            try:
+                self._stats.pop(graph_execution_id)
+            except KeyError:
+                logger.warning(f"Attempted to clear statistics for unknown graph {graph_execution_id}")
 
     def update_mem_stats(
         self,
@@ -112,14 +118,22 @@ class InvocationStatsService(InvocationStatsServiceBase):
         time_used: float,
         vram_used: float,
     ):
-        if not self._stats[graph_id].nodes.get(invocation_type):
-            self._stats[graph_id].nodes[invocation_type] = NodeStats()
-        stats = self._stats[graph_id].nodes[invocation_type]
-        stats.calls += 1
-        stats.time_used += time_used
-        stats.max_vram = max(stats.max_vram, vram_used)
+        with self._lock:
+            # The stats of a session that errored may be reset while its other nodes are still executing
+            node_log = self._stats.setdefault(graph_id, NodeLog())
+            self._cache_stats.setdefault(graph_id, CacheStats())
+            if not node_log.nodes.get(invocation_type):
+                node_log.nodes[invocation_type] = NodeStats()
+            stats = node_log.nodes[invocation_type]
+            stats.calls += 1
+            stats.time_used += time_used
+            stats.max_vram = max(stats.max_vram, vram_used)
 
     def log_stats(self):
+        with self._lock:
+            self._log_stats()
+
+    def _log_stats(self):
         completed = set()
         errored = set()
         for graph_id, _node_log in self._stats.items():
@@ -0,0 +1,273 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+
+from invokeai.app.services.shared.graph import GraphExecutionState
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+
+from .item_storage_sqlite import SqliteItemStorage
+
+# How many sessions to keep in memory. Their changes are in the database, so evicting one only costs a reload.
+MAX_LIVE_SESSIONS = 32
+
+
+@dataclass
+class PersistedState:
+    """Tracks which parts of a session's state are in the database, as a checkpoint or deltas"""
+
+    state: GraphExecutionState
+    graph: tuple[int, int, int]
+    execution_graph: int
+    nodes: set[str] = field(default_factory=set)
+    # Nodes whose inputs were set before they were written, which do not change anymore
+    final_nodes: set[str] = field(default_factory=set)
+    edges: int = 0
+    executed: set[str] = field(default_factory=set)
+    executed_history: int = 0
+    results: set[str] = field(default_factory=set)
+    errors: set[str] = field(default_factory=set)
+    prepared: set[str] = field(default_factory=set)
+    deltas: int = 0
+
+
+def get_graph_stamp(state: GraphExecutionState) -> tuple[int, int, int]:
+    return (id(state.graph), len(state.graph.nodes), len(state.graph.edges))
+
+
+def dump(value: Any) -> Any:
+    return value.model_dump(mode="json", warnings=False, exclude_none=True)
+
+
+class SqliteSessionStorage(SqliteItemStorage[GraphExecutionState]):
+    """Stores graph execution states, writing the changes made by each node instead of the whole state.
+
+    The invocation processor saves the state of a session after every node, and the invoker again before it queues
+    the next one. Writing the whole state each time costs as much as the state is large, and the execution graph and
+    results of a session grow with every node. Instead, each save appends a delta to `{table_name}_deltas` with the
+    nodes, edges and results added since the previous save, and the full state is only written as a checkpoint every
+    `checkpoint_interval` saves, when the session completes, or when it changed in a way deltas do not describe (e.g.
+    its source graph was changed).
+
+    The states of recent sessions are kept in memory, so `get()` returns the state the invocation processor last
+    saved without parsing it. Other states are read from their checkpoint and deltas. `list()` and `search()` only
+    read checkpoints.
+    """
+
+    _live: OrderedDict[str, PersistedState]
+    _live_lock: threading.Lock
+    _checkpoint_interval: int
+
+    def __init__(self, db: SqliteDatabase, table_name: str = "graph_executions", checkpoint_interval: int = 32):
+        super().__init__(db=db, table_name=table_name)
+        self._validator = TypeAdapter(GraphExecutionState)
+        self._live = OrderedDict()
+        self._live_lock = threading.Lock()
+        self._checkpoint_interval = checkpoint_interval
+
+    def _create_table(self):
+        super()._create_table()
+        try:
+            self._lock.acquire()
+            self._cursor.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self._table_name}_deltas (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                delta TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq));"""
+            )
+        finally:
+            self._lock.release()
+
+    def set(self, item: GraphExecutionState):
+        with self._live_lock:
+            persisted = self._live.get(item.id)
+            if persisted is not None and persisted.state is not item:
+                # Saved from another copy of the state, whose changes are not tracked
+                persisted = None
+            delta = self._get_delta(persisted) if persisted is not None else None
+            is_done = item.is_complete() and not item.executing
+            if delta is None or is_done or persisted is None or persisted.deltas >= self._checkpoint_interval:
+                self._checkpoint(item)
+                persisted = None
+            else:
+                try:
+                    self._append_delta(item.id, persisted.deltas + 1, delta)
+                except Exception:
+                    # The delta is lost, the next save writes a checkpoint
+                    self._live.pop(item.id, None)
+                    raise
+                persisted.deltas += 1
+
+            if is_done:
+                # Completed sessions are not saved again, they are read back from their checkpoint when needed
+                self._live.pop(item.id, None)
+            elif persisted is None:
+                self._track(item, deltas=0)
+            else:
+                self._live.move_to_end(item.id)
+        self._on_changed(item)
+
+    def get(self, id: str) -> Optional[GraphExecutionState]:
+        with self._live_lock:
+            persisted = self._live.get(id)
+            if persisted is not None:
+                self._live.move_to_end(id)
+                return persisted.state
+
+        state, deltas = self._load(id)
+        if state is None:
+            return None
+        with self._live_lock:
+            persisted = self._live.get(id)
+            if persisted is not None:
+                # Loaded by another thread in the meantime
+                return persisted.state
+            if not (state.is_complete() and not state.executing):
+                self._track(state, deltas)
+        return state
+
+    def get_raw(self, id: str) -> Optional[str]:
+        state = self.get(id)
+        if state is None:
+            return None
+        return state.model_dump_json(warnings=False, exclude_none=True)
+
+    def delete(self, id: str):
+        with self._live_lock:
+            self._live.pop(id, None)
+        try:
+            self._lock.acquire()
+            self._cursor.execute(f"""DELETE FROM {self._table_name}_deltas WHERE session_id = ?;""", (str(id),))
+            self._conn.commit()
+        finally:
+            self._lock.release()
+        super().delete(id)
+
+    def _track(self, state: GraphExecutionState, deltas: int) -> None:
+        """Starts tracking the changes made to a state that is entirely in the database"""
+        self._live[state.id] = PersistedState(
+            state=state,
+            graph=get_graph_stamp(state),
+            execution_graph=id(state.execution_graph),
+            nodes=set(state.execution_graph.nodes),
+            final_nodes=state.executing | state.executed,
+            edges=len(state.execution_graph.edges),
+            executed=set(state.executed),
+            executed_history=len(state.executed_history),
+            results=set(state.results),
+            errors=set(state.errors),
+            prepared=set(state.prepared_source_mapping),
+            deltas=deltas,
+        )
+        self._live.move_to_end(state.id)
+        while len(self._live) > MAX_LIVE_SESSIONS:
+            self._live.popitem(last=False)
+
+    def _get_delta(self, persisted: PersistedState) -> Optional[dict[str, Any]]:
+        """Gets the changes made to a state since it was last saved, or `None` if they cannot be described as a delta.
+        The persisted state is updated as if the delta was saved."""
+        state = persisted.state
+        nodes = state.execution_graph.nodes
+        edges = state.execution_graph.edges
+        if (
+            get_graph_stamp(state) != persisted.graph
+            or id(state.execution_graph) != persisted.execution_graph
+            or len(nodes) < len(persisted.nodes)
+            or len(edges) < persisted.edges
+            or not persisted.executed.issubset(state.executed)
+            or len(state.executed_history) < persisted.executed_history
+        ):
+            return None
+
+        started = state.executing | state.executed
+        changed_nodes = [
+            node_id
+            for node_id in nodes
+            if node_id not in persisted.nodes or (node_id in started and node_id not in persisted.final_nodes)
+        ]
+        new_prepared = [node_id for node_id in state.prepared_source_mapping if node_id not in persisted.prepared]
+        new_sources = {state.prepared_source_mapping[node_id] for node_id in new_prepared}
+        delta = {
+            "nodes": {node_id: dump(nodes[node_id]) for node_id in changed_nodes},
+            "edges": [dump(edge) for edge in edges[persisted.edges :]],
+            "executed": list(state.executed - persisted.executed),
+            "executing": list(state.executing),
+            "executed_history": state.executed_history[persisted.executed_history :],
+            "results": {k: dump(v) for k, v in state.results.items() if k not in persisted.results},
+            "errors": {k: v for k, v in state.errors.items() if k not in persisted.errors},
+            "prepared_source_mapping": {node_id: state.prepared_source_mapping[node_id] for node_id in new_prepared},
+            "source_prepared_mapping": {s: list(state.source_prepared_mapping.get(s, ())) for s in new_sources},
+        }
+
+        persisted.nodes.update(changed_nodes)
+        persisted.final_nodes.update(node_id for node_id in changed_nodes if node_id in started)
+        persisted.edges = len(edges)
+        persisted.executed.update(delta["executed"])
+        persisted.executed_history = len(state.executed_history)
+        persisted.results.update(delta["results"])
+        persisted.errors.update(delta["errors"])
+        persisted.prepared.update(new_prepared)
+        return delta
+
+    def _checkpoint(self, state: GraphExecutionState) -> None:
+        """Writes the full state, replacing its previous checkpoint and deltas"""
+        try:
+            self._lock.acquire()
+            self._cursor.execute(
+                f"""INSERT OR REPLACE INTO {self._table_name} (item) VALUES (?);""",
+                (state.model_dump_json(warnings=False, exclude_none=True),),
+            )
+            self._cursor.execute(f"""DELETE FROM {self._table_name}_deltas WHERE session_id = ?;""", (state.id,))
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+        finally:
+            self._lock.release()
+
+    def _append_delta(self, session_id: str, seq: int, delta: dict[str, Any]) -> None:
+        try:
+            self._lock.acquire()
+            self._cursor.execute(
+                f"""INSERT OR REPLACE INTO {self._table_name}_deltas (session_id, seq, delta) VALUES (?, ?, ?);""",
+                (session_id, seq, json.dumps(delta)),
+            )
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+        finally:
+            self._lock.release()
+
+    def _load(self, id: str) -> tuple[Optional[GraphExecutionState], int]:
+        """Reads a state from its checkpoint and deltas. Returns the state and its number of deltas."""
+        with self._db.read() as cursor:
+            cursor.execute(f"""SELECT item FROM {self._table_name} WHERE id = ?;""", (str(id),))
+            result = cursor.fetchone()
+            if not result:
+                return None, 0
+            cursor.execute(
+                f"""SELECT delta FROM {self._table_name}_deltas WHERE session_id = ? ORDER BY seq;""", (str(id),)
+            )
+            deltas = [row[0] for row in cursor.fetchall()]
+
+        if not deltas:
+            return self._parse_item(result[0]), 0
+
+        state = json.loads(result[0])
+        for delta_json in deltas:
+            delta = json.loads(delta_json)
+            state["execution_graph"]["nodes"].update(delta["nodes"])
+            state["execution_graph"]["edges"].extend(delta["edges"])
+            state["executed"] = list(set(state["executed"]).union(delta["executed"]))
+            state["executing"] = delta["executing"]
+            state["executed_history"].extend(delta["executed_history"])
+            state["results"].update(delta["results"])
+            state["errors"].update(delta["errors"])
+            state["prepared_source_mapping"].update(delta["prepared_source_mapping"])
+            state["source_prepared_mapping"].update(delta["source_prepared_mapping"])
+        return GraphExecutionState.model_validate(state), len(deltas)
@@ -14,6 +14,7 @@ T = TypeVar("T", bound=BaseModel)
 
 class SqliteItemStorage(ItemStorageABC, Generic[T]):
     _table_name: str
+    _db: SqliteDatabase
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
     _id_field: str
@@ -23,6 +24,7 @@ class SqliteItemStorage(ItemStorageABC, Generic[T]):
     def __init__(self, db: SqliteDatabase, table_name: str, id_field: str = "id"):
         super().__init__()
 
+        self._db = db
         self._lock = db.lock
         self._conn = db.conn
         self._table_name = table_name
@@ -69,12 +71,9 @@ class SqliteItemStorage(ItemStorageABC, Generic[T]):
         self._on_changed(item)
 
     def get(self, id: str) -> Optional[T]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(f"""SELECT item FROM {self._table_name} WHERE id = ?;""", (str(id),))
-            result = self._cursor.fetchone()
-        finally:
-            self._lock.release()
+        with self._db.read() as cursor:
+            cursor.execute(f"""SELECT item FROM {self._table_name} WHERE id = ?;""", (str(id),))
+            result = cursor.fetchone()
 
         if not result:
             return None
@@ -82,12 +81,9 @@ class SqliteItemStorage(ItemStorageABC, Generic[T]):
         return self._parse_item(result[0])
 
     def get_raw(self, id: str) -> Optional[str]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(f"""SELECT item FROM {self._table_name} WHERE id = ?;""", (str(id),))
-            result = self._cursor.fetchone()
-        finally:
-            self._lock.release()
+        with self._db.read() as cursor:
+            cursor.execute(f"""SELECT item FROM {self._table_name} WHERE id = ?;""", (str(id),))
+            result = cursor.fetchone()
 
         if not result:
             return None
@@ -104,43 +100,37 @@ class SqliteItemStorage(ItemStorageABC, Generic[T]):
         self._on_deleted(id)
 
     def list(self, page: int = 0, per_page: int = 10) -> PaginatedResults[T]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 f"""SELECT item FROM {self._table_name} LIMIT ? OFFSET ?;""",
                 (per_page, page * per_page),
             )
-            result = self._cursor.fetchall()
+            result = cursor.fetchall()
 
             items = [self._parse_item(r[0]) for r in result]
 
-            self._cursor.execute(f"""SELECT count(*) FROM {self._table_name};""")
-            count = self._cursor.fetchone()[0]
-        finally:
-            self._lock.release()
+            cursor.execute(f"""SELECT count(*) FROM {self._table_name};""")
+            count = cursor.fetchone()[0]
 
         pageCount = int(count / per_page) + 1
 
         return PaginatedResults[T](items=items, page=page, pages=pageCount, per_page=per_page, total=count)
 
     def search(self, query: str, page: int = 0, per_page: int = 10) -> PaginatedResults[T]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 f"""SELECT item FROM {self._table_name} WHERE item LIKE ? LIMIT ? OFFSET ?;""",
                 (f"%{query}%", per_page, page * per_page),
             )
-            result = self._cursor.fetchall()
+            result = cursor.fetchall()
 
             items = [self._parse_item(r[0]) for r in result]
 
-            self._cursor.execute(
+            cursor.execute(
                 f"""SELECT count(*) FROM {self._table_name} WHERE item LIKE ?;""",
                 (f"%{query}%",),
             )
-            count = self._cursor.fetchone()[0]
-        finally:
-            self._lock.release()
+            count = cursor.fetchone()[0]
 
         pageCount = int(count / per_page) + 1
 
@@ -28,6 +28,16 @@ class LatentsStorageBase(ABC):
     def delete(self, name: str) -> None:
         pass
 
+    @abstractmethod
+    def delete_session(self, session_id: str) -> None:
+        """Deletes all latents saved by a session"""
+        pass
+
+    @staticmethod
+    def get_session_id(name: str) -> str:
+        """Gets the id of the session that saved latents, which nodes put at the start of their names"""
+        return name.split("_", 1)[0]
+
     def on_changed(self, on_changed: Callable[[torch.Tensor], None]) -> None:
         """Register a callback for when an item is changed"""
         self._on_changed_callbacks.append(on_changed)
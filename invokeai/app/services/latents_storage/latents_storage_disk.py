@@ -1,58 +1,83 @@
 # Copyright (c) 2023 Kyle Schouviller (https://github.com/kyle0654)
 
 from pathlib import Path
-from typing import Union
+from threading import Thread
+from typing import Any, Union
 
 import torch
+from safetensors.torch import load_file, save_file
 
 from invokeai.app.services.invoker import Invoker
 
 from .latents_storage_base import LatentsStorageBase
 
+# The key of the tensor in safetensors files
+TENSOR_KEY = "latents"
+
 
 class DiskLatentsStorage(LatentsStorageBase):
-    """Stores latents in a folder on disk without caching"""
+    """Stores latents in a folder on disk without caching.
+
+    Tensors are stored as safetensors files, which are memory-mapped when read back. Other objects, like the
+    conditioning data of prompts, are pickled with `torch.save`.
+    """
 
     __output_folder: Path
 
     def __init__(self, output_folder: Union[str, Path]):
+        super().__init__()
         self.__output_folder = output_folder if isinstance(output_folder, Path) else Path(output_folder)
         self.__output_folder.mkdir(parents=True, exist_ok=True)
 
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
-        self._delete_all_latents()
+        # Latents do not outlive the process. Those left over by the previous run are deleted in the background, so
+        # they do not hold up startup.
+        leftover_files = [f for f in self.__output_folder.glob("*") if f.is_file()]
+        if leftover_files:
+            Thread(name="latents_cleanup", target=self._delete_files, args=(leftover_files,), daemon=True).start()
 
-    def get(self, name: str) -> torch.Tensor:
-        latent_path = self.get_path(name)
-        return torch.load(latent_path)
+    def get(self, name: str) -> Any:
+        tensor_path = self.get_path(name)
+        if tensor_path.exists():
+            return load_file(tensor_path)[TENSOR_KEY]
+        return torch.load(self.get_object_path(name))
 
-    def save(self, name: str, data: torch.Tensor) -> None:
+    def save(self, name: str, data: Any) -> None:
         self.__output_folder.mkdir(parents=True, exist_ok=True)
-        latent_path = self.get_path(name)
-        torch.save(data, latent_path)
+        if isinstance(data, torch.Tensor):
+            save_file({TENSOR_KEY: data.contiguous()}, self.get_path(name))
+        else:
+            torch.save(data, self.get_object_path(name))
 
     def delete(self, name: str) -> None:
         latent_path = self.get_path(name)
-        latent_path.unlink()
+        if latent_path.exists():
+            latent_path.unlink()
+        else:
+            self.get_object_path(name).unlink()
+
+    def delete_session(self, session_id: str) -> None:
+        self._delete_files(list(self.__output_folder.glob(f"{session_id}_*")))
 
     def get_path(self, name: str) -> Path:
-        return self.__output_folder / name
+        return self.__output_folder / f"{name}.safetensors"
+
+    def get_object_path(self, name: str) -> Path:
+        return self.__output_folder / f"{name}.pt"
 
-    def _delete_all_latents(self) -> None:
-        """
-        Deletes all latents from disk.
-        Must be called after we have access to `self._invoker` (e.g. in `start()`).
-        """
+    def _delete_files(self, files: list[Path]) -> None:
         deleted_latents_count = 0
         freed_space = 0
-        for latents_file in Path(self.__output_folder).glob("*"):
-            if latents_file.is_file():
+        for latents_file in files:
+            try:
                 freed_space += latents_file.stat().st_size
-                deleted_latents_count += 1
                 latents_file.unlink()
+                deleted_latents_count += 1
+            except FileNotFoundError:
+                pass
         if deleted_latents_count > 0:
             freed_space_in_mb = round(freed_space / 1024 / 1024, 2)
-            self._invoker.services.logger.info(
+            self._invoker.services.logger.debug(
                 f"Deleted {deleted_latents_count} latents files (freed {freed_space_in_mb}MB)"
             )
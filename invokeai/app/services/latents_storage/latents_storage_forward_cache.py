@@ -1,7 +1,11 @@
 # Copyright (c) 2023 Kyle Schouviller (https://github.com/kyle0654)
 
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from functools import partial
 from queue import Queue
-from typing import Dict, Optional
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
 
 import torch
 
@@ -9,60 +13,180 @@ from invokeai.app.services.invoker import Invoker
 
 from .latents_storage_base import LatentsStorageBase
 
+# How many deleted sessions to remember, to drop latents their nodes save after the session was deleted
+MAX_DELETED_SESSIONS = 256
+
+
+@dataclass
+class CachedLatents:
+    data: Any
+    size: int
+    # Saved latents stay in memory until they have been written to the underlying storage
+    pending: bool
+
+
+def get_size(data: Any) -> int:
+    """Gets the memory used by the tensors in latents or conditioning data, in bytes"""
+    if isinstance(data, torch.Tensor):
+        return data.element_size() * data.nelement()
+    if is_dataclass(data):
+        return sum(get_size(getattr(data, f.name)) for f in fields(data))
+    if isinstance(data, (list, tuple)):
+        return sum(get_size(item) for item in data)
+    if isinstance(data, dict):
+        return sum(get_size(item) for item in data.values())
+    return 0
 
-class ForwardCacheLatentsStorage(LatentsStorageBase):
-    """Caches the latest N latents in memory, writing-thorugh to and reading from underlying storage"""
 
-    __cache: Dict[str, torch.Tensor]
-    __cache_ids: Queue
-    __max_cache_size: int
+class ForwardCacheLatentsStorage(LatentsStorageBase):
+    """Keeps recently used latents in memory, up to a size in bytes, writing them to the underlying storage on a
+    background thread.
+
+    Saved latents stay in memory until they are written, so they are never read back while being written. The least
+    recently used latents that have been written are evicted first, and read from the underlying storage when needed
+    again. Writes and deletions are applied to the underlying storage in the order they are made.
+    """
+
+    __cache: OrderedDict[str, CachedLatents]
+    __size: int
+    __max_cache_bytes: int
+    __session_names: dict[str, set[str]]
+    __deleted_sessions: OrderedDict[str, None]
     __underlying_storage: LatentsStorageBase
+    __lock: Lock
+    __write_queue: Queue[Optional[Callable[[], None]]]
+    __writer_thread: Optional[Thread]
 
-    def __init__(self, underlying_storage: LatentsStorageBase, max_cache_size: int = 20):
+    def __init__(self, underlying_storage: LatentsStorageBase, max_cache_bytes: int = 512 * 2**20):
         super().__init__()
         self.__underlying_storage = underlying_storage
-        self.__cache = {}
-        self.__cache_ids = Queue()
-        self.__max_cache_size = max_cache_size
+        self.__cache = OrderedDict()
+        self.__size = 0
+        self.__max_cache_bytes = max_cache_bytes
+        self.__session_names = {}
+        self.__deleted_sessions = OrderedDict()
+        self.__lock = Lock()
+        self.__write_queue = Queue()
+        self.__writer_thread = None
 
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
         start_op = getattr(self.__underlying_storage, "start", None)
         if callable(start_op):
             start_op(invoker)
+        self.__writer_thread = Thread(name="latents_writer", target=self.__process_writes, daemon=True)
+        self.__writer_thread.start()
 
     def stop(self, invoker: Invoker) -> None:
         self._invoker = invoker
+        if self.__writer_thread is not None:
+            # Pending writes are completed first
+            self.__write_queue.put(None)
+            self.__writer_thread.join()
+            self.__writer_thread = None
         stop_op = getattr(self.__underlying_storage, "stop", None)
         if callable(stop_op):
             stop_op(invoker)
 
-    def get(self, name: str) -> torch.Tensor:
-        cache_item = self.__get_cache(name)
-        if cache_item is not None:
-            return cache_item
+    def get(self, name: str) -> Any:
+        with self.__lock:
+            cache_item = self.__cache.get(name)
+            if cache_item is not None:
+                self.__cache.move_to_end(name)
+                return cache_item.data
 
         latent = self.__underlying_storage.get(name)
-        self.__set_cache(name, latent)
+        with self.__lock:
+            if name not in self.__cache:
+                self.__set_cache(name, CachedLatents(latent, get_size(latent), pending=False))
         return latent
 
-    def save(self, name: str, data: torch.Tensor) -> None:
-        self.__underlying_storage.save(name, data)
-        self.__set_cache(name, data)
+    def save(self, name: str, data: Any) -> None:
+        with self.__lock:
+            if self.get_session_id(name) in self.__deleted_sessions:
+                # A node of a canceled session finished after the session's latents were deleted
+                return
+            self.__set_cache(name, CachedLatents(data, get_size(data), pending=True))
+        self.__write_queue.put(partial(self.__write, name, data))
         self._on_changed(data)
 
     def delete(self, name: str) -> None:
-        self.__underlying_storage.delete(name)
-        if name in self.__cache:
-            del self.__cache[name]
+        with self.__lock:
+            self.__forget(name)
+        self.__write_queue.put(partial(self.__underlying_storage.delete, name))
         self._on_deleted(name)
 
-    def __get_cache(self, name: str) -> Optional[torch.Tensor]:
-        return None if name not in self.__cache else self.__cache[name]
-
-    def __set_cache(self, name: str, data: torch.Tensor):
-        if name not in self.__cache:
-            self.__cache[name] = data
-            self.__cache_ids.put(name)
-            if self.__cache_ids.qsize() > self.__max_cache_size:
-                self.__cache.pop(self.__cache_ids.get())
+    def delete_session(self, session_id: str) -> None:
+        with self.__lock:
+            self.__deleted_sessions[session_id] = None
+            while len(self.__deleted_sessions) > MAX_DELETED_SESSIONS:
+                self.__deleted_sessions.popitem(last=False)
+            names = list(self.__session_names.get(session_id, ()))
+            for name in names:
+                self.__forget(name)
+        self.__write_queue.put(partial(self.__underlying_storage.delete_session, session_id))
+        for name in names:
+            self._on_deleted(name)
+
+    def flush(self) -> None:
+        """Waits for all writes and deletions to be applied to the underlying storage"""
+        self.__write_queue.join()
+
+    def __set_cache(self, name: str, item: CachedLatents) -> None:
+        self.__delete_cache(name)
+        self.__cache[name] = item
+        self.__size += item.size
+        # Names are remembered after their latents are evicted, to report them deleted with their session
+        self.__session_names.setdefault(self.get_session_id(name), set()).add(name)
+        self.__evict()
+
+    def __delete_cache(self, name: str) -> None:
+        item = self.__cache.pop(name, None)
+        if item is not None:
+            self.__size -= item.size
+
+    def __forget(self, name: str) -> None:
+        self.__delete_cache(name)
+        session_id = self.get_session_id(name)
+        names = self.__session_names.get(session_id)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self.__session_names[session_id]
+
+    def __evict(self) -> None:
+        """Evicts the least recently used latents that have been written, until the cache is within its size"""
+        if self.__size <= self.__max_cache_bytes:
+            return
+        for name in [name for name, item in self.__cache.items() if not item.pending]:
+            self.__delete_cache(name)
+            if self.__size <= self.__max_cache_bytes:
+                return
+
+    def __write(self, name: str, data: Any) -> None:
+        with self.__lock:
+            cache_item = self.__cache.get(name)
+            if cache_item is None or cache_item.data is not data:
+                # Deleted or saved again before it was written
+                return
+        self.__underlying_storage.save(name, data)
+        with self.__lock:
+            cache_item = self.__cache.get(name)
+            if cache_item is not None and cache_item.data is data:
+                cache_item.pending = False
+                self.__evict()
+
+    def __process_writes(self) -> None:
+        while True:
+            operation = self.__write_queue.get()
+            try:
+                if operation is None:
+                    return
+                operation()
+            except FileNotFoundError:
+                # Latents that were deleted before they were written
+                pass
+            except Exception as e:
+                self._invoker.services.logger.error(f"Error while writing latents: {e}")
+            finally:
+                self.__write_queue.task_done()
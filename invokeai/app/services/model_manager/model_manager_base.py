@@ -57,6 +57,21 @@ class ModelManagerServiceBase(ABC):
         of a diffusers pipeline."""
         pass
 
+    @abstractmethod
+    def prefetch_model(
+        self,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel: Optional[SubModelType] = None,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ) -> Optional[ModelInfo]:
+        """Load the indicated model into the RAM cache ahead of its
+        use, if it fits in the free room of the cache. Returns None
+        if the model was already cached or does not fit.
+        on_load_started is called before the model is read from disk."""
+        pass
+
     @property
     @abstractmethod
     def logger(self):
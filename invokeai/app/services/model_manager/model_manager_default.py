@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from logging import Logger
 from pathlib import Path
+from threading import Thread
 from typing import TYPE_CHECKING, Callable, List, Literal, Optional, Tuple, Union
 
 import torch
@@ -128,6 +129,26 @@ class ModelManagerService(ModelManagerServiceBase):
 
         return model_info
 
+    def prefetch_model(
+        self,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel: Optional[SubModelType] = None,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ) -> Optional[ModelInfo]:
+        """
+        Load the indicated model into the RAM cache ahead of its use,
+        without evicting other models.
+        """
+        return self.mgr.prefetch_model(
+            model_name,
+            base_model,
+            model_type,
+            submodel,
+            on_load_started=on_load_started,
+        )
+
     def model_exists(
         self,
         model_name: str,
@@ -186,7 +207,9 @@ class ModelManagerService(ModelManagerServiceBase):
         the model name is missing. Call commit() to write changes to disk.
         """
         self.logger.debug(f"add/update model {model_name}")
-        return self.mgr.add_model(model_name, base_model, model_type, model_attributes, clobber)
+        result = self.mgr.add_model(model_name, base_model, model_type, model_attributes, clobber)
+        self._convert_in_background([result])
+        return result
 
     def update_model(
         self,
@@ -322,7 +345,23 @@ class ModelManagerService(ModelManagerServiceBase):
         of the set is a dict corresponding to the newly-created OmegaConf stanza for
         that model.
         """
-        return self.mgr.heuristic_import(items_to_import, prediction_type_helper)
+        results = self.mgr.heuristic_import(items_to_import, prediction_type_helper)
+        self._convert_in_background(list(results.values()))
+        return results
+
+    def _convert_in_background(self, models: List[AddModelResult]) -> None:
+        """Convert the checkpoint models that were added into the conversion cache, on a background thread"""
+        checkpoints = [model for model in models if getattr(model.config, "model_format", None) == "checkpoint"]
+        if not checkpoints or not self.mgr.app_config.convert_on_import:
+            return
+        Thread(name="model_converter", target=self._convert_models, args=(checkpoints,), daemon=True).start()
+
+    def _convert_models(self, models: List[AddModelResult]) -> None:
+        for model in models:
+            try:
+                self.mgr.cache_converted_model(model.name, model.base_model, model.model_type)
+            except Exception as e:
+                self.logger.warning(f"Unable to convert model {model.name} in the background: {e}")
 
     def merge_models(
         self,
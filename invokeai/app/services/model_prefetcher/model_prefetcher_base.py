@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+
+class ModelPrefetcherBase(ABC):
+    """
+    Base class for model prefetcher.
+
+    The model prefetcher loads the models used by the next pending queue items into the RAM cache, while the current
+    queue item is processed, so they do not have to be read from disk when their nodes execute.
+    """
+
+    @abstractmethod
+    def prefetch(self) -> None:
+        """Looks for models to load in the pending queue items. This is done in the background."""
+        pass
@@ -0,0 +1,146 @@
+from threading import Event as ThreadEvent
+from threading import Thread
+from typing import NamedTuple, Optional
+
+from fastapi_events.handlers.local import local_handler
+from fastapi_events.typing import Event as FastAPIEvent
+
+from invokeai.app.invocations.model import LoRAModelField, MainModelField, VAEModelField
+from invokeai.app.services.events.events_base import EventServiceBase
+from invokeai.app.services.session_queue.session_queue_common import SessionQueueItem
+from invokeai.app.services.shared.graph import Graph
+from invokeai.backend.model_management import BaseModelType, ModelType, SubModelType
+
+from ..invoker import Invoker
+from .model_prefetcher_base import ModelPrefetcherBase
+
+# The submodels nodes load from a main model, in the order they are used. Tokenizers and schedulers are quick to load.
+MAIN_MODEL_SUBMODELS: dict[BaseModelType, list[SubModelType]] = {
+    BaseModelType.StableDiffusionXL: [
+        SubModelType.TextEncoder,
+        SubModelType.TextEncoder2,
+        SubModelType.UNet,
+        SubModelType.Vae,
+    ],
+    BaseModelType.StableDiffusionXLRefiner: [SubModelType.TextEncoder2, SubModelType.UNet, SubModelType.Vae],
+}
+DEFAULT_MAIN_MODEL_SUBMODELS = [SubModelType.TextEncoder, SubModelType.UNet, SubModelType.Vae]
+
+
+class PrefetchModel(NamedTuple):
+    model_name: str
+    base_model: BaseModelType
+    model_type: ModelType
+    submodel: Optional[SubModelType] = None
+
+
+def get_prefetch_models(graph: Graph) -> list[PrefetchModel]:
+    """Gets the models the nodes of a graph will load, from their main model, VAE and LoRA fields"""
+    models: dict[PrefetchModel, None] = {}
+    for node in graph.nodes.values():
+        for field_name in node.model_fields:
+            value = getattr(node, field_name)
+            if isinstance(value, MainModelField):
+                for submodel in MAIN_MODEL_SUBMODELS.get(value.base_model, DEFAULT_MAIN_MODEL_SUBMODELS):
+                    models[PrefetchModel(value.model_name, value.base_model, value.model_type, submodel)] = None
+            elif isinstance(value, VAEModelField):
+                models[PrefetchModel(value.model_name, value.base_model, ModelType.Vae)] = None
+            elif isinstance(value, LoRAModelField):
+                models[PrefetchModel(value.model_name, value.base_model, ModelType.Lora)] = None
+    return list(models)
+
+
+class DefaultModelPrefetcher(ModelPrefetcherBase):
+    """Loads the models of the next `prefetch_depth` pending queue items into the RAM cache, on a background
+    thread. It looks at them whenever a queue item starts processing and when a batch is enqueued.
+
+    Models are only loaded into the free room of the cache, so they never evict the models of the queue item being
+    processed. Loads emit the model load events of the queue item they are for, with `prefetch` set.
+    """
+
+    def start(self, invoker: Invoker) -> None:
+        self.__invoker = invoker
+        self.__depth = invoker.services.configuration.prefetch_depth
+        self.__stop_event = ThreadEvent()
+        self.__prefetch_event = ThreadEvent()
+        if self.__depth == 0:
+            return
+
+        local_handler.register(event_name=EventServiceBase.queue_event, _func=self._on_queue_event)
+        self.__thread = Thread(name="model_prefetcher", target=self.__process, daemon=True)
+        self.__thread.start()
+
+    def stop(self, *args, **kwargs) -> None:
+        self.__stop_event.set()
+        self.__prefetch_event.set()
+
+    def prefetch(self) -> None:
+        self.__prefetch_event.set()
+
+    async def _on_queue_event(self, event: FastAPIEvent) -> None:
+        event_name = event[1]["event"]
+        if event_name == "queue_item_status_changed":
+            if event[1]["data"]["queue_item"]["status"] == "in_progress":
+                self.prefetch()
+        elif event_name in ["batch_enqueued", "batch_enqueue_progress"]:
+            self.prefetch()
+
+    def __process(self) -> None:
+        while not self.__stop_event.is_set():
+            self.__prefetch_event.wait()
+            self.__prefetch_event.clear()
+            try:
+                self.__prefetch_pending()
+            except Exception as e:
+                self.__invoker.services.logger.error(f"Error in model prefetcher: {e}")
+
+    def __prefetch_pending(self) -> None:
+        for queue_item in self.__invoker.services.session_queue.get_pending(self.__depth):
+            for model in get_prefetch_models(queue_item.session.graph):
+                # Start over when the queue changed, the next items may be others
+                if self.__stop_event.is_set() or self.__prefetch_event.is_set():
+                    return
+                self.__prefetch_model(queue_item, model)
+
+    def __prefetch_model(self, queue_item: SessionQueueItem, model: PrefetchModel) -> None:
+        events = self.__invoker.services.events
+
+        def on_load_started() -> None:
+            events.emit_model_load_started(
+                queue_id=queue_item.queue_id,
+                queue_item_id=queue_item.item_id,
+                queue_batch_id=queue_item.batch_id,
+                graph_execution_state_id=queue_item.session_id,
+                model_name=model.model_name,
+                base_model=model.base_model,
+                model_type=model.model_type,
+                submodel=model.submodel,  # type: ignore
+                prefetch=True,
+            )
+
+        try:
+            model_info = self.__invoker.services.model_manager.prefetch_model(
+                model_name=model.model_name,
+                base_model=model.base_model,
+                model_type=model.model_type,
+                submodel=model.submodel,
+                on_load_started=on_load_started,
+            )
+        except Exception as e:
+            # The node that uses the model reports the error, if it is still there when it executes
+            self.__invoker.services.logger.debug(f"Unable to prefetch model {model.model_name}: {e}")
+            return
+        if model_info is None:
+            return
+        events.emit_model_load_completed(
+            queue_id=queue_item.queue_id,
+            queue_item_id=queue_item.item_id,
+            queue_batch_id=queue_item.batch_id,
+            graph_execution_state_id=queue_item.session_id,
+            model_name=model.model_name,
+            base_model=model.base_model,
+            model_type=model.model_type,
+            submodel=model.submodel,  # type: ignore
+            model_info=model_info,
+            prefetch=True,
+        )
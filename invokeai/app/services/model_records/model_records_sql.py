@@ -189,15 +189,15 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
 
         Exceptions: UnknownModelException
         """
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 """--sql
                 SELECT config FROM model_config
                 WHERE id=?;
                 """,
                 (key,),
             )
-            rows = self._cursor.fetchone()
+            rows = cursor.fetchone()
             if not rows:
                 raise UnknownModelException("model not found")
             model = ModelConfigFactory.make_config(json.loads(rows[0]))
@@ -210,15 +210,15 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
         :param key: Unique key for the model to be deleted
         """
         count = 0
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 """--sql
                 select count(*) FROM model_config
                 WHERE id=?;
                 """,
                 (key,),
             )
-            count = self._cursor.fetchone()[0]
+            count = cursor.fetchone()[0]
         return count > 0
 
     def search_by_attr(
@@ -255,41 +255,41 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
             where_clause.append("format=?")
             bindings.append(model_format)
         where = f"WHERE {' AND '.join(where_clause)}" if where_clause else ""
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 f"""--sql
                 select config FROM model_config
                 {where};
                 """,
                 tuple(bindings),
             )
-            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in self._cursor.fetchall()]
+            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in cursor.fetchall()]
         return results
 
     def search_by_path(self, path: Union[str, Path]) -> List[AnyModelConfig]:
         """Return models with the indicated path."""
         results = []
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 """--sql
                 SELECT config FROM model_config
                 WHERE path=?;
                 """,
                 (str(path),),
             )
-            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in self._cursor.fetchall()]
+            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in cursor.fetchall()]
         return results
 
     def search_by_hash(self, hash: str) -> List[AnyModelConfig]:
         """Return models with the indicated original_hash."""
         results = []
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read() as cursor:
+            cursor.execute(
                 """--sql
                 SELECT config FROM model_config
                 WHERE original_hash=?;
                 """,
                 (hash,),
             )
-            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in self._cursor.fetchall()]
+            results = [ModelConfigFactory.make_config(json.loads(x[0])) for x in cursor.fetchall()]
         return results
@@ -9,7 +9,7 @@ class SessionProcessorBase(ABC):
 
     The session processor is responsible for executing sessions. It runs a simple polling loop,
     checking the session queue for new sessions to execute. It must coordinate with the
-    invocation queue to ensure only one session is executing at a time.
+    invocation queue to ensure each of its lanes executes only one session at a time.
     """
 
     @abstractmethod
@@ -1,6 +1,17 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
+class SessionProcessorLaneStatus(BaseModel):
+    lane: int = Field(description="The index of the lane")
+    queue_item_id: Optional[int] = Field(default=None, description="The id of the queue item being processed, if any")
+    session_id: Optional[str] = Field(default=None, description="The id of the session being processed, if any")
+
+
 class SessionProcessorStatus(BaseModel):
     is_started: bool = Field(description="Whether the session processor is started")
     is_processing: bool = Field(description="Whether a session is being processed")
+    lanes: list[SessionProcessorLaneStatus] = Field(
+        default_factory=list, description="The status of each of the session processor's lanes"
+    )
@@ -1,7 +1,7 @@
 import traceback
-from threading import BoundedSemaphore, Thread
+from threading import BoundedSemaphore, Lock, Thread
 from threading import Event as ThreadEvent
-from typing import Optional
+from typing import Callable, Optional
 
 from fastapi_events.handlers.local import local_handler
 from fastapi_events.typing import Event as FastAPIEvent
@@ -11,16 +11,25 @@ from invokeai.app.services.session_queue.session_queue_common import SessionQueu
 
 from ..invoker import Invoker
 from .session_processor_base import SessionProcessorBase
-from .session_processor_common import SessionProcessorStatus
+from .session_processor_common import SessionProcessorLaneStatus, SessionProcessorStatus
 
 POLLING_INTERVAL = 1
 THREAD_LIMIT = 1
 
 
 class DefaultSessionProcessor(SessionProcessorBase):
+    """Processes up to `session_lanes` queue items at the same time, one per lane.
+
+    Every lane dequeues its next item as soon as its current item is complete, failed or canceled, when the latents
+    of its session are deleted and its images unpinned. The nodes of all lanes are executed by the invocation
+    processor's workers.
+    """
+
     def start(self, invoker: Invoker) -> None:
         self.__invoker: Invoker = invoker
-        self.__queue_item: Optional[SessionQueueItem] = None
+        self.__lanes: list[Optional[SessionQueueItem]] = [None] * invoker.services.configuration.session_lanes
+        # Lanes are freed by queue events, which are handled on another thread
+        self.__lanes_lock = Lock()
 
         self.__resume_event = ThreadEvent()
         self.__stop_event = ThreadEvent()
@@ -42,10 +51,23 @@ class DefaultSessionProcessor(SessionProcessorBase):
 
     def stop(self, *args, **kwargs) -> None:
         self.__stop_event.set()
+        self._poll_now()
 
     def _poll_now(self) -> None:
         self.__poll_now_event.set()
 
+    def _free_lanes(self, match: Callable[[SessionQueueItem], bool]) -> None:
+        """Frees the lanes processing a queue item that matches, releasing the latents and images of their sessions"""
+        freed: list[SessionQueueItem] = []
+        with self.__lanes_lock:
+            for lane, queue_item in enumerate(self.__lanes):
+                if queue_item is not None and match(queue_item):
+                    self.__lanes[lane] = None
+                    freed.append(queue_item)
+        for queue_item in freed:
+            self.__invoker.services.latents.delete_session(queue_item.session_id)
+            self.__invoker.services.image_files.unpin_session(queue_item.session_id)
+
     async def _on_queue_event(self, event: FastAPIEvent) -> None:
         event_name = event[1]["event"]
 
@@ -56,24 +78,23 @@ class DefaultSessionProcessor(SessionProcessorBase):
             "session_retrieval_error",
             "invocation_retrieval_error",
         ]:
-            self.__queue_item = None
+            queue_item_id = event[1]["data"]["queue_item_id"]
+            self._free_lanes(lambda queue_item: queue_item.item_id == queue_item_id)
             self._poll_now()
-        elif (
-            event_name == "session_canceled"
-            and self.__queue_item is not None
-            and self.__queue_item.session_id == event[1]["data"]["graph_execution_state_id"]
-        ):
-            self.__queue_item = None
+        elif event_name == "session_canceled":
+            session_id = event[1]["data"]["graph_execution_state_id"]
+            self._free_lanes(lambda queue_item: queue_item.session_id == session_id)
             self._poll_now()
-        elif event_name == "batch_enqueued":
+        elif event_name in ["batch_enqueued", "batch_enqueue_progress"]:
             self._poll_now()
         elif event_name == "queue_cleared":
-            self.__queue_item = None
+            self._free_lanes(lambda queue_item: True)
             self._poll_now()
 
     def resume(self) -> SessionProcessorStatus:
         if not self.__resume_event.is_set():
             self.__resume_event.set()
+            self._poll_now()
         return self.get_status()
 
     def pause(self) -> SessionProcessorStatus:
@@ -82,11 +103,25 @@ class DefaultSessionProcessor(SessionProcessorBase):
         return self.get_status()
 
     def get_status(self) -> SessionProcessorStatus:
+        with self.__lanes_lock:
+            lanes = [
+                SessionProcessorLaneStatus(
+                    lane=lane,
+                    queue_item_id=None if queue_item is None else queue_item.item_id,
+                    session_id=None if queue_item is None else queue_item.session_id,
+                )
+                for lane, queue_item in enumerate(self.__lanes)
+            ]
         return SessionProcessorStatus(
             is_started=self.__resume_event.is_set(),
-            is_processing=self.__queue_item is not None,
+            is_processing=any(lane.queue_item_id is not None for lane in lanes),
+            lanes=lanes,
         )
 
+    def __get_idle_lane(self) -> Optional[int]:
+        with self.__lanes_lock:
+            return next((lane for lane, queue_item in enumerate(self.__lanes) if queue_item is None), None)
+
     def __process(
         self,
         stop_event: ThreadEvent,
@@ -101,34 +136,42 @@ class DefaultSessionProcessor(SessionProcessorBase):
             while not stop_event.is_set():
                 poll_now_event.clear()
                 try:
-                    # do not dequeue if there is already a session running
-                    if self.__queue_item is None and resume_event.is_set():
+                    # dequeue an item for every lane that is not running a session
+                    lane = self.__get_idle_lane()
+                    while lane is not None and resume_event.is_set():
                         queue_item = self.__invoker.services.session_queue.dequeue()
+                        if queue_item is None:
+                            break
 
-                        if queue_item is not None:
-                            self.__invoker.services.logger.debug(f"Executing queue item {queue_item.item_id}")
-                            self.__queue_item = queue_item
-                            self.__invoker.services.graph_execution_manager.set(queue_item.session)
-                            self.__invoker.invoke(
-                                session_queue_batch_id=queue_item.batch_id,
-                                session_queue_id=queue_item.queue_id,
-                                session_queue_item_id=queue_item.item_id,
-                                graph_execution_state=queue_item.session,
-                                workflow=queue_item.workflow,
-                                invoke_all=True,
-                            )
-                            queue_item = None
-
-                    if queue_item is None:
-                        self.__invoker.services.logger.debug("Waiting for next polling interval or event")
-                        poll_now_event.wait(POLLING_INTERVAL)
-                        continue
+                        self.__invoker.services.logger.debug(
+                            f"Executing queue item {queue_item.item_id} in lane {lane}"
+                        )
+                        with self.__lanes_lock:
+                            self.__lanes[lane] = queue_item
+                        self.__invoker.services.graph_execution_manager.set(queue_item.session)
+                        self.__invoker.invoke(
+                            session_queue_batch_id=queue_item.batch_id,
+                            session_queue_id=queue_item.queue_id,
+                            session_queue_item_id=queue_item.item_id,
+                            graph_execution_state=queue_item.session,
+                            workflow=queue_item.workflow,
+                            invoke_all=True,
+                        )
+                        queue_item = None
+                        lane = self.__get_idle_lane()
+
+                    # Everything that can free a lane or add a queue item wakes us up, so there is nothing to poll for
+                    self.__invoker.services.logger.debug("Waiting for next event")
+                    poll_now_event.wait()
+                    continue
                 except Exception as e:
                     self.__invoker.services.logger.error(f"Error in session processor: {e}")
                     if queue_item is not None:
+                        self._free_lanes(lambda item, failed_item=queue_item: item.item_id == failed_item.item_id)
                         self.__invoker.services.session_queue.cancel_queue_item(
                             queue_item.item_id, error=traceback.format_exc()
                         )
+                        queue_item = None
                     poll_now_event.wait(POLLING_INTERVAL)
                     continue
         except Exception as e:
@@ -137,5 +180,5 @@ class DefaultSessionProcessor(SessionProcessorBase):
         finally:
             stop_event.clear()
             poll_now_event.clear()
-            self.__queue_item = None
+            self._free_lanes(lambda queue_item: True)
             self.__threadLimit.release()
@@ -15,6 +15,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     SessionQueueItem,
     SessionQueueItemDTO,
     SessionQueueStatus,
+    SessionQueueWaitTimes,
 )
 from invokeai.app.services.shared.pagination import CursorPaginatedResults
 
@@ -42,6 +43,11 @@ class SessionQueueBase(ABC):
         """Gets the next session queue item (does not dequeue it)"""
         pass
 
+    @abstractmethod
+    def get_pending(self, limit: int) -> list[SessionQueueItem]:
+        """Gets the session queue items that will be dequeued next, in order (does not dequeue them)"""
+        pass
+
     @abstractmethod
     def clear(self, queue_id: str) -> ClearResult:
         """Deletes all session queue items"""
@@ -67,6 +73,11 @@ class SessionQueueBase(ABC):
         """Gets the status of the queue"""
         pass
 
+    @abstractmethod
+    def get_wait_times(self, queue_id: str) -> SessionQueueWaitTimes:
+        """Gets how long the queue items of a queue waited before being dequeued"""
+        pass
+
     @abstractmethod
     def get_batch_status(self, queue_id: str, batch_id: str) -> BatchStatus:
         """Gets the status of a batch"""
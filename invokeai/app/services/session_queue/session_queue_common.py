@@ -233,11 +233,23 @@ class SessionQueueItem(SessionQueueItemWithoutGraph):
     )
 
     @classmethod
-    def queue_item_from_dict(cls, queue_item_dict: dict) -> "SessionQueueItem":
+    def queue_item_from_dict(
+        cls, queue_item_dict: dict, batch_template: Optional["BatchTemplate"] = None
+    ) -> "SessionQueueItem":
+        """
+        Parses a queue item from a row of the session_queue table. Queue items stored without their session are
+        materialized from the template of their batch, which must then be given.
+        """
         # must parse these manually
         queue_item_dict["field_values"] = get_field_values(queue_item_dict)
-        queue_item_dict["session"] = get_session(queue_item_dict)
-        queue_item_dict["workflow"] = get_workflow(queue_item_dict)
+        if queue_item_dict.get("session") == "" and batch_template is not None:
+            queue_item_dict["session"] = materialize_session(
+                batch_template.graph, queue_item_dict["session_id"], queue_item_dict["field_values"]
+            )
+            queue_item_dict["workflow"] = batch_template.workflow
+        else:
+            queue_item_dict["session"] = get_session(queue_item_dict)
+            queue_item_dict["workflow"] = get_workflow(queue_item_dict)
         return SessionQueueItem(**queue_item_dict)
 
     model_config = ConfigDict(
@@ -287,6 +299,20 @@ class BatchStatus(BaseModel):
     total: int = Field(..., description="Total number of queue items")
 
 
+class SessionQueueWaitTimes(BaseModel):
+    queue_id: str = Field(..., description="The ID of the queue")
+    dequeued: int = Field(..., description="Number of queue items dequeued since the app started")
+    mean: Optional[float] = Field(default=None, description="Mean time the recently dequeued items waited, in seconds")
+    p50: Optional[float] = Field(default=None, description="Median time the recently dequeued items waited, in seconds")
+    p95: Optional[float] = Field(
+        default=None, description="95th percentile of the time the recently dequeued items waited, in seconds"
+    )
+    max: Optional[float] = Field(default=None, description="Longest time a recently dequeued item waited, in seconds")
+    oldest_pending: Optional[float] = Field(
+        default=None, description="Time the oldest pending queue item has been waiting, in seconds"
+    )
+
+
 class EnqueueBatchResult(BaseModel):
     queue_id: str = Field(description="The ID of the queue")
     enqueued: int = Field(description="The total number of queue items enqueued")
@@ -351,6 +377,15 @@ def populate_graph(graph: Graph, node_field_values: Iterable[NodeFieldValue]) ->
     return graph_clone
 
 
+def materialize_session(
+    graph: Graph, session_id: str, node_field_values: Optional[Iterable[NodeFieldValue]]
+) -> GraphExecutionState:
+    """
+    Creates the session of a queue item stored without it, from the graph of its batch and its field values.
+    """
+    return GraphExecutionState(id=session_id, graph=populate_graph(graph, node_field_values or []))
+
+
 def create_session_nfv_tuples(
     batch: Batch, maximum: int
 ) -> Generator[tuple[GraphExecutionState, list[NodeFieldValue], Optional[WorkflowWithoutID]], None, None]:
@@ -359,6 +394,16 @@ def create_session_nfv_tuples(
     of the form (graph, batch_data_items) where batch_data_items is the list of BatchDataItems
     that was applied to the graph.
     """
+    for flat_node_field_values in create_nfv_lists(batch, maximum):
+        graph = populate_graph(batch.graph, flat_node_field_values)
+        yield (GraphExecutionState(graph=graph), flat_node_field_values, batch.workflow)
+
+
+def create_nfv_lists(batch: Batch, maximum: int) -> Generator[list[NodeFieldValue], None, None]:
+    """
+    Create the lists of NodeFieldValues of all permutations of the given batch data, without
+    populating the graph with them.
+    """
 
     # TODO: Should this be a class method on Batch?
 
@@ -382,9 +427,7 @@ def create_session_nfv_tuples(
         for d in product(*data):
             if count >= maximum:
                 return
-            flat_node_field_values = list(chain.from_iterable(d))
-            graph = populate_graph(batch.graph, flat_node_field_values)
-            yield (GraphExecutionState(graph=graph), flat_node_field_values, batch.workflow)
+            yield list(chain.from_iterable(d))
             count += 1
 
 
@@ -423,24 +466,55 @@ class SessionQueueValueToInsert(NamedTuple):
 ValuesToInsert: TypeAlias = list[SessionQueueValueToInsert]
 
 
-def prepare_values_to_insert(queue_id: str, batch: Batch, priority: int, max_new_queue_items: int) -> ValuesToInsert:
-    values_to_insert: ValuesToInsert = []
-    for session, field_values, workflow in create_session_nfv_tuples(batch, max_new_queue_items):
-        # sessions must have unique id
-        session.id = uuid_string()
-        values_to_insert.append(
-            SessionQueueValueToInsert(
+class BatchTemplate(NamedTuple):
+    """The graph and workflow of a batch, from which the sessions of its queue items are materialized"""
+
+    graph: Graph
+    workflow: Optional[WorkflowWithoutID]
+
+
+def generate_values_to_insert(
+    queue_id: str, batch: Batch, priority: int, max_new_queue_items: int, store_sessions: bool = True
+) -> Generator[SessionQueueValueToInsert, None, None]:
+    """
+    Generates the rows of the queue items of a batch. When `store_sessions` is False, the rows only hold their field
+    values, with an empty session and no workflow, and their sessions are materialized from the batch's template
+    when they are read.
+    """
+    if not store_sessions:
+        for field_values in create_nfv_lists(batch, max_new_queue_items):
+            # must use pydantic_encoder bc field_values is a list of models
+            field_values_json = json.dumps(field_values, default=to_jsonable_python) if field_values else None
+            yield SessionQueueValueToInsert(
                 queue_id,  # queue_id
-                session.model_dump_json(warnings=False, exclude_none=True),  # session (json)
-                session.id,  # session_id
+                "",  # session (materialized from the batch template)
+                uuid_string(),  # session_id
                 batch.batch_id,  # batch_id
-                # must use pydantic_encoder bc field_values is a list of models
-                json.dumps(field_values, default=to_jsonable_python) if field_values else None,  # field_values (json)
+                field_values_json,  # field_values (json)
                 priority,  # priority
-                json.dumps(workflow, default=to_jsonable_python) if workflow else None,  # workflow (json)
+                None,  # workflow (stored with the batch template)
             )
+        return
+    for session, field_values, workflow in create_session_nfv_tuples(batch, max_new_queue_items):
+        # sessions must have unique id
+        session.id = uuid_string()
+        yield SessionQueueValueToInsert(
+            queue_id,  # queue_id
+            session.model_dump_json(warnings=False, exclude_none=True),  # session (json)
+            session.id,  # session_id
+            batch.batch_id,  # batch_id
+            # must use pydantic_encoder bc field_values is a list of models
+            json.dumps(field_values, default=to_jsonable_python) if field_values else None,  # field_values (json)
+            priority,  # priority
+            json.dumps(workflow, default=to_jsonable_python) if workflow else None,  # workflow (json)
         )
-    return values_to_insert
+
+
+def prepare_values_to_insert(
+    queue_id: str, batch: Batch, priority: int, max_new_queue_items: int, store_sessions: bool = True
+) -> ValuesToInsert:
+    """Prepares the rows of the queue items of a batch. See `generate_values_to_insert`."""
+    return list(generate_values_to_insert(queue_id, batch, priority, max_new_queue_items, store_sessions))
 
 
 # endregion Util
@@ -1,9 +1,13 @@
+import json
 import sqlite3
 import threading
-from typing import Optional, Union, cast
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Literal, Optional, Union, cast
 
 from fastapi_events.handlers.local import local_handler
 from fastapi_events.typing import Event as FastAPIEvent
+from pydantic_core import to_jsonable_python
 
 from invokeai.app.services.events.events_base import EventServiceBase
 from invokeai.app.services.invoker import Invoker
@@ -13,6 +17,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     QUEUE_ITEM_STATUS,
     Batch,
     BatchStatus,
+    BatchTemplate,
     CancelByBatchIDsResult,
     CancelByQueueIDResult,
     ClearResult,
@@ -24,18 +29,37 @@ from invokeai.app.services.session_queue.session_queue_common import (
     SessionQueueItemDTO,
     SessionQueueItemNotFoundError,
     SessionQueueStatus,
+    SessionQueueWaitTimes,
+    ValuesToInsert,
     calc_session_count,
-    prepare_values_to_insert,
+    generate_values_to_insert,
 )
+from invokeai.app.services.shared.graph import Graph
 from invokeai.app.services.shared.pagination import CursorPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.workflow_records.workflow_records_common import WorkflowWithoutIDValidator
+
+# Number of parsed batch templates kept in memory
+BATCH_TEMPLATE_CACHE_SIZE = 16
+# Number of queue items inserted in each transaction when enqueuing a batch
+ENQUEUE_CHUNK_SIZE = 1000
+# Number of recently dequeued items of each queue whose wait times are kept
+WAIT_TIME_WINDOW = 1000
 
 
 class SqliteSessionQueue(SessionQueueBase):
     __invoker: Invoker
+    __db: SqliteDatabase
     __conn: sqlite3.Connection
     __cursor: sqlite3.Cursor
     __lock: threading.RLock
+    __batch_templates: bool
+    __batch_template_cache: OrderedDict[str, BatchTemplate]
+    __batch_template_cache_lock: threading.Lock
+    __dequeue_count: int
+    __last_dequeued: dict[str, int]
+    __dequeued_per_queue: dict[str, int]
+    __wait_times: dict[str, deque[float]]
 
     def start(self, invoker: Invoker) -> None:
         self.__invoker = invoker
@@ -45,11 +69,27 @@ class SqliteSessionQueue(SessionQueueBase):
         if prune_result.deleted > 0:
             self.__invoker.services.logger.info(f"Pruned {prune_result.deleted} finished queue items")
 
-    def __init__(self, db: SqliteDatabase) -> None:
+    def __init__(self, db: SqliteDatabase, batch_templates: bool = True) -> None:
+        """
+        :param db: The database
+        :param batch_templates: Store the graph and workflow of each batch once, and only the field values of its
+            queue items, materializing their sessions when they are read. Otherwise, the whole session and workflow
+            of each queue item is stored in its row.
+        """
         super().__init__()
+        self.__db = db
         self.__lock = db.lock
         self.__conn = db.conn
         self.__cursor = self.__conn.cursor()
+        self.__batch_templates = batch_templates
+        self.__batch_template_cache = OrderedDict()
+        self.__batch_template_cache_lock = threading.Lock()
+        # When each queue was last dequeued from, as the number of items dequeued before, for round-robin scheduling
+        self.__dequeue_count = 0
+        self.__last_dequeued = {}
+        # How long the recently dequeued items of each queue waited, in seconds
+        self.__dequeued_per_queue = {}
+        self.__wait_times = {}
 
     def _match_event_name(self, event: FastAPIEvent, match_in: list[str]) -> bool:
         return event[1]["event"] in match_in
@@ -121,15 +161,15 @@ class SqliteSessionQueue(SessionQueueBase):
         """Gets the current number of pending queue items"""
         self.__cursor.execute(
             """--sql
-            SELECT count(*)
-            FROM session_queue
+            SELECT SUM(count)
+            FROM session_queue_counts
             WHERE
               queue_id = ?
               AND status = 'pending'
             """,
             (queue_id,),
         )
-        return cast(int, self.__cursor.fetchone()[0])
+        return cast(Union[int, None], self.__cursor.fetchone()[0]) or 0
 
     def _get_highest_priority(self, queue_id: str) -> int:
         """Gets the highest priority value in the queue"""
@@ -146,6 +186,12 @@ class SqliteSessionQueue(SessionQueueBase):
         return cast(Union[int, None], self.__cursor.fetchone()[0]) or 0
 
     def enqueue_batch(self, queue_id: str, batch: Batch, prepend: bool) -> EnqueueBatchResult:
+        """
+        Enqueues a batch in chunks of `ENQUEUE_CHUNK_SIZE` queue items, each inserted in its own transaction. Other
+        database operations, and dequeuing the first items, can proceed between chunks. The progress is emitted after
+        every chunk but the last. If enqueuing fails, the chunks inserted before stay enqueued.
+        """
+        requested_count = calc_session_count(batch)
         try:
             self.__lock.acquire()
 
@@ -153,36 +199,45 @@ class SqliteSessionQueue(SessionQueueBase):
             current_queue_size = self._get_current_queue_size(queue_id)
             max_queue_size = self.__invoker.services.configuration.get_config().max_queue_size
             max_new_queue_items = max_queue_size - current_queue_size
+            total_count = max(min(requested_count, max_new_queue_items), 0)
 
             priority = 0
             if prepend:
                 priority = self._get_highest_priority(queue_id) + 1
 
-            requested_count = calc_session_count(batch)
-            values_to_insert = prepare_values_to_insert(
+            store_sessions = not (self.__batch_templates and total_count > 0 and self._insert_template(batch))
+            values_to_insert = generate_values_to_insert(
                 queue_id=queue_id,
                 batch=batch,
                 priority=priority,
-                max_new_queue_items=max_new_queue_items,
-            )
-            enqueued_count = len(values_to_insert)
-
-            if requested_count > enqueued_count:
-                values_to_insert = values_to_insert[:max_new_queue_items]
-
-            self.__cursor.executemany(
-                """--sql
-                INSERT INTO session_queue (queue_id, session, session_id, batch_id, field_values, priority, workflow)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                values_to_insert,
+                max_new_queue_items=total_count,
+                store_sessions=store_sessions,
             )
-            self.__conn.commit()
+            # The first chunk is inserted with the template of the batch
+            enqueued_count = self._insert_queue_items(list(islice(values_to_insert, ENQUEUE_CHUNK_SIZE)))
         except Exception:
             self.__conn.rollback()
             raise
         finally:
             self.__lock.release()
+
+        while enqueued_count < total_count:
+            self.__invoker.services.events.emit_batch_enqueue_progress(
+                queue_id=queue_id, batch_id=batch.batch_id, enqueued=enqueued_count, total=total_count
+            )
+            # Sessions are created outside of the lock
+            chunk = list(islice(values_to_insert, ENQUEUE_CHUNK_SIZE))
+            if not chunk:
+                break
+            try:
+                self.__lock.acquire()
+                enqueued_count += self._insert_queue_items(chunk)
+            except Exception:
+                self.__conn.rollback()
+                raise
+            finally:
+                self.__lock.release()
+
         enqueue_result = EnqueueBatchResult(
             queue_id=queue_id,
             requested=requested_count,
@@ -193,21 +248,119 @@ class SqliteSessionQueue(SessionQueueBase):
         self.__invoker.services.events.emit_batch_enqueued(enqueue_result)
         return enqueue_result
 
+    def _insert_queue_items(self, values_to_insert: ValuesToInsert) -> int:
+        """Inserts and commits queue items, returning their number. Must be called with the lock held."""
+        self.__cursor.executemany(
+            """--sql
+            INSERT INTO session_queue (queue_id, session, session_id, batch_id, field_values, priority, workflow)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            values_to_insert,
+        )
+        self.__conn.commit()
+        return len(values_to_insert)
+
+    def _insert_template(self, batch: Batch) -> bool:
+        """
+        Stores the graph and workflow of a batch, returning whether they were stored. They are not if the batch ID
+        has queue items already, which then keep the template they were enqueued with.
+        """
+        self.__cursor.execute(
+            """--sql
+            INSERT OR IGNORE INTO session_queue_batches (batch_id, graph, workflow)
+            VALUES (?, ?, ?)
+            """,
+            (
+                batch.batch_id,
+                batch.graph.model_dump_json(warnings=False, exclude_none=True),
+                json.dumps(batch.workflow, default=to_jsonable_python) if batch.workflow else None,
+            ),
+        )
+        if self.__cursor.rowcount == 0:
+            return False
+        # The batch ID may have been used by a batch whose queue items were all deleted since
+        with self.__batch_template_cache_lock:
+            self.__batch_template_cache.pop(batch.batch_id, None)
+        return True
+
+    def _get_template(self, batch_id: str) -> Optional[BatchTemplate]:
+        """Gets the template of a batch, parsing it only if it isn't among the recently used ones"""
+        with self.__batch_template_cache_lock:
+            template = self.__batch_template_cache.get(batch_id)
+            if template is not None:
+                self.__batch_template_cache.move_to_end(batch_id)
+                return template
+        with self.__db.read() as cursor:
+            cursor.execute(
+                """--sql
+                SELECT graph, workflow
+                FROM session_queue_batches
+                WHERE batch_id = ?
+                """,
+                (batch_id,),
+            )
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
+        if result is None:
+            return None
+        template = BatchTemplate(
+            graph=Graph.model_validate_json(result["graph"], strict=False),
+            workflow=(
+                WorkflowWithoutIDValidator.validate_json(result["workflow"], strict=False)
+                if result["workflow"] is not None
+                else None
+            ),
+        )
+        with self.__batch_template_cache_lock:
+            self.__batch_template_cache[batch_id] = template
+            while len(self.__batch_template_cache) > BATCH_TEMPLATE_CACHE_SIZE:
+                self.__batch_template_cache.popitem(last=False)
+        return template
+
+    def _queue_item_from_row(self, row: sqlite3.Row) -> SessionQueueItem:
+        """Parses a queue item, materializing its session from the template of its batch if it was stored without"""
+        queue_item_dict = dict(row)
+        batch_template = self._get_template(queue_item_dict["batch_id"]) if queue_item_dict["session"] == "" else None
+        return SessionQueueItem.queue_item_from_dict(queue_item_dict, batch_template=batch_template)
+
     def dequeue(self) -> Optional[SessionQueueItem]:
         try:
             self.__lock.acquire()
+            config = self.__invoker.services.configuration
+            if config.queue_scheduling == "priority" and config.max_in_flight_per_queue == 0:
+                # Claims the next item in a single statement
+                where = """--sql
+                    WHERE item_id = (
+                      SELECT item_id
+                      FROM session_queue
+                      WHERE status = 'pending'
+                      ORDER BY
+                        priority DESC,
+                        item_id ASC
+                      LIMIT 1
+                    )
+                    """
+                params: tuple[int, ...] = ()
+            else:
+                item_id = self._schedule_next(config.queue_scheduling, config.max_in_flight_per_queue)
+                if item_id is None:
+                    return None
+                where = """--sql
+                    WHERE item_id = ? AND status = 'pending'
+                    """
+                params = (item_id,)
             self.__cursor.execute(
-                """--sql
-                SELECT *
-                FROM session_queue
-                WHERE status = 'pending'
-                ORDER BY
-                  priority DESC,
-                  item_id ASC
-                LIMIT 1
-                """
+                f"""--sql
+                UPDATE session_queue
+                SET status = 'in_progress'
+                {where}
+                RETURNING item_id, queue_id, (JULIANDAY('NOW') - JULIANDAY(created_at)) * 86400.0
+                """,
+                params,
             )
             result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
+            self.__conn.commit()
+            if result is not None:
+                self._record_wait_time(queue_id=result[1], wait_time=result[2])
         except Exception:
             self.__conn.rollback()
             raise
@@ -215,60 +368,202 @@ class SqliteSessionQueue(SessionQueueBase):
             self.__lock.release()
         if result is None:
             return None
-        queue_item = SessionQueueItem.queue_item_from_dict(dict(result))
-        queue_item = self._set_queue_item_status(item_id=queue_item.item_id, status="in_progress")
-        return queue_item
+        return self._emit_queue_item_status_changed(item_id=result[0])
 
-    def get_next(self, queue_id: str) -> Optional[SessionQueueItem]:
-        try:
-            self.__lock.acquire()
+    def _schedule_next(
+        self, policy: Literal["priority", "round_robin", "fair"], max_in_flight_per_queue: int
+    ) -> Optional[int]:
+        """
+        Returns the ID of the queue item to dequeue next with the given policy, among the queues with fewer than
+        `max_in_flight_per_queue` items in progress (0 for no limit). Items of the highest priority come first with
+        every policy, which then picks among them:
+        - priority: the first one
+        - round_robin: the first one of the queue that was dequeued from the least recently
+        - fair: the first one of the batch that had the fewest items processed, then of the oldest batch
+        Must be called with the lock held.
+        """
+        self.__cursor.execute(
+            """--sql
+            SELECT
+              queue_id,
+              SUM(CASE WHEN status = 'pending' THEN count ELSE 0 END),
+              SUM(CASE WHEN status = 'in_progress' THEN count ELSE 0 END)
+            FROM session_queue_counts
+            GROUP BY queue_id
+            """
+        )
+        queue_ids = [
+            queue_id
+            for queue_id, pending, in_progress in self.__cursor.fetchall()
+            if pending > 0 and (max_in_flight_per_queue == 0 or in_progress < max_in_flight_per_queue)
+        ]
+        if not queue_ids:
+            return None
+
+        # (priority, item ID, key to pick by) of the next item of each queue or batch
+        candidates: list[tuple[int, int, tuple[int, int]]] = []
+        if policy == "fair":
+            placeholders = ", ".join("?" for _ in queue_ids)
             self.__cursor.execute(
+                f"""--sql
+                SELECT
+                  queue_id,
+                  batch_id,
+                  SUM(CASE WHEN status = 'pending' THEN count ELSE 0 END) AS pending,
+                  SUM(CASE WHEN status IN ('in_progress', 'completed', 'failed') THEN count ELSE 0 END)
+                FROM session_queue_counts
+                WHERE queue_id IN ({placeholders})
+                GROUP BY queue_id, batch_id
+                HAVING pending > 0
+                """,
+                queue_ids,
+            )
+            for queue_id, batch_id, _, processed in self.__cursor.fetchall():
+                self.__cursor.execute(
+                    """--sql
+                    SELECT priority, item_id
+                    FROM session_queue
+                    WHERE
+                      batch_id = ?
+                      AND status = 'pending'
+                      AND queue_id = ?
+                    ORDER BY item_id ASC
+                    LIMIT 1
+                    """,
+                    (batch_id, queue_id),
+                )
+                priority, item_id = self.__cursor.fetchone()
+                candidates.append((priority, item_id, (processed, item_id)))
+        else:
+            for queue_id in queue_ids:
+                self.__cursor.execute(
+                    """--sql
+                    SELECT priority, item_id
+                    FROM session_queue
+                    WHERE
+                      queue_id = ?
+                      AND status = 'pending'
+                    ORDER BY
+                      priority DESC,
+                      item_id ASC
+                    LIMIT 1
+                    """,
+                    (queue_id,),
+                )
+                priority, item_id = self.__cursor.fetchone()
+                if policy == "round_robin":
+                    candidates.append((priority, item_id, (self.__last_dequeued.get(queue_id, -1), item_id)))
+                else:
+                    candidates.append((priority, item_id, (item_id, item_id)))
+
+        highest_priority = max(priority for priority, _, _ in candidates)
+        _, item_id, _ = min(
+            (candidate for candidate in candidates if candidate[0] == highest_priority), key=lambda c: c[2]
+        )
+        return item_id
+
+    def _record_wait_time(self, queue_id: str, wait_time: float) -> None:
+        """Records how long a dequeued item waited. Must be called with the lock held."""
+        self.__dequeue_count += 1
+        self.__last_dequeued[queue_id] = self.__dequeue_count
+        self.__dequeued_per_queue[queue_id] = self.__dequeued_per_queue.get(queue_id, 0) + 1
+        wait_times = self.__wait_times.setdefault(queue_id, deque(maxlen=WAIT_TIME_WINDOW))
+        wait_times.append(max(wait_time, 0.0))
+
+    def get_wait_times(self, queue_id: str) -> SessionQueueWaitTimes:
+        with self.__lock:
+            dequeued = self.__dequeued_per_queue.get(queue_id, 0)
+            wait_times = sorted(self.__wait_times.get(queue_id, []))
+        with self.__db.read() as cursor:
+            cursor.execute(
                 """--sql
-                SELECT *
+                SELECT (JULIANDAY('NOW') - JULIANDAY(created_at)) * 86400.0
                 FROM session_queue
-                WHERE
-                  queue_id = ?
-                  AND status = 'pending'
-                ORDER BY
-                  priority DESC,
-                  created_at ASC
-                LIMIT 1
+                WHERE item_id = (
+                  SELECT MIN(item_id)
+                  FROM session_queue
+                  WHERE
+                    queue_id = ?
+                    AND status = 'pending'
+                )
                 """,
                 (queue_id,),
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
+        oldest_pending = max(result[0], 0.0) if result is not None else None
+        if not wait_times:
+            return SessionQueueWaitTimes(queue_id=queue_id, dequeued=dequeued, oldest_pending=oldest_pending)
+        return SessionQueueWaitTimes(
+            queue_id=queue_id,
+            dequeued=dequeued,
+            mean=sum(wait_times) / len(wait_times),
+            p50=wait_times[int(0.5 * (len(wait_times) - 1))],
+            p95=wait_times[int(0.95 * (len(wait_times) - 1))],
+            max=wait_times[-1],
+            oldest_pending=oldest_pending,
+        )
+
+    def get_next(self, queue_id: str) -> Optional[SessionQueueItem]:
+        try:
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM session_queue
+                    WHERE
+                      queue_id = ?
+                      AND status = 'pending'
+                    ORDER BY
+                      priority DESC,
+                      item_id ASC
+                    LIMIT 1
+                    """,
+                    (queue_id,),
+                )
+                result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         if result is None:
             return None
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return self._queue_item_from_row(result)
 
-    def get_current(self, queue_id: str) -> Optional[SessionQueueItem]:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+    def get_pending(self, limit: int) -> list[SessionQueueItem]:
+        with self.__db.read() as cursor:
+            cursor.execute(
                 """--sql
                 SELECT *
                 FROM session_queue
-                WHERE
-                  queue_id = ?
-                  AND status = 'in_progress'
-                LIMIT 1
+                WHERE status = 'pending'
+                ORDER BY
+                  priority DESC,
+                  item_id ASC
+                LIMIT ?
                 """,
-                (queue_id,),
+                (limit,),
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
+            results = cast(list[sqlite3.Row], cursor.fetchall())
+        return [self._queue_item_from_row(result) for result in results]
+
+    def get_current(self, queue_id: str) -> Optional[SessionQueueItem]:
+        try:
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM session_queue
+                    WHERE
+                      queue_id = ?
+                      AND status = 'in_progress'
+                    LIMIT 1
+                    """,
+                    (queue_id,),
+                )
+                result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         if result is None:
             return None
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return self._queue_item_from_row(result)
 
     def _set_queue_item_status(
         self, item_id: int, status: QUEUE_ITEM_STATUS, error: Optional[str] = None
@@ -289,6 +584,10 @@ class SqliteSessionQueue(SessionQueueBase):
             raise
         finally:
             self.__lock.release()
+        return self._emit_queue_item_status_changed(item_id)
+
+    def _emit_queue_item_status_changed(self, item_id: int) -> SessionQueueItem:
+        """Emits the status of a queue item, with the status of its batch and queue, after it changed"""
         queue_item = self.get_queue_item(item_id)
         batch_status = self.get_batch_status(queue_id=queue_item.queue_id, batch_id=queue_item.batch_id)
         queue_status = self.get_queue_status(queue_id=queue_item.queue_id)
@@ -301,41 +600,35 @@ class SqliteSessionQueue(SessionQueueBase):
 
     def is_empty(self, queue_id: str) -> IsEmptyResult:
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
-                """--sql
-                SELECT count(*)
-                FROM session_queue
-                WHERE queue_id = ?
-                """,
-                (queue_id,),
-            )
-            is_empty = cast(int, self.__cursor.fetchone()[0]) == 0
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT SUM(count)
+                    FROM session_queue_counts
+                    WHERE queue_id = ?
+                    """,
+                    (queue_id,),
+                )
+                is_empty = (cast(Union[int, None], cursor.fetchone()[0]) or 0) == 0
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         return IsEmptyResult(is_empty=is_empty)
 
     def is_full(self, queue_id: str) -> IsFullResult:
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
-                """--sql
-                SELECT count(*)
-                FROM session_queue
-                WHERE queue_id = ?
-                """,
-                (queue_id,),
-            )
-            max_queue_size = self.__invoker.services.configuration.max_queue_size
-            is_full = cast(int, self.__cursor.fetchone()[0]) >= max_queue_size
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT SUM(count)
+                    FROM session_queue_counts
+                    WHERE queue_id = ?
+                    """,
+                    (queue_id,),
+                )
+                max_queue_size = self.__invoker.services.configuration.max_queue_size
+                is_full = (cast(Union[int, None], cursor.fetchone()[0]) or 0) >= max_queue_size
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         return IsFullResult(is_full=is_full)
 
     def delete_queue_item(self, item_id: int) -> SessionQueueItem:
@@ -546,24 +839,21 @@ class SqliteSessionQueue(SessionQueueBase):
 
     def get_queue_item(self, item_id: int) -> SessionQueueItem:
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
-                """--sql
-                SELECT * FROM session_queue
-                WHERE
-                  item_id = ?
-                """,
-                (item_id,),
-            )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT * FROM session_queue
+                    WHERE
+                      item_id = ?
+                    """,
+                    (item_id,),
+                )
+                result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         if result is None:
             raise SessionQueueItemNotFoundError(f"No queue item with id {item_id}")
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return self._queue_item_from_row(result)
 
     def list_queue_items(
         self,
@@ -573,79 +863,73 @@ class SqliteSessionQueue(SessionQueueBase):
         cursor: Optional[int] = None,
         status: Optional[QUEUE_ITEM_STATUS] = None,
     ) -> CursorPaginatedResults[SessionQueueItemDTO]:
+        item_id = cursor
         try:
-            item_id = cursor
-            self.__lock.acquire()
-            query = """--sql
-                SELECT item_id,
-                    status,
-                    priority,
-                    field_values,
-                    error,
-                    created_at,
-                    updated_at,
-                    completed_at,
-                    started_at,
-                    session_id,
-                    batch_id,
-                    queue_id
-                FROM session_queue
-                WHERE queue_id = ?
-            """
-            params: list[Union[str, int]] = [queue_id]
+            with self.__db.read() as db_cursor:
+                query = """--sql
+                    SELECT item_id,
+                        status,
+                        priority,
+                        field_values,
+                        error,
+                        created_at,
+                        updated_at,
+                        completed_at,
+                        started_at,
+                        session_id,
+                        batch_id,
+                        queue_id
+                    FROM session_queue
+                    WHERE queue_id = ?
+                """
+                params: list[Union[str, int]] = [queue_id]
 
-            if status is not None:
-                query += """--sql
-                    AND status = ?
-                    """
-                params.append(status)
+                if status is not None:
+                    query += """--sql
+                        AND status = ?
+                        """
+                    params.append(status)
+
+                if item_id is not None:
+                    query += """--sql
+                        AND ((priority < ?) OR (priority = ? AND item_id > ?))
+                        """
+                    params.extend([priority, priority, item_id])
 
-            if item_id is not None:
                 query += """--sql
-                    AND (priority < ?) OR (priority = ? AND item_id > ?)
+                    ORDER BY
+                      priority DESC,
+                      item_id ASC
+                    LIMIT ?
                     """
-                params.extend([priority, priority, item_id])
-
-            query += """--sql
-                ORDER BY
-                  priority DESC,
-                  item_id ASC
-                LIMIT ?
-                """
-            params.append(limit + 1)
-            self.__cursor.execute(query, params)
-            results = cast(list[sqlite3.Row], self.__cursor.fetchall())
-            items = [SessionQueueItemDTO.queue_item_dto_from_dict(dict(result)) for result in results]
-            has_more = False
-            if len(items) > limit:
-                # remove the extra item
-                items.pop()
-                has_more = True
+                params.append(limit + 1)
+                db_cursor.execute(query, params)
+                results = cast(list[sqlite3.Row], db_cursor.fetchall())
+                items = [SessionQueueItemDTO.queue_item_dto_from_dict(dict(result)) for result in results]
+                has_more = False
+                if len(items) > limit:
+                    # remove the extra item
+                    items.pop()
+                    has_more = True
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
         return CursorPaginatedResults(items=items, limit=limit, has_more=has_more)
 
     def get_queue_status(self, queue_id: str) -> SessionQueueStatus:
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
-                """--sql
-                SELECT status, count(*)
-                FROM session_queue
-                WHERE queue_id = ?
-                GROUP BY status
-                """,
-                (queue_id,),
-            )
-            counts_result = cast(list[sqlite3.Row], self.__cursor.fetchall())
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT status, SUM(count)
+                    FROM session_queue_counts
+                    WHERE queue_id = ?
+                    GROUP BY status
+                    """,
+                    (queue_id,),
+                )
+                counts_result = cast(list[sqlite3.Row], cursor.fetchall())
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
 
         current_item = self.get_current(queue_id=queue_id)
         total = sum(row[1] for row in counts_result)
@@ -665,26 +949,22 @@ class SqliteSessionQueue(SessionQueueBase):
 
     def get_batch_status(self, queue_id: str, batch_id: str) -> BatchStatus:
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
-                """--sql
-                SELECT status, count(*)
-                FROM session_queue
-                WHERE
-                  queue_id = ?
-                  AND batch_id = ?
-                GROUP BY status
-                """,
-                (queue_id, batch_id),
-            )
-            result = cast(list[sqlite3.Row], self.__cursor.fetchall())
-            total = sum(row[1] for row in result)
-            counts: dict[str, int] = {row[0]: row[1] for row in result}
+            with self.__db.read() as cursor:
+                cursor.execute(
+                    """--sql
+                    SELECT status, count
+                    FROM session_queue_counts
+                    WHERE
+                      queue_id = ?
+                      AND batch_id = ?
+                    """,
+                    (queue_id, batch_id),
+                )
+                result = cast(list[sqlite3.Row], cursor.fetchall())
+                total = sum(row[1] for row in result)
+                counts: dict[str, int] = {row[0]: row[1] for row in result}
         except Exception:
-            self.__conn.rollback()
             raise
-        finally:
-            self.__lock.release()
 
         return BatchStatus(
             batch_id=batch_id,
@@ -1,11 +1,12 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654)
 
 import copy
+import heapq
 import itertools
 from typing import Annotated, Any, Optional, Union, get_args, get_origin, get_type_hints
 
 import networkx as nx
-from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator, model_validator
 from pydantic.fields import Field
 
 # Importing * is bad karma but needed here for node detection
@@ -762,14 +763,14 @@ class Graph(BaseModel):
         # TODO: Cache this?
         g = nx.DiGraph()
         g.add_nodes_from(list(self.nodes.keys()))
-        g.add_edges_from({(e.source.node_id, e.destination.node_id) for e in self.edges})
+        g.add_edges_from(dict.fromkeys((e.source.node_id, e.destination.node_id) for e in self.edges))
         return g
 
     def nx_graph_with_data(self) -> nx.DiGraph:
         """Returns a NetworkX DiGraph representing the data and layout of this graph"""
         g = nx.DiGraph()
         g.add_nodes_from(list(self.nodes.items()))
-        g.add_edges_from({(e.source.node_id, e.destination.node_id) for e in self.edges})
+        g.add_edges_from(dict.fromkeys((e.source.node_id, e.destination.node_id) for e in self.edges))
         return g
 
     def nx_graph_flat(self, nx_graph: Optional[nx.DiGraph] = None, prefix: Optional[str] = None) -> nx.DiGraph:
@@ -791,11 +792,222 @@ class Graph(BaseModel):
 
         # TODO: figure out if iteration nodes need to be expanded
 
-        unique_edges = {(e.source.node_id, e.destination.node_id) for e in self.edges}
+        # Edges are kept in insertion order so traversals of the graph are deterministic
+        unique_edges = dict.fromkeys((e.source.node_id, e.destination.node_id) for e in self.edges)
         g.add_edges_from([(self._get_node_path(e[0], prefix), self._get_node_path(e[1], prefix)) for e in unique_edges])
         return g
 
 
+def _get_subgraphs(graph: Graph) -> list[Graph]:
+    """Returns a graph and all graphs nested in it"""
+    graphs = [graph]
+    for node in graph.nodes.values():
+        if isinstance(node, GraphInvocation):
+            graphs.extend(_get_subgraphs(node.graph))
+    return graphs
+
+
+def _graph_fingerprint(graphs: list[Graph]) -> tuple[tuple[int, int, int], ...]:
+    """A cheap stamp of graphs, used to detect changes made to a graph behind a cached plan. Adding a subgraph changes
+    the node count of its parent, so the subgraphs found when the plan was built are the only ones to check."""
+    return tuple((id(g), len(g.nodes), len(g.edges)) for g in graphs)
+
+
+class _SourceGraphPlan:
+    """Cached analysis of the source graph of a GraphExecutionState.
+
+    The source graph does not change while it is being executed, so its topological order and iterator ancestry
+    only need to be computed once instead of on every call to `GraphExecutionState.next()`.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graphs = _get_subgraphs(graph)
+        self.fingerprint = _graph_fingerprint(self.graphs)
+        g = graph.nx_graph_flat()
+        self.sorted_nodes: list[str] = list(nx.topological_sort(g))
+        self.parents: dict[str, list[str]] = {n: [e[0] for e in g.in_edges(n)] for n in self.sorted_nodes}
+
+        order = {n: i for i, n in enumerate(self.sorted_nodes)}
+        iterate_nodes = {n for n in self.sorted_nodes if isinstance(graph.get_node(n), IterateInvocation)}
+        # Active iterators are found with edges into (top-level) collectors removed, since collectors end an iteration
+        collectors = {n for n in graph.nodes if isinstance(graph.get_node(n), CollectInvocation)}
+
+        # All iterate ancestors of each node, and the iterate ancestors once edges into collectors are removed
+        self.iterate_ancestors: dict[str, frozenset[str]] = {}
+        self.node_iterators: dict[str, list[str]] = {}
+        iterator_ancestors: dict[str, frozenset[str]] = {}
+        for n in self.sorted_nodes:
+            ancestors: set[str] = set()
+            active: set[str] = set()
+            for p in self.parents[n]:
+                ancestors.update(self.iterate_ancestors[p])
+                if n not in collectors:
+                    active.update(iterator_ancestors[p])
+                if p in iterate_nodes:
+                    ancestors.add(p)
+                    if n not in collectors:
+                        active.add(p)
+            self.iterate_ancestors[n] = frozenset(ancestors)
+            iterator_ancestors[n] = frozenset(active)
+            self.node_iterators[n] = sorted(active, key=lambda a: order[a])
+        self.iterate_nodes = frozenset(iterate_nodes)
+
+
+class _ExecutionGraphPlan:
+    """Incrementally-maintained scheduling state for the execution graph of a GraphExecutionState.
+
+    Keeps a count of unexecuted inputs for every prepared node and a heap of nodes that are ready to execute, so
+    finding the next node does not require a traversal of the whole execution graph.
+
+    Ready nodes are ordered by their position in a depth-first pre-order traversal of the execution graph (roots in
+    insertion order, successors in edge order), which is maintained as nodes are added: a new node has no outputs
+    yet, so it does not move any existing node and lands right after the traversal subtree of the parent that the
+    traversal reaches it from first.
+    """
+
+    # Spacing of pre-order positions, so most insertions fit between two existing positions
+    POSITION_GAP = 1 << 32
+
+    def __init__(self, state: "GraphExecutionState"):
+        self.graph_id = id(state.execution_graph)
+        self.edge_count = 0
+        # The order nodes were prepared in
+        self.creation_index: dict[str, int] = {}
+        self.children: dict[str, list[str]] = {}
+        self.input_edges: dict[str, list[Edge]] = {}
+        self.pending_inputs: dict[str, int] = {}
+        self.iterate_ancestors: dict[str, frozenset[str]] = {}
+        self.iterate_nodes: set[str] = set()
+        self.completed: set[str] = set()
+        # Nodes that have been handed out for execution, which are never ready again
+        self.started: set[str] = set(state.executing)
+        self.ready: list[tuple[int, str]] = []
+
+        # Depth-first pre-order, as a linked list with ordered positions
+        self.position: dict[str, int] = {}
+        self.next_in_order: dict[str, Optional[str]] = {}
+        self.first_in_order: Optional[str] = None
+        self.last_in_order: Optional[str] = None
+        # The parent each node is reached from in the traversal, and the last node of each traversal subtree
+        self.traversal_parent: dict[str, Optional[str]] = {}
+        self.subtree_end: dict[str, str] = {}
+
+        edges_by_destination: dict[str, list[Edge]] = {}
+        for edge in state.execution_graph.edges:
+            edges_by_destination.setdefault(edge.destination.node_id, []).append(edge)
+
+        # Nodes are only ever added to the execution graph after all of their inputs, so replaying them in insertion
+        # order reproduces the same traversal
+        for node_id, node in state.execution_graph.nodes.items():
+            self.add_node(
+                node_id,
+                isinstance(node, IterateInvocation),
+                edges_by_destination.get(node_id, []),
+                state.executed,
+            )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.creation_index)
+
+    def in_creation_order(self, node_ids: set[str]) -> list[str]:
+        return sorted(node_ids, key=lambda n: self.creation_index[n])
+
+    def add_node(self, node_id: str, is_iterate: bool, input_edges: list[Edge], executed: set[str]) -> None:
+        parents = list(dict.fromkeys(e.source.node_id for e in input_edges))
+        self.creation_index[node_id] = len(self.creation_index)
+        self.edge_count += len(input_edges)
+        self.children[node_id] = []
+        self.input_edges[node_id] = input_edges
+
+        ancestors: set[str] = set()
+        for p in parents:
+            self.children[p].append(node_id)
+            ancestors.update(self.iterate_ancestors[p])
+            if p in self.iterate_nodes:
+                ancestors.add(p)
+        self.iterate_ancestors[node_id] = frozenset(ancestors)
+        if is_iterate:
+            self.iterate_nodes.add(node_id)
+
+        self._insert_in_order(node_id, parents)
+
+        if node_id in executed:
+            self.completed.add(node_id)
+        self.pending_inputs[node_id] = sum(1 for p in parents if p not in executed)
+        if node_id not in executed and self.pending_inputs[node_id] == 0:
+            heapq.heappush(self.ready, (self.position[node_id], node_id))
+
+    def _insert_in_order(self, node_id: str, parents: list[str]) -> None:
+        self.traversal_parent[node_id] = None
+        self.subtree_end[node_id] = node_id
+        if not parents:
+            # A new root is only reached after everything already in the graph
+            self._link_after(node_id, self.last_in_order)
+            return
+
+        # The node is the last successor of each of its parents, so the traversal reaches it once it has finished the
+        # subtree of a parent. That happens first for the parent whose subtree ends first - or, if several end at the
+        # same node, for the deepest of them (the one that comes last in the traversal).
+        parent = min(parents, key=lambda p: (self.position[self.subtree_end[p]], -self.position[p]))
+        end = self.subtree_end[parent]
+        self._link_after(node_id, end)
+        self.traversal_parent[node_id] = parent
+
+        # The node is now the end of the subtree of its traversal parent, and of every traversal ancestor that ended
+        # with the same node
+        ancestor: Optional[str] = parent
+        while ancestor is not None and self.subtree_end[ancestor] == end:
+            self.subtree_end[ancestor] = node_id
+            ancestor = self.traversal_parent[ancestor]
+
+    def _link_after(self, node_id: str, previous: Optional[str]) -> None:
+        following = self.first_in_order if previous is None else self.next_in_order[previous]
+        low = -self.POSITION_GAP if previous is None else self.position[previous]
+        high = low + 2 * self.POSITION_GAP if following is None else self.position[following]
+        if high - low < 2:
+            self._renumber()
+            low = -self.POSITION_GAP if previous is None else self.position[previous]
+            high = low + 2 * self.POSITION_GAP if following is None else self.position[following]
+
+        self.position[node_id] = (low + high) // 2
+        self.next_in_order[node_id] = following
+        if previous is None:
+            self.first_in_order = node_id
+        else:
+            self.next_in_order[previous] = node_id
+        if following is None:
+            self.last_in_order = node_id
+
+    def _renumber(self) -> None:
+        node_id = self.first_in_order
+        position = 0
+        while node_id is not None:
+            self.position[node_id] = position
+            position += self.POSITION_GAP
+            node_id = self.next_in_order[node_id]
+        self.ready = [(self.position[n], n) for _, n in self.ready]
+        heapq.heapify(self.ready)
+
+    def complete(self, node_id: str) -> None:
+        if node_id in self.completed or node_id not in self.children:
+            return
+        self.completed.add(node_id)
+        for child in self.children[node_id]:
+            self.pending_inputs[child] -= 1
+            if self.pending_inputs[child] == 0:
+                heapq.heappush(self.ready, (self.position[child], child))
+
+    def start(self, node_id: str) -> None:
+        self.started.add(node_id)
+
+    def peek_ready(self) -> Optional[str]:
+        # Started and completed nodes are removed lazily
+        while self.ready and (self.ready[0][1] in self.completed or self.ready[0][1] in self.started):
+            heapq.heappop(self.ready)
+        return self.ready[0][1] if self.ready else None
+
+
 class GraphExecutionState(BaseModel):
     """Tracks the state of a graph execution"""
 
@@ -811,6 +1023,10 @@ class GraphExecutionState(BaseModel):
 
     # Nodes that have been executed
     executed: set[str] = Field(description="The set of node ids that have been executed", default_factory=set)
+    executing: set[str] = Field(
+        description="The set of prepared node ids that have been handed out for execution and are not complete yet",
+        default_factory=set,
+    )
     executed_history: list[str] = Field(
         description="The list of node ids that have been executed, in order of execution",
         default_factory=list,
@@ -836,6 +1052,14 @@ class GraphExecutionState(BaseModel):
         default_factory=dict,
     )
 
+    # Scheduling caches, rebuilt lazily (e.g. after the state is deserialized or copied). They are kept up to date by
+    # the methods of this class; changes made directly to `graph` or `execution_graph` are detected by comparing node
+    # and edge counts, so in-place replacements of nodes or edges must go through the methods of this class.
+    _source_plan: Optional[_SourceGraphPlan] = PrivateAttr(default=None)
+    _execution_plan: Optional[_ExecutionGraphPlan] = PrivateAttr(default=None)
+    # The number of nodes at the start of the source plan's topological order that have all been prepared
+    _prepared_prefix: int = PrivateAttr(default=0)
+
     @field_validator("graph")
     def graph_is_valid(cls, v: Graph):
         """Validates that the graph is valid"""
@@ -849,6 +1073,7 @@ class GraphExecutionState(BaseModel):
                 "graph",
                 "execution_graph",
                 "executed",
+                "executing",
                 "executed_history",
                 "results",
                 "errors",
@@ -859,10 +1084,8 @@ class GraphExecutionState(BaseModel):
     )
 
     def next(self) -> Optional[BaseInvocation]:
-        """Gets the next node ready to execute."""
-
-        # TODO: enable multiple nodes to execute simultaneously by tracking currently executing nodes
-        #       possibly with a timeout?
+        """Gets the next node ready to execute and marks it as executing. Nodes that are executing are not returned
+        again, so several nodes may be executed at the same time."""
 
         # If there are no prepared nodes, prepare some nodes
         next_node = self._get_next_node()
@@ -877,6 +1100,8 @@ class GraphExecutionState(BaseModel):
         # Get values from edges
         if next_node is not None:
             self._prepare_inputs(next_node)
+            self.executing.add(next_node.id)
+            self._get_execution_plan().start(next_node.id)
 
         # If next is still none, there's no next node, return None
         return next_node
@@ -888,8 +1113,11 @@ class GraphExecutionState(BaseModel):
             return  # TODO: log error?
 
         # Mark node as executed
+        plan = self._get_execution_plan()
+        self.executing.discard(node_id)
         self.executed.add(node_id)
         self.results[node_id] = output
+        plan.complete(node_id)
 
         # Check if source node is complete (all prepared nodes are complete)
         source_node = self.prepared_source_mapping[node_id]
@@ -901,21 +1129,60 @@ class GraphExecutionState(BaseModel):
 
     def set_node_error(self, node_id: str, error: str):
         """Marks a node as errored"""
+        self.executing.discard(node_id)
         self.errors[node_id] = error
 
     def is_complete(self) -> bool:
         """Returns true if the graph is complete"""
-        node_ids = set(self.graph.nx_graph_flat().nodes)
-        return self.has_error() or all((k in self.executed for k in node_ids))
+        node_ids = self._get_source_plan().sorted_nodes
+        return self.has_error() or (len(self.executed) >= len(node_ids) and all((k in self.executed for k in node_ids)))
 
     def has_error(self) -> bool:
         """Returns true if the graph has any errors"""
         return len(self.errors) > 0
 
+    def __copy__(self) -> "GraphExecutionState":
+        copied = super().__copy__()
+        copied._invalidate_plans()
+        return copied
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> "GraphExecutionState":
+        copied = super().__deepcopy__(memo)
+        copied._invalidate_plans()
+        return copied
+
+    def _get_source_plan(self) -> _SourceGraphPlan:
+        plan = self._source_plan
+        if plan is None or plan.graphs[0] is not self.graph or plan.fingerprint != _graph_fingerprint(plan.graphs):
+            self._source_plan = _SourceGraphPlan(self.graph)
+            self._prepared_prefix = 0
+        return self._source_plan
+
+    def _get_execution_plan(self) -> _ExecutionGraphPlan:
+        plan = self._execution_plan
+        if (
+            plan is None
+            or plan.graph_id != id(self.execution_graph)
+            or plan.node_count != len(self.execution_graph.nodes)
+            or plan.edge_count != len(self.execution_graph.edges)
+        ):
+            plan = self._execution_plan = _ExecutionGraphPlan(self)
+        return plan
+
+    def _invalidate_source_plan(self) -> None:
+        self._source_plan = None
+        self._prepared_prefix = 0
+
+    def _invalidate_plans(self) -> None:
+        self._invalidate_source_plan()
+        self._execution_plan = None
+
     def _create_execution_node(self, node_path: str, iteration_node_map: list[tuple[str, str]]) -> list[str]:
         """Prepares an iteration node and connects all edges, returning the new node id"""
 
         node = self.graph.get_node(node_path)
+        # Get the plan before changing the execution graph, so the new nodes are only added to it once
+        plan = self._get_execution_plan()
 
         self_iteration_count = -1
 
@@ -969,40 +1236,42 @@ class GraphExecutionState(BaseModel):
             self.source_prepared_mapping[node_path].add(new_node.id)
 
             # Add new edges to execution graph
+            # These mirror edges of the (already validated) source graph and only point into the new node, so they
+            # cannot create a cycle and do not need to be validated again
+            node_edges: list[Edge] = []
             for edge in new_edges:
                 new_edge = Edge(
                     source=edge.source,
                     destination=EdgeConnection(node_id=new_node.id, field=edge.destination.field),
                 )
-                self.execution_graph.add_edge(new_edge)
+                node_edges.append(new_edge)
+            self.execution_graph.edges.extend(node_edges)
+            plan.add_node(new_node.id, isinstance(new_node, IterateInvocation), node_edges, self.executed)
 
             new_nodes.append(new_node.id)
 
         return new_nodes
 
-    def _iterator_graph(self) -> nx.DiGraph:
-        """Gets a DiGraph with edges to collectors removed so an ancestor search produces all active iterators for any node"""
-        g = self.graph.nx_graph_flat()
-        collectors = (n for n in self.graph.nodes if isinstance(self.graph.get_node(n), CollectInvocation))
-        for c in collectors:
-            g.remove_edges_from(list(g.in_edges(c)))
-        return g
-
     def _get_node_iterators(self, node_id: str) -> list[str]:
         """Gets iterators for a node"""
-        g = self._iterator_graph()
-        iterators = [n for n in nx.ancestors(g, node_id) if isinstance(self.graph.get_node(n), IterateInvocation)]
-        return iterators
+        return list(self._get_source_plan().node_iterators[node_id])
 
     def _prepare(self) -> Optional[str]:
-        # Get flattened source graph
-        g = self.graph.nx_graph_flat()
+        # Get the cached analysis of the flattened source graph
+        plan = self._get_source_plan()
+
+        # Skip past the prefix of the topological order that has already been prepared
+        while (
+            self._prepared_prefix < len(plan.sorted_nodes)
+            and plan.sorted_nodes[self._prepared_prefix] in self.source_prepared_mapping
+        ):
+            self._prepared_prefix += 1
 
         # Find next node that:
         # - was not already prepared
         # - is not an iterate node whose inputs have not been executed
         # - does not have an unexecuted iterate ancestor
-        sorted_nodes = nx.topological_sort(g)
+        sorted_nodes = itertools.islice(plan.sorted_nodes, self._prepared_prefix, None)
         next_node_id = next(
             (
                 n
@@ -1011,15 +1280,14 @@ class GraphExecutionState(BaseModel):
                 if n not in self.source_prepared_mapping
                 # exclude iterate nodes whose inputs have not been executed
                 and not (
-                    isinstance(self.graph.get_node(n), IterateInvocation)  # `n` is an iterate node...
-                    and not all((e[0] in self.executed for e in g.in_edges(n)))  # ...that has unexecuted inputs
+                    n in plan.iterate_nodes  # `n` is an iterate node...
+                    and not all((p in self.executed for p in plan.parents[n]))  # ...that has unexecuted inputs
                 )
                 # exclude nodes who have unexecuted iterate ancestors
                 and not any(
                     (
-                        isinstance(self.graph.get_node(a), IterateInvocation)  # `a` is an iterate ancestor of `n`...
-                        and a not in self.executed  # ...that is not executed
-                        for a in nx.ancestors(g, n)  # for all ancestors `a` of node `n`
+                        a not in self.executed  # `a` is an iterate ancestor of `n` that is not executed
+                        for a in plan.iterate_ancestors[n]  # for all iterate ancestors `a` of node `n`
                     )
                 )
             ),
@@ -1030,7 +1298,9 @@ class GraphExecutionState(BaseModel):
             return None
 
         # Get all parents of the next node
-        next_node_parents = [e[0] for e in g.in_edges(next_node_id)]
+        next_node_parents = plan.parents[next_node_id]
+        # Prepared nodes are stored in sets, use them in the order they were created so iterations are deterministic
+        execution_plan = self._get_execution_plan()
 
         # Create execution nodes
         next_node = self.graph.get_node(next_node_id)
@@ -1038,7 +1308,12 @@ class GraphExecutionState(BaseModel):
         if isinstance(next_node, CollectInvocation):
             # Collapse all iterator input mappings and create a single execution node for the collect invocation
             all_iteration_mappings = list(
-                itertools.chain(*(((s, p) for p in self.source_prepared_mapping[s]) for s in next_node_parents))
+                itertools.chain(
+                    *(
+                        ((s, p) for p in execution_plan.in_creation_order(self.source_prepared_mapping[s]))
+                        for s in next_node_parents
+                    )
+                )
             )
             # all_iteration_mappings = list(set(itertools.chain(*prepared_parent_mappings)))
             create_results = self._create_execution_node(next_node_id, all_iteration_mappings)
@@ -1048,15 +1323,16 @@ class GraphExecutionState(BaseModel):
             # Get all iterator combinations for this node
             # Will produce a list of lists of prepared iterator nodes, from which results can be iterated
             iterator_nodes = self._get_node_iterators(next_node_id)
-            iterator_nodes_prepared = [list(self.source_prepared_mapping[n]) for n in iterator_nodes]
+            iterator_nodes_prepared = [
+                execution_plan.in_creation_order(self.source_prepared_mapping[n]) for n in iterator_nodes
+            ]
             iterator_node_prepared_combinations = list(itertools.product(*iterator_nodes_prepared))
 
             # Select the correct prepared parents for each iteration
             # For every iterator, the parent must either not be a child of that iterator, or must match the prepared iteration for that iterator
             # TODO: Handle a node mapping to none
-            eg = self.execution_graph.nx_graph_flat()
             prepared_parent_mappings = [
-                [(n, self._get_iteration_node(n, g, eg, it)) for n in next_node_parents]
+                [(n, self._get_iteration_node(n, it)) for n in next_node_parents]
                 for it in iterator_node_prepared_combinations
             ]  # type: ignore
 
@@ -1071,8 +1347,6 @@ class GraphExecutionState(BaseModel):
     def _get_iteration_node(
         self,
         source_node_path: str,
-        graph: nx.DiGraph,
-        execution_graph: nx.DiGraph,
         prepared_iterator_nodes: list[str],
     ) -> Optional[str]:
         """Gets the prepared version of the specified source node that matches every iteration specified"""
@@ -1086,38 +1360,35 @@ class GraphExecutionState(BaseModel):
             return prepared_iterator
 
         # Filter to only iterator nodes that are a parent of the specified node, in tuple format (prepared, source)
+        source_plan = self._get_source_plan()
+        execution_plan = self._get_execution_plan()
         iterator_source_node_mapping = [(n, self.prepared_source_mapping[n]) for n in prepared_iterator_nodes]
-        parent_iterators = [itn for itn in iterator_source_node_mapping if nx.has_path(graph, itn[1], source_node_path)]
+        parent_iterators = [
+            itn
+            for itn in iterator_source_node_mapping
+            if itn[1] == source_node_path or itn[1] in source_plan.iterate_ancestors[source_node_path]
+        ]
 
         return next(
-            (n for n in prepared_nodes if all(nx.has_path(execution_graph, pit[0], n) for pit in parent_iterators)),
-            None,
-        )
-
-    def _get_next_node(self) -> Optional[BaseInvocation]:
-        """Gets the deepest node that is ready to be executed"""
-        g = self.execution_graph.nx_graph()
-
-        # Depth-first search with pre-order traversal is a depth-first topological sort
-        sorted_nodes = nx.dfs_preorder_nodes(g)
-
-        next_node = next(
             (
                 n
-                for n in sorted_nodes
-                if n not in self.executed  # the node must not already be executed...
-                and all((e[0] in self.executed for e in g.in_edges(n)))  # ...and all its inputs must be executed
+                for n in prepared_nodes
+                if all(pit[0] == n or pit[0] in execution_plan.iterate_ancestors[n] for pit in parent_iterators)
             ),
             None,
         )
 
+    def _get_next_node(self) -> Optional[BaseInvocation]:
+        """Gets the deepest node that is ready to be executed"""
+        next_node = self._get_execution_plan().peek_ready()
+
         if next_node is None:
             return None
 
         return self.execution_graph.nodes[next_node]
 
     def _prepare_inputs(self, node: BaseInvocation):
-        input_edges = [e for e in self.execution_graph.edges if e.destination.node_id == node.id]
+        input_edges = self._get_execution_plan().input_edges[node.id]
         if isinstance(node, CollectInvocation):
             output_collection = [
                 getattr(self.results[edge.source.node_id], edge.source.field)
@@ -1150,6 +1421,7 @@ class GraphExecutionState(BaseModel):
 
     def add_node(self, node: BaseInvocation) -> None:
         self.graph.add_node(node)
+        self._invalidate_source_plan()
 
     def update_node(self, node_path: str, new_node: BaseInvocation) -> None:
         if not self._is_node_updatable(node_path):
@@ -1157,6 +1429,7 @@ class GraphExecutionState(BaseModel):
                 f"Node {node_path} has already been prepared or executed and cannot be updated"
             )
         self.graph.update_node(node_path, new_node)
+        self._invalidate_source_plan()
 
     def delete_node(self, node_path: str) -> None:
         if not self._is_node_updatable(node_path):
@@ -1164,6 +1437,7 @@ class GraphExecutionState(BaseModel):
                 f"Node {node_path} has already been prepared or executed and cannot be deleted"
             )
         self.graph.delete_node(node_path)
+        self._invalidate_source_plan()
 
     def add_edge(self, edge: Edge) -> None:
         if not self._is_node_updatable(edge.destination.node_id):
@@ -1171,6 +1445,7 @@ class GraphExecutionState(BaseModel):
                 f"Destination node {edge.destination.node_id} has already been prepared or executed and cannot be linked to"
             )
         self.graph.add_edge(edge)
+        self._invalidate_source_plan()
 
     def delete_edge(self, edge: Edge) -> None:
         if not self._is_node_updatable(edge.destination.node_id):
@@ -1178,6 +1453,7 @@ class GraphExecutionState(BaseModel):
                 f"Destination node {edge.destination.node_id} has already been prepared or executed and cannot have a source edge deleted"
             )
         self.graph.delete_edge(edge)
+        self._invalidate_source_plan()
 
 
 class ExposedNodeInput(BaseModel):
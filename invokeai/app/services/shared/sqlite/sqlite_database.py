@@ -1,10 +1,22 @@
 import sqlite3
 import threading
+from contextlib import contextmanager
 from logging import Logger
 from pathlib import Path
+from typing import Iterator
 
 from invokeai.app.services.shared.sqlite.sqlite_common import sqlite_memory
 
+# Pragmas applied to every connection to a database file
+CONNECTION_PRAGMAS = [
+    # Memory-map up to 256MB of the database file, reads then avoid a copy through the page cache
+    "PRAGMA mmap_size = 268435456;",
+    # 64MB of page cache per connection (negative values are in KiB)
+    "PRAGMA cache_size = -65536;",
+    # Wait for locks instead of failing immediately, e.g. while the WAL is checkpointed
+    "PRAGMA busy_timeout = 5000;",
+]
+
 
 class SqliteDatabase:
     """
@@ -22,7 +34,13 @@ class SqliteDatabase:
     In addition to the constructor args, the instance provides the following attributes and methods:
     - `conn`: A `sqlite3.Connection` object. Note that the connection must never be closed if the database is in-memory.
     - `lock`: A shared re-entrant lock, used to approximate thread safety.
+    - `read()`: A context manager providing a cursor for read-only queries.
     - `clean()`: Runs the SQL `VACUUM;` command and reports on the freed space.
+
+    Database files use write-ahead logging (WAL). `conn` is the single writer, serialized by `lock`. Read-only queries
+    run through `read()` on a connection per thread, which does not take the lock: readers neither wait for each other
+    nor for the writer, and see the database as of the last committed write. In-memory databases only exist on `conn`,
+    so their reads still go through it, holding the lock.
     """
 
     def __init__(self, db_path: Path | None, logger: Logger, verbose: bool = False) -> None:
@@ -46,6 +64,47 @@ class SqliteDatabase:
 
         self.conn.execute("PRAGMA foreign_keys = ON;")
 
+        self._readers = threading.local()
+        if self.db_path:
+            self.conn.execute("PRAGMA journal_mode = WAL;")
+            # With WAL, commits are durable at the next checkpoint rather than immediately, but cannot corrupt the db
+            self.conn.execute("PRAGMA synchronous = NORMAL;")
+            for pragma in CONNECTION_PRAGMAS:
+                self.conn.execute(pragma)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Provides a cursor for read-only queries. The queries made with it see the same snapshot of the database.
+        """
+        if not self.db_path:
+            with self.lock:
+                yield self.conn.cursor()
+            return
+
+        conn = self._get_reader()
+        conn.execute("BEGIN;")
+        try:
+            yield conn.cursor()
+        finally:
+            conn.execute("COMMIT;")
+
+    def _get_reader(self) -> sqlite3.Connection:
+        """Gets the reader connection of the current thread, opening it on first use."""
+        conn: sqlite3.Connection | None = getattr(self._readers, "conn", None)
+        if conn is None:
+            assert self.db_path is not None
+            # Transactions are managed explicitly by `read()`
+            conn = sqlite3.connect(database=self.db_path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            if self.verbose:
+                conn.set_trace_callback(self.logger.debug)
+            conn.execute("PRAGMA query_only = ON;")
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._readers.conn = conn
+        return conn
+
     def clean(self) -> None:
         """
         Cleans the database by running the VACUUM command, reporting on the freed space.
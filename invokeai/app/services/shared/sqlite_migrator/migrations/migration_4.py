@@ -0,0 +1,62 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class Migration4Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._create_invocation_cache(cursor)
+
+    def _create_invocation_cache(self, cursor: sqlite3.Cursor) -> None:
+        """Creates the `invocation_cache` table and its reverse index, `invocation_cache_references`."""
+        tables = [
+            """--sql
+            CREATE TABLE IF NOT EXISTS invocation_cache (
+                -- Content hash of the invocation
+                key TEXT NOT NULL PRIMARY KEY,
+                -- Serialized JSON representation of the invocation output
+                output TEXT NOT NULL,
+                -- Size of the serialized output, in bytes
+                size INTEGER NOT NULL,
+                -- Updated manually when the output is retrieved
+                accessed_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'))
+            );
+            """,
+            """--sql
+            CREATE TABLE IF NOT EXISTS invocation_cache_references (
+                -- The name of an image or latents referenced by the output
+                name TEXT NOT NULL,
+                -- Either 'image' or 'latents'
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (name, key),
+                FOREIGN KEY (key) REFERENCES invocation_cache (key) ON DELETE CASCADE
+            );
+            """,
+        ]
+
+        indices = [
+            "CREATE INDEX IF NOT EXISTS idx_invocation_cache_accessed_at ON invocation_cache(accessed_at);",
+            "CREATE INDEX IF NOT EXISTS idx_invocation_cache_references_key ON invocation_cache_references(key);",
+        ]
+
+        for stmt in tables + indices:
+            cursor.execute(stmt)
+
+
+def build_migration_4() -> Migration:
+    """
+    Build the migration from database version 3 to 4.
+
+    This migration does the following:
+    - Adds the `invocation_cache` table, which persists cached invocation outputs
+    - Adds the `invocation_cache_references` table, mapping image and latents names to the cached outputs that
+      reference them
+    """
+    migration_4 = Migration(
+        from_version=3,
+        to_version=4,
+        callback=Migration4Callback(),
+    )
+
+    return migration_4
@@ -0,0 +1,62 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class Migration5Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._create_session_queue_batches(cursor)
+
+    def _create_session_queue_batches(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Creates the `session_queue_batches` table, which holds the graph and workflow of each batch once.
+
+        Queue items enqueued with a batch template have an empty `session`, and no `workflow`. Their sessions are
+        materialized from the template and their field values when they are read. Templates are deleted with the
+        last queue item of their batch.
+        """
+        tables = [
+            """--sql
+            CREATE TABLE IF NOT EXISTS session_queue_batches (
+                batch_id TEXT NOT NULL PRIMARY KEY,
+                -- Serialized JSON representation of the graph of the batch, without its field values
+                graph TEXT NOT NULL,
+                -- Serialized JSON representation of the workflow of the batch, if any
+                workflow TEXT,
+                created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'))
+            );
+            """,
+        ]
+
+        triggers = [
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_batches_cleanup
+            AFTER DELETE ON session_queue FOR EACH ROW
+            WHEN NOT EXISTS (SELECT 1 FROM session_queue WHERE batch_id = OLD.batch_id)
+            BEGIN
+                DELETE FROM session_queue_batches
+                WHERE batch_id = OLD.batch_id;
+            END;
+            """,
+        ]
+
+        for stmt in tables + triggers:
+            cursor.execute(stmt)
+
+
+def build_migration_5() -> Migration:
+    """
+    Build the migration from database version 4 to 5.
+
+    This migration does the following:
+    - Adds the `session_queue_batches` table, holding the graph and workflow of each batch, from which the sessions
+      of its queue items are materialized
+    - Adds a trigger deleting the template of a batch when its last queue item is deleted
+    """
+    migration_5 = Migration(
+        from_version=4,
+        to_version=5,
+        callback=Migration5Callback(),
+    )
+
+    return migration_5
@@ -0,0 +1,120 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class Migration6Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._replace_session_queue_indices(cursor)
+        self._create_session_queue_counts(cursor)
+
+    def _replace_session_queue_indices(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Replaces the single-column `status`, `priority` and `batch_id` indices of the `session_queue` table with
+        indices matching its queries, which filter by queue or batch and status and order by priority and item ID.
+        """
+        indices = [
+            "DROP INDEX IF EXISTS idx_session_queue_created_priority;",
+            "DROP INDEX IF EXISTS idx_session_queue_created_status;",
+            "DROP INDEX IF EXISTS idx_session_queue_batch_id;",
+            # Canceling batches, and deleting their templates with their last queue item
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_batch_id_status ON session_queue(batch_id, status);",
+            # Queue sizes, the highest priority of the pending items, the current item and the lists by status
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_queue_id_status_priority ON session_queue(queue_id, status, priority DESC, item_id);",
+            # The lists of all statuses
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_queue_id_priority ON session_queue(queue_id, priority DESC, item_id);",
+            # The next item to dequeue, from any queue
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_pending ON session_queue(priority DESC, item_id) WHERE status = 'pending';",
+        ]
+
+        for stmt in indices:
+            cursor.execute(stmt)
+
+    def _create_session_queue_counts(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Creates the `session_queue_counts` table, holding the number of queue items of each status in each batch.
+
+        It is kept up to date by triggers, so the statuses of batches and queues are read without counting their
+        items. Counts are deleted when they drop to zero.
+        """
+        tables = [
+            """--sql
+            CREATE TABLE IF NOT EXISTS session_queue_counts (
+                queue_id TEXT NOT NULL,
+                batch_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (queue_id, batch_id, status)
+            ) WITHOUT ROWID;
+            """,
+        ]
+
+        triggers = [
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_counts_insert
+            AFTER INSERT ON session_queue FOR EACH ROW
+            BEGIN
+                INSERT INTO session_queue_counts (queue_id, batch_id, status, count)
+                VALUES (NEW.queue_id, NEW.batch_id, NEW.status, 1)
+                ON CONFLICT (queue_id, batch_id, status) DO UPDATE SET count = count + 1;
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_counts_update
+            AFTER UPDATE OF status ON session_queue FOR EACH ROW
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE session_queue_counts
+                SET count = count - 1
+                WHERE queue_id = OLD.queue_id AND batch_id = OLD.batch_id AND status = OLD.status;
+                DELETE FROM session_queue_counts
+                WHERE queue_id = OLD.queue_id AND batch_id = OLD.batch_id AND status = OLD.status AND count <= 0;
+                INSERT INTO session_queue_counts (queue_id, batch_id, status, count)
+                VALUES (NEW.queue_id, NEW.batch_id, NEW.status, 1)
+                ON CONFLICT (queue_id, batch_id, status) DO UPDATE SET count = count + 1;
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_counts_delete
+            AFTER DELETE ON session_queue FOR EACH ROW
+            BEGIN
+                UPDATE session_queue_counts
+                SET count = count - 1
+                WHERE queue_id = OLD.queue_id AND batch_id = OLD.batch_id AND status = OLD.status;
+                DELETE FROM session_queue_counts
+                WHERE queue_id = OLD.queue_id AND batch_id = OLD.batch_id AND status = OLD.status AND count <= 0;
+            END;
+            """,
+        ]
+
+        for stmt in tables + triggers:
+            cursor.execute(stmt)
+
+        cursor.execute("DELETE FROM session_queue_counts;")
+        cursor.execute(
+            """--sql
+            INSERT INTO session_queue_counts (queue_id, batch_id, status, count)
+            SELECT queue_id, batch_id, status, COUNT(*)
+            FROM session_queue
+            GROUP BY queue_id, batch_id, status;
+            """
+        )
+
+
+def build_migration_6() -> Migration:
+    """
+    Build the migration from database version 5 to 6.
+
+    This migration does the following:
+    - Replaces the `status`, `priority` and `batch_id` indices of the `session_queue` table with indices on its
+      queue, status, priority and item ID, on its batch and status, and a partial index on the pending items
+    - Adds the `session_queue_counts` table, holding the number of queue items of each status in each batch, and the
+      triggers keeping it up to date
+    """
+    migration_6 = Migration(
+        from_version=5,
+        to_version=6,
+        callback=Migration6Callback(),
+    )
+
+    return migration_6
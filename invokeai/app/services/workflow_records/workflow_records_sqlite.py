@@ -23,6 +23,7 @@ from invokeai.app.util.misc import uuid_string
 class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
+        self._db = db
         self._lock = db.lock
         self._conn = db.conn
         self._cursor = self._conn.cursor()
@@ -133,56 +134,53 @@ class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
         query: Optional[str] = None,
     ) -> PaginatedResults[WorkflowRecordListItemDTO]:
         try:
-            self._lock.acquire()
-            # sanitize!
-            assert order_by in WorkflowRecordOrderBy
-            assert direction in SQLiteDirection
-            assert category in WorkflowCategory
-            count_query = "SELECT COUNT(*) FROM workflow_library WHERE category = ?"
-            main_query = """
-                SELECT
-                    workflow_id,
-                    category,
-                    name,
-                    description,
-                    created_at,
-                    updated_at,
-                    opened_at
-                FROM workflow_library
-                WHERE category = ?
-                """
-            main_params: list[int | str] = [category.value]
-            count_params: list[int | str] = [category.value]
-            stripped_query = query.strip() if query else None
-            if stripped_query:
-                wildcard_query = "%" + stripped_query + "%"
-                main_query += " AND name LIKE ? OR description LIKE ? "
-                count_query += " AND name LIKE ? OR description LIKE ?;"
-                main_params.extend([wildcard_query, wildcard_query])
-                count_params.extend([wildcard_query, wildcard_query])
-
-            main_query += f" ORDER BY {order_by.value} {direction.value} LIMIT ? OFFSET ?;"
-            main_params.extend([per_page, page * per_page])
-            self._cursor.execute(main_query, main_params)
-            rows = self._cursor.fetchall()
-            workflows = [WorkflowRecordListItemDTOValidator.validate_python(dict(row)) for row in rows]
-
-            self._cursor.execute(count_query, count_params)
-            total = self._cursor.fetchone()[0]
-            pages = int(total / per_page) + 1
-
-            return PaginatedResults(
-                items=workflows,
-                page=page,
-                per_page=per_page,
-                pages=pages,
-                total=total,
-            )
+            with self._db.read() as cursor:
+                # sanitize!
+                assert order_by in WorkflowRecordOrderBy
+                assert direction in SQLiteDirection
+                assert category in WorkflowCategory
+                count_query = "SELECT COUNT(*) FROM workflow_library WHERE category = ?"
+                main_query = """
+                    SELECT
+                        workflow_id,
+                        category,
+                        name,
+                        description,
+                        created_at,
+                        updated_at,
+                        opened_at
+                    FROM workflow_library
+                    WHERE category = ?
+                    """
+                main_params: list[int | str] = [category.value]
+                count_params: list[int | str] = [category.value]
+                stripped_query = query.strip() if query else None
+                if stripped_query:
+                    wildcard_query = "%" + stripped_query + "%"
+                    main_query += " AND name LIKE ? OR description LIKE ? "
+                    count_query += " AND name LIKE ? OR description LIKE ?;"
+                    main_params.extend([wildcard_query, wildcard_query])
+                    count_params.extend([wildcard_query, wildcard_query])
+
+                main_query += f" ORDER BY {order_by.value} {direction.value} LIMIT ? OFFSET ?;"
+                main_params.extend([per_page, page * per_page])
+                cursor.execute(main_query, main_params)
+                rows = cursor.fetchall()
+                workflows = [WorkflowRecordListItemDTOValidator.validate_python(dict(row)) for row in rows]
+
+                cursor.execute(count_query, count_params)
+                total = cursor.fetchone()[0]
+                pages = int(total / per_page) + 1
+
+                return PaginatedResults(
+                    items=workflows,
+                    page=page,
+                    per_page=per_page,
+                    pages=pages,
+                    total=total,
+                )
         except Exception:
-            self._conn.rollback()
             raise
-        finally:
-            self._lock.release()
 
     def _sync_default_workflows(self) -> None:
         """Syncs default workflows to the database. Internal use only."""
@@ -0,0 +1,278 @@
+"""
+Manage a cache of checkpoint models converted to diffusers format, on disk.
+
+Conversions are keyed by the content of the checkpoint file and the
+settings it is converted with, so they are found again after a model
+is renamed or moved, and redone when either changes. The cache keeps
+within a size budget by removing the least recently used conversions.
+Use like this:
+
+   convert_cache = ConvertCache(cache_path, max_size=10.0)
+   diffusers_path = convert_cache.get(
+       checkpoint_path,
+       settings={"base_model": base_model, "config": config_file},
+       convert=lambda output_path: convert_to_diffusers(checkpoint_path, output_path),
+   )
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import types
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import invokeai.backend.util.logging as logger
+
+GIG = 1073741824
+DEFAULT_MAX_SIZE = 10.0  # GB
+
+INDEX_FILE = "index.json"
+# Conversions are written to a temporary folder, and renamed into place once they are complete
+TEMP_PREFIX = ".tmp-"
+# Temporary folders left by conversions that were interrupted, such as by the process exiting, are removed after
+STALE_TEMP_AGE = 24 * 60 * 60  # seconds
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+@dataclass
+class _PendingConversion:
+    """A conversion in progress, which other requests for the same conversion wait for"""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    error: Optional[BaseException] = None
+
+
+class ConvertCache(object):
+    def __init__(
+        self,
+        cache_path: Path,
+        max_size: float = DEFAULT_MAX_SIZE,
+        logger: types.ModuleType = logger,
+    ):
+        """
+        :param cache_path: Folder of the converted models
+        :param max_size: Maximum size of the converted models, in GB. The most recent conversion is kept even if
+            it is larger.
+        :param logger: Logger to use
+        """
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.logger = logger
+
+        # Guards the index and the pending conversions
+        self._lock = threading.Lock()
+        # Serializes conversions, as each reads a whole checkpoint into RAM
+        self._convert_lock = threading.Lock()
+        self._pending: Dict[str, _PendingConversion] = {}
+        # Content hashes of the checkpoints, by path, with the size and modification time they were computed for
+        self._hashes: Dict[str, Dict[str, Any]] = {}
+        # Checkpoints the cached conversions were made from, by key
+        self._sources: Dict[str, str] = {}
+
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        self._read_index()
+        self._remove_stale_temp_folders()
+
+    def get(
+        self,
+        checkpoint_path: Union[str, Path],
+        settings: Dict[str, Any],
+        convert: Callable[[Path], Any],
+    ) -> Path:
+        """
+        Return the path of the conversion of a checkpoint, converting it if it is not cached.
+
+        :param checkpoint_path: The checkpoint file
+        :param settings: Anything besides the checkpoint that the result of the conversion depends on. It must be
+            serializable to JSON.
+        :param convert: Called with the folder to write the converted model to, which does not exist yet
+        """
+        checkpoint_path = Path(checkpoint_path)
+        key = self.get_key(checkpoint_path, settings)
+        output_path = self.cache_path / key
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                if output_path.exists():
+                    self._touch(key, checkpoint_path)
+                    return output_path
+                pending = self._pending[key] = _PendingConversion()
+                converting = True
+            else:
+                converting = False
+
+        if not converting:
+            # The same conversion is in progress on another thread
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return output_path
+
+        try:
+            with self._convert_lock:
+                # Another process may have converted it in the meantime
+                if not output_path.exists():
+                    self._convert(checkpoint_path, output_path, convert)
+            with self._lock:
+                self._touch(key, checkpoint_path)
+                self._make_room(keep=key)
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.done.set()
+        return output_path
+
+    def get_key(self, checkpoint_path: Union[str, Path], settings: Dict[str, Any]) -> str:
+        """Return the key of the conversion of a checkpoint with the given settings"""
+        content_hash = self._hash_checkpoint(Path(checkpoint_path))
+        settings_json = json.dumps(settings, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{settings_json}".encode()).hexdigest()
+
+    def uncache(self, checkpoint_path: Union[str, Path]) -> None:
+        """Remove the conversions of a checkpoint"""
+        source = str(checkpoint_path)
+        with self._lock:
+            keys = [key for key, key_source in self._sources.items() if key_source == source]
+            for key in keys:
+                self._remove(key)
+            if keys:
+                self._write_index()
+
+    def cache_size(self) -> float:
+        """Return the size of the converted models, in GB"""
+        with self._lock:
+            return sum(self._entry_sizes().values()) / GIG
+
+    def _convert(self, checkpoint_path: Path, output_path: Path, convert: Callable[[Path], Any]) -> None:
+        temp_path = self.cache_path / f"{TEMP_PREFIX}{output_path.name}-{uuid.uuid4().hex}"
+        self.logger.info(f"Converting {checkpoint_path} into the conversion cache")
+        start_time = time.time()
+        try:
+            convert(temp_path)
+            if not temp_path.exists():
+                raise Exception(f"Conversion of {checkpoint_path} did not write a model")
+            try:
+                os.rename(temp_path, output_path)
+            except OSError:
+                # Another process renamed the same conversion into place first
+                if not output_path.exists():
+                    raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self.logger.debug(f"Converted {checkpoint_path} in {time.time() - start_time:.2f}s")
+
+    def _hash_checkpoint(self, checkpoint_path: Path) -> str:
+        """Return the SHA256 of a checkpoint file. It is only computed again when the file's size or modification
+        time changed."""
+        stat = checkpoint_path.stat()
+        with self._lock:
+            known = self._hashes.get(str(checkpoint_path))
+            if known is not None and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                return known["sha256"]
+
+        sha = hashlib.sha256()
+        with open(checkpoint_path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                sha.update(chunk)
+        content_hash = sha.hexdigest()
+
+        with self._lock:
+            self._hashes[str(checkpoint_path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": content_hash,
+            }
+            self._write_index()
+        return content_hash
+
+    def _touch(self, key: str, checkpoint_path: Path) -> None:
+        """Mark a conversion as the most recently used. Must be called with the lock held."""
+        os.utime(self.cache_path / key)
+        if self._sources.get(key) != str(checkpoint_path):
+            self._sources[key] = str(checkpoint_path)
+            self._write_index()
+
+    def _make_room(self, keep: str) -> None:
+        """Remove the least recently used conversions until the cache is within its size. Must be called with the
+        lock held."""
+        sizes = self._entry_sizes()
+        current_size = sum(sizes.values())
+        maximum_size = self.max_size * GIG
+        if current_size <= maximum_size:
+            return
+
+        entries = sorted(sizes, key=lambda key: (self.cache_path / key).stat().st_mtime)
+        for key in entries:
+            if current_size <= maximum_size:
+                break
+            if key == keep or key in self._pending:
+                continue
+            self.logger.debug(f"Removing converted model {key} ({sizes[key] / GIG:.2f}GB) from the conversion cache")
+            self._remove(key)
+            current_size -= sizes[key]
+        self._write_index()
+
+    def _remove(self, key: str) -> None:
+        """Remove a conversion. It is first renamed out of the way, so it is never seen partially removed. Must be
+        called with the lock held."""
+        self._sources.pop(key, None)
+        entry_path = self.cache_path / key
+        if not entry_path.exists():
+            # Moved out of the cache by converting the model for good
+            return
+        temp_path = self.cache_path / f"{TEMP_PREFIX}{key}-{uuid.uuid4().hex}"
+        try:
+            os.rename(entry_path, temp_path)
+        except OSError as e:
+            # On Windows, the files of a model that is loaded can't be moved
+            self.logger.warning(f"Unable to remove converted model {entry_path}: {e}")
+            return
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def _entry_sizes(self) -> Dict[str, int]:
+        """Return the sizes of the cached conversions on disk, in bytes, by key"""
+        sizes: Dict[str, int] = {}
+        for entry in os.scandir(self.cache_path):
+            if entry.is_dir() and not entry.name.startswith(TEMP_PREFIX):
+                sizes[entry.name] = sum(file.stat().st_size for file in Path(entry.path).rglob("*") if file.is_file())
+        return sizes
+
+    def _remove_stale_temp_folders(self) -> None:
+        now = time.time()
+        for entry in os.scandir(self.cache_path):
+            if entry.name.startswith(TEMP_PREFIX) and now - entry.stat().st_mtime > STALE_TEMP_AGE:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    Path(entry.path).unlink(missing_ok=True)
+
+    def _read_index(self) -> None:
+        try:
+            with open(self.cache_path / INDEX_FILE, "r") as f:
+                index = json.load(f)
+            self._hashes = index["hashes"]
+            self._sources = index["sources"]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.warning(f"Unable to read the index of the conversion cache, checkpoints will be hashed: {e}")
+            return
+        # Forget the conversions that were removed, or moved out of the cache by converting a model for good
+        self._sources = {key: source for key, source in self._sources.items() if (self.cache_path / key).exists()}
+
+    def _write_index(self) -> None:
+        """Write the index, atomically. Must be called with the lock held."""
+        temp_path = self.cache_path / f"{TEMP_PREFIX}{INDEX_FILE}-{uuid.uuid4().hex}"
+        with open(temp_path, "w") as f:
+            json.dump({"hashes": self._hashes, "sources": self._sources}, f)
+        os.replace(temp_path, self.cache_path / INDEX_FILE)
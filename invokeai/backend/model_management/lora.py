@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import pickle
+import weakref
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -14,7 +16,27 @@ from transformers import CLIPTextModel, CLIPTokenizer
 
 from invokeai.app.shared.models import FreeUConfig
 
-from .models.lora import LoRAModel
+from .models.lora import LoRALayerBase, LoRAModel, LoRAModelRaw
+
+if TYPE_CHECKING:
+    from .model_cache import ModelCache
+
+# Hashes of the module names of the models LoRAs were applied to. See ModelPatcher._get_architecture().
+_architectures: weakref.WeakKeyDictionary[torch.nn.Module, int] = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class _LoRAPatch:
+    """LoRAs applied to a model, with the weights of its modules before they were applied"""
+
+    # The prefix of the LoRA keys, and the LoRAs with their weights. The LoRAs are weakly referenced, so a LoRA that
+    # was dropped from the model cache and loaded again is not mistaken for the one that was applied.
+    signature: Tuple[str, List[Tuple[weakref.ref, float]]]
+    original_weights: Dict[str, torch.Tensor] = field(default_factory=dict)
+
+
+# LoRAs left applied to models by ModelPatcher.apply_lora(sticky=True)
+_sticky_patches: weakref.WeakKeyDictionary[torch.nn.Module, _LoRAPatch] = weakref.WeakKeyDictionary()
 
 """
 loras = [
@@ -56,14 +78,39 @@ class ModelPatcher:
 
         return (module_key, module)
 
+    @staticmethod
+    def _get_architecture(model: torch.nn.Module) -> int:
+        """Return a hash of the module names of a model, which are all that LoRA keys are resolved against"""
+        architecture = _architectures.get(model)
+        if architecture is None:
+            architecture = hash(tuple(name for name, _ in model.named_modules()))
+            _architectures[model] = architecture
+        return architecture
+
+    @classmethod
+    def _get_lora_key_index(cls, model: torch.nn.Module, lora: LoRAModelRaw, prefix: str) -> Dict[str, str]:
+        """Return the keys of the modules of a model that the layers of a LoRA patch, by layer key. Resolving them is
+        slow, so they are resolved the first time a LoRA is applied to a model architecture, and kept in the LoRA."""
+        index_key = (cls._get_architecture(model), prefix)
+        key_index = lora.key_index.get(index_key)
+        if key_index is None:
+            key_index = {
+                layer_key: cls._resolve_lora_key(model, layer_key, prefix)[0]
+                for layer_key in lora.layers
+                if layer_key.startswith(prefix)
+            }
+            lora.key_index[index_key] = key_index
+        return key_index
+
     @classmethod
     @contextmanager
     def apply_lora_unet(
         cls,
         unet: UNet2DConditionModel,
         loras: List[Tuple[LoRAModel, float]],
+        sticky: bool = False,
     ):
-        with cls.apply_lora(unet, loras, "lora_unet_"):
+        with cls.apply_lora(unet, loras, "lora_unet_", sticky=sticky):
             yield
 
     @classmethod
@@ -101,59 +148,102 @@ class ModelPatcher:
     def apply_lora(
         cls,
         model: torch.nn.Module,
-        loras: List[Tuple[LoRAModel, float]],
+        loras: Iterable[Tuple[LoRAModelRaw, float]],
         prefix: str,
+        sticky: bool = False,
     ):
-        original_weights = {}
+        """
+        Apply LoRAs to a model for the duration of the context.
+
+        :param sticky: Leave the model patched on exit. Applying the same LoRAs with the same weights to it again
+            then costs nothing, and its original weights are only restored when other LoRAs, or none, are applied to
+            it. Only use this for models that are always used through apply_lora().
+        """
+        loras = list(loras)
+        signature = (prefix, [(weakref.ref(lora), lora_weight) for lora, lora_weight in loras])
+
+        patch = _sticky_patches.pop(model, None)
+        if patch is not None and patch.signature != signature:
+            cls._restore_weights(model, patch.original_weights)
+            patch = None
+
+        patched = False
         try:
-            with torch.no_grad():
-                for lora, lora_weight in loras:
-                    # assert lora.device.type == "cpu"
-                    for layer_key, layer in lora.layers.items():
-                        if not layer_key.startswith(prefix):
-                            continue
-
-                        # TODO(ryand): A non-negligible amount of time is currently spent resolving LoRA keys. This
-                        # should be improved in the following ways:
-                        # 1. The key mapping could be more-efficiently pre-computed. This would save time every time a
-                        #    LoRA model is applied.
-                        # 2. From an API perspective, there's no reason that the `ModelPatcher` should be aware of the
-                        #    intricacies of Stable Diffusion key resolution. It should just expect the input LoRA
-                        #    weights to have valid keys.
-                        module_key, module = cls._resolve_lora_key(model, layer_key, prefix)
-
-                        # All of the LoRA weight calculations will be done on the same device as the module weight.
-                        # (Performance will be best if this is a CUDA device.)
-                        device = module.weight.device
-                        dtype = module.weight.dtype
-
-                        if module_key not in original_weights:
-                            original_weights[module_key] = module.weight.detach().to(device="cpu", copy=True)
-
-                        layer_scale = layer.alpha / layer.rank if (layer.alpha and layer.rank) else 1.0
-
-                        # We intentionally move to the target device first, then cast. Experimentally, this was found to
-                        # be significantly faster for 16-bit CPU tensors being moved to a CUDA device than doing the
-                        # same thing in a single call to '.to(...)'.
-                        layer.to(device=device)
-                        layer.to(dtype=torch.float32)
-                        # TODO(ryand): Using torch.autocast(...) over explicit casting may offer a speed benefit on CUDA
-                        # devices here. Experimentally, it was found to be very slow on CPU. More investigation needed.
-                        layer_weight = layer.get_weight(module.weight) * (lora_weight * layer_scale)
-                        layer.to(device="cpu")
-
-                        if module.weight.shape != layer_weight.shape:
-                            # TODO: debug on lycoris
-                            layer_weight = layer_weight.reshape(module.weight.shape)
-
-                        module.weight += layer_weight.to(dtype=dtype)
+            if patch is None:
+                patch = _LoRAPatch(signature=signature, original_weights={})
+                cls._patch_weights(model, loras, prefix, patch.original_weights)
+            patched = True
 
             yield  # wait for context manager exit
 
         finally:
-            with torch.no_grad():
-                for module_key, weight in original_weights.items():
-                    model.get_submodule(module_key).weight.copy_(weight)
+            if sticky and patched:
+                _sticky_patches[model] = patch
+            elif patch is not None:
+                cls._restore_weights(model, patch.original_weights)
+
+    @classmethod
+    def _patch_weights(
+        cls,
+        model: torch.nn.Module,
+        loras: List[Tuple[LoRAModelRaw, float]],
+        prefix: str,
+        original_weights: Dict[str, torch.Tensor],
+    ) -> None:
+        """Add the LoRAs to the weights of the model, keeping a copy of the weights they change in original_weights"""
+        # The layers of all the LoRAs that patch each module, with their scales. Their deltas are summed, so each
+        # weight is only changed once, however many LoRAs patch it.
+        module_layers: Dict[str, List[Tuple[LoRALayerBase, float]]] = {}
+        for lora, lora_weight in loras:
+            # assert lora.device.type == "cpu"
+            # TODO(ryand): From an API perspective, there's no reason that the `ModelPatcher` should be aware
+            # of the intricacies of Stable Diffusion key resolution. It should just expect the input LoRA
+            # weights to have valid keys.
+            for layer_key, module_key in cls._get_lora_key_index(model, lora, prefix).items():
+                layer = lora.layers[layer_key]
+                layer_scale = layer.alpha / layer.rank if (layer.alpha and layer.rank) else 1.0
+                module_layers.setdefault(module_key, []).append((layer, lora_weight * layer_scale))
+
+        with torch.no_grad():
+            for module_key, layers in module_layers.items():
+                module = model.get_submodule(module_key)
+
+                # All of the LoRA weight calculations will be done on the same device as the module weight.
+                # (Performance will be best if this is a CUDA device.)
+                device = module.weight.device
+                dtype = module.weight.dtype
+
+                original_weights[module_key] = module.weight.detach().to(device="cpu", copy=True)
+
+                delta: Optional[torch.Tensor] = None
+                for layer, scale in layers:
+                    # We intentionally move to the target device first, then cast. Experimentally, this was found to
+                    # be significantly faster for 16-bit CPU tensors being moved to a CUDA device than doing the
+                    # same thing in a single call to '.to(...)'.
+                    layer.to(device=device)
+                    layer.to(dtype=torch.float32)
+                    # TODO(ryand): Using torch.autocast(...) over explicit casting may offer a speed benefit on CUDA
+                    # devices here. Experimentally, it was found to be very slow on CPU. More investigation needed.
+                    layer_weight = layer.get_weight(module.weight) * scale
+                    layer.to(device="cpu")
+
+                    if module.weight.shape != layer_weight.shape:
+                        # TODO: debug on lycoris
+                        layer_weight = layer_weight.reshape(module.weight.shape)
+
+                    if delta is None:
+                        delta = layer_weight
+                    else:
+                        delta += layer_weight
+
+                assert delta is not None
+                module.weight += delta.to(dtype=dtype)
+
+    @staticmethod
+    def _restore_weights(model: torch.nn.Module, original_weights: Dict[str, torch.Tensor]) -> None:
+        with torch.no_grad():
+            for module_key, weight in original_weights.items():
+                model.get_submodule(module_key).weight.copy_(weight)
 
     @classmethod
     @contextmanager
@@ -162,89 +252,43 @@ class ModelPatcher:
         tokenizer: CLIPTokenizer,
         text_encoder: CLIPTextModel,
         ti_list: List[Tuple[str, Any]],
+        cache: Optional[ModelCache] = None,
+        tokenizer_key: Optional[str] = None,
     ) -> Tuple[CLIPTokenizer, TextualInversionManager]:
-        init_tokens_count = None
-        new_tokens_added = None
-
-        # TODO: This is required since Transformers 4.32 see
-        # https://github.com/huggingface/transformers/pull/25088
-        # More information by NVIDIA:
-        # https://docs.nvidia.com/deeplearning/performance/dl-performance-matrix-multiplication/index.html#requirements-tc
-        # This value might need to be changed in the future and take the GPUs model into account as there seem
-        # to be ideal values for different GPUS. This value is temporary!
-        # For references to the current discussion please see https://github.com/invoke-ai/InvokeAI/pull/4817
-        pad_to_multiple_of = 8
-
+        """
+        Apply textual inversions to a tokenizer and text encoder for the duration of the context.
+
+        :param cache: The model cache to keep the tokenizer extended with the textual inversions in, so prompts using
+            the same textual inversions share it
+        :param tokenizer_key: The key of the tokenizer in the model cache
+        """
+        input_embeddings = text_encoder.get_input_embeddings()
+        if cache is not None and tokenizer_key is not None:
+            ti_patch = cache.get_derived(
+                TextualInversionPatch.get_key(tokenizer_key, input_embeddings.embedding_dim, ti_list),
+                lambda: TextualInversionPatch.create(tokenizer, input_embeddings.embedding_dim, ti_list),
+                is_valid=lambda ti_patch: ti_patch.was_created_from(tokenizer, ti_list),
+            )
+        else:
+            ti_patch, _ = TextualInversionPatch.create(tokenizer, input_embeddings.embedding_dim, ti_list)
+
+        if ti_patch.ti_embeddings is None:
+            yield ti_patch.tokenizer, ti_patch.manager
+            return
+
+        # The embeddings of the textual inversion tokens are looked up alongside the text encoder's own, rather than
+        # being added to them, so its embedding table is neither copied nor resized
+        text_encoder.set_input_embeddings(
+            TextualInversionEmbedding(
+                input_embeddings,
+                ti_patch.ti_embeddings.to(device=input_embeddings.weight.device, dtype=input_embeddings.weight.dtype),
+                ti_patch.ti_token_start,
+            )
+        )
         try:
-            # HACK: The CLIPTokenizer API does not include a way to remove tokens after calling add_tokens(...). As a
-            # workaround, we create a full copy of `tokenizer` so that its original behavior can be restored after
-            # exiting this `apply_ti(...)` context manager.
-            #
-            # In a previous implementation, the deep copy was obtained with `ti_tokenizer = copy.deepcopy(tokenizer)`,
-            # but a pickle roundtrip was found to be much faster (1 sec vs. 0.05 secs).
-            ti_tokenizer = pickle.loads(pickle.dumps(tokenizer))
-            ti_manager = TextualInversionManager(ti_tokenizer)
-            init_tokens_count = text_encoder.resize_token_embeddings(None, pad_to_multiple_of).num_embeddings
-
-            def _get_trigger(ti_name, index):
-                trigger = ti_name
-                if index > 0:
-                    trigger += f"-!pad-{i}"
-                return f"<{trigger}>"
-
-            def _get_ti_embedding(model_embeddings, ti):
-                # for SDXL models, select the embedding that matches the text encoder's dimensions
-                if ti.embedding_2 is not None:
-                    return (
-                        ti.embedding_2
-                        if ti.embedding_2.shape[1] == model_embeddings.weight.data[0].shape[0]
-                        else ti.embedding
-                    )
-                else:
-                    return ti.embedding
-
-            # modify tokenizer
-            new_tokens_added = 0
-            for ti_name, ti in ti_list:
-                ti_embedding = _get_ti_embedding(text_encoder.get_input_embeddings(), ti)
-
-                for i in range(ti_embedding.shape[0]):
-                    new_tokens_added += ti_tokenizer.add_tokens(_get_trigger(ti_name, i))
-
-            # modify text_encoder
-            text_encoder.resize_token_embeddings(init_tokens_count + new_tokens_added, pad_to_multiple_of)
-            model_embeddings = text_encoder.get_input_embeddings()
-
-            for ti_name, _ in ti_list:
-                ti_tokens = []
-                for i in range(ti_embedding.shape[0]):
-                    embedding = ti_embedding[i]
-                    trigger = _get_trigger(ti_name, i)
-
-                    token_id = ti_tokenizer.convert_tokens_to_ids(trigger)
-                    if token_id == ti_tokenizer.unk_token_id:
-                        raise RuntimeError(f"Unable to find token id for token '{trigger}'")
-
-                    if model_embeddings.weight.data[token_id].shape != embedding.shape:
-                        raise ValueError(
-                            f"Cannot load embedding for {trigger}. It was trained on a model with token dimension"
-                            f" {embedding.shape[0]}, but the current model has token dimension"
-                            f" {model_embeddings.weight.data[token_id].shape[0]}."
-                        )
-
-                    model_embeddings.weight.data[token_id] = embedding.to(
-                        device=text_encoder.device, dtype=text_encoder.dtype
-                    )
-                    ti_tokens.append(token_id)
-
-                if len(ti_tokens) > 1:
-                    ti_manager.pad_tokens[ti_tokens[0]] = ti_tokens[1:]
-
-            yield ti_tokenizer, ti_manager
-
+            yield ti_patch.tokenizer, ti_patch.manager
         finally:
-            if init_tokens_count and new_tokens_added:
-                text_encoder.resize_token_embeddings(init_tokens_count, pad_to_multiple_of)
+            text_encoder.set_input_embeddings(input_embeddings)
 
     @classmethod
     @contextmanager
@@ -371,6 +415,130 @@ class TextualInversionManager(BaseTextualInversionManager):
         return new_token_ids
 
 
+class TextualInversionPatch:
+    """A tokenizer extended with the trigger tokens of textual inversions, and the embeddings of those tokens"""
+
+    tokenizer: CLIPTokenizer
+    manager: TextualInversionManager
+    # The id of the first trigger token. Trigger tokens follow the tokens of the original tokenizer.
+    ti_token_start: int
+    # The embeddings of the trigger tokens, in the order of their ids, or None if there are none
+    ti_embeddings: Optional[torch.Tensor]
+
+    def __init__(
+        self,
+        tokenizer: CLIPTokenizer,
+        manager: TextualInversionManager,
+        ti_token_start: int,
+        ti_embeddings: Optional[torch.Tensor],
+        sources: List[Any],
+    ):
+        self.tokenizer = tokenizer
+        self.manager = manager
+        self.ti_token_start = ti_token_start
+        self.ti_embeddings = ti_embeddings
+        # The tokenizer and textual inversions this was created from, weakly referenced so a model that was evicted
+        # from the model cache and loaded again is not mistaken for the one this was created from
+        self._sources = [weakref.ref(source) for source in sources]
+
+    @staticmethod
+    def get_key(tokenizer_key: str, embedding_dim: int, ti_list: List[Tuple[str, Any]]) -> str:
+        return f"{tokenizer_key}:textual_inversion:{embedding_dim}:{','.join(sorted({name for name, _ in ti_list}))}"
+
+    @classmethod
+    def create(
+        cls, tokenizer: CLIPTokenizer, embedding_dim: int, ti_list: List[Tuple[str, Any]]
+    ) -> Tuple[TextualInversionPatch, int]:
+        """Return the patch applying the textual inversions to the tokenizer and a text encoder whose token embeddings
+        have embedding_dim dimensions, and its size in bytes"""
+        ti_models = dict(sorted(ti_list, key=lambda ti: ti[0]))
+        sources = [tokenizer, *ti_models.values()]
+        if not ti_models:
+            # Nothing is added to the tokenizer, so it needn't be copied
+            return cls(tokenizer, TextualInversionManager(tokenizer), len(tokenizer), None, sources), 0
+
+        # HACK: The CLIPTokenizer API does not include a way to remove tokens after calling add_tokens(...). As a
+        # workaround, we create a full copy of `tokenizer`, which is kept for the prompts using the same textual
+        # inversions.
+        #
+        # In a previous implementation, the deep copy was obtained with `ti_tokenizer = copy.deepcopy(tokenizer)`,
+        # but a pickle roundtrip was found to be much faster (1 sec vs. 0.05 secs).
+        pickled_tokenizer = pickle.dumps(tokenizer)
+        ti_tokenizer = pickle.loads(pickled_tokenizer)
+        ti_manager = TextualInversionManager(ti_tokenizer)
+        ti_token_start = len(ti_tokenizer)
+
+        def _get_trigger(ti_name, index):
+            trigger = ti_name
+            if index > 0:
+                trigger += f"-!pad-{index}"
+            return f"<{trigger}>"
+
+        def _get_ti_embedding(ti):
+            # for SDXL models, select the embedding that matches the text encoder's dimensions
+            if ti.embedding_2 is not None and ti.embedding_2.shape[1] == embedding_dim:
+                return ti.embedding_2
+            return ti.embedding
+
+        ti_embeddings = {}
+        for ti_name, ti in ti_models.items():
+            ti_embedding = _get_ti_embedding(ti)
+            ti_tokens = []
+            for i in range(ti_embedding.shape[0]):
+                embedding = ti_embedding[i]
+                trigger = _get_trigger(ti_name, i)
+                ti_tokenizer.add_tokens(trigger)
+
+                token_id = ti_tokenizer.convert_tokens_to_ids(trigger)
+                if token_id == ti_tokenizer.unk_token_id:
+                    raise RuntimeError(f"Unable to find token id for token '{trigger}'")
+                if token_id < ti_token_start:
+                    raise RuntimeError(f"Token '{trigger}' is already in the vocabulary of the tokenizer")
+
+                if embedding.shape[0] != embedding_dim:
+                    raise ValueError(
+                        f"Cannot load embedding for {trigger}. It was trained on a model with token dimension"
+                        f" {embedding.shape[0]}, but the current model has token dimension {embedding_dim}."
+                    )
+
+                ti_embeddings[token_id] = embedding
+                ti_tokens.append(token_id)
+
+            if len(ti_tokens) > 1:
+                ti_manager.pad_tokens[ti_tokens[0]] = ti_tokens[1:]
+
+        embeddings = torch.stack([ti_embeddings[token_id] for token_id in sorted(ti_embeddings)])
+        size = len(pickled_tokenizer) + embeddings.nbytes
+        return cls(ti_tokenizer, ti_manager, ti_token_start, embeddings, sources), size
+
+    def was_created_from(self, tokenizer: CLIPTokenizer, ti_list: List[Tuple[str, Any]]) -> bool:
+        ti_models = dict(sorted(ti_list, key=lambda ti: ti[0]))
+        sources = [tokenizer, *ti_models.values()]
+        return len(sources) == len(self._sources) and all(
+            ref() is source for ref, source in zip(self._sources, sources, strict=True)
+        )
+
+
+class TextualInversionEmbedding(torch.nn.Module):
+    """The token embedding of a text encoder, extended with the embeddings of the trigger tokens of textual
+    inversions, whose ids follow those of the tokens it has embeddings for"""
+
+    def __init__(self, embedding: torch.nn.Embedding, ti_embeddings: torch.Tensor, ti_token_start: int):
+        super().__init__()
+        self.embedding = embedding
+        self.register_buffer("ti_embeddings", ti_embeddings, persistent=False)
+        self.ti_token_start = ti_token_start
+        self.embedding_dim = embedding.embedding_dim
+
+    def forward(self, input_ids: torch.Tensor) -> torch.Tensor:
+        is_ti_token = input_ids >= self.ti_token_start
+        embeddings = self.embedding(input_ids.masked_fill(is_ti_token, 0))
+        ti_embeddings = torch.nn.functional.embedding(
+            (input_ids - self.ti_token_start).clamp(min=0, max=self.ti_embeddings.shape[0] - 1), self.ti_embeddings
+        )
+        return torch.where(is_ti_token.unsqueeze(-1), ti_embeddings.to(dtype=embeddings.dtype), embeddings)
+
+
 class ONNXModelPatcher:
     from diffusers import OnnxRuntimeModel
 
@@ -16,21 +16,23 @@ context. Use like this:
 
 """
 
-import gc
 import hashlib
+import json
 import math
 import os
-import sys
+import threading
 import time
-from contextlib import suppress
+import weakref
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Type, Union, types
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type, Union, types
 
 import torch
 
 import invokeai.backend.util.logging as logger
 from invokeai.backend.model_management.memory_snapshot import MemorySnapshot, get_pretty_snapshot_diff
+from invokeai.backend.model_management.model_cache_policy import get_eviction_policy
 from invokeai.backend.model_management.model_load_optimizations import skip_torch_weight_init
 
 from ..util.devices import choose_torch_device
@@ -51,6 +53,9 @@ GIG = 1073741824
 # Size of a MB in bytes.
 MB = 2**20
 
+# Number of eviction decisions kept for inspection
+EVICTION_LOG_SIZE = 100
+
 
 @dataclass
 class CacheStats(object):
@@ -64,6 +69,18 @@ class CacheStats(object):
     loaded_model_sizes: Dict[str, int] = field(default_factory=dict)
 
 
+@dataclass
+class EvictionDecision:
+    """Why a model was, or was not, evicted to make room for another"""
+
+    key: str  # model considered for eviction
+    size: int  # its size, in bytes
+    evicted: bool
+    reason: str
+    bytes_needed: int  # size of the model room was made for
+    timestamp: float = field(default_factory=time.time)
+
+
 class ModelLocker(object):
     "Forward declaration"
 
@@ -78,22 +95,40 @@ class ModelCache(object):
 
 class _CacheRecord:
     size: int
+    # Bytes of the model that are memory-mapped from its files, which the OS can drop from RAM and read again
+    mapped_size: int
     model: Any
     cache: ModelCache
+    # Lockers that are within their context, keeping the model in VRAM
     _locks: int
+    # Lockers that were handed out and are still alive, whose callers may be using the model
+    _handles: int
+    # Whether the record is still in the cache, and counted in its totals
+    cached: bool
 
-    def __init__(self, cache, model: Any, size: int):
+    def __init__(self, cache, model: Any, size: int, mapped_size: int = 0):
         self.size = size
+        self.mapped_size = mapped_size
         self.model = model
         self.cache = cache
         self._locks = 0
+        self._handles = 0
+        self.cached = True
 
     def lock(self):
         self._locks += 1
+        if self._locks == 1 and self.cached:
+            self.cache._locked_models += 1
 
     def unlock(self):
         self._locks -= 1
         assert self._locks >= 0
+        if self._locks == 0 and self.cached:
+            self.cache._locked_models -= 1
+
+    @property
+    def in_use(self):
+        return self._handles > 0
 
     @property
     def locked(self):
@@ -107,6 +142,19 @@ class _CacheRecord:
             return False
 
 
+class _PendingLoad:
+    """A model being loaded from disk. Callers asking for the same model wait for it instead of loading a copy."""
+
+    size: int
+    done: threading.Event
+    error: Optional[BaseException]
+
+    def __init__(self, size: int):
+        self.size = size
+        self.done = threading.Event()
+        self.error = None
+
+
 class ModelCache(object):
     def __init__(
         self,
@@ -120,6 +168,8 @@ class ModelCache(object):
         sha_chunksize: int = 16777216,
         logger: types.ModuleType = logger,
         log_memory_usage: bool = False,
+        eviction_policy: str = "lru",
+        trace_path: Optional[Path] = None,
     ):
         """
         :param max_cache_size: Maximum size of the RAM cache [6.0 GB]
@@ -133,6 +183,9 @@ class ModelCache(object):
             operation, and the result will be logged (at debug level). There is a time cost to capturing the memory
             snapshots, so it is recommended to disable this feature unless you are actively inspecting the model cache's
             behaviour.
+        :param eviction_policy: Name of the policy deciding which models are evicted first, one of EVICTION_POLICIES
+        :param trace_path: If set, every model request is appended to this file as a line of JSON, for replay by
+            scripts/replay_model_cache_trace.py
         """
         self.model_infos: Dict[str, ModelBase] = {}
         # allow lazy offloading only when vram cache enabled
@@ -145,12 +198,34 @@ class ModelCache(object):
         self.sha_chunksize = sha_chunksize
         self.logger = logger
         self._log_memory_usage = log_memory_usage
+        self.eviction_policy = eviction_policy
+        self._policy = get_eviction_policy(eviction_policy)
+        self._trace_file = open(trace_path, "a", buffering=1) if trace_path else None
 
         # used for stats collection
         self.stats = None
 
-        self._cached_models = {}
-        self._cache_stack = []
+        # Cached models. The eviction policy orders them.
+        self._cached_models: Dict[str, _CacheRecord] = {}
+        # Models being loaded from disk, by key
+        self._pending_loads: Dict[str, _PendingLoad] = {}
+        # Cached models that are on the execution device
+        self._vram_models: Dict[str, _CacheRecord] = {}
+        # Running totals of the sizes of the models above, in bytes, so they are not summed on every request
+        self._cache_bytes = 0
+        self._pending_bytes = 0
+        self._vram_bytes = 0
+        # Of _cache_bytes, the bytes memory-mapped from model files rather than in private memory. They still count
+        # towards the cache size, as they are copied to private memory once a model has been to VRAM and back.
+        self._mapped_bytes = 0
+        self._locked_models = 0
+        self._eviction_log: Deque[EvictionDecision] = deque(maxlen=EVICTION_LOG_SIZE)
+
+        # Guards the cache records and the bookkeeping above. It is not held while models are loaded from disk or
+        # moved between devices, so requests for models that are already in RAM are not held up by those.
+        self._lock = threading.RLock()
+        # Serializes moving models between devices, as VRAM is managed by looking at the whole cache
+        self._device_lock = threading.RLock()
 
     def _capture_memory_snapshot(self) -> Optional[MemorySnapshot]:
         if self._log_memory_usage:
@@ -183,14 +258,15 @@ class ModelCache(object):
             submodel_type=None,
         )
 
-        if model_info_key not in self.model_infos:
-            self.model_infos[model_info_key] = model_class(
-                model_path,
-                base_model,
-                model_type,
-            )
+        with self._lock:
+            if model_info_key not in self.model_infos:
+                self.model_infos[model_info_key] = model_class(
+                    model_path,
+                    base_model,
+                    model_type,
+                )
 
-        return self.model_infos[model_info_key]
+            return self.model_infos[model_info_key]
 
     # TODO: args
     def get_model(
@@ -202,6 +278,77 @@ class ModelCache(object):
         submodel: Optional[SubModelType] = None,
         gpu_load: bool = True,
     ) -> Any:
+        locker = self._get_model(model_path, model_class, base_model, model_type, submodel, gpu_load=gpu_load)
+        assert locker is not None
+        return locker
+
+    def prefetch_model(
+        self,
+        model_path: Union[str, Path],
+        model_class: Type[ModelBase],
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel: Optional[SubModelType] = None,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ) -> Optional["ModelCache.ModelLocker"]:
+        """Loads a model into RAM ahead of its use, if it fits in the free room of the cache.
+
+        Unlike get_model(), no models are evicted to make room for it and the cache statistics are not updated.
+        Returns the locker of the model if it was loaded, or None if it was already cached, is being loaded or does
+        not fit. `on_load_started` is called before the model is read from disk.
+        """
+        return self._get_model(
+            model_path,
+            model_class,
+            base_model,
+            model_type,
+            submodel,
+            gpu_load=False,
+            prefetch=True,
+            on_load_started=on_load_started,
+        )
+
+    def get_derived(
+        self,
+        key: str,
+        create: Callable[[], Tuple[Any, int]],
+        is_valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Returns an object derived from cached models, such as a tokenizer extended with textual inversions,
+        creating it if it is not cached.
+
+        Derived objects stay in RAM, count towards the size of the cache and are evicted like models. `create` returns
+        the object and its size in bytes. `is_valid`, if given, tells whether a cached object can still be used, as
+        when the models it was derived from were not loaded again since; it is created again otherwise.
+        """
+        with self._lock:
+            cache_entry = self._cached_models.get(key, None)
+            if cache_entry is not None and (is_valid is None or is_valid(cache_entry.model)):
+                self._touch(key)
+                return cache_entry.model
+
+        start_time = time.time()
+        derived, size = create()
+        end_time = time.time()
+
+        with self._lock:
+            # Replaces an object that is no longer valid, or that another caller created meanwhile
+            self._remove(key)
+            self._make_cache_room(size)
+            self._add(key, _CacheRecord(self, derived, size), end_time - start_time)
+        return derived
+
+    def _get_model(
+        self,
+        model_path: Union[str, Path],
+        model_class: Type[ModelBase],
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel: Optional[SubModelType],
+        gpu_load: bool,
+        prefetch: bool = False,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ) -> Optional["ModelCache.ModelLocker"]:
         if not isinstance(model_path, Path):
             model_path = Path(model_path)
 
@@ -220,20 +367,51 @@ class ModelCache(object):
             model_type=model_type,
             submodel_type=submodel,
         )
-        # TODO: lock for no copies on simultaneous calls?
-        cache_entry = self._cached_models.get(key, None)
-        if cache_entry is None:
-            self.logger.info(
-                f"Loading model {model_path}, type"
-                f" {base_model.value}:{model_type.value}{':'+submodel.value if submodel else ''}"
-            )
-            if self.stats:
-                self.stats.misses += 1
-
-            self_reported_model_size_before_load = model_info.get_size(submodel)
-            # Remove old models from the cache to make room for the new model.
-            self._make_cache_room(self_reported_model_size_before_load)
-
+        while True:
+            with self._lock:
+                cache_entry = self._cached_models.get(key, None)
+                if cache_entry is not None:
+                    if prefetch:
+                        # Keep it from being evicted before it is used
+                        self._touch(key)
+                        return None
+                    if self.stats:
+                        self.stats.hits += 1
+                    self._trace(key, cache_entry.size)
+                    return self._get_locker(key, cache_entry, model_info, submodel, gpu_load)
+
+                pending_load = self._pending_loads.get(key, None)
+                if pending_load is None:
+                    self_reported_model_size_before_load = model_info.get_size(submodel)
+                    if prefetch:
+                        if self._reserved_size() + self_reported_model_size_before_load > self.max_cache_size * GIG:
+                            return None
+                    else:
+                        # Remove old models from the cache to make room for the new model
+                        self._make_cache_room(self_reported_model_size_before_load)
+                        if self.stats:
+                            self.stats.misses += 1
+                    # Reserve room for the model while it is loaded
+                    pending_load = _PendingLoad(self_reported_model_size_before_load)
+                    self._pending_loads[key] = pending_load
+                    self._pending_bytes += pending_load.size
+                    break
+                elif prefetch:
+                    return None
+
+            # Another caller is loading the model, wait for it and use its copy
+            self.logger.debug(f"Waiting for model {key} to be loaded by another caller")
+            pending_load.done.wait()
+            if pending_load.error is not None:
+                raise pending_load.error
+
+        self.logger.info(
+            f"{'Prefetching' if prefetch else 'Loading'} model {model_path}, type"
+            f" {base_model.value}:{model_type.value}{':'+submodel.value if submodel else ''}"
+        )
+        try:
+            if on_load_started is not None:
+                on_load_started()
             # Load the model from disk and capture a memory snapshot before/after.
             start_load_time = time.time()
             snapshot_before = self._capture_memory_snapshot()
@@ -243,43 +421,102 @@ class ModelCache(object):
             end_load_time = time.time()
 
             self_reported_model_size_after_load = model_info.get_size(submodel)
+            mapped_size = model_info.get_mapped_size(submodel)
+        except BaseException as e:
+            with self._lock:
+                del self._pending_loads[key]
+                self._pending_bytes -= pending_load.size
+            pending_load.error = e
+            pending_load.done.set()
+            raise
+
+        self.logger.debug(
+            f"Moved model '{key}' from disk to cpu in {(end_load_time-start_load_time):.2f}s.\n"
+            f"Self-reported size before/after load: {(self_reported_model_size_before_load/GIG):.3f}GB /"
+            f" {(self_reported_model_size_after_load/GIG):.3f}GB, of which {(mapped_size/GIG):.3f}GB memory-mapped.\n"
+            f"{get_pretty_snapshot_diff(snapshot_before, snapshot_after)}"
+        )
 
+        if abs(self_reported_model_size_after_load - self_reported_model_size_before_load) > 10 * MB:
             self.logger.debug(
-                f"Moved model '{key}' from disk to cpu in {(end_load_time-start_load_time):.2f}s.\n"
-                f"Self-reported size before/after load: {(self_reported_model_size_before_load/GIG):.3f}GB /"
-                f" {(self_reported_model_size_after_load/GIG):.3f}GB.\n"
-                f"{get_pretty_snapshot_diff(snapshot_before, snapshot_after)}"
+                f"Model '{key}' mis-reported its size before load. Self-reported size before/after load:"
+                f" {(self_reported_model_size_before_load/GIG):.2f}GB /"
+                f" {(self_reported_model_size_after_load/GIG):.2f}GB."
             )
 
-            if abs(self_reported_model_size_after_load - self_reported_model_size_before_load) > 10 * MB:
-                self.logger.debug(
-                    f"Model '{key}' mis-reported its size before load. Self-reported size before/after load:"
-                    f" {(self_reported_model_size_before_load/GIG):.2f}GB /"
-                    f" {(self_reported_model_size_after_load/GIG):.2f}GB."
-                )
-
-            cache_entry = _CacheRecord(self, model, self_reported_model_size_after_load)
-            self._cached_models[key] = cache_entry
-        else:
-            if self.stats:
-                self.stats.hits += 1
-
+        with self._lock:
+            cache_entry = _CacheRecord(self, model, self_reported_model_size_after_load, mapped_size)
+            self._add(key, cache_entry, end_load_time - start_load_time)
+            del self._pending_loads[key]
+            self._pending_bytes -= pending_load.size
+            pending_load.done.set()
+            if prefetch:
+                return self.ModelLocker(self, key, cache_entry.model, gpu_load, cache_entry.size)
+            self._trace(key, cache_entry.size, end_load_time - start_load_time)
+            return self._get_locker(key, cache_entry, model_info, submodel, gpu_load)
+
+    def _get_locker(
+        self,
+        key: str,
+        cache_entry: _CacheRecord,
+        model_info: ModelBase,
+        submodel: Optional[SubModelType],
+        gpu_load: bool,
+    ) -> "ModelCache.ModelLocker":
+        """Marks a cached model as the most recently used and returns its locker. Must be called with the lock held."""
         if self.stats:
             self.stats.cache_size = self.max_cache_size * GIG
-            self.stats.high_watermark = max(self.stats.high_watermark, self._cache_size())
+            self.stats.high_watermark = max(self.stats.high_watermark, self._cache_bytes)
             self.stats.in_cache = len(self._cached_models)
             self.stats.loaded_model_sizes[key] = max(
                 self.stats.loaded_model_sizes.get(key, 0), model_info.get_size(submodel)
             )
 
-        with suppress(Exception):
-            self._cache_stack.remove(key)
-        self._cache_stack.append(key)
-
+        self._touch(key)
         return self.ModelLocker(self, key, cache_entry.model, gpu_load, cache_entry.size)
 
+    def _touch(self, key: str) -> None:
+        """Marks a cached model as the most recently used. Must be called with the lock held."""
+        self._policy.access(key)
+
+    def _add(self, key: str, cache_entry: _CacheRecord, load_time: float) -> None:
+        """Adds a model to the cache, as the most recently used. Must be called with the lock held."""
+        self._cached_models[key] = cache_entry
+        self._policy.add(key, cache_entry.size, load_time)
+        self._cache_bytes += cache_entry.size
+        self._mapped_bytes += cache_entry.mapped_size
+        if cache_entry.loaded:
+            self._vram_models[key] = cache_entry
+            self._vram_bytes += cache_entry.size
+
+    def _remove(self, key: str, evicted: bool = False) -> Optional[_CacheRecord]:
+        """Removes a model from the cache. Must be called with the lock held."""
+        cache_entry = self._cached_models.pop(key, None)
+        if cache_entry is None:
+            return None
+        self._policy.remove(key, evicted)
+        self._cache_bytes -= cache_entry.size
+        self._mapped_bytes -= cache_entry.mapped_size
+        if self._vram_models.pop(key, None) is not None:
+            self._vram_bytes -= cache_entry.size
+        if cache_entry.locked:
+            self._locked_models -= 1
+        cache_entry.cached = False
+        return cache_entry
+
+    def _trace(self, key: str, size: int, load_time: Optional[float] = None) -> None:
+        """Records a model request, with the time it took to load the model if it was not cached. Must be called with
+        the lock held."""
+        if self._trace_file is not None:
+            self._trace_file.write(json.dumps({"key": key, "size": size, "load_time": load_time}) + "\n")
+
+    def _release_handle(self, cache_entry: _CacheRecord) -> None:
+        with self._lock:
+            cache_entry._handles -= 1
+
     def _move_model_to_device(self, key: str, target_device: torch.device):
-        cache_entry = self._cached_models[key]
+        with self._lock:
+            cache_entry = self._cached_models[key]
 
         source_device = cache_entry.model.device
         # Note: We compare device types only so that 'cuda' == 'cuda:0'. This would need to be revised to support
@@ -292,6 +529,18 @@ class ModelCache(object):
         cache_entry.model.to(target_device)
         snapshot_after = self._capture_memory_snapshot()
         end_model_to_time = time.time()
+
+        with self._lock:
+            if self._cached_models.get(key) is cache_entry:
+                in_vram = torch.device(target_device).type != torch.device(self.storage_device).type
+                if in_vram and key not in self._vram_models:
+                    self._vram_models[key] = cache_entry
+                    self._vram_bytes += cache_entry.size
+                    # The weights are copied to VRAM, and will be copied back to private memory when offloaded
+                    self._mapped_bytes -= cache_entry.mapped_size
+                    cache_entry.mapped_size = 0
+                elif not in_vram and self._vram_models.pop(key, None) is not None:
+                    self._vram_bytes -= cache_entry.size
         self.logger.debug(
             f"Moved model '{key}' from {source_device} to"
             f" {target_device} in {(end_model_to_time-start_model_to_time):.2f}s.\n"
@@ -337,6 +586,9 @@ class ModelCache(object):
             self.model = model
             self.size_needed = size_needed
             self.cache_entry = self.cache._cached_models[self.key]
+            # The model is in use, and is not evicted, as long as its locker is alive
+            self.cache_entry._handles += 1
+            weakref.finalize(self, self.cache._release_handle, self.cache_entry)
 
         def __enter__(self) -> Any:
             if not hasattr(self.model, "to"):
@@ -345,26 +597,31 @@ class ModelCache(object):
             # NOTE that the model has to have the to() method in order for this
             # code to move it into GPU!
             if self.gpu_load:
-                self.cache_entry.lock()
+                with self.cache._lock:
+                    self.cache_entry.lock()
 
                 try:
-                    if self.cache.lazy_offloading:
-                        self.cache._offload_unlocked_models(self.size_needed)
+                    with self.cache._device_lock:
+                        if self.cache.lazy_offloading:
+                            self.cache._offload_unlocked_models(self.size_needed)
 
-                    self.cache._move_model_to_device(self.key, self.cache.execution_device)
+                        self.cache._move_model_to_device(self.key, self.cache.execution_device)
 
                     self.cache.logger.debug(f"Locking {self.key} in {self.cache.execution_device}")
                     self.cache._print_cuda_stats()
 
                 except Exception:
-                    self.cache_entry.unlock()
+                    with self.cache._lock:
+                        self.cache_entry.unlock()
                     raise
 
             # TODO: not fully understand
             # in the event that the caller wants the model in RAM, we
             # move it into CPU if it is in GPU and not locked
-            elif self.cache_entry.loaded and not self.cache_entry.locked:
-                self.cache._move_model_to_device(self.key, self.cache.storage_device)
+            else:
+                with self.cache._device_lock:
+                    if self.cache_entry.loaded and not self.cache_entry.locked:
+                        self.cache._move_model_to_device(self.key, self.cache.storage_device)
 
             return self.model
 
@@ -372,16 +629,17 @@ class ModelCache(object):
             if not hasattr(self.model, "to"):
                 return
 
-            self.cache_entry.unlock()
+            with self.cache._lock:
+                self.cache_entry.unlock()
             if not self.cache.lazy_offloading:
-                self.cache._offload_unlocked_models()
+                with self.cache._device_lock:
+                    self.cache._offload_unlocked_models()
                 self.cache._print_cuda_stats()
 
     # TODO: should it be called untrack_model?
     def uncache_model(self, cache_id: str):
-        with suppress(ValueError):
-            self._cache_stack.remove(cache_id)
-        self._cached_models.pop(cache_id, None)
+        with self._lock:
+            self._remove(cache_id)
 
     def model_hash(
         self,
@@ -397,39 +655,51 @@ class ModelCache(object):
 
     def cache_size(self) -> float:
         """Return the current size of the cache, in GB."""
-        return self._cache_size() / GIG
+        with self._lock:
+            return self._cache_bytes / GIG
+
+    def mapped_cache_size(self) -> float:
+        """Return how much of the cache is memory-mapped from model files rather than in private memory, in GB."""
+        with self._lock:
+            return self._mapped_bytes / GIG
+
+    def get_eviction_log(self) -> List[EvictionDecision]:
+        """Return the most recent eviction decisions, oldest first."""
+        with self._lock:
+            return list(self._eviction_log)
 
     def _has_cuda(self) -> bool:
         return self.execution_device.type == "cuda"
 
     def _print_cuda_stats(self):
         vram = "%4.2fG" % (torch.cuda.memory_allocated() / GIG)
-        ram = "%4.2fG" % self.cache_size()
-
-        cached_models = 0
-        loaded_models = 0
-        locked_models = 0
-        for model_info in self._cached_models.values():
-            cached_models += 1
-            if model_info.loaded:
-                loaded_models += 1
-            if model_info.locked:
-                locked_models += 1
+        with self._lock:
+            ram = "%4.2fG" % (self._cache_bytes / GIG)
+            mapped = "%4.2fG" % (self._mapped_bytes / GIG)
+            vram_models = "%4.2fG" % (self._vram_bytes / GIG)
+            cached_models = len(self._cached_models)
+            loaded_models = len(self._vram_models)
+            locked_models = self._locked_models
 
         self.logger.debug(
-            f"Current VRAM/RAM usage: {vram}/{ram}; cached_models/loaded_models/locked_models/ ="
-            f" {cached_models}/{loaded_models}/{locked_models}"
+            f"Current VRAM/RAM usage: {vram}/{ram} ({vram_models} of models in VRAM, {mapped} of RAM memory-mapped);"
+            f" cached_models/loaded_models/locked_models/ = {cached_models}/{loaded_models}/{locked_models}"
         )
 
     def _cache_size(self) -> int:
-        return sum([m.size for m in self._cached_models.values()])
+        return self._cache_bytes
+
+    def _reserved_size(self) -> int:
+        """Returns the size of the cached models and of the models being loaded. Must be called with the lock held."""
+        return self._cache_bytes + self._pending_bytes
 
     def _make_cache_room(self, model_size):
+        """Evicts models until there is room for a model of the given size. Must be called with the lock held."""
         # calculate how much memory this model will require
         # multiplier = 2 if self.precision==torch.float32 else 1
         bytes_needed = model_size
         maximum_size = self.max_cache_size * GIG  # stored in GB, convert to bytes
-        current_size = self._cache_size()
+        current_size = self._reserved_size()
 
         if current_size + bytes_needed > maximum_size:
             self.logger.debug(
@@ -439,87 +709,60 @@ class ModelCache(object):
 
         self.logger.debug(f"Before unloading: cached_models={len(self._cached_models)}")
 
-        pos = 0
-        models_cleared = 0
-        while current_size + bytes_needed > maximum_size and pos < len(self._cache_stack):
-            model_key = self._cache_stack[pos]
+        # Walk the models in the order of the eviction policy, until there is enough room. Models whose lockers are
+        # alive may still be used by their callers, and are kept.
+        evicted: List[str] = []
+        for model_key in self._policy.eviction_order():
             cache_entry = self._cached_models[model_key]
-
-            refs = sys.getrefcount(cache_entry.model)
-
-            # HACK: This is a workaround for a memory-management issue that we haven't tracked down yet. We are directly
-            # going against the advice in the Python docs by using `gc.get_referrers(...)` in this way:
-            # https://docs.python.org/3/library/gc.html#gc.get_referrers
-
-            # manualy clear local variable references of just finished function calls
-            # for some reason python don't want to collect it even by gc.collect() immidiately
-            if refs > 2:
-                while True:
-                    cleared = False
-                    for referrer in gc.get_referrers(cache_entry.model):
-                        if type(referrer).__name__ == "frame":
-                            # RuntimeError: cannot clear an executing frame
-                            with suppress(RuntimeError):
-                                referrer.clear()
-                                cleared = True
-                                # break
-
-                    # repeat if referrers changes(due to frame clear), else exit loop
-                    if cleared:
-                        gc.collect()
-                    else:
-                        break
-
-            device = cache_entry.model.device if hasattr(cache_entry.model, "device") else None
-            self.logger.debug(
-                f"Model: {model_key}, locks: {cache_entry._locks}, device: {device}, loaded: {cache_entry.loaded},"
-                f" refs: {refs}"
-            )
-
-            # Expected refs:
-            # 1 from cache_entry
-            # 1 from getrefcount function
-            # 1 from onnx runtime object
-            if not cache_entry.locked and refs <= (3 if "onnx" in model_key else 2):
-                self.logger.debug(
-                    f"Unloading model {model_key} to free {(model_size/GIG):.2f} GB (-{(cache_entry.size/GIG):.2f} GB)"
+            if current_size + bytes_needed <= maximum_size:
+                break
+            if cache_entry.locked:
+                self._log_eviction(model_key, cache_entry, False, "locked in VRAM", bytes_needed)
+            elif cache_entry.in_use:
+                self._log_eviction(model_key, cache_entry, False, "in use", bytes_needed)
+            else:
+                self._log_eviction(
+                    model_key, cache_entry, True, f"next to evict ({self.eviction_policy})", bytes_needed
                 )
+                evicted.append(model_key)
                 current_size -= cache_entry.size
-                models_cleared += 1
-                if self.stats:
-                    self.stats.cleared += 1
-                del self._cache_stack[pos]
-                del self._cached_models[model_key]
-                del cache_entry
 
-            else:
-                pos += 1
-
-        if models_cleared > 0:
-            # There would likely be some 'garbage' to be collected regardless of whether a model was cleared or not, but
-            # there is a significant time cost to calling `gc.collect()`, so we want to use it sparingly. (The time cost
-            # is high even if no garbage gets collected.)
-            #
-            # Calling gc.collect(...) when a model is cleared seems like a good middle-ground:
-            # - If models had to be cleared, it's a signal that we are close to our memory limit.
-            # - If models were cleared, there's a good chance that there's a significant amount of garbage to be
-            #   collected.
-            #
-            # Keep in mind that gc is only responsible for handling reference cycles. Most objects should be cleaned up
-            # immediately when their reference count hits 0.
-            gc.collect()
+        for model_key in evicted:
+            self._remove(model_key, evicted=True)
+            if self.stats:
+                self.stats.cleared += 1
 
-        torch.cuda.empty_cache()
-        if choose_torch_device() == torch.device("mps"):
-            mps.empty_cache()
+        if evicted:
+            # Models are only evicted when no locker refers to them anymore, so their memory is freed as soon as they
+            # are removed, without a garbage collection.
+            torch.cuda.empty_cache()
+            if choose_torch_device() == torch.device("mps"):
+                mps.empty_cache()
 
         self.logger.debug(f"After unloading: cached_models={len(self._cached_models)}")
 
+    def _log_eviction(
+        self, model_key: str, cache_entry: _CacheRecord, evicted: bool, reason: str, bytes_needed: int
+    ) -> None:
+        """Records an eviction decision. Must be called with the lock held."""
+        decision = EvictionDecision(
+            key=model_key, size=cache_entry.size, evicted=evicted, reason=reason, bytes_needed=bytes_needed
+        )
+        self._eviction_log.append(decision)
+        self.logger.debug(
+            f"{'Unloading' if evicted else 'Keeping'} model {model_key} ({reason}) to free"
+            f" {(bytes_needed/GIG):.2f} GB (-{(cache_entry.size/GIG):.2f} GB)"
+        )
+
     def _offload_unlocked_models(self, size_needed: int = 0):
+        """Moves unlocked models out of VRAM until it is within its budget. Must be called with the device lock held."""
         reserved = self.max_vram_cache_size * GIG
         vram_in_use = torch.cuda.memory_allocated()
         self.logger.debug(f"{(vram_in_use/GIG):.2f}GB VRAM used for models; max allowed={(reserved/GIG):.2f}GB")
-        for model_key, cache_entry in sorted(self._cached_models.items(), key=lambda x: x[1].size):
+        with self._lock:
+            # Only the models on the execution device are looked at, not the whole cache
+            cache_entries = sorted(self._vram_models.items(), key=lambda x: x[1].size)
+        for model_key, cache_entry in cache_entries:
             if vram_in_use <= reserved:
                 break
             if not cache_entry.locked and cache_entry.loaded:
@@ -0,0 +1,105 @@
+"""
+Eviction policies of the model cache, which decide which models are
+evicted first when the cache needs room for another model.
+
+   policy = get_eviction_policy("reload_cost")
+   policy.add(key, size, load_time)
+   policy.access(key)
+   for key in policy.eviction_order():
+       ...
+
+New policies are added to EVICTION_POLICIES, under the name used to
+select them with the `eviction_policy` setting.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, Type
+
+
+class EvictionPolicy(ABC):
+    """Orders the cached models from the first to the last to evict. The cache tells it when models are added,
+    accessed and removed. It is called with the cache lock held."""
+
+    @abstractmethod
+    def add(self, key: str, size: int, load_time: float) -> None:
+        """Called when a model was loaded into the cache, `load_time` seconds after it was requested"""
+        pass
+
+    @abstractmethod
+    def access(self, key: str) -> None:
+        """Called when a cached model is requested"""
+        pass
+
+    @abstractmethod
+    def remove(self, key: str, evicted: bool) -> None:
+        """Called when a model is removed from the cache, either evicted to make room or uncached"""
+        pass
+
+    @abstractmethod
+    def eviction_order(self) -> Iterable[str]:
+        """Returns the keys of the cached models, from the first to the last to evict"""
+        pass
+
+
+class LRUEvictionPolicy(EvictionPolicy):
+    """Evicts the least recently used models first"""
+
+    def __init__(self):
+        self._keys: OrderedDict[str, None] = OrderedDict()
+
+    def add(self, key: str, size: int, load_time: float) -> None:
+        self._keys[key] = None
+
+    def access(self, key: str) -> None:
+        self._keys.move_to_end(key)
+
+    def remove(self, key: str, evicted: bool) -> None:
+        self._keys.pop(key, None)
+
+    def eviction_order(self) -> Iterable[str]:
+        return self._keys
+
+
+class ReloadCostEvictionPolicy(EvictionPolicy):
+    """Evicts the models that are the quickest to load again per byte of cache they take, among the least recently
+    used ones. This is the GreedyDual-Size algorithm, with the measured load time of each model as its cost.
+
+    Every model has a priority of `inflation + load_time / size` when it is added or accessed, and the model with the
+    lowest priority is evicted first. The inflation rises to the priority of each evicted model, so models that were
+    not accessed for a while are eventually evicted, however long they take to load.
+    """
+
+    def __init__(self):
+        self._inflation = 0.0
+        self._costs: Dict[str, float] = {}
+        self._priorities: Dict[str, float] = {}
+
+    def add(self, key: str, size: int, load_time: float) -> None:
+        self._costs[key] = load_time / max(size, 1)
+        self._priorities[key] = self._inflation + self._costs[key]
+
+    def access(self, key: str) -> None:
+        self._priorities[key] = self._inflation + self._costs[key]
+
+    def remove(self, key: str, evicted: bool) -> None:
+        priority = self._priorities.pop(key, None)
+        self._costs.pop(key, None)
+        if evicted and priority is not None:
+            self._inflation = max(self._inflation, priority)
+
+    def eviction_order(self) -> Iterable[str]:
+        # Only sorted when the cache needs room, which is when a model is read from disk
+        return sorted(self._priorities, key=self._priorities.__getitem__)
+
+
+EVICTION_POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    "lru": LRUEvictionPolicy,
+    "reload_cost": ReloadCostEvictionPolicy,
+}
+
+
+def get_eviction_policy(name: str) -> EvictionPolicy:
+    if name not in EVICTION_POLICIES:
+        raise ValueError(f"Unknown eviction policy '{name}', expected one of {', '.join(EVICTION_POLICIES)}")
+    return EVICTION_POLICIES[name]()
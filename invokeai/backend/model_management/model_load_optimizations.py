@@ -1,3 +1,4 @@
+import threading
 from contextlib import contextmanager
 
 import torch
@@ -7,6 +8,13 @@ def _no_op(*args, **kwargs):
     pass
 
 
+# Models may be loaded by several threads at once. The layers are patched when the first of them enters the context
+# manager and restored when the last one exits, so one thread does not restore the patched functions of another.
+_patch_lock = threading.Lock()
+_patch_depth = 0
+_saved_functions: list = []
+
+
 @contextmanager
 def skip_torch_weight_init():
     """A context manager that monkey-patches several of the common torch layers (torch.nn.Linear, torch.nn.Conv1d, etc.)
@@ -17,14 +25,21 @@ def skip_torch_weight_init():
     completely unnecessary if the intent is to load checkpoint weights from disk for the layer. This context manager
     monkey-patches common torch layers to skip the weight initialization step.
     """
+    global _patch_depth, _saved_functions
     torch_modules = [torch.nn.Linear, torch.nn.modules.conv._ConvNd, torch.nn.Embedding]
-    saved_functions = [m.reset_parameters for m in torch_modules]
 
-    try:
-        for torch_module in torch_modules:
-            torch_module.reset_parameters = _no_op
+    with _patch_lock:
+        if _patch_depth == 0:
+            _saved_functions = [m.reset_parameters for m in torch_modules]
+            for torch_module in torch_modules:
+                torch_module.reset_parameters = _no_op
+        _patch_depth += 1
 
+    try:
         yield None
     finally:
-        for torch_module, saved_function in zip(torch_modules, saved_functions, strict=True):
-            torch_module.reset_parameters = saved_function
+        with _patch_lock:
+            _patch_depth -= 1
+            if _patch_depth == 0:
+                for torch_module, saved_function in zip(torch_modules, _saved_functions, strict=True):
+                    torch_module.reset_parameters = saved_function
@@ -229,14 +229,13 @@ the root is the InvokeAI ROOTDIR.
 """
 from __future__ import annotations
 
-import hashlib
 import os
 import textwrap
 import types
 from dataclasses import dataclass
 from pathlib import Path
 from shutil import move, rmtree
-from typing import Callable, Dict, List, Literal, Optional, Set, Tuple, Union, cast
+from typing import Callable, Dict, List, Literal, Optional, Set, Tuple, Type, Union, cast
 
 import torch
 import yaml
@@ -248,6 +247,7 @@ import invokeai.backend.util.logging as logger
 from invokeai.app.services.config import InvokeAIAppConfig
 from invokeai.backend.util import CUDA_DEVICE, Chdir
 
+from .convert_cache import ConvertCache
 from .model_cache import ModelCache, ModelLocker
 from .model_search import ModelSearch
 from .models import (
@@ -352,6 +352,13 @@ class ModelManager(object):
             sequential_offload=sequential_offload,
             logger=logger,
             log_memory_usage=self.app_config.log_memory_usage,
+            eviction_policy=self.app_config.eviction_policy,
+            trace_path=self.app_config.cache_trace_path,
+        )
+        self.convert_cache = ConvertCache(
+            cache_path=self.resolve_model_path(".cache"),
+            max_size=self.app_config.convert_cache,
+            logger=logger,
         )
 
         self._read_models(config)
@@ -435,9 +442,6 @@ class ModelManager(object):
 
         return (model_name, base_model, model_type)
 
-    def _get_model_cache_path(self, model_path):
-        return self.resolve_model_path(Path(".cache") / hashlib.md5(str(model_path).encode()).hexdigest())
-
     @classmethod
     def initialize_model_config(cls, config_path: Path):
         """Create empty config file"""
@@ -460,6 +464,65 @@ class ModelManager(object):
                the model to retrieve (e.g. ModelType.Vae)
         """
         model_key = self.create_key(model_name, base_model, model_type)
+        model_path, model_class, model_type, submodel_type = self._resolve_model(
+            model_name, base_model, model_type, submodel_type
+        )
+
+        model_context = self.cache.get_model(
+            model_path=model_path,
+            model_class=model_class,
+            base_model=base_model,
+            model_type=model_type,
+            submodel=submodel_type,
+        )
+        return self._get_model_info(
+            model_key, model_name, base_model, model_type, submodel_type, model_path, model_context
+        )
+
+    def prefetch_model(
+        self,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel_type: Optional[SubModelType] = None,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ) -> Optional[ModelInfo]:
+        """Load a model into the RAM cache ahead of its use, if it fits
+        in the free room of the cache. Return an ModelInfo object
+        describing it if it was loaded, or None if it was already
+        cached or does not fit.
+        :param on_load_started: called before the model is read from disk
+        """
+        model_key = self.create_key(model_name, base_model, model_type)
+        model_path, model_class, model_type, submodel_type = self._resolve_model(
+            model_name, base_model, model_type, submodel_type
+        )
+
+        model_context = self.cache.prefetch_model(
+            model_path=model_path,
+            model_class=model_class,
+            base_model=base_model,
+            model_type=model_type,
+            submodel=submodel_type,
+            on_load_started=on_load_started,
+        )
+        if model_context is None:
+            return None
+        return self._get_model_info(
+            model_key, model_name, base_model, model_type, submodel_type, model_path, model_context
+        )
+
+    def _resolve_model(
+        self,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel_type: Optional[SubModelType],
+    ) -> Tuple[Path, Type[ModelBase], ModelType, Optional[SubModelType]]:
+        """Find the files of a model, converting them if required, and the
+        class that loads them. Submodels that override the main model's
+        files are returned as a model of their own type."""
+        model_key = self.create_key(model_name, base_model, model_type)
 
         if not self.model_exists(model_name, base_model, model_type, rescan=True):
             raise ModelNotFoundException(f"Model not found - {model_key}")
@@ -483,25 +546,49 @@ class ModelManager(object):
                 self.models.pop(model_key, None)
                 raise ModelNotFoundException(f'Files for model "{model_key}" not found at {model_path}')
 
-        # TODO: path
-        # TODO: is it accurate to use path as id
-        dst_convert_path = self._get_model_cache_path(model_path)
+        if model_class.requires_conversion(str(model_path), model_config):
+            checkpoint_path = model_path
+            model_path = self.convert_cache.get(
+                checkpoint_path,
+                settings={
+                    "base_model": base_model,
+                    "model_type": model_type,
+                    "config": model_config.model_dump(mode="json", exclude={"path", "description", "error"}),
+                },
+                convert=lambda output_path: model_class.convert_if_required(
+                    base_model=base_model,
+                    model_path=str(checkpoint_path),
+                    output_path=str(output_path),
+                    config=model_config,
+                ),
+            )
+        else:
+            # Models that don't require conversion are not written anywhere
+            model_path = model_class.convert_if_required(
+                base_model=base_model,
+                model_path=str(model_path),  # TODO: refactor str/Path types logic
+                output_path="",
+                config=model_config,
+            )
+        return model_path, model_class, model_type, submodel_type
 
-        model_path = model_class.convert_if_required(
-            base_model=base_model,
-            model_path=str(model_path),  # TODO: refactor str/Path types logic
-            output_path=dst_convert_path,
-            config=model_config,
-        )
-
-        model_context = self.cache.get_model(
-            model_path=model_path,
-            model_class=model_class,
-            base_model=base_model,
-            model_type=model_type,
-            submodel=submodel_type,
-        )
+    def cache_converted_model(self, model_name: str, base_model: BaseModelType, model_type: ModelType) -> None:
+        """Convert a checkpoint model into the conversion cache, if it
+        requires conversion, without loading it. This saves the time of
+        the conversion when the model is first used."""
+        self._resolve_model(model_name, base_model, model_type, None)
 
+    def _get_model_info(
+        self,
+        model_key: str,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel_type: Optional[SubModelType],
+        model_path: Path,
+        model_context: ModelLocker,
+    ) -> ModelInfo:
+        """Describe a model the cache returned"""
         if model_key not in self.cache_keys:
             self.cache_keys[model_key] = set()
         self.cache_keys[model_key].add(model_context.key)
@@ -682,9 +769,7 @@ class ModelManager(object):
 
         # if model inside invoke models folder - delete files
         model_path = self.resolve_model_path(model_cfg.path)
-        cache_path = self._get_model_cache_path(model_path)
-        if cache_path.exists():
-            rmtree(str(cache_path))
+        self.convert_cache.uncache(model_path)
 
         if model_path.is_relative_to(self.app_config.models_path):
             if model_path.is_dir():
@@ -728,13 +813,7 @@ class ModelManager(object):
             # TODO: if path changed and old_model.path inside models folder should we delete this too?
 
             # remove conversion cache as config changed
-            old_model_path = self.resolve_model_path(old_model.path)
-            old_model_cache = self._get_model_cache_path(old_model_path)
-            if old_model_cache.exists():
-                if old_model_cache.is_dir():
-                    rmtree(str(old_model_cache))
-                else:
-                    old_model_cache.unlink()
+            self.convert_cache.uncache(self.resolve_model_path(old_model.path))
 
             # remove in-memory cache
             # note: it not guaranteed to release memory(model can has other references)
@@ -791,14 +870,7 @@ class ModelManager(object):
             move(old_path, new_path)
             model_cfg.path = str(new_path.relative_to(self.app_config.models_path))
 
-        # clean up caches
-        old_model_cache = self._get_model_cache_path(old_path)
-        if old_model_cache.exists():
-            if old_model_cache.is_dir():
-                rmtree(str(old_model_cache))
-            else:
-                old_model_cache.unlink()
-
+        # clean up caches. Conversions are keyed by the content of the checkpoint, and are still valid.
         cache_ids = self.cache_keys.pop(model_key, [])
         for cache_id in cache_ids:
             self.cache.uncache_model(cache_id)
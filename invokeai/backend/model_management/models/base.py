@@ -1,5 +1,6 @@
 import inspect
 import json
+import mmap
 import os
 import sys
 import typing
@@ -8,18 +9,20 @@ from abc import ABCMeta, abstractmethod
 from contextlib import suppress
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, Generic, List, Literal, Optional, Type, TypeVar, Union
+from typing import Any, Callable, Dict, Generic, List, Literal, Optional, Tuple, Type, TypeVar, Union
 
 import numpy as np
 import onnx
 import safetensors.torch
 import torch
-from diffusers import ConfigMixin, DiffusionPipeline
+from accelerate import init_empty_weights
+from diffusers import ConfigMixin, DiffusionPipeline, ModelMixin
 from diffusers import logging as diffusers_logging
 from onnx import numpy_helper
 from onnxruntime import InferenceSession, SessionOptions, get_available_providers
 from picklescan.scanner import scan_file_path
 from pydantic import BaseModel, ConfigDict, Field
+from transformers import PreTrainedModel
 from transformers import logging as transformers_logging
 
 
@@ -238,6 +241,15 @@ class ModelBase(metaclass=ABCMeta):
     ) -> Any:
         raise NotImplementedError()
 
+    def get_mapped_size(self, child_type: Optional[SubModelType] = None) -> int:
+        """Returns how many bytes of the loaded model are memory-mapped from its files rather than in private memory"""
+        return 0
+
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        """Returns whether convert_if_required() converts the model, writing it to its output path"""
+        return False
+
 
 class DiffusersModel(ModelBase):
     # child_types: Dict[str, Type]
@@ -248,6 +260,7 @@ class DiffusersModel(ModelBase):
 
         self.child_types: Dict[str, Type] = {}
         self.child_sizes: Dict[str, int] = {}
+        self.child_mapped_sizes: Dict[str, int] = {}
 
         try:
             config_data = DiffusionPipeline.load_config(self.model_path)
@@ -271,6 +284,12 @@ class DiffusersModel(ModelBase):
         else:
             return self.child_sizes[child_type]
 
+    def get_mapped_size(self, child_type: Optional[SubModelType] = None) -> int:
+        if child_type is None:
+            return sum(self.child_mapped_sizes.values())
+        else:
+            return self.child_mapped_sizes.get(child_type, 0)
+
     def get_model(
         self,
         torch_dtype: Optional[torch.dtype],
@@ -290,6 +309,17 @@ class DiffusersModel(ModelBase):
         # TODO: better error handling(differentiate not found from others)
         for variant in variants:
             try:
+                # Safetensors weights are memory-mapped instead of read into private memory
+                loaded = load_pretrained_mmap(
+                    self.child_types[child_type],
+                    Path(self.model_path, child_type.value),
+                    torch_dtype=torch_dtype,
+                    variant=variant,
+                )
+                if loaded is not None:
+                    model, self.child_mapped_sizes[child_type] = loaded
+                    break
+
                 # TODO: set cache_dir to /dev/null to be sure that cache not used?
                 model = self.child_types[child_type].from_pretrained(
                     self.model_path,
@@ -298,6 +328,7 @@ class DiffusersModel(ModelBase):
                     variant=variant,
                     local_files_only=True,
                 )
+                self.child_mapped_sizes[child_type] = 0
                 break
             except Exception as e:
                 if not str(e).startswith("Error no file"):
@@ -412,38 +443,156 @@ def _calc_onnx_model_by_data(model) -> int:
     return mem
 
 
+SAFETENSORS_DTYPES = {
+    "BOOL": torch.bool,
+    "U8": torch.uint8,
+    "I8": torch.int8,
+    "I16": torch.int16,
+    "I32": torch.int32,
+    "I64": torch.int64,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "F32": torch.float32,
+    "F64": torch.float64,
+}
+
+# Names of the weights files of diffusers and transformers models
+WEIGHTS_NAMES = ["diffusion_pytorch_model", "model"]
+
+
+def _read_safetensors_header(file) -> Tuple[Dict[str, Any], int]:
+    """Returns the tensor definitions of an open safetensors file, and the offset of the tensor data"""
+    definition_len = int.from_bytes(file.read(8), "little")
+    definition = json.loads(file.read(definition_len))
+    if "__metadata__" in definition and definition["__metadata__"].get("format", "pt") not in {
+        "pt",
+        "torch",
+        "pytorch",
+    }:
+        raise Exception("Supported only pytorch safetensors files")
+    definition.pop("__metadata__", None)
+    return definition, 8 + definition_len
+
+
 def _fast_safetensors_reader(path: str):
     checkpoint = {}
     device = torch.device("meta")
     with open(path, "rb") as f:
-        definition_len = int.from_bytes(f.read(8), "little")
-        definition_json = f.read(definition_len)
-        definition = json.loads(definition_json)
-
-        if "__metadata__" in definition and definition["__metadata__"].get("format", "pt") not in {
-            "pt",
-            "torch",
-            "pytorch",
-        }:
-            raise Exception("Supported only pytorch safetensors files")
-        definition.pop("__metadata__", None)
+        definition, _ = _read_safetensors_header(f)
 
         for key, info in definition.items():
-            dtype = {
-                "I8": torch.int8,
-                "I16": torch.int16,
-                "I32": torch.int32,
-                "I64": torch.int64,
-                "F16": torch.float16,
-                "F32": torch.float32,
-                "F64": torch.float64,
-            }[info["dtype"]]
-
+            dtype = SAFETENSORS_DTYPES[info["dtype"]]
             checkpoint[key] = torch.empty(info["shape"], dtype=dtype, device=device)
 
     return checkpoint
 
 
+def load_safetensors_mmap(path: Union[str, Path]) -> Dict[str, torch.Tensor]:
+    """Reads the tensors of a safetensors file without copying them.
+
+    The tensors are views of a copy-on-write memory map of the file, so their pages are read on first use, backed by
+    the OS page cache and shared with the other processes mapping the file. Writing to a tensor copies the pages it
+    writes to into private memory. Tensors whose data is not aligned for their dtype are copied.
+    """
+    with open(path, "rb") as f:
+        definition, data_offset = _read_safetensors_header(f)
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    tensors: Dict[str, torch.Tensor] = {}
+    for key, info in definition.items():
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if begin == end:
+            tensors[key] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        offset = data_offset + begin
+        if offset % dtype.itemsize == 0:
+            tensor = torch.frombuffer(buffer, dtype=dtype, count=(end - begin) // dtype.itemsize, offset=offset)
+        else:
+            tensor = torch.frombuffer(bytearray(buffer[offset : data_offset + end]), dtype=dtype)
+        tensors[key] = tensor.reshape(info["shape"])
+    return tensors
+
+
+def _add_variant(weights_name: str, variant: Optional[str]) -> str:
+    if variant is None:
+        return weights_name
+    parts = weights_name.split(".")
+    return ".".join(parts[:-1] + [variant, parts[-1]])
+
+
+def _find_safetensors_files(model_path: Path, variant: Optional[str]) -> Optional[List[Path]]:
+    """Returns the safetensors files of the weights of a diffusers or transformers model, or None if its weights are
+    in another format"""
+    for weights_name in WEIGHTS_NAMES:
+        weights_path = model_path / _add_variant(f"{weights_name}.safetensors", variant)
+        if weights_path.is_file():
+            return [weights_path]
+        index_path = model_path / _add_variant(f"{weights_name}.safetensors.index.json", variant)
+        if index_path.is_file():
+            with open(index_path, "r") as f:
+                weight_map = json.load(f)["weight_map"]
+            return [model_path / file for file in sorted(set(weight_map.values()))]
+    return None
+
+
+def load_pretrained_mmap(
+    model_class: Type,
+    model_path: Path,
+    torch_dtype: Optional[torch.dtype],
+    variant: Optional[str] = None,
+) -> Optional[Tuple[torch.nn.Module, int]]:
+    """Loads a diffusers or transformers model whose weights are safetensors files, with memory-mapped weights (see
+    load_safetensors_mmap). Weights already in `torch_dtype` stay mapped, the others are converted into private memory.
+
+    Returns the model and how many bytes of it are mapped, or None if the model can't be loaded this way and should be
+    loaded with from_pretrained(): its weights are in another format, or don't match the model.
+    """
+    weights_files = _find_safetensors_files(model_path, variant)
+    if weights_files is None:
+        return None
+
+    with init_empty_weights():
+        if issubclass(model_class, ModelMixin):
+            config, unused_kwargs = model_class.load_config(model_path, return_unused_kwargs=True)
+            model = model_class.from_config(config, **unused_kwargs)
+        elif issubclass(model_class, PreTrainedModel):
+            model = model_class(model_class.config_class.from_pretrained(model_path))
+        else:
+            return None
+
+    state_dict: Dict[str, torch.Tensor] = {}
+    for weights_file in weights_files:
+        state_dict.update(load_safetensors_mmap(weights_file))
+    converted = set()
+    for key, tensor in state_dict.items():
+        if torch_dtype is not None and tensor.is_floating_point() and tensor.dtype != torch_dtype:
+            state_dict[key] = tensor.to(torch_dtype)
+            converted.add(key)
+
+    result = model.load_state_dict(state_dict, strict=False, assign=True)
+    if isinstance(model, PreTrainedModel):
+        model.tie_weights()
+
+    # Weights of a format from_pretrained() converts, such as the deprecated attention blocks of diffusers
+    buffers = {name for name, _ in model.named_buffers()}
+    if any(key not in buffers for key in result.unexpected_keys):
+        return None
+    if any(param.device.type == "meta" for param in model.parameters()):
+        return None
+
+    if torch_dtype is not None:
+        model.to(torch_dtype)
+    if isinstance(model, ModelMixin):
+        model.register_to_config(_name_or_path=str(model_path))
+    model.eval()
+    unexpected = set(result.unexpected_keys)
+    mapped_size = sum(
+        tensor.nbytes for key, tensor in state_dict.items() if key not in converted and key not in unexpected
+    )
+    return model, mapped_size
+
+
 def read_checkpoint_meta(path: Union[str, Path], scan: bool = False):
     if str(path).endswith(".safetensors"):
         try:
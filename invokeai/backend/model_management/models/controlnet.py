@@ -109,6 +109,10 @@ class ControlNetModel(ModelBase):
 
         raise InvalidModelException(f"Not a valid model: {path}")
 
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        return cls.detect_format(model_path) == ControlNetModelFormat.Checkpoint
+
     @classmethod
     def convert_if_required(
         cls,
@@ -117,7 +121,7 @@ class ControlNetModel(ModelBase):
         config: ModelConfigBase,
         base_model: BaseModelType,
     ) -> str:
-        if cls.detect_format(model_path) == ControlNetModelFormat.Checkpoint:
+        if cls.requires_conversion(model_path, config):
             return _convert_controlnet_ckpt_and_cache(
                 model_path=model_path,
                 model_config=config.config,
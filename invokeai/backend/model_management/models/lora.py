@@ -451,6 +451,9 @@ class LoRAModelRaw:  # (torch.nn.Module):
     ):
         self._name = name
         self.layers = layers
+        # The keys of the modules the layers patch, by layer key, for each model architecture and key prefix the LoRA
+        # was applied with. See ModelPatcher.
+        self.key_index: Dict[Tuple[int, str], Dict[str, str]] = {}
 
     @property
     def name(self):
@@ -105,6 +105,10 @@ class StableDiffusionXLModel(DiffusersModel):
         else:
             return StableDiffusionXLModelFormat.Checkpoint
 
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        return isinstance(config, cls.CheckpointConfig)
+
     @classmethod
     def convert_if_required(
         cls,
@@ -116,7 +120,7 @@ class StableDiffusionXLModel(DiffusersModel):
         # The convert script adapted from the diffusers package uses
         # strings for the base model type. To avoid making too many
         # source code changes, we simply translate here
-        if isinstance(config, cls.CheckpointConfig):
+        if cls.requires_conversion(model_path, config):
             from invokeai.backend.model_management.models.stable_diffusion import _convert_ckpt_and_cache
 
             return _convert_ckpt_and_cache(
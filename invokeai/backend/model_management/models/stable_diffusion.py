@@ -115,6 +115,10 @@ class StableDiffusion1Model(DiffusersModel):
 
         raise InvalidModelException(f"Not a valid model: {model_path}")
 
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        return isinstance(config, cls.CheckpointConfig)
+
     @classmethod
     def convert_if_required(
         cls,
@@ -123,7 +127,7 @@ class StableDiffusion1Model(DiffusersModel):
         config: ModelConfigBase,
         base_model: BaseModelType,
     ) -> str:
-        if isinstance(config, cls.CheckpointConfig):
+        if cls.requires_conversion(model_path, config):
             return _convert_ckpt_and_cache(
                 version=BaseModelType.StableDiffusion1,
                 model_config=config,
@@ -226,6 +230,10 @@ class StableDiffusion2Model(DiffusersModel):
 
         raise InvalidModelException(f"Not a valid model: {model_path}")
 
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        return isinstance(config, cls.CheckpointConfig)
+
     @classmethod
     def convert_if_required(
         cls,
@@ -234,7 +242,7 @@ class StableDiffusion2Model(DiffusersModel):
         config: ModelConfigBase,
         base_model: BaseModelType,
     ) -> str:
-        if isinstance(config, cls.CheckpointConfig):
+        if cls.requires_conversion(model_path, config):
             return _convert_ckpt_and_cache(
                 version=BaseModelType.StableDiffusion2,
                 model_config=config,
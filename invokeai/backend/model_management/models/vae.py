@@ -94,6 +94,10 @@ class VaeModel(ModelBase):
 
         raise InvalidModelException(f"Not a valid model: {path}")
 
+    @classmethod
+    def requires_conversion(cls, model_path: str, config: ModelConfigBase) -> bool:
+        return cls.detect_format(model_path) == VaeModelFormat.Checkpoint
+
     @classmethod
     def convert_if_required(
         cls,
@@ -102,7 +106,7 @@ class VaeModel(ModelBase):
         config: ModelConfigBase,  # empty config or config of parent model
         base_model: BaseModelType,
     ) -> str:
-        if cls.detect_format(model_path) == VaeModelFormat.Checkpoint:
+        if cls.requires_conversion(model_path, config):
             return _convert_vae_ckpt_and_cache(
                 weights_path=model_path,
                 output_path=output_path,
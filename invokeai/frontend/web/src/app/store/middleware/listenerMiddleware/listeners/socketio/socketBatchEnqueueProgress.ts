@@ -0,0 +1,50 @@
+import { createStandaloneToast } from '@chakra-ui/react';
+import { logger } from 'app/logging/logger';
+import { t } from 'i18next';
+import { queueApi } from 'services/api/endpoints/queue';
+import {
+  appSocketBatchEnqueueProgress,
+  socketBatchEnqueueProgress,
+} from 'services/events/actions';
+import { TOAST_OPTIONS, theme } from 'theme/theme';
+import { startAppListening } from '../..';
+
+const { toast } = createStandaloneToast({
+  theme: theme,
+  defaultOptions: TOAST_OPTIONS.defaultOptions,
+});
+
+export const addSocketBatchEnqueueProgressEventListener = () => {
+  startAppListening({
+    actionCreator: socketBatchEnqueueProgress,
+    effect: (action, { dispatch }) => {
+      const log = logger('socketio');
+      const { batch_id, enqueued, total } = action.payload.data;
+      log.debug(
+        action.payload,
+        `Batch enqueue progress: ${batch_id} (${enqueued}/${total})`
+      );
+
+      // The first items of the batch may already be processed
+      dispatch(
+        queueApi.util.invalidateTags(['SessionQueueStatus', 'BatchStatus'])
+      );
+
+      const description = t('queue.batchQueueingDesc', { enqueued, total });
+      if (toast.isActive('batch-queueing')) {
+        toast.update('batch-queueing', { description });
+      } else {
+        toast({
+          id: 'batch-queueing',
+          title: t('queue.batchQueueing'),
+          description,
+          duration: 1000,
+          status: 'info',
+        });
+      }
+
+      // pass along the socket event as an application action
+      dispatch(appSocketBatchEnqueueProgress(action.payload));
+    },
+  });
+};
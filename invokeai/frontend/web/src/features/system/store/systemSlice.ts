@@ -154,11 +154,18 @@ export const systemSlice = createSlice({
       state.status = 'CONNECTED';
     });
 
-    builder.addCase(appSocketModelLoadStarted, (state) => {
+    builder.addCase(appSocketModelLoadStarted, (state, action) => {
+      // Prefetches load models for pending queue items, while the current one keeps processing
+      if (action.payload.data.prefetch) {
+        return;
+      }
       state.status = 'LOADING_MODEL';
     });
 
-    builder.addCase(appSocketModelLoadCompleted, (state) => {
+    builder.addCase(appSocketModelLoadCompleted, (state, action) => {
+      if (action.payload.data.prefetch) {
+        return;
+      }
       state.status = 'CONNECTED';
     });
 
@@ -409,6 +409,13 @@ export type paths = {
      */
     get: operations["get_invocation_cache_status"];
   };
+  "/api/v1/app/image_cache/status": {
+    /**
+     * Get Image Cache Status
+     * @description Gets the status of the in-memory cache of decoded images
+     */
+    get: operations["get_image_cache_status"];
+  };
   "/api/v1/queue/{queue_id}/enqueue_batch": {
     /**
      * Enqueue Batch
@@ -3747,6 +3754,11 @@ export type components = {
        * @description The set of node ids that have been executed
        */
       executed: string[];
+      /**
+       * Executing
+       * @description The set of prepared node ids that have been handed out for execution and are not complete yet
+       */
+      executing: string[];
       /**
        * Executed History
        * @description The list of node ids that have been executed, in order of execution
@@ -4522,6 +4534,39 @@ export type components = {
        */
       board_id?: string | null;
     };
+    /** ImageFileCacheStatus */
+    ImageFileCacheStatus: {
+      /**
+       * Size
+       * @description The number of images in the cache
+       */
+      size: number;
+      /**
+       * Hits
+       * @description The number of cache hits
+       */
+      hits: number;
+      /**
+       * Misses
+       * @description The number of cache misses
+       */
+      misses: number;
+      /**
+       * Pinned
+       * @description The number of cached images pinned by sessions
+       */
+      pinned: number;
+      /**
+       * Size In Bytes
+       * @description The size of the decoded images in the cache, in bytes
+       */
+      size_in_bytes: number;
+      /**
+       * Max Size In Bytes
+       * @description The maximum size of the decoded images in the cache, in bytes
+       */
+      max_size_in_bytes: number;
+    };
     /**
      * ImageField
      * @description An image primitive field
@@ -5408,6 +5453,16 @@ export type components = {
        * @description The maximum size of the invocation cache
        */
       max_size: number;
+      /**
+       * Size In Bytes
+       * @description The size of the cached outputs in bytes, if the cache tracks it
+       */
+      size_in_bytes?: number | null;
+      /**
+       * Max Size In Bytes
+       * @description The maximum size of the cached outputs in bytes, if the cache tracks it
+       */
+      max_size_in_bytes?: number | null;
     };
     /**
      * IterateInvocation
@@ -8667,6 +8722,24 @@ export type components = {
        */
       type: "segment_anything_processor";
     };
+    /** SessionProcessorLaneStatus */
+    SessionProcessorLaneStatus: {
+      /**
+       * Lane
+       * @description The index of the lane
+       */
+      lane: number;
+      /**
+       * Queue Item Id
+       * @description The id of the queue item being processed, if any
+       */
+      queue_item_id?: number | null;
+      /**
+       * Session Id
+       * @description The id of the session being processed, if any
+       */
+      session_id?: string | null;
+    };
     /** SessionProcessorStatus */
     SessionProcessorStatus: {
       /**
@@ -8679,6 +8752,11 @@ export type components = {
        * @description Whether a session is being processed
        */
       is_processing: boolean;
+      /**
+       * Lanes
+       * @description The status of each of the session processor's lanes
+       */
+      lanes?: components["schemas"]["SessionProcessorLaneStatus"][];
     };
     /**
      * SessionQueueAndProcessorStatus
@@ -12268,6 +12346,20 @@ export type operations = {
       };
     };
   };
+  /**
+   * Get Image Cache Status
+   * @description Gets the status of the in-memory cache of decoded images
+   */
+  get_image_cache_status: {
+    responses: {
+      /** @description Successful Response */
+      200: {
+        content: {
+          "application/json": components["schemas"]["ImageFileCacheStatus"];
+        };
+      };
+    };
+  };
   /**
    * Enqueue Batch
    * @description Processes a batch and enqueues the output graphs for execution.
@@ -1,5 +1,6 @@
 import { createAction } from '@reduxjs/toolkit';
 import {
+  BatchEnqueueProgressEvent,
   GeneratorProgressEvent,
   GraphExecutionStateCompleteEvent,
   InvocationCompleteEvent,
@@ -232,3 +233,19 @@ export const socketQueueItemStatusChanged = createAction<{
 export const appSocketQueueItemStatusChanged = createAction<{
   data: QueueItemStatusChangedEvent;
 }>('socket/appSocketQueueItemStatusChanged');
+
+/**
+ * Socket.IO Batch Enqueue Progress
+ *
+ * Do not use. Only for use in middleware.
+ */
+export const socketBatchEnqueueProgress = createAction<{
+  data: BatchEnqueueProgressEvent;
+}>('socket/socketBatchEnqueueProgress');
+
+/**
+ * App-level Batch Enqueue Progress
+ */
+export const appSocketBatchEnqueueProgress = createAction<{
+  data: BatchEnqueueProgressEvent;
+}>('socket/appSocketBatchEnqueueProgress');
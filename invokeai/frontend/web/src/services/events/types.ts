@@ -35,6 +35,7 @@ export type ModelLoadStartedEvent = {
   base_model: BaseModelType;
   model_type: ModelType;
   submodel: SubModelType;
+  prefetch: boolean;
 };
 
 export type ModelLoadCompletedEvent = {
@@ -49,6 +50,7 @@ export type ModelLoadCompletedEvent = {
   hash?: string;
   location: string;
   precision: string;
+  prefetch: boolean;
 };
 
 /**
@@ -200,6 +202,18 @@ export type QueueItemStatusChangedEvent = {
   };
 };
 
+/**
+ * A `batch_enqueue_progress` socket.io event, emitted while a large batch is enqueued in chunks.
+ *
+ * @example socket.on('batch_enqueue_progress', (data: BatchEnqueueProgressEvent) => { ... }
+ */
+export type BatchEnqueueProgressEvent = {
+  queue_id: string;
+  batch_id: string;
+  enqueued: number;
+  total: number;
+};
+
 export type ClientEmitSubscribeQueue = {
   queue_id: string;
 };
@@ -221,6 +235,7 @@ export type ServerToClientEvents = {
   session_retrieval_error: (payload: SessionRetrievalErrorEvent) => void;
   invocation_retrieval_error: (payload: InvocationRetrievalErrorEvent) => void;
   queue_item_status_changed: (payload: QueueItemStatusChangedEvent) => void;
+  batch_enqueue_progress: (payload: BatchEnqueueProgressEvent) => void;
 };
 
 export type ClientToServerEvents = {
@@ -4,6 +4,7 @@ import { addToast } from 'features/system/store/systemSlice';
 import { makeToast } from 'features/system/util/makeToast';
 import { Socket } from 'socket.io-client';
 import {
+  socketBatchEnqueueProgress,
   socketConnected,
   socketDisconnected,
   socketGeneratorProgress,
@@ -155,4 +156,8 @@ export const setEventListeners = (arg: SetEventListenersArg) => {
   socket.on('queue_item_status_changed', (data) => {
     dispatch(socketQueueItemStatusChanged({ data }));
   });
+
+  socket.on('batch_enqueue_progress', (data) => {
+    dispatch(socketBatchEnqueueProgress({ data }));
+  });
 };
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the scheduling overhead of GraphExecutionState.
+
+Runs synthetic graphs of add/multiply nodes to completion with the incremental planner and with a reference
+implementation of the previous scheduler, which rebuilt networkx graphs and searched ancestors on every step.
+With --round-trip the state is serialized and re-parsed after every node, as the invocation processor does when it
+reads the session back from the database.
+"""
+
+import argparse
+import time
+from typing import Optional
+
+import networkx as nx
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation
+from invokeai.app.invocations.collections import RangeInvocation
+from invokeai.app.invocations.math import AddInvocation, MultiplyInvocation
+from invokeai.app.services.shared.graph import (
+    CollectInvocation,
+    Edge,
+    EdgeConnection,
+    Graph,
+    GraphExecutionState,
+    IterateInvocation,
+)
+
+
+class LegacyGraphExecutionState(GraphExecutionState):
+    """Node selection as done by the previous scheduler. Preparation of execution nodes is shared with the planner,
+    so this under-reports the previous cost, which also re-validated every new execution edge."""
+
+    def is_complete(self) -> bool:
+        return self.has_error() or all((k in self.executed for k in self.graph.nx_graph_flat().nodes))
+
+    def _prepare(self) -> Optional[str]:
+        g = self.graph.nx_graph_flat()
+        next_node_id = next(
+            (
+                n
+                for n in nx.topological_sort(g)
+                if n not in self.source_prepared_mapping
+                and not (
+                    isinstance(self.graph.get_node(n), IterateInvocation)
+                    and not all((e[0] in self.executed for e in g.in_edges(n)))
+                )
+                and not any(
+                    isinstance(self.graph.get_node(a), IterateInvocation) and a not in self.executed
+                    for a in nx.ancestors(g, n)
+                )
+            ),
+            None,
+        )
+        if next_node_id is None:
+            return None
+        # The selected node is the first unprepared node the planner would pick too, so let it create the nodes
+        return super()._prepare()
+
+    def _get_next_node(self) -> Optional[BaseInvocation]:
+        g = self.execution_graph.nx_graph()
+        next_node = next(
+            (
+                n
+                for n in nx.dfs_preorder_nodes(g)
+                if n not in self.executed and all((e[0] in self.executed for e in g.in_edges(n)))
+            ),
+            None,
+        )
+        return None if next_node is None else self.execution_graph.nodes[next_node]
+
+
+def create_edge(from_id: str, from_field: str, to_id: str, to_field: str) -> Edge:
+    return Edge(
+        source=EdgeConnection(node_id=from_id, field=from_field),
+        destination=EdgeConnection(node_id=to_id, field=to_field),
+    )
+
+
+def create_iterate_graph(size: int) -> Graph:
+    """range -> iterate -> multiply -> add -> collect, which prepares 3 nodes per iteration"""
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range", start=0, stop=max(0, (size - 2) // 3), step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_node(MultiplyInvocation(id="multiply", b=10))
+    graph.add_node(AddInvocation(id="add", b=1))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("range", "collection", "iterate", "collection"))
+    graph.add_edge(create_edge("iterate", "item", "multiply", "a"))
+    graph.add_edge(create_edge("multiply", "value", "add", "a"))
+    graph.add_edge(create_edge("add", "value", "collect", "item"))
+    return graph
+
+
+def create_fan_graph(size: int) -> Graph:
+    """Layers of 8 add nodes, where every node depends on two nodes of the previous layer"""
+    width = 8
+    nodes = {str(i): AddInvocation(id=str(i), a=1, b=1) for i in range(size)}
+    edges = []
+    for i in range(width, size):
+        layer_start = (i // width - 1) * width
+        edges.append(create_edge(str(layer_start + i % width), "value", str(i), "a"))
+        edges.append(create_edge(str(layer_start + (i + 1) % width), "value", str(i), "b"))
+    return Graph(nodes=nodes, edges=edges)
+
+
+def run_graph(state: GraphExecutionState, round_trip: bool) -> float:
+    """Runs a graph to completion, returning the time spent outside of the nodes themselves"""
+    elapsed = 0.0
+    start = time.perf_counter()
+    while not state.is_complete():
+        node = state.next()
+        assert node is not None
+        elapsed += time.perf_counter() - start
+        # None of the nodes used here need an invocation context
+        output = node.invoke(None)  # type: ignore
+        start = time.perf_counter()
+        state.complete(node.id, output)
+        if round_trip:
+            state = type(state).model_validate_json(state.model_dump_json())
+    return elapsed + time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphExecutionState scheduling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000, 2000])
+    parser.add_argument(
+        "--round-trip",
+        default=False,
+        action="store_true",
+        help="Serialize and re-parse the state after every node, like the invocation processor",
+    )
+    parser.add_argument(
+        "--max-legacy-size",
+        type=int,
+        default=2000,
+        help="Skip the previous scheduler for graphs larger than this",
+    )
+    args = parser.parse_args()
+
+    for name, create_graph in [("iterate", create_iterate_graph), ("fan", create_fan_graph)]:
+        for size in args.sizes:
+            graph = create_graph(size)
+            planner = run_graph(GraphExecutionState(graph=graph.model_copy(deep=True)), args.round_trip)
+            if size <= args.max_legacy_size:
+                legacy = run_graph(LegacyGraphExecutionState(graph=graph.model_copy(deep=True)), args.round_trip)
+                legacy_report = f"{legacy:8.3f}s ({legacy / planner:5.1f}x)"
+            else:
+                legacy_report = "skipped"
+            print(f"{name:>8} {size:>5} nodes: planner {planner:8.3f}s, previous {legacy_report}")
+
+
+if __name__ == "__main__":
+    main()
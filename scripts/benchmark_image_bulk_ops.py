@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the bulk image operations of the gallery: starring, unstarring and deleting a list of images.
+
+For each of --sizes, creates a database file and an output folder in a temporary folder, with that many images on a
+board, then stars, unstars and deletes them all, one image at a time as the API used to, and with the batch methods
+of the image service, which update and delete the records in a single transaction, trash the files in parallel and
+notify the deleted images at once.
+
+By default, the files are deleted instead of being moved to the trash of the user, which would fill it with the images
+of the benchmark. Use --trash to measure moving them to the trash.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Union
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+from invokeai.app.services.board_image_records.board_image_records_sqlite import SqliteBoardImageRecordStorage
+from invokeai.app.services.board_records.board_records_sqlite import SqliteBoardRecordStorage
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.image_files import image_files_disk
+from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+from invokeai.app.services.image_records.image_records_common import ImageRecordChanges
+from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
+from invokeai.app.services.images.images_default import ImageService
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.app.services.urls.urls_default import LocalUrlService
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+def create_images(tempdir: Path, count: int) -> tuple[ImageService, list[str]]:
+    """Creates an image service over a new database and output folder, with `count` images on a board"""
+    config = InvokeAIAppConfig(db_dir=tempdir / "databases")
+    logger = InvokeAILogger.get_logger(config=config)
+    image_files = DiskImageFileStorage(tempdir / "outputs")
+    db = init_db(config=config, logger=logger, image_files=image_files)
+    services = SimpleNamespace(
+        configuration=config,
+        logger=logger,
+        board_records=SqliteBoardRecordStorage(db=db),
+        board_image_records=SqliteBoardImageRecordStorage(db=db),
+        image_files=image_files,
+        image_records=SqliteImageRecordStorage(db=db),
+        urls=LocalUrlService(),
+    )
+    invoker = SimpleNamespace(services=services)
+    image_files.start(invoker)  # type: ignore
+    images = ImageService()
+    images.start(invoker)  # type: ignore
+    # The invocation cache is notified of the deleted images
+    images.on_deleted(MagicMock())
+
+    # The files are copies of a single image and thumbnail, and the records inserted at once, to set up quickly
+    image_names = [f"{i}.png" for i in range(count)]
+    image_path = image_files.get_path("image.png")
+    Image.new("RGB", (64, 64), "red").save(image_path)
+    thumbnail_path = image_files.get_path("image.png", thumbnail=True)
+    Image.new("RGB", (64, 64), "red").save(thumbnail_path)
+    for image_name in image_names:
+        shutil.copyfile(image_path, image_files.get_path(image_name))
+        shutil.copyfile(thumbnail_path, image_files.get_path(image_name, thumbnail=True))
+    board_id = services.board_records.save("benchmark").board_id
+    with db.lock:
+        db.conn.executemany(
+            """--sql
+            INSERT INTO images (image_name, image_origin, image_category, width, height, has_workflow)
+            VALUES (?, 'internal', 'general', 64, 64, FALSE);
+            """,
+            [(image_name,) for image_name in image_names],
+        )
+        db.conn.executemany(
+            "INSERT INTO board_images (board_id, image_name) VALUES (?, ?);",
+            [(board_id, image_name) for image_name in image_names],
+        )
+        db.conn.commit()
+    return images, image_names
+
+
+def unlink(paths: Union[Path, list[Path]]) -> None:
+    """Deletes files, in place of `send2trash`, which takes a path or a list of paths"""
+    for path in paths if isinstance(paths, list) else [paths]:
+        path.unlink()
+
+
+def one_at_a_time(images: ImageService) -> dict[str, Callable[[list[str]], object]]:
+    def update(image_names: list[str], changes: ImageRecordChanges) -> None:
+        for image_name in image_names:
+            try:
+                images.update(image_name, changes=changes)
+            except Exception:
+                pass
+
+    def delete(image_names: list[str]) -> None:
+        for image_name in image_names:
+            try:
+                images.delete(image_name)
+            except Exception:
+                pass
+
+    return {
+        "star": lambda image_names: update(image_names, ImageRecordChanges(starred=True)),
+        "unstar": lambda image_names: update(image_names, ImageRecordChanges(starred=False)),
+        "delete": delete,
+    }
+
+
+def batched(images: ImageService) -> dict[str, Callable[[list[str]], object]]:
+    return {
+        "star": lambda image_names: images.update_many(image_names, ImageRecordChanges(starred=True)),
+        "unstar": lambda image_names: images.update_many(image_names, ImageRecordChanges(starred=False)),
+        "delete": images.delete_many,
+    }
+
+
+def run(count: int, operations: Callable[[ImageService], dict[str, Callable[[list[str]], object]]]) -> dict[str, float]:
+    """Returns the time taken by each operation on `count` images, in seconds"""
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tempdir:
+        images, image_names = create_images(Path(tempdir), count)
+        for name, operation in operations(images).items():
+            start = time.perf_counter()
+            operation(image_names)
+            results[name] = time.perf_counter() - start
+        assert images.get_many(limit=1).total == 0, "all images are deleted"
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="Numbers of images")
+    parser.add_argument("--trash", action="store_true", help="Move the files to the trash instead of deleting them")
+    args = parser.parse_args()
+
+    if not args.trash:
+        image_files_disk.send2trash = unlink  # type: ignore
+
+    for count in args.sizes:
+        for mode, operations in [("one at a time", one_at_a_time), ("batched", batched)]:
+            results = run(count, operations)
+            print(f"{count} images, {mode}: " + ", ".join(f"{name} {s:.3f}s" for name, s in results.items()))
+
+
+if __name__ == "__main__":
+    main()
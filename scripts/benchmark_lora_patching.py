@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+"""
+Benchmark applying stacks of LoRAs to a UNet.
+
+Creates an SD-1 UNet with --channels channels in its first block (320 for the real one) and LoRAs of rank --rank
+patching all of its attention and feed-forward layers, as most LoRAs do. Then, for 1 to --max-loras stacked LoRAs,
+measures:
+- resolving the keys of the LoRAs, which every application did before they were kept in the LoRAs
+- looking up the resolved keys, which the applications after the first do
+- patching and unpatching the UNet, with the resolved keys
+- applying the same LoRAs again to a UNet they were left applied to, with sticky=True
+"""
+
+import argparse
+import statistics
+import time
+
+import torch
+from diffusers import UNet2DConditionModel
+
+from invokeai.backend.model_management.lora import ModelPatcher
+from invokeai.backend.model_management.model_load_optimizations import skip_torch_weight_init
+from invokeai.backend.model_management.models.lora import LoRALayer, LoRAModelRaw
+
+PATCHED_LAYERS = ("to_q", "to_k", "to_v", "to_out.0", "ff.net.0.proj", "ff.net.2", "proj_in", "proj_out")
+
+
+def create_lora(unet: UNet2DConditionModel, name: str, rank: int) -> LoRAModelRaw:
+    layers = {}
+    for module_key, module in unet.named_modules():
+        if isinstance(module, torch.nn.Linear) and module_key.endswith(PATCHED_LAYERS):
+            layer_key = "lora_unet_" + module_key.replace(".", "_")
+            layers[layer_key] = LoRALayer(
+                layer_key=layer_key,
+                values={
+                    "lora_down.weight": torch.randn(rank, module.in_features) * 0.01,
+                    "lora_up.weight": torch.randn(module.out_features, rank) * 0.01,
+                },
+            )
+    return LoRAModelRaw(name, layers)
+
+
+def resolve_keys(unet: UNet2DConditionModel, loras: list[LoRAModelRaw]) -> float:
+    start = time.perf_counter()
+    for lora in loras:
+        ModelPatcher._get_lora_key_index(unet, lora, "lora_unet_")
+    return time.perf_counter() - start
+
+
+def apply(unet: UNet2DConditionModel, loras: list[LoRAModelRaw], sticky: bool = False) -> float:
+    start = time.perf_counter()
+    with ModelPatcher.apply_lora_unet(unet, [(lora, 0.75) for lora in loras], sticky=sticky):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=160, help="Channels of the first block of the UNet")
+    parser.add_argument("--rank", type=int, default=8, help="Rank of the LoRAs")
+    parser.add_argument("--max-loras", type=int, default=10, help="Largest number of stacked LoRAs")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of applications measured")
+    args = parser.parse_args()
+
+    channels = args.channels
+    with skip_torch_weight_init():
+        unet = UNet2DConditionModel(block_out_channels=(channels, channels * 2, channels * 4, channels * 4))
+    loras = [create_lora(unet, f"lora_{i}", args.rank) for i in range(args.max_loras)]
+    print(f"{len(loras[0].layers)} layers per LoRA")
+
+    for lora_count in sorted({1, 2, 5, args.max_loras}):
+        stack = loras[:lora_count]
+        resolving = []
+        for _ in range(args.repeats):
+            for lora in stack:
+                lora.key_index.clear()
+            resolving.append(resolve_keys(unet, stack))
+        lookups = [resolve_keys(unet, stack) for _ in range(args.repeats)]
+        patching = [apply(unet, stack) for _ in range(args.repeats)]
+        apply(unet, stack, sticky=True)
+        reapplying = [apply(unet, stack, sticky=True) for _ in range(args.repeats)]
+        # Restore the UNet
+        apply(unet, [])
+        print(
+            f"{lora_count} LoRAs: resolving keys {statistics.median(resolving) * 1000:.2f}ms,"
+            f" looking them up {statistics.median(lookups) * 1000:.3f}ms,"
+            f" patching {statistics.median(patching) * 1000:.0f}ms,"
+            f" reapplying sticky {statistics.median(reapplying) * 1000:.3f}ms (median)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+"""
+Benchmark loading safetensors models with memory-mapped weights against from_pretrained().
+
+Saves a randomly initialized SD-1 UNet, with --channels channels in its first block (320 for the real one), and an
+SD-1 text encoder, then loads each of them on the CPU both ways, in a new process each time:
+- cold: the weights file is dropped from the OS page cache first, so it is read from disk
+- warm: the weights file is in the page cache, as when a model is loaded again or by another process
+and reports the load time and the private (anonymous) and file-backed memory the model takes once all its weights
+have been read.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from diffusers import UNet2DConditionModel
+from transformers import CLIPTextConfig, CLIPTextModel
+
+from invokeai.backend.model_management.model_load_optimizations import skip_torch_weight_init
+from invokeai.backend.model_management.models.base import load_pretrained_mmap
+
+GIG = 1073741824
+
+
+def read_rss() -> tuple[int, int]:
+    """Returns the anonymous and file-backed resident memory of this process, in bytes"""
+    rss = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                name, value, _ = line.split()
+                rss[name] = int(value) * 1024
+    return rss["RssAnon:"], rss["RssFile:"]
+
+
+def drop_from_page_cache(path: Path) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def load(method: str, model_class: type, model_path: Path) -> tuple[float, int, int]:
+    """Loads the model, returning the time taken and the anonymous and file-backed memory it takes"""
+    anon_before, file_before = read_rss()
+    start = time.perf_counter()
+    with skip_torch_weight_init():
+        if method == "mmap":
+            loaded = load_pretrained_mmap(model_class, model_path, torch_dtype=torch.float32)
+            assert loaded is not None
+            model = loaded[0]
+        else:
+            model = model_class.from_pretrained(model_path, torch_dtype=torch.float32)
+    elapsed = time.perf_counter() - start
+    # Read every weight, as a denoising step does, so the mapped pages are resident
+    with torch.no_grad():
+        for param in model.parameters():
+            param.sum()
+    anon_after, file_after = read_rss()
+    return elapsed, anon_after - anon_before, file_after - file_before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=160, help="Channels of the first block of the UNet")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of loads measured for each method")
+    args = parser.parse_args()
+
+    channels = args.channels
+    context = multiprocessing.get_context("spawn")
+    model_paths: list[tuple[type, Path]] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        for model_class in [UNet2DConditionModel, CLIPTextModel]:
+            with skip_torch_weight_init():
+                if model_class is UNet2DConditionModel:
+                    model = UNet2DConditionModel(
+                        block_out_channels=(channels, channels * 2, channels * 4, channels * 4)
+                    )
+                else:
+                    model = CLIPTextModel(CLIPTextConfig())
+            model_path = Path(tempdir, model_class.__name__)
+            model.save_pretrained(model_path, safe_serialization=True)
+            del model
+            model_paths.append((model_class, model_path))
+
+        for model_class, model_path in model_paths:
+            weights_path = next(model_path.glob("*.safetensors"))
+            print(f"{model_class.__name__} of {weights_path.stat().st_size / GIG:.2f}GB")
+            with context.Pool(1, maxtasksperchild=1) as pool:
+                for method in ["from_pretrained", "mmap"]:
+                    for cache_state in ["cold", "warm"]:
+                        results = []
+                        for _ in range(args.repeats):
+                            if cache_state == "cold":
+                                drop_from_page_cache(weights_path)
+                            results.append(pool.apply(load, (method, model_class, model_path)))
+                        elapsed, anon, file = min(results)
+                        print(
+                            f"  {method} ({cache_state}): {elapsed:.2f}s,"
+                            f" {anon / GIG:.2f}GB private and {file / GIG:.2f}GB file-backed memory"
+                        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the bookkeeping cost of the model cache with many cached submodels.
+
+Fills a model cache with --models small fake submodels, which are created instead of being read from disk, then
+measures:
+- hits: getting a cached model and entering and exiting its context, as a node does
+- misses: getting a model that is not cached, which evicts the least recently used model to make room for it
+The models are tiny, so the times are those of the cache itself. Run with several --models values to see how they
+grow with the number of cached models.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import torch
+
+from invokeai.backend.model_management.model_cache import GIG, MB, ModelCache
+from invokeai.backend.model_management.models.base import BaseModelType, ModelBase, ModelType, SubModelType
+from invokeai.backend.util.logging import InvokeAILogger
+
+MODEL_SIZE = 100 * MB
+
+
+class FakeModel(torch.nn.Linear):
+    """A tiny module with a `device`, as the diffusers and transformers models have"""
+
+    @property
+    def device(self) -> torch.device:
+        return self.weight.device
+
+
+class FakeModelInfo(ModelBase):
+    """A model of MODEL_SIZE bytes, which is a small torch module"""
+
+    @classmethod
+    def detect_format(cls, path: str) -> str:
+        return "fake"
+
+    @classmethod
+    def save_to_config(cls) -> bool:
+        return False
+
+    def get_size(self, child_type: Optional[SubModelType] = None) -> int:
+        return MODEL_SIZE
+
+    def get_model(self, torch_dtype: Optional[torch.dtype], child_type: Optional[SubModelType] = None):
+        return FakeModel(4, 4)
+
+
+def get_model(cache: ModelCache, model_path: Path) -> ModelCache.ModelLocker:
+    return cache.get_model(
+        model_path=model_path,
+        model_class=FakeModelInfo,
+        base_model=BaseModelType.StableDiffusion1,
+        model_type=ModelType.Main,
+        submodel=SubModelType.UNet,
+    )
+
+
+def run(model_count: int, iterations: int, root: Path) -> tuple[list[float], list[float]]:
+    """Returns the times of cache hits and misses, in seconds"""
+    model_paths = [root / f"model_{i}" for i in range(model_count * 2)]
+    for model_path in model_paths:
+        model_path.mkdir(exist_ok=True)
+    logger = InvokeAILogger.get_logger()
+    cache = ModelCache(
+        max_cache_size=model_count * MODEL_SIZE / GIG,
+        execution_device=torch.device("cpu"),
+        lazy_offloading=False,
+        logger=logger,  # type: ignore
+    )
+    cached = model_paths[:model_count]
+    uncached = model_paths[model_count:]
+    for model_path in cached:
+        with get_model(cache, model_path):
+            pass
+
+    hits: list[float] = []
+    for _ in range(iterations):
+        model_path = random.choice(cached)
+        start = time.perf_counter()
+        with get_model(cache, model_path):
+            pass
+        hits.append(time.perf_counter() - start)
+
+    misses: list[float] = []
+    for _ in range(iterations):
+        # Swap a model in, evicting the least recently used one
+        model_path = uncached.pop(random.randrange(len(uncached)))
+        start = time.perf_counter()
+        with get_model(cache, model_path):
+            pass
+        misses.append(time.perf_counter() - start)
+        cached.append(model_path)
+        uncached.append(cached.pop(0))
+    return hits, misses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, nargs="+", default=[10, 50, 200], help="Numbers of cached submodels")
+    parser.add_argument("--iterations", type=int, default=2000, help="Number of hits and misses measured")
+    args = parser.parse_args()
+
+    InvokeAILogger.get_logger().setLevel("WARNING")
+    for model_count in args.models:
+        with tempfile.TemporaryDirectory() as tempdir:
+            hits, misses = run(model_count, args.iterations, Path(tempdir))
+        print(
+            f"{model_count} models: hit {statistics.median(hits) * 1e6:.1f}us,"
+            f" miss {statistics.median(misses) * 1e6:.1f}us (median)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the latency between enqueuing a batch and its first node starting.
+
+Runs the session queue, session processor and invocation processor against an in-memory database, enqueues
+single-node sessions one after another, and measures the time from `enqueue_batch()` to the `invocation_started`
+event of each session. With --back-to-back all sessions are enqueued at once, and the gap between one session
+completing and the next one starting is measured instead.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from fastapi_events import handler_store
+from fastapi_events.handlers.local import local_handler
+from fastapi_events.typing import Event as FastAPIEvent
+
+from invokeai.app.api.events import FastAPIEventService
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.events.events_base import EventServiceBase
+from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
+from invokeai.app.services.invocation_processor.invocation_processor_default import DefaultInvocationProcessor
+from invokeai.app.services.invocation_queue.invocation_queue_memory import MemoryInvocationQueue
+from invokeai.app.services.invocation_services import InvocationServices
+from invokeai.app.services.invocation_stats.invocation_stats_default import InvocationStatsService
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.item_storage.item_storage_sqlite import SqliteItemStorage
+from invokeai.app.services.latents_storage.latents_storage_disk import DiskLatentsStorage
+from invokeai.app.services.latents_storage.latents_storage_forward_cache import ForwardCacheLatentsStorage
+from invokeai.app.services.session_processor.session_processor_default import DefaultSessionProcessor
+from invokeai.app.services.session_queue.session_queue_common import DEFAULT_QUEUE_ID, Batch
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.backend.util.logging import InvokeAILogger
+
+EVENT_HANDLER_ID = 1
+
+
+def create_invoker(config: InvokeAIAppConfig, latents_folder: str) -> Invoker:
+    logger = InvokeAILogger.get_logger(config=config)
+    db = init_db(config=config, logger=logger, image_files=None)  # type: ignore
+    services = InvocationServices(
+        board_image_records=None,  # type: ignore
+        board_images=None,  # type: ignore
+        board_records=None,  # type: ignore
+        boards=None,  # type: ignore
+        conditioning_cache=None,  # type: ignore
+        configuration=config,
+        events=FastAPIEventService(EVENT_HANDLER_ID),
+        graph_execution_manager=SqliteItemStorage[GraphExecutionState](db=db, table_name="graph_executions"),
+        image_files=None,  # type: ignore
+        image_records=None,  # type: ignore
+        images=None,  # type: ignore
+        invocation_cache=MemoryInvocationCache(max_cache_size=0),
+        latents=ForwardCacheLatentsStorage(DiskLatentsStorage(latents_folder)),
+        logger=logger,
+        model_manager=None,  # type: ignore
+        model_prefetcher=None,  # type: ignore
+        model_records=None,  # type: ignore
+        download_queue=None,  # type: ignore
+        model_install=None,  # type: ignore
+        names=None,  # type: ignore
+        performance_statistics=InvocationStatsService(),
+        processor=DefaultInvocationProcessor(),
+        queue=MemoryInvocationQueue(),
+        session_processor=DefaultSessionProcessor(),
+        session_queue=SqliteSessionQueue(db=db),
+        urls=None,  # type: ignore
+        workflow_records=None,  # type: ignore
+    )
+    return Invoker(services)
+
+
+async def run(sessions: int, back_to_back: bool) -> list[float]:
+    # Outside of the app, the event handlers have to be registered by hand
+    handler_store[EVENT_HANDLER_ID].append(local_handler)
+    config = InvokeAIAppConfig(use_memory_db=True, node_cache_size=0, log_level="warning")
+    latents_folder = tempfile.TemporaryDirectory()
+    invoker = create_invoker(config, latents_folder.name)
+
+    started: dict[int, float] = {}
+    completed: dict[int, float] = {}
+    all_completed = asyncio.Event()
+
+    async def on_queue_event(event: FastAPIEvent) -> None:
+        data: dict[str, Any] = event[1]["data"]
+        if event[1]["event"] == "invocation_started":
+            started.setdefault(data["queue_item_id"], time.perf_counter())
+        elif event[1]["event"] == "graph_execution_state_complete":
+            completed[data["queue_item_id"]] = time.perf_counter()
+            if len(completed) == sessions:
+                all_completed.set()
+
+    local_handler.register(event_name=EventServiceBase.queue_event, _func=on_queue_event)
+
+    graph = Graph()
+    graph.add_node(AddInvocation(id="add", a=1, b=2))
+    latencies: list[float] = []
+    if back_to_back:
+        result = invoker.services.session_queue.enqueue_batch(
+            DEFAULT_QUEUE_ID, Batch(graph=graph, runs=sessions), prepend=False
+        )
+        invoker.services.events.emit_batch_enqueued(result)
+        await asyncio.wait_for(all_completed.wait(), timeout=sessions * 5)
+        item_ids = sorted(completed)
+        latencies = [
+            started[next_id] - completed[item_id] for item_id, next_id in zip(item_ids, item_ids[1:], strict=False)
+        ]
+    else:
+        for _ in range(sessions):
+            enqueued = time.perf_counter()
+            result = invoker.services.session_queue.enqueue_batch(
+                DEFAULT_QUEUE_ID, Batch(graph=graph, runs=1), prepend=False
+            )
+            invoker.services.events.emit_batch_enqueued(result)
+            while len(completed) < len(latencies) + 1:
+                await asyncio.sleep(0.001)
+            latencies.append(started[max(started)] - enqueued)
+
+    invoker.stop()
+    latents_folder.cleanup()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session queue latency benchmark")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument(
+        "--back-to-back",
+        default=False,
+        action="store_true",
+        help="Enqueue all sessions at once and measure the gap between one completing and the next starting",
+    )
+    args = parser.parse_args()
+    logging.getLogger("fastapi_events").setLevel(logging.WARNING)
+    # The stats of every session are logged at info level
+    InvokeAILogger.get_logger().setLevel(logging.WARNING)
+
+    latencies = asyncio.run(run(args.sessions, args.back_to_back))
+    name = "complete -> next invocation_started" if args.back_to_back else "enqueue -> invocation_started"
+    print(
+        f"{name}: mean {statistics.mean(latencies) * 1000:8.2f}ms, "
+        f"median {statistics.median(latencies) * 1000:8.2f}ms, max {max(latencies) * 1000:8.2f}ms "
+        f"({len(latencies)} samples)"
+    )
+
+
+if __name__ == "__main__":
+    main()
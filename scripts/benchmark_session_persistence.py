@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the cost of saving the state of a session after every node.
+
+Executes an iterate graph of --size items (range -> iterate -> multiply -> add -> collect), saving the session before
+and after each node as the invoker and invocation processor do, and reports the time spent saving per node. The full
+state is saved with SqliteItemStorage, and only the changes made by each node with SqliteSessionStorage.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from invokeai.app.invocations.collections import RangeInvocation
+from invokeai.app.invocations.math import AddInvocation, MultiplyInvocation
+from invokeai.app.services.item_storage.item_storage_base import ItemStorageABC
+from invokeai.app.services.item_storage.item_storage_session_sqlite import SqliteSessionStorage
+from invokeai.app.services.item_storage.item_storage_sqlite import SqliteItemStorage
+from invokeai.app.services.shared.graph import (
+    CollectInvocation,
+    Edge,
+    EdgeConnection,
+    Graph,
+    GraphExecutionState,
+    IterateInvocation,
+)
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+def create_edge(from_id: str, from_field: str, to_id: str, to_field: str) -> Edge:
+    return Edge(
+        source=EdgeConnection(node_id=from_id, field=from_field),
+        destination=EdgeConnection(node_id=to_id, field=to_field),
+    )
+
+
+def create_session(size: int) -> GraphExecutionState:
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range", start=0, stop=size, step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_node(MultiplyInvocation(id="multiply", b=10))
+    graph.add_node(AddInvocation(id="add", b=1))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("range", "collection", "iterate", "collection"))
+    graph.add_edge(create_edge("iterate", "item", "multiply", "a"))
+    graph.add_edge(create_edge("multiply", "value", "add", "a"))
+    graph.add_edge(create_edge("add", "value", "collect", "item"))
+    return GraphExecutionState(graph=graph)
+
+
+def run(storage: ItemStorageABC[GraphExecutionState], size: int) -> list[float]:
+    """Executes a session, returning the time spent saving it for each node"""
+    session = create_session(size)
+    storage.set(session)
+    save_times: list[float] = []
+    while (node := session.next()) is not None:
+        start = time.perf_counter()
+        storage.set(session)
+        elapsed = time.perf_counter() - start
+        session.complete(node.id, node.invoke(None))  # type: ignore
+        start = time.perf_counter()
+        storage.set(session)
+        save_times.append(elapsed + time.perf_counter() - start)
+    return save_times
+
+
+def report(name: str, save_times: list[float]) -> None:
+    ms = [t * 1000 for t in save_times]
+    tenth = max(len(ms) // 10, 1)
+    print(
+        f"{name}: {len(ms)} nodes, {sum(ms):.0f}ms total, {statistics.mean(ms):.2f}ms per node "
+        f"(first 10%: {statistics.mean(ms[:tenth]):.2f}ms, last 10%: {statistics.mean(ms[-tenth:]):.2f}ms)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200, help="Number of items iterated over")
+    parser.add_argument("--checkpoint-interval", type=int, default=32, help="Saves between full checkpoints")
+    args = parser.parse_args()
+
+    logger = InvokeAILogger.get_logger()
+    with tempfile.TemporaryDirectory() as tempdir:
+        db = SqliteDatabase(db_path=Path(tempdir) / "invokeai.db", logger=logger)
+        full = SqliteItemStorage[GraphExecutionState](db=db, table_name="full_graph_executions")
+        report("Full state", run(full, args.size))
+        incremental = SqliteSessionStorage(
+            db=db, table_name="graph_executions", checkpoint_interval=args.checkpoint_interval
+        )
+        report("Incremental", run(incremental, args.size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""
+Benchmark enqueuing large batches, with and without batch templates.
+
+Creates a database file in a temporary folder for each mode, then enqueues a batch whose graph has --nodes nodes of
+about --node-size bytes each, and --items values substituted into one of them, as a batch of prompts or seeds does.
+Reports the time taken to enqueue it, and until its first items could be dequeued, the size the queue takes in the
+database, and the time taken to dequeue an item. Without batch templates, every queue item stores its whole session
+and workflow; with them, the graph and workflow of the batch are stored once and the sessions are materialized from
+them when the items are dequeued.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from invokeai.app.invocations.primitives import StringInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_queue.session_queue_common import DEFAULT_QUEUE_ID, Batch, BatchDatum
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+def create_batch(nodes: int, node_size: int, items: int) -> Batch:
+    graph = Graph()
+    for i in range(nodes):
+        graph.add_node(StringInvocation(id=str(i), value="x" * node_size))
+    data = [[BatchDatum(node_path="0", field_name="value", items=[f"prompt {i}" for i in range(items)])]]
+    return Batch(graph=graph, data=data, runs=1)
+
+
+def used_bytes(db: SqliteDatabase) -> int:
+    with db.read() as cursor:
+        page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - freelist_count) * page_size
+
+
+def run(batch: Batch, batch_templates: bool, dequeues: int) -> tuple[float, float, int, float]:
+    """Returns the time taken to enqueue the batch and until its first items could be dequeued, the bytes the queue
+    takes and the median time to dequeue an item"""
+    with tempfile.TemporaryDirectory() as tempdir:
+        config = InvokeAIAppConfig(db_dir=Path(tempdir), max_queue_size=len(batch.data[0][0].items))  # type: ignore
+        logger = InvokeAILogger.get_logger(config=config)
+        db = init_db(config=config, logger=logger, image_files=None)  # type: ignore
+        bytes_before = used_bytes(db)
+        events = MagicMock()
+        progress_times: list[float] = []
+        events.emit_batch_enqueue_progress.side_effect = lambda **kwargs: progress_times.append(time.perf_counter())
+        invoker = SimpleNamespace(
+            services=SimpleNamespace(configuration=config, events=events, logger=logger, queue=MagicMock())
+        )
+        queue = SqliteSessionQueue(db=db, batch_templates=batch_templates)
+        queue.start(invoker)  # type: ignore
+
+        start = time.perf_counter()
+        queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+        enqueue_time = time.perf_counter() - start
+        first_items_time = progress_times[0] - start if progress_times else enqueue_time
+        queue_bytes = used_bytes(db) - bytes_before
+
+        dequeue_times = []
+        for _ in range(dequeues):
+            start = time.perf_counter()
+            queue.dequeue()
+            dequeue_times.append(time.perf_counter() - start)
+        db.conn.close()
+    return enqueue_time, first_items_time, queue_bytes, statistics.median(dequeue_times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20, help="Number of nodes in the graph")
+    parser.add_argument("--node-size", type=int, default=500, help="Size of each node, in bytes")
+    parser.add_argument("--items", type=int, default=5000, help="Number of queue items in the batch")
+    parser.add_argument("--dequeues", type=int, default=50, help="Number of dequeues measured")
+    args = parser.parse_args()
+
+    batch = create_batch(args.nodes, args.node_size, args.items)
+    print(f"Graph of {len(batch.graph.model_dump_json()) / 1024:.0f}KB, {args.items} queue items")
+    for batch_templates in [False, True]:
+        enqueue_time, first_items_time, queue_bytes, dequeue_time = run(batch, batch_templates, args.dequeues)
+        print(
+            f"{'With' if batch_templates else 'Without'} batch templates: enqueuing {enqueue_time:.2f}s"
+            f" ({args.items / enqueue_time:.0f} items/s), first items after {first_items_time:.2f}s,"
+            f" {queue_bytes / 2**20:.1f}MB in the database,"
+            f" dequeuing {dequeue_time * 1000:.2f}ms (median)"
+        )
+
+
+if __name__ == "__main__":
+    main()
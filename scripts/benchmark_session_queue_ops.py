@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the session queue operations made while a large queue drains.
+
+Creates a database file in a temporary folder and fills a queue with --items pending items, some of them already
+completed, then measures the operations the processor and the UI make for every queue item:
+- dequeuing an item, and marking it completed, which emits the status of its batch and queue
+- getting the status of the queue, and whether it is full
+- listing the first page of the queue, of all and of the pending items
+- enqueuing a single item in front of the others
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+from unittest.mock import MagicMock
+
+from invokeai.app.invocations.primitives import StringInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_queue.session_queue_common import DEFAULT_QUEUE_ID, Batch, BatchDatum
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+def create_batch(items: int) -> Batch:
+    graph = Graph()
+    graph.add_node(StringInvocation(id="prompt", value=""))
+    data = [[BatchDatum(node_path="prompt", field_name="value", items=[f"prompt {i}" for i in range(items)])]]
+    return Batch(graph=graph, data=data, runs=1)
+
+
+def measure(operation: Callable[[], object], repeats: int) -> float:
+    """Returns the median time taken by the operation, in ms"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="Number of items in the queue")
+    parser.add_argument("--completed", type=int, default=1000, help="Number of these items completed first")
+    parser.add_argument("--repeats", type=int, default=50, help="Number of times each operation is measured")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        config = InvokeAIAppConfig(db_dir=Path(tempdir), max_queue_size=args.items + args.repeats * 2)
+        logger = InvokeAILogger.get_logger(config=config)
+        db = init_db(config=config, logger=logger, image_files=None)  # type: ignore
+        invoker = SimpleNamespace(
+            services=SimpleNamespace(configuration=config, events=MagicMock(), logger=logger, queue=MagicMock())
+        )
+        queue = SqliteSessionQueue(db=db)
+        queue.start(invoker)  # type: ignore
+
+        start = time.perf_counter()
+        queue.enqueue_batch(DEFAULT_QUEUE_ID, create_batch(args.items), prepend=False)
+        print(f"Enqueued {args.items} items in {time.perf_counter() - start:.2f}s")
+
+        def dequeue_and_complete() -> None:
+            queue_item = queue.dequeue()
+            assert queue_item is not None
+            queue._set_queue_item_status(queue_item.item_id, "completed")
+
+        for _ in range(args.completed):
+            dequeue_and_complete()
+
+        results = {
+            "dequeue and complete": measure(dequeue_and_complete, args.repeats),
+            "get_queue_status": measure(lambda: queue.get_queue_status(DEFAULT_QUEUE_ID), args.repeats),
+            "is_full": measure(lambda: queue.is_full(DEFAULT_QUEUE_ID), args.repeats),
+            "list all": measure(lambda: queue.list_queue_items(DEFAULT_QUEUE_ID, 50, 0), args.repeats),
+            "list pending": measure(
+                lambda: queue.list_queue_items(DEFAULT_QUEUE_ID, 50, 0, status="pending"), args.repeats
+            ),
+            "enqueue in front": measure(
+                lambda: queue.enqueue_batch(DEFAULT_QUEUE_ID, create_batch(1), prepend=True), args.repeats
+            ),
+        }
+        db.conn.close()
+
+    for operation, ms in results.items():
+        print(f"{operation}: {ms:.2f}ms (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the queue scheduling policies with a large batch and a single request from another user.
+
+For each policy, creates a database file in a temporary folder, enqueues a batch of --items items in one queue and
+starts processing it, then enqueues a single item in a second queue and another single item in the first queue.
+Reports how many items were processed before each of the single items, and the median time taken to dequeue an item.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from invokeai.app.invocations.primitives import StringInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_queue.session_queue_common import Batch, BatchDatum
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.backend.util.logging import InvokeAILogger
+
+POLICIES = ["priority", "round_robin", "fair"]
+
+
+def create_batch(batch_id: str, items: int) -> Batch:
+    graph = Graph()
+    graph.add_node(StringInvocation(id="prompt", value=""))
+    data = [[BatchDatum(node_path="prompt", field_name="value", items=[f"prompt {i}" for i in range(items)])]]
+    return Batch(batch_id=batch_id, graph=graph, data=data, runs=1)
+
+
+def run(policy: str, items: int, started: int) -> tuple[dict[str, int], float]:
+    """Returns the number of items processed before each single item, and the median time to dequeue an item"""
+    with tempfile.TemporaryDirectory() as tempdir:
+        config = InvokeAIAppConfig(db_dir=Path(tempdir), max_queue_size=items + 1, queue_scheduling=policy)
+        logger = InvokeAILogger.get_logger(config=config)
+        db = init_db(config=config, logger=logger, image_files=None)  # type: ignore
+        invoker = SimpleNamespace(
+            services=SimpleNamespace(configuration=config, events=MagicMock(), logger=logger, queue=MagicMock())
+        )
+        queue = SqliteSessionQueue(db=db)
+        queue.start(invoker)  # type: ignore
+
+        queue.enqueue_batch("user_a", create_batch("large", items), prepend=False)
+        processed = 0
+        processed_before: dict[str, int] = {}
+        dequeue_times: list[float] = []
+        while True:
+            if processed == started:
+                queue.enqueue_batch("user_b", create_batch("user_b single", 1), prepend=False)
+                queue.enqueue_batch("user_a", create_batch("user_a single", 1), prepend=False)
+            start = time.perf_counter()
+            queue_item = queue.dequeue()
+            dequeue_times.append(time.perf_counter() - start)
+            if queue_item is None:
+                break
+            if queue_item.batch_id != "large":
+                processed_before[queue_item.batch_id] = processed
+            queue._set_queue_item_status(queue_item.item_id, "completed")
+            processed += 1
+        db.conn.close()
+    return processed_before, statistics.median(dequeue_times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000, help="Number of items in the large batch")
+    parser.add_argument("--started", type=int, default=10, help="Items of the large batch processed before the others")
+    args = parser.parse_args()
+
+    for policy in POLICIES:
+        processed_before, dequeue_time = run(policy, args.items, args.started)
+        print(
+            f"{policy}: {processed_before['user_b single']} items processed before the other user's,"
+            f" {processed_before['user_a single']} before the single item of the same user,"
+            f" dequeuing {dequeue_time * 1000:.2f}ms (median)"
+        )
+
+
+if __name__ == "__main__":
+    main()
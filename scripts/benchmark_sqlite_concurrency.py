@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the latency of database reads made by the API while the session queue is draining.
+
+Creates a database file in a temporary folder, then runs a writer thread that saves image records and graph execution
+states as the invocation processor does, while reader threads list images as the gallery does. Reports the latency
+percentiles of the image list queries. With --single-connection, reads go through the writer connection and hold the
+database lock, as they did before reader connections were introduced.
+"""
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import MethodType
+from typing import Iterator
+
+from pydantic import BaseModel
+
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.image_records.image_records_common import ImageCategory, ResourceOrigin
+from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
+from invokeai.app.services.item_storage.item_storage_sqlite import SqliteItemStorage
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.shared.sqlite.sqlite_util import init_db
+from invokeai.app.util.misc import uuid_string
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+class ExecutionState(BaseModel):
+    """Stands in for a graph execution state, which is saved after every node"""
+
+    id: str
+    payload: str
+
+
+@contextmanager
+def read_through_writer(db: SqliteDatabase) -> Iterator:
+    with db.lock:
+        yield db.conn.cursor()
+
+
+def write(db: SqliteDatabase, stop: threading.Event, state_size: int, writes: list[int]) -> None:
+    image_records = SqliteImageRecordStorage(db=db)
+    states = SqliteItemStorage[ExecutionState](db=db, table_name="graph_executions")
+    state = ExecutionState(id=uuid_string(), payload="x" * state_size)
+    count = 0
+    while not stop.is_set():
+        states.set(state)
+        image_records.save(
+            image_name=f"{uuid_string()}.png",
+            image_origin=ResourceOrigin.INTERNAL,
+            image_category=ImageCategory.GENERAL,
+            width=512,
+            height=512,
+            has_workflow=False,
+            session_id=state.id,
+        )
+        count += 1
+    writes.append(count)
+
+
+def read(db: SqliteDatabase, stop: threading.Event, latencies: list[float]) -> None:
+    image_records = SqliteImageRecordStorage(db=db)
+    while not stop.is_set():
+        start = time.perf_counter()
+        image_records.get_many(offset=0, limit=50, categories=[ImageCategory.GENERAL])
+        latencies.append(time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run the benchmark for")
+    parser.add_argument("--readers", type=int, default=4, help="Number of reader threads")
+    parser.add_argument("--state-size", type=int, default=50_000, help="Size of the saved execution states, in bytes")
+    parser.add_argument(
+        "--single-connection",
+        action="store_true",
+        help="Read through the writer connection, holding the database lock",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        config = InvokeAIAppConfig(db_dir=Path(tempdir))
+        logger = InvokeAILogger.get_logger(config=config)
+        db = init_db(config=config, logger=logger, image_files=None)  # type: ignore
+        if args.single_connection:
+            db.read = MethodType(read_through_writer, db)  # type: ignore
+
+        stop = threading.Event()
+        writes: list[int] = []
+        latencies: list[float] = []
+        threads = [threading.Thread(target=write, args=(db, stop, args.state_size, writes))]
+        threads.extend(threading.Thread(target=read, args=(db, stop, latencies)) for _ in range(args.readers))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    percentiles = statistics.quantiles(latencies_ms, n=100)
+    print(f"Writes: {writes[0]} ({writes[0] / args.duration:.0f}/s)")
+    print(f"Reads: {len(latencies_ms)} ({len(latencies_ms) / args.duration:.0f}/s)")
+    print(f"Read latency: p50 {percentiles[49]:.2f}ms, p99 {percentiles[98]:.2f}ms, max {latencies_ms[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
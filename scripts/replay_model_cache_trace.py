@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""
+Compare the eviction policies of the model cache on a trace of model requests.
+
+Record a trace by setting `cache_trace_path` in invokeai.yaml and generating as usual, or pass --synthetic for a
+workload of --models models of random sizes and load times, requested with a skewed popularity. Each request is
+replayed through a simulated cache of --cache-size GB with each policy, and the hit rate and the total time spent
+loading models are reported.
+
+The simulation only accounts for the cache itself: the models in use by a node are never pinned, and models are
+loaded as soon as they are requested. The load time of a model is the one recorded the first time it was read from
+disk; models that were already cached when the trace started load at --load-throughput GB/s.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from invokeai.backend.model_management.model_cache import GIG, MB
+from invokeai.backend.model_management.model_cache_policy import EVICTION_POLICIES, get_eviction_policy
+
+
+class Request(NamedTuple):
+    key: str
+    size: int
+    load_time: Optional[float]
+
+
+def read_trace(path: Path) -> list[Request]:
+    requests: list[Request] = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                request = json.loads(line)
+                requests.append(Request(request["key"], request["size"], request["load_time"]))
+    return requests
+
+
+def synthetic_trace(model_count: int, request_count: int, seed: int) -> list[Request]:
+    """Models of 100MB to 5GB, which take 1 to 20 seconds per GB to load, the first ones requested the most often"""
+    rng = random.Random(seed)
+    models = [
+        Request(f"model_{i}", size, size / GIG * rng.uniform(1.0, 20.0))
+        for i, size in enumerate(rng.randint(100 * MB, 5 * GIG) for _ in range(model_count))
+    ]
+    weights = [1 / (i + 1) for i in range(model_count)]
+    return rng.choices(models, weights=weights, k=request_count)
+
+
+def replay(policy_name: str, requests: list[Request], cache_size: int, load_throughput: float) -> tuple[int, float]:
+    """Returns the number of hits and the total load time, in seconds"""
+    load_times: dict[str, float] = {}
+    for request in requests:
+        if request.load_time is not None:
+            load_times.setdefault(request.key, request.load_time)
+
+    policy = get_eviction_policy(policy_name)
+    cached: dict[str, int] = {}
+    cached_bytes = 0
+    hits = 0
+    total_load_time = 0.0
+    for request in requests:
+        if request.key in cached:
+            hits += 1
+            policy.access(request.key)
+            continue
+
+        load_time = load_times.get(request.key, request.size / (load_throughput * GIG))
+        total_load_time += load_time
+        victims: list[str] = []
+        for key in policy.eviction_order():
+            if cached_bytes + request.size <= cache_size:
+                break
+            victims.append(key)
+            cached_bytes -= cached[key]
+        for key in victims:
+            del cached[key]
+            policy.remove(key, evicted=True)
+        cached[request.key] = request.size
+        cached_bytes += request.size
+        policy.add(request.key, request.size, load_time)
+    return hits, total_load_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", type=Path, nargs="?", help="Trace recorded with cache_trace_path")
+    parser.add_argument("--synthetic", action="store_true", help="Replay a synthetic workload instead of a trace")
+    parser.add_argument("--models", type=int, default=30, help="Number of models of the synthetic workload")
+    parser.add_argument("--requests", type=int, default=5000, help="Number of requests of the synthetic workload")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic workload")
+    parser.add_argument("--cache-size", type=float, default=7.5, help="Size of the simulated cache, in GB")
+    parser.add_argument("--load-throughput", type=float, default=1.0, help="GB/s read when no load time is known")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        requests = synthetic_trace(args.models, args.requests, args.seed)
+    elif args.trace is not None:
+        requests = read_trace(args.trace)
+    else:
+        parser.error("either a trace or --synthetic is required")
+
+    print(f"{len(requests)} requests of {len({request.key for request in requests})} models")
+    for policy_name in EVICTION_POLICIES:
+        hits, total_load_time = replay(policy_name, requests, int(args.cache_size * GIG), args.load_throughput)
+        print(f"{policy_name}: hit rate {hits / len(requests):.1%}, {total_load_time:.1f}s loading models")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+import copy
+from typing import Any
+
+import pytest
+
+# This import must happen before other invoke imports or test in other files(!!) break
+from .test_nodes import create_edge  # isort: split
+
+from invokeai.app.invocations.collections import RangeInvocation, RangeOfSizeInvocation
+from invokeai.app.invocations.math import AddInvocation, MultiplyInvocation
+from invokeai.app.invocations.primitives import IntegerCollectionInvocation
+from invokeai.app.services.shared.graph import (
+    CollectInvocation,
+    Graph,
+    GraphExecutionState,
+    GraphInvocation,
+    IterateInvocation,
+)
+
+# The expected orders below are the orders the scheduler produced before the incremental planner was introduced, a
+# depth-first pre-order traversal of the execution graph. Each executed node is described by its source node and the
+# value it produced, which tells iterations apart. Prepared nodes are now used in the order they were created, so
+# iterations (and the items of collections) come out in a fixed order where they used to depend on set ordering.
+
+
+def describe_output(output: Any) -> Any:
+    for field in ("value", "item", "collection"):
+        if hasattr(output, field):
+            return getattr(output, field)
+    return None
+
+
+def run_graph(state: GraphExecutionState, steps: int = -1) -> list[tuple[str, Any]]:
+    """Runs a graph for a number of steps (or to completion), describing every executed node"""
+    order: list[tuple[str, Any]] = []
+    while not state.is_complete() and steps != 0:
+        node = state.next()
+        assert node is not None
+        # None of the nodes used here need an invocation context
+        output = node.invoke(None)  # type: ignore
+        state.complete(node.id, output)
+        order.append((state.prepared_source_mapping[node.id], describe_output(output)))
+        steps -= 1
+    return order
+
+
+def add(id: str, a: int = 0, b: int = 0) -> AddInvocation:
+    return AddInvocation(id=id, a=a, b=b)
+
+
+def create_branching_graph() -> Graph:
+    """A -> B, A -> C, C -> E, B -> D, C -> D"""
+    graph = Graph()
+    for node in (add("A", a=1), add("B", b=10), add("C", b=100), add("D"), add("E", b=1000)):
+        graph.add_node(node)
+    graph.add_edge(create_edge("A", "value", "B", "a"))
+    graph.add_edge(create_edge("A", "value", "C", "a"))
+    graph.add_edge(create_edge("C", "value", "E", "a"))
+    graph.add_edge(create_edge("B", "value", "D", "a"))
+    graph.add_edge(create_edge("C", "value", "D", "b"))
+    return graph
+
+
+def create_fan_in_graph() -> Graph:
+    """P -> V2, Q -> V1, Q -> V2"""
+    graph = Graph()
+    for node in (add("P", a=1), add("Q", a=2), add("V1", b=10), add("V2")):
+        graph.add_node(node)
+    graph.add_edge(create_edge("P", "value", "V2", "a"))
+    graph.add_edge(create_edge("Q", "value", "V1", "a"))
+    graph.add_edge(create_edge("Q", "value", "V2", "b"))
+    return graph
+
+
+def create_independent_roots_graph() -> Graph:
+    """X1 -> X2, Y1 -> Y2 -> Y3, and a lone Z"""
+    graph = Graph()
+    for node in (add("X1", a=1), add("Y1", a=2), add("Z", a=3), add("X2", b=10), add("Y2", b=20), add("Y3", b=30)):
+        graph.add_node(node)
+    graph.add_edge(create_edge("X1", "value", "X2", "a"))
+    graph.add_edge(create_edge("Y1", "value", "Y2", "a"))
+    graph.add_edge(create_edge("Y2", "value", "Y3", "a"))
+    return graph
+
+
+def create_multiple_iterators_graph() -> Graph:
+    """Two iterators feeding the same node, which is prepared for every combination of their items"""
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range_a", start=0, stop=2, step=1))
+    graph.add_node(RangeInvocation(id="range_b", start=10, stop=30, step=10))
+    graph.add_node(IterateInvocation(id="iterate_a"))
+    graph.add_node(IterateInvocation(id="iterate_b"))
+    graph.add_node(AddInvocation(id="sum"))
+    graph.add_node(MultiplyInvocation(id="double", b=2))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("range_a", "collection", "iterate_a", "collection"))
+    graph.add_edge(create_edge("range_b", "collection", "iterate_b", "collection"))
+    graph.add_edge(create_edge("iterate_a", "item", "sum", "a"))
+    graph.add_edge(create_edge("iterate_b", "item", "sum", "b"))
+    graph.add_edge(create_edge("sum", "value", "double", "a"))
+    graph.add_edge(create_edge("double", "value", "collect", "item"))
+    return graph
+
+
+def create_nested_iterators_graph() -> Graph:
+    """An outer iterator whose items produce the collections of an inner iterator"""
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="outer_range", start=0, stop=200, step=100))
+    graph.add_node(IterateInvocation(id="outer"))
+    graph.add_node(RangeOfSizeInvocation(id="inner_range", size=2, step=1))
+    graph.add_node(IterateInvocation(id="inner"))
+    graph.add_node(AddInvocation(id="offset", b=1000))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("outer_range", "collection", "outer", "collection"))
+    graph.add_edge(create_edge("outer", "item", "inner_range", "start"))
+    graph.add_edge(create_edge("inner_range", "collection", "inner", "collection"))
+    graph.add_edge(create_edge("inner", "item", "offset", "a"))
+    graph.add_edge(create_edge("offset", "value", "collect", "item"))
+    return graph
+
+
+def create_collect_then_iterate_graph() -> Graph:
+    """The collected results of one iteration are iterated over again"""
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range", start=1, stop=3, step=1))
+    graph.add_node(IterateInvocation(id="first"))
+    graph.add_node(MultiplyInvocation(id="scale", b=10))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_node(IntegerCollectionInvocation(id="collection"))
+    graph.add_node(IterateInvocation(id="second"))
+    graph.add_node(AddInvocation(id="shift", b=5))
+    graph.add_edge(create_edge("range", "collection", "first", "collection"))
+    graph.add_edge(create_edge("first", "item", "scale", "a"))
+    graph.add_edge(create_edge("scale", "value", "collect", "item"))
+    graph.add_edge(create_edge("collect", "collection", "collection", "collection"))
+    graph.add_edge(create_edge("collection", "collection", "second", "collection"))
+    graph.add_edge(create_edge("second", "item", "shift", "a"))
+    return graph
+
+
+def create_subgraph_graph() -> Graph:
+    """A graph invocation between nodes of the parent graph, which is flattened into the execution graph"""
+    subgraph = Graph()
+    subgraph.add_node(add("inner_1", a=3, b=10))
+    subgraph.add_node(add("inner_2", b=20))
+    subgraph.add_edge(create_edge("inner_1", "value", "inner_2", "a"))
+    graph = Graph()
+    graph.add_node(add("before", a=1))
+    graph.add_node(GraphInvocation(id="sub", graph=subgraph))
+    graph.add_node(add("after", b=300))
+    graph.add_edge(create_edge("before", "value", "after", "a"))
+    return graph
+
+
+EXPECTED_ORDERS = {
+    "branching": (
+        create_branching_graph,
+        [("A", 1), ("B", 11), ("C", 101), ("D", 112), ("E", 1101)],
+    ),
+    "fan_in": (
+        create_fan_in_graph,
+        [("P", 1), ("Q", 2), ("V2", 3), ("V1", 12)],
+    ),
+    "independent_roots": (
+        create_independent_roots_graph,
+        [("X1", 1), ("X2", 11), ("Y1", 2), ("Y2", 22), ("Y3", 52), ("Z", 3)],
+    ),
+    "multiple_iterators": (
+        create_multiple_iterators_graph,
+        [
+            ("range_a", [0, 1]),
+            ("range_b", [10, 20]),
+            ("iterate_a", 0),
+            ("iterate_a", 1),
+            ("iterate_b", 10),
+            ("iterate_b", 20),
+            ("sum", 10),
+            ("double", 20),
+            ("sum", 20),
+            ("double", 40),
+            ("sum", 11),
+            ("double", 22),
+            ("sum", 21),
+            ("double", 42),
+            ("collect", [20, 40, 22, 42]),
+        ],
+    ),
+    # Every inner item is combined with both outer items, so each offset is prepared twice
+    "nested_iterators": (
+        create_nested_iterators_graph,
+        [
+            ("outer_range", [0, 100]),
+            ("outer", 0),
+            ("outer", 100),
+            ("inner_range", [0, 1]),
+            ("inner_range", [100, 101]),
+            ("inner", 0),
+            ("inner", 1),
+            ("inner", 100),
+            ("inner", 101),
+            ("offset", 1000),
+            ("offset", 1000),
+            ("offset", 1001),
+            ("offset", 1001),
+            ("offset", 1100),
+            ("offset", 1100),
+            ("offset", 1101),
+            ("offset", 1101),
+            ("collect", [1000, 1001, 1100, 1101, 1000, 1001, 1100, 1101]),
+        ],
+    ),
+    "collect_then_iterate": (
+        create_collect_then_iterate_graph,
+        [
+            ("range", [1, 2]),
+            ("first", 1),
+            ("first", 2),
+            ("scale", 10),
+            ("scale", 20),
+            ("collect", [10, 20]),
+            ("collection", [10, 20]),
+            ("second", 10),
+            ("second", 20),
+            ("shift", 15),
+            ("shift", 25),
+        ],
+    ),
+    "subgraph": (
+        create_subgraph_graph,
+        [("before", 1), ("after", 301), ("sub.inner_1", 13), ("sub.inner_2", 33)],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", EXPECTED_ORDERS.keys())
+def test_planner_execution_order(name: str):
+    create_graph, expected = EXPECTED_ORDERS[name]
+    assert run_graph(GraphExecutionState(graph=create_graph())) == expected
+
+
+@pytest.mark.parametrize("name", EXPECTED_ORDERS.keys())
+def test_planner_execution_order_survives_round_trip(name: str):
+    create_graph, expected = EXPECTED_ORDERS[name]
+    for steps in range(1, len(expected)):
+        state = GraphExecutionState(graph=create_graph())
+        order = run_graph(state, steps)
+        # The processor reads the session back from the database between nodes
+        state = GraphExecutionState.model_validate_json(state.model_dump_json())
+        order.extend(run_graph(state))
+        assert order == expected, f"diverged after a round trip at step {steps}"
+
+
+def test_planner_prepare_before_next():
+    """Preparing nodes before anything else touches the plan must not count inputs twice"""
+    state = GraphExecutionState(graph=create_branching_graph())
+    while state._prepare() is not None:
+        pass
+    assert run_graph(state) == EXPECTED_ORDERS["branching"][1]
+
+
+def test_planner_detects_direct_graph_changes():
+    state = GraphExecutionState(graph=create_fan_in_graph())
+    run_graph(state, 1)
+    state.graph.add_node(add("late", a=7))
+    assert [source for source, _ in run_graph(state)][-1] == "late"
+
+
+def test_planner_copies_do_not_share_plans():
+    state = GraphExecutionState(graph=create_branching_graph())
+    run_graph(state, 2)
+    for copied in (state.model_copy(), copy.deepcopy(state)):
+        assert copied._execution_plan is None
+        assert copied._source_plan is None
+
+
+def test_planner_does_not_return_executing_nodes():
+    state = GraphExecutionState(graph=create_independent_roots_graph())
+    first = state.next()
+    second = state.next()
+    assert first is not None and second is not None
+    assert state.prepared_source_mapping[first.id] == "X1"
+    assert state.prepared_source_mapping[second.id] == "Y1"
+    assert state.executing == {first.id, second.id}
+
+    # Still executing after the state is read back
+    state = GraphExecutionState.model_validate_json(state.model_dump_json())
+    third = state.next()
+    assert third is not None
+    assert state.prepared_source_mapping[third.id] == "Z"
+    assert state.next() is None
+    assert not state.is_complete()
+
+    state.complete(first.id, first.invoke(None))  # type: ignore
+    state.set_node_error(second.id, "error")
+    assert state.executing == {third.id}
@@ -57,6 +57,7 @@ def mock_services() -> InvocationServices:
         board_images=None,  # type: ignore
         board_records=None,  # type: ignore
         boards=None,  # type: ignore
+        conditioning_cache=None,  # type: ignore
         configuration=configuration,
         events=TestEventService(),
         graph_execution_manager=graph_execution_manager,
@@ -67,6 +68,7 @@ def mock_services() -> InvocationServices:
         latents=None,  # type: ignore
         logger=logging,  # type: ignore
         model_manager=None,  # type: ignore
+        model_prefetcher=None,  # type: ignore
         model_records=None,  # type: ignore
         download_queue=None,  # type: ignore
         model_install=None,  # type: ignore
@@ -1,4 +1,5 @@
 import logging
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -9,9 +10,13 @@ from tests.fixtures.sqlite_database import create_mock_sqlite_database
 # This import must happen before other invoke imports or test in other files(!!) break
 from .test_nodes import (  # isort: split
     ErrorInvocation,
+    GPUTestInvocation,
+    ImageToImageTestInvocation,
     PromptTestInvocation,
     TestEventService,
     TextToImageTestInvocation,
+    WaitForSiblingTestInvocation,
+    concurrency_tracker,
     create_edge,
     wait_until,
 )
@@ -63,16 +68,18 @@ def mock_services() -> InvocationServices:
         board_images=None,  # type: ignore
         board_records=None,  # type: ignore
         boards=None,  # type: ignore
+        conditioning_cache=None,  # type: ignore
         configuration=configuration,
         events=TestEventService(),
         graph_execution_manager=graph_execution_manager,
-        image_files=None,  # type: ignore
+        image_files=MagicMock(),
         image_records=None,  # type: ignore
         images=None,  # type: ignore
         invocation_cache=MemoryInvocationCache(max_cache_size=0),
         latents=None,  # type: ignore
         logger=logging,  # type: ignore
         model_manager=None,  # type: ignore
+        model_prefetcher=None,  # type: ignore
         model_records=None,  # type: ignore
         download_queue=None,  # type: ignore
         model_install=None,  # type: ignore
@@ -92,6 +99,12 @@ def mock_invoker(mock_services: InvocationServices) -> Invoker:
     return Invoker(services=mock_services)
 
 
+@pytest.fixture()
+def mock_parallel_invoker(mock_services: InvocationServices) -> Invoker:
+    mock_services.configuration.node_workers = 2
+    return Invoker(services=mock_services)
+
+
 def test_can_create_graph_state(mock_invoker: Invoker):
     g = mock_invoker.create_execution_state()
     mock_invoker.stop()
@@ -179,3 +192,69 @@ def test_handles_errors(mock_invoker: Invoker):
     assert g.is_complete()
 
     assert all((i in g.errors for i in g.source_prepared_mapping["1"]))
+
+
+def invoke_all_and_wait(invoker: Invoker, graph: Graph) -> GraphExecutionState:
+    g = invoker.create_execution_state(graph=graph)
+    invoker.invoke(
+        session_queue_batch_id="1",
+        session_queue_item_id=1,
+        session_queue_id=DEFAULT_QUEUE_ID,
+        graph_execution_state=g,
+        invoke_all=True,
+    )
+
+    def has_executed_all(g: GraphExecutionState):
+        g = invoker.services.graph_execution_manager.get(g.id)
+        return g.is_complete() and not g.executing
+
+    wait_until(lambda: has_executed_all(g), timeout=10, interval=0.1)
+    invoker.stop()
+
+    return invoker.services.graph_execution_manager.get(g.id)
+
+
+def test_invokes_independent_nodes_concurrently(mock_parallel_invoker: Invoker):
+    concurrency_tracker.reset()
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="1", prompt="Banana sushi"))
+    graph.add_node(WaitForSiblingTestInvocation(id="2"))
+    graph.add_node(WaitForSiblingTestInvocation(id="3"))
+    graph.add_node(TextToImageTestInvocation(id="4"))
+    graph.add_edge(create_edge("1", "prompt", "2", "prompt"))
+    graph.add_edge(create_edge("1", "prompt", "3", "prompt"))
+    graph.add_edge(create_edge("2", "prompt", "4", "prompt"))
+    graph.add_edge(create_edge("3", "prompt", "4", "prompt2"))
+
+    # The waiting nodes fail unless they execute at the same time
+    g = invoke_all_and_wait(mock_parallel_invoker, graph)
+    assert not g.has_error()
+    assert g.is_complete()
+
+
+def test_invokes_gpu_nodes_one_at_a_time(mock_parallel_invoker: Invoker):
+    concurrency_tracker.reset()
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="1", prompt="Banana sushi"))
+    for i in range(2, 6):
+        graph.add_node(GPUTestInvocation(id=str(i)))
+        graph.add_edge(create_edge("1", "prompt", str(i), "prompt"))
+
+    g = invoke_all_and_wait(mock_parallel_invoker, graph)
+    assert not g.has_error()
+    assert g.is_complete()
+    assert concurrency_tracker.max_active == 1
+
+
+def test_pins_images_used_by_later_nodes(mock_invoker: Invoker):
+    mock_invoker.services.image_files = MagicMock()
+    graph = Graph()
+    graph.add_node(TextToImageTestInvocation(id="1", prompt="Banana sushi"))
+    graph.add_node(ImageToImageTestInvocation(id="2"))
+    graph.add_edge(create_edge("1", "image", "2", "image"))
+
+    g = invoke_all_and_wait(mock_invoker, graph)
+    assert not g.has_error()
+    # The test nodes name their images after themselves. The image of the last node is not used by any other node.
+    (image_name,) = g.source_prepared_mapping["1"]
+    mock_invoker.services.image_files.pin.assert_called_once_with(image_name, g.id)  # type: ignore
@@ -1,3 +1,5 @@
+import threading
+import time
 from typing import Any, Callable, Union
 
 from invokeai.app.invocations.baseinvocation import (
@@ -5,6 +7,7 @@ from invokeai.app.invocations.baseinvocation import (
     BaseInvocationOutput,
     InputField,
     InvocationContext,
+    InvocationResource,
     OutputField,
     invocation,
     invocation_output,
@@ -104,6 +107,55 @@ class PolymorphicStringTestInvocation(BaseInvocation):
         return PromptCollectionTestInvocationOutput(collection=self.value)
 
 
+class ConcurrencyTracker:
+    """Records how many test invocations execute at the same time"""
+
+    __test__ = False  # not a pytest test case
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def reset(self):
+        self.__init__()
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def exit(self):
+        with self.lock:
+            self.active -= 1
+
+
+concurrency_tracker = ConcurrencyTracker()
+
+
+@invocation("test_wait_for_sibling", version="1.0.0", resource=InvocationResource.CPU)
+class WaitForSiblingTestInvocation(BaseInvocation):
+    """Waits until another of these executes at the same time, fails if none does"""
+
+    prompt: str = InputField(default="")
+
+    def invoke(self, context: InvocationContext) -> PromptTestInvocationOutput:
+        concurrency_tracker.barrier.wait()
+        return PromptTestInvocationOutput(prompt=self.prompt)
+
+
+@invocation("test_gpu", version="1.0.0")
+class GPUTestInvocation(BaseInvocation):
+    prompt: str = InputField(default="")
+
+    def invoke(self, context: InvocationContext) -> PromptTestInvocationOutput:
+        concurrency_tracker.enter()
+        time.sleep(0.05)
+        concurrency_tracker.exit()
+        return PromptTestInvocationOutput(prompt=self.prompt)
+
+
 # Importing these must happen after test invocations are defined or they won't register
 from invokeai.app.services.events.events_base import EventServiceBase  # noqa: E402
 from invokeai.app.services.shared.graph import Edge, EdgeConnection  # noqa: E402
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+# This import must happen before other invoke imports or test in other files(!!) break
+from .test_nodes import wait_until  # isort: split
+
+from invokeai.app.services.session_processor.session_processor_default import POLLING_INTERVAL, DefaultSessionProcessor
+
+
+class MockSessionQueue:
+    def __init__(self, item_count: int):
+        self.items = [
+            SimpleNamespace(
+                item_id=i,
+                session_id=f"session_{i}",
+                session=MagicMock(),
+                batch_id="batch",
+                queue_id="default",
+                workflow=None,
+            )
+            for i in range(1, item_count + 1)
+        ]
+
+    def dequeue(self) -> Optional[Any]:
+        return self.items.pop(0) if self.items else None
+
+
+@pytest.fixture
+def invoker():
+    return SimpleNamespace(
+        services=SimpleNamespace(
+            configuration=SimpleNamespace(session_lanes=2),
+            session_queue=MockSessionQueue(3),
+            graph_execution_manager=MagicMock(),
+            image_files=MagicMock(),
+            latents=MagicMock(),
+            logger=MagicMock(),
+        ),
+        invoke=MagicMock(),
+    )
+
+
+@pytest.fixture
+def processor(invoker):
+    processor = DefaultSessionProcessor()
+    processor.start(invoker)  # type: ignore
+    yield processor
+    processor.stop()
+
+
+def send_event(processor: DefaultSessionProcessor, event_name: str, **data: Any) -> None:
+    asyncio.run(processor._on_queue_event(("queue_event", {"event": event_name, "data": data})))
+
+
+def lane_items(processor: DefaultSessionProcessor) -> list[Optional[int]]:
+    return [lane.queue_item_id for lane in processor.get_status().lanes]
+
+
+def test_processes_an_item_per_lane(processor: DefaultSessionProcessor):
+    wait_until(lambda: lane_items(processor) == [1, 2], timeout=5)
+    assert processor.get_status().is_processing
+
+
+def test_frees_the_lane_of_a_completed_item(processor: DefaultSessionProcessor, invoker):
+    wait_until(lambda: lane_items(processor) == [1, 2], timeout=5)
+    send_event(processor, "graph_execution_state_complete", queue_item_id=2)
+    # The processor is woken up by the event, well before it would have polled the queue
+    wait_until(lambda: lane_items(processor) == [1, 3], timeout=POLLING_INTERVAL / 2, interval=0.01)
+    invoker.services.latents.delete_session.assert_called_once_with("session_2")
+    invoker.services.image_files.unpin_session.assert_called_once_with("session_2")
+
+
+def test_frees_the_lane_of_a_canceled_item(processor: DefaultSessionProcessor):
+    wait_until(lambda: lane_items(processor) == [1, 2], timeout=5)
+    send_event(processor, "session_canceled", queue_item_id=1, graph_execution_state_id="session_1")
+    wait_until(lambda: lane_items(processor) == [3, 2], timeout=5)
+    send_event(processor, "queue_cleared")
+    wait_until(lambda: lane_items(processor) == [None, None], timeout=5)
+    assert not processor.get_status().is_processing
@@ -8,6 +8,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     NodeFieldValue,
     calc_session_count,
     create_session_nfv_tuples,
+    materialize_session,
     populate_graph,
     prepare_values_to_insert,
 )
@@ -177,6 +178,24 @@ def test_prepare_values_to_insert(batch_data_collection, batch_graph):
     assert all(v.priority == 0 for v in values)
 
 
+def test_prepare_values_to_insert_without_sessions(batch_data_collection, batch_graph):
+    b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
+    values = prepare_values_to_insert(
+        queue_id="default", batch=b, priority=0, max_new_queue_items=1000, store_sessions=False
+    )
+    assert len(values) == 8
+    assert all(v.session == "" and v.workflow is None for v in values)
+
+    # the sessions materialized from the batch graph are those that would have been stored
+    stored = prepare_values_to_insert(queue_id="default", batch=b, priority=0, max_new_queue_items=1000)
+    GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
+    for value, stored_value in zip(values, stored, strict=True):
+        field_values = TypeAdapter(list[NodeFieldValue]).validate_json(value.field_values)
+        session = materialize_session(b.graph, value.session_id, field_values)
+        assert session.id == value.session_id
+        assert session.graph == GraphExecutionStateValidator.validate_json(stored_value.session).graph
+
+
 def test_prepare_values_to_insert_with_priority(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
     values = prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=1000)
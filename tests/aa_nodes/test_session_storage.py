@@ -0,0 +1,107 @@
+import pytest
+
+# This import must happen before other invoke imports or test in other files(!!) break
+from .test_nodes import create_edge  # isort: split
+
+from invokeai.app.invocations.collections import RangeInvocation
+from invokeai.app.invocations.math import AddInvocation, MultiplyInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.item_storage.item_storage_session_sqlite import SqliteSessionStorage
+from invokeai.app.services.shared.graph import CollectInvocation, Graph, GraphExecutionState, IterateInvocation
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+@pytest.fixture
+def db() -> SqliteDatabase:
+    config = InvokeAIAppConfig(use_memory_db=True)
+    return SqliteDatabase(db_path=None, logger=InvokeAILogger.get_logger(), verbose=config.log_sql)
+
+
+def create_session(size: int) -> GraphExecutionState:
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range", start=0, stop=size, step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_node(MultiplyInvocation(id="multiply", b=10))
+    graph.add_node(AddInvocation(id="add", b=1))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("range", "collection", "iterate", "collection"))
+    graph.add_edge(create_edge("iterate", "item", "multiply", "a"))
+    graph.add_edge(create_edge("multiply", "value", "add", "a"))
+    graph.add_edge(create_edge("add", "value", "collect", "item"))
+    return GraphExecutionState(graph=graph)
+
+
+def execute(storage: SqliteSessionStorage, session: GraphExecutionState, node_count: int) -> None:
+    """Executes nodes of a session, saving it as the invoker and invocation processor do"""
+    for _ in range(node_count):
+        node = session.next()
+        if node is None:
+            return
+        storage.set(session)
+        session.complete(node.id, node.invoke(None))  # type: ignore
+        storage.set(session)
+
+
+def count_deltas(db: SqliteDatabase, session_id: str) -> int:
+    return db.conn.execute(
+        "SELECT COUNT(*) FROM graph_executions_deltas WHERE session_id = ?;", (session_id,)
+    ).fetchone()[0]
+
+
+def test_saves_deltas_between_checkpoints(db: SqliteDatabase):
+    storage = SqliteSessionStorage(db=db, checkpoint_interval=100)
+    session = create_session(5)
+    storage.set(session)
+    execute(storage, session, 6)
+    assert count_deltas(db, session.id) == 12
+    assert storage.get(session.id) is session
+
+    # Another instance reads the session from its checkpoint and deltas
+    loaded = SqliteSessionStorage(db=db).get(session.id)
+    assert loaded is not None
+    assert loaded.model_dump() == session.model_dump()
+
+
+def test_loaded_sessions_keep_saving_deltas(db: SqliteDatabase):
+    session = create_session(5)
+    storage = SqliteSessionStorage(db=db, checkpoint_interval=100)
+    storage.set(session)
+    execute(storage, session, 4)
+
+    storage = SqliteSessionStorage(db=db, checkpoint_interval=100)
+    loaded = storage.get(session.id)
+    assert loaded is not None
+    execute(storage, loaded, 1000)
+    assert loaded.is_complete()
+    assert {loaded.results[n].value for n in loaded.source_prepared_mapping["add"]} == {1, 11, 21, 31, 41}
+
+    reloaded = SqliteSessionStorage(db=db).get(session.id)
+    assert reloaded is not None
+    assert reloaded.model_dump() == loaded.model_dump()
+
+
+def test_writes_checkpoints(db: SqliteDatabase):
+    storage = SqliteSessionStorage(db=db, checkpoint_interval=4)
+    session = create_session(10)
+    storage.set(session)
+    execute(storage, session, 5)
+    assert count_deltas(db, session.id) < 5
+
+    execute(storage, session, 1000)
+    assert session.is_complete()
+    # Completed sessions are written as a checkpoint
+    assert count_deltas(db, session.id) == 0
+    loaded = SqliteSessionStorage(db=db).get(session.id)
+    assert loaded is not None
+    assert loaded.model_dump() == session.model_dump()
+
+
+def test_deletes_deltas(db: SqliteDatabase):
+    storage = SqliteSessionStorage(db=db)
+    session = create_session(3)
+    storage.set(session)
+    execute(storage, session, 2)
+    storage.delete(session.id)
+    assert storage.get(session.id) is None
+    assert count_deltas(db, session.id) == 0
@@ -1,3 +1,6 @@
+from pathlib import Path
+from threading import Thread
+
 import pytest
 from pydantic import BaseModel, Field
 
@@ -13,11 +16,11 @@ class TestModel(BaseModel):
     __test__ = False  # not a pytest test case
 
 
-@pytest.fixture
-def db() -> SqliteItemStorage[TestModel]:
-    config = InvokeAIAppConfig(use_memory_db=True)
+@pytest.fixture(params=["memory", "file"])
+def db(request: pytest.FixtureRequest, tmp_path: Path) -> SqliteItemStorage[TestModel]:
+    config = InvokeAIAppConfig(use_memory_db=request.param == "memory")
     logger = InvokeAILogger.get_logger()
-    db_path = None if config.use_memory_db else config.db_path
+    db_path = None if config.use_memory_db else tmp_path / "invokeai.db"
     db = SqliteDatabase(db_path=db_path, logger=logger, verbose=config.log_sql)
     sqlite_item_storage = SqliteItemStorage[TestModel](db=db, table_name="test", id_field="id")
     return sqlite_item_storage
@@ -137,3 +140,24 @@ def test_sqlite_service_can_search_with_pagination_and_offset(db: SqliteItemStor
     assert results.per_page == 2
     assert results.total == 3
     assert results.items == [TestModel(id="3", name="Test")]
+
+
+def test_sqlite_database_reads_do_not_wait_for_the_writer(tmp_path: Path):
+    db = SqliteDatabase(db_path=tmp_path / "invokeai.db", logger=InvokeAILogger.get_logger())
+    storage = SqliteItemStorage[TestModel](db=db, table_name="test", id_field="id")
+    storage.set(TestModel(id="1", name="Test"))
+    assert db.conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+
+    results: list = []
+    with db.lock:
+        # A write in progress on the writer connection
+        db.conn.execute("INSERT INTO test (item) VALUES (?);", ('{"id": "2", "name": "Uncommitted"}',))
+        reader = Thread(target=lambda: results.extend([storage.get("1"), storage.get("2")]))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+        db.conn.commit()
+
+    # Readers see the last committed state of the database
+    assert results == [TestModel(id="1", name="Test"), None]
+    assert storage.get("2") == TestModel(id="2", name="Uncommitted")
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+from invokeai.app.invocations.compel import CompelInvocation, ConditioningFieldData
+from invokeai.app.invocations.model import ClipField, LoraInfo, ModelInfo
+from invokeai.app.services.conditioning_cache.conditioning_cache_memory import MemoryConditioningCache
+from invokeai.backend.model_management.models import BaseModelType, ModelType, SubModelType
+from invokeai.backend.stable_diffusion.diffusion.conditioning_data import BasicConditioningInfo, ExtraConditioningInfo
+
+# 77 * 8 float32 values
+CONDITIONING_SIZE = 2464
+
+
+def create_conditioning(value: float) -> ConditioningFieldData:
+    return ConditioningFieldData(
+        conditionings=[
+            BasicConditioningInfo(
+                embeds=torch.full((1, 77, 8), float(value)),
+                extra_conditioning=ExtraConditioningInfo(tokens_count_including_eos_bos=3),
+            )
+        ]
+    )
+
+
+def create_clip(loras: list[LoraInfo]) -> ClipField:
+    def model_info(submodel: SubModelType) -> ModelInfo:
+        return ModelInfo(
+            model_name="sd-1.5", base_model=BaseModelType.StableDiffusion1, model_type=ModelType.Main, submodel=submodel
+        )
+
+    return ClipField(
+        tokenizer=model_info(SubModelType.Tokenizer),
+        text_encoder=model_info(SubModelType.TextEncoder),
+        skipped_layers=0,
+        loras=loras,
+    )
+
+
+def create_lora(weight: float) -> LoraInfo:
+    return LoraInfo(
+        model_name="style", base_model=BaseModelType.StableDiffusion1, model_type=ModelType.Lora, weight=weight
+    )
+
+
+def test_least_recently_used_conditioning_is_evicted():
+    # Room for two conditionings
+    cache = MemoryConditioningCache(max_cache_bytes=CONDITIONING_SIZE * 2)
+    for i in range(2):
+        cache.save(f"prompt_{i}", create_conditioning(i))
+    assert cache.get("prompt_0") is not None
+    cache.save("prompt_2", create_conditioning(2))
+
+    assert cache.get("prompt_1") is None
+    assert cache.get("prompt_0") is not None
+    assert cache.get("prompt_2") is not None
+
+    cache.clear()
+    assert cache.get("prompt_0") is None
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = MemoryConditioningCache(max_cache_bytes=0)
+    cache.save("prompt", create_conditioning(0))
+    assert cache.get("prompt") is None
+
+
+def test_keys_depend_on_all_inputs():
+    cache = MemoryConditioningCache()
+    key = cache.create_key(prompt="a cat", clip=create_clip([create_lora(0.5)]).model_dump(mode="json"))
+    assert key == cache.create_key(prompt="a cat", clip=create_clip([create_lora(0.5)]).model_dump(mode="json"))
+    assert key != cache.create_key(prompt="a dog", clip=create_clip([create_lora(0.5)]).model_dump(mode="json"))
+    assert key != cache.create_key(prompt="a cat", clip=create_clip([create_lora(0.75)]).model_dump(mode="json"))
+    assert key != cache.create_key(prompt="a cat", clip=create_clip([]).model_dump(mode="json"))
+
+
+def test_prompts_are_encoded_once(monkeypatch: pytest.MonkeyPatch):
+    encoded: list[str] = []
+
+    def encode_prompt(self: CompelInvocation, context) -> ConditioningFieldData:
+        encoded.append(self.prompt)
+        return create_conditioning(len(encoded))
+
+    monkeypatch.setattr(CompelInvocation, "encode_prompt", encode_prompt)
+    latents = MagicMock()
+    services = SimpleNamespace(conditioning_cache=MemoryConditioningCache(), latents=latents)
+
+    # The sessions of a batch of seeds
+    for session_id in ["session_1", "session_2"]:
+        context = SimpleNamespace(services=services, graph_execution_state_id=session_id)
+        invocation = CompelInvocation(id="prompt", prompt="a cat", clip=create_clip([create_lora(0.5)]))
+        output = invocation.invoke(context)  # type: ignore
+        assert output.conditioning.conditioning_name == f"{session_id}_prompt_conditioning"
+
+    assert encoded == ["a cat"]
+    first_conditioning = latents.save.call_args_list[0].args[1]
+    assert latents.save.call_args_list[1].args[1] is first_conditioning
+
+    # Another LoRA weight is encoded again
+    invocation = CompelInvocation(id="prompt", prompt="a cat", clip=create_clip([create_lora(1.0)]))
+    invocation.invoke(SimpleNamespace(services=services, graph_execution_state_id="session_3"))  # type: ignore
+    assert encoded == ["a cat", "a cat"]
@@ -0,0 +1,113 @@
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from invokeai.app.services.image_files import image_files_disk
+from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+
+# A decoded 8x8 RGB image
+IMAGE_SIZE = 8 * 8 * 3
+
+
+def create_invoker() -> SimpleNamespace:
+    return SimpleNamespace(
+        services=SimpleNamespace(configuration=SimpleNamespace(png_compress_level=1), logger=MagicMock())
+    )
+
+
+@pytest.fixture
+def image_files(tmp_path: Path) -> DiskImageFileStorage:
+    image_files = DiskImageFileStorage(tmp_path, max_cache_bytes=IMAGE_SIZE * 2)
+    image_files.start(create_invoker())  # type: ignore
+    for color in ("red", "green", "blue"):
+        Image.new("RGB", (8, 8), color).save(image_files.get_path(f"{color}.png"))
+    return image_files
+
+
+def test_caches_decoded_images(image_files: DiskImageFileStorage):
+    image = image_files.get("red.png")
+    assert image_files.get("red.png") is image
+    assert image.im is not None, "the image is decoded"
+    status = image_files.get_cache_status()
+    assert (status.hits, status.misses, status.size, status.size_in_bytes) == (1, 1, 1, IMAGE_SIZE)
+
+
+def test_evicts_least_recently_used_images(image_files: DiskImageFileStorage):
+    red = image_files.get("red.png")
+    image_files.get("green.png")
+    image_files.get("red.png")
+    image_files.get("blue.png")
+    assert image_files.get("red.png") is red
+    assert image_files.get_cache_status().misses == 3
+    image_files.get("green.png")
+    assert image_files.get_cache_status().misses == 4
+
+
+def test_pinned_images_are_evicted_last(image_files: DiskImageFileStorage):
+    red = image_files.get("red.png")
+    image_files.pin("red.png", "session")
+    image_files.get("green.png")
+    image_files.get("blue.png")
+    assert image_files.get("red.png") is red
+    assert image_files.get_cache_status().pinned == 1
+
+    image_files.unpin_session("session")
+    image_files.get("green.png")
+    image_files.get("blue.png")
+    assert image_files.get("red.png") is not red
+
+
+def test_saved_images_are_cached(image_files: DiskImageFileStorage):
+    image = Image.new("RGB", (8, 8), "white")
+    image_files.save(image, "white.png")
+    assert image_files.get("white.png") is image
+    image_files.delete("white.png")
+    assert image_files.get_cache_status().size == 0
+
+
+def test_writes_images_in_the_background(tmp_path: Path):
+    image_files = DiskImageFileStorage(tmp_path, max_cache_bytes=0, max_writers=1)
+    image_files.start(create_invoker())  # type: ignore
+    image = Image.new("RGB", (8, 8), "white")
+    image_files.save(image, "white.png")
+    # Pending images are served from memory, even when they do not fit in the cache
+    assert image_files.get("white.png") is image
+    image_files.flush()
+    assert not image_files.is_pending("white.png")
+    assert image_files.get_path("white.png").exists()
+    assert image_files.get_path("white.png", thumbnail=True).exists()
+    assert image_files.get_cache_status().size == 0
+    image_files.stop(create_invoker())  # type: ignore
+
+
+def test_stop_completes_pending_writes(tmp_path: Path):
+    image_files = DiskImageFileStorage(tmp_path, max_writers=2)
+    image_files.start(create_invoker())  # type: ignore
+    for i in range(10):
+        image_files.save(Image.new("RGB", (8, 8), "white"), f"white_{i}.png")
+    image_files.stop(create_invoker())  # type: ignore
+    assert all(image_files.get_path(f"white_{i}.png").exists() for i in range(10))
+
+
+def test_delete_many_trashes_images_and_thumbnails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    trashed: list[Path] = []
+
+    def send2trash(paths: list[Path]) -> None:
+        if any(path.name == "green.png" for path in paths):
+            raise OSError("Permission denied")
+        trashed.extend(paths)
+
+    monkeypatch.setattr(image_files_disk, "send2trash", send2trash)
+    image_files = DiskImageFileStorage(tmp_path, max_writers=2)
+    image_files.start(create_invoker())  # type: ignore
+    for color in ("red", "green", "blue"):
+        image_files.save(Image.new("RGB", (8, 8), color), f"{color}.png")
+
+    deleted = image_files.delete_many(["red.png", "green.png", "blue.png", "red.png", "missing.png"])
+    assert deleted == ["red.png", "blue.png", "missing.png"]
+    assert sorted(path.name for path in trashed) == ["blue.png", "blue.webp", "red.png", "red.webp"]
+    assert image_files.get_cache_status().size == 1, "only the image that could not be deleted stays cached"
+    image_files.stop(create_invoker())  # type: ignore
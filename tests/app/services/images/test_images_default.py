@@ -0,0 +1,92 @@
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from invokeai.app.services.board_image_records.board_image_records_sqlite import SqliteBoardImageRecordStorage
+from invokeai.app.services.board_records.board_records_sqlite import SqliteBoardRecordStorage
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.image_files import image_files_disk
+from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+from invokeai.app.services.image_records.image_records_common import ImageCategory, ImageRecordChanges, ResourceOrigin
+from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
+from invokeai.app.services.images.images_default import ImageService
+from invokeai.app.services.names.names_default import SimpleNameService
+from invokeai.app.services.urls.urls_default import LocalUrlService
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+
+
+@pytest.fixture
+def services(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    monkeypatch.setattr(image_files_disk, "send2trash", lambda paths: [path.unlink() for path in paths])
+    config = InvokeAIAppConfig(use_memory_db=True, png_compress_level=1)
+    logger = InvokeAILogger.get_logger(config=config)
+    db = create_mock_sqlite_database(config, logger)
+    services = SimpleNamespace(
+        configuration=config,
+        logger=logger,
+        board_records=SqliteBoardRecordStorage(db=db),
+        board_image_records=SqliteBoardImageRecordStorage(db=db),
+        image_files=DiskImageFileStorage(tmp_path),
+        image_records=SqliteImageRecordStorage(db=db),
+        names=SimpleNameService(),
+        urls=LocalUrlService(),
+    )
+    services.image_files.start(SimpleNamespace(services=services))
+    return services
+
+
+@pytest.fixture
+def images(services: SimpleNamespace) -> ImageService:
+    invoker = SimpleNamespace(services=services)
+    images = ImageService()
+    images.start(invoker)  # type: ignore
+    return images
+
+
+def create_images(images: ImageService, count: int, board_id: Optional[str] = None) -> list[str]:
+    return [
+        images.create(
+            Image.new("RGB", (8, 8), "red"), ResourceOrigin.INTERNAL, ImageCategory.GENERAL, board_id=board_id
+        ).image_name
+        for _ in range(count)
+    ]
+
+
+def test_update_many(images: ImageService):
+    image_names = create_images(images, 3)
+    updated = images.update_many([*image_names[:2], "missing.png"], ImageRecordChanges(starred=True))
+    assert updated == image_names[:2]
+    assert [images.get_record(image_name).starred for image_name in image_names] == [True, True, False]
+
+
+def test_delete_many_notifies_once(images: ImageService):
+    image_names = create_images(images, 3)
+    deleted_many = MagicMock()
+    deleted = MagicMock()
+    images.on_deleted_many(deleted_many)
+    images.on_deleted(deleted)
+
+    assert images.delete_many([*image_names[:2], "missing.png"]) == image_names[:2]
+    deleted_many.assert_called_once_with(image_names[:2])
+    assert deleted.call_count == 2
+    assert images.get_many(limit=10).total == 1
+    assert not Path(images.get_path(image_names[0])).exists()
+    assert not Path(images.get_path(image_names[0], thumbnail=True)).exists()
+    assert Path(images.get_path(image_names[2])).exists()
+
+
+def test_delete_images_on_board(images: ImageService, services: SimpleNamespace):
+    board_id = services.board_records.save("board").board_id
+    on_board = create_images(images, 3, board_id=board_id)
+    create_images(images, 1)
+    deleted_many = MagicMock()
+    images.on_deleted_many(deleted_many)
+
+    images.delete_images_on_board(board_id)
+    assert sorted(deleted_many.call_args.args[0]) == sorted(on_board)
+    assert images.get_many(limit=10).total == 1
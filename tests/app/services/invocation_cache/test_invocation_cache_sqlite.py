@@ -0,0 +1,168 @@
+from types import SimpleNamespace
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+from PIL import Image
+
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.invocations.primitives import (
+    ImageField,
+    ImageInvocation,
+    ImageOutput,
+    IntegerOutput,
+    LatentsField,
+    LatentsInvocation,
+    LatentsOutput,
+)
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.invocation_cache.invocation_cache_sqlite import SqliteInvocationCache
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+
+
+class MockStorage:
+    def __init__(self, items: dict) -> None:
+        self.items = items
+        self.callbacks: list[Callable[[str], None]] = []
+        self.many_callbacks: list[Callable[[list[str]], None]] = []
+
+    def get(self, name: str):
+        return self.items[name]
+
+    def get_pil_image(self, name: str) -> Image.Image:
+        return self.items[name]
+
+    def on_deleted(self, callback: Callable[[str], None]) -> None:
+        self.callbacks.append(callback)
+
+    def on_deleted_many(self, callback: Callable[[list[str]], None]) -> None:
+        self.many_callbacks.append(callback)
+
+    def delete(self, name: str) -> None:
+        self.delete_many([name])
+
+    def delete_many(self, names: list[str]) -> None:
+        for name in names:
+            del self.items[name]
+            for callback in self.callbacks:
+                callback(name)
+        for many_callback in self.many_callbacks:
+            many_callback(names)
+
+
+@pytest.fixture
+def db() -> SqliteDatabase:
+    config = InvokeAIAppConfig(use_memory_db=True)
+    return create_mock_sqlite_database(config, InvokeAILogger.get_logger(config=config))
+
+
+@pytest.fixture
+def invoker():
+    return SimpleNamespace(
+        services=SimpleNamespace(
+            images=MockStorage(
+                {
+                    "red.png": Image.new("RGB", (8, 8), "red"),
+                    "red_again.png": Image.new("RGB", (8, 8), "red"),
+                    "blue.png": Image.new("RGB", (8, 8), "blue"),
+                }
+            ),
+            latents=MockStorage({"latents": torch.zeros(1, 4, 8, 8), "latents_again": torch.zeros(1, 4, 8, 8)}),
+            logger=MagicMock(),
+        )
+    )
+
+
+def create_cache(db: SqliteDatabase, invoker, max_cache_size: int = 100, max_cache_bytes: int = 2**20):
+    cache = SqliteInvocationCache(db=db, max_cache_size=max_cache_size, max_cache_bytes=max_cache_bytes)
+    cache.start(invoker)
+    return cache
+
+
+def image_output(image_name: str) -> ImageOutput:
+    return ImageOutput(image=ImageField(image_name=image_name), width=8, height=8)
+
+
+def test_keys_are_content_hashes(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker)
+    key = cache.create_key(AddInvocation(id="1", a=1, b=2))
+    assert key == cache.create_key(AddInvocation(id="2", a=1, b=2))
+    assert key != cache.create_key(AddInvocation(id="1", a=2, b=1))
+    # Images and latents are keyed on their content, not their names
+    red = cache.create_key(ImageInvocation(id="1", image=ImageField(image_name="red.png")))
+    assert red == cache.create_key(ImageInvocation(id="2", image=ImageField(image_name="red_again.png")))
+    assert red != cache.create_key(ImageInvocation(id="1", image=ImageField(image_name="blue.png")))
+    assert cache.create_key(LatentsInvocation(latents=LatentsField(latents_name="latents"))) == cache.create_key(
+        LatentsInvocation(latents=LatentsField(latents_name="latents_again"))
+    )
+
+
+def test_outputs_persist(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker)
+    cache.save("integer", IntegerOutput(value=3))
+    cache.save("image", image_output("red.png"))
+    cache.save("latents", LatentsOutput(latents=LatentsField(latents_name="latents"), width=8, height=8))
+    db.conn.execute(
+        "INSERT INTO images (image_name, image_origin, image_category, width, height) VALUES ('red.png', 'internal', 'general', 8, 8);"
+    )
+
+    cache = create_cache(db, invoker)
+    assert cache.get("integer") == IntegerOutput(value=3)
+    assert cache.get("image") == image_output("red.png")
+    # Latents do not outlive the process
+    assert cache.get("latents") is None
+    assert cache.get_status().size == 2
+
+
+def test_evicts_least_recently_used_outputs_by_size(db: SqliteDatabase, invoker):
+    size = len(IntegerOutput(value=0).model_dump_json().encode())
+    cache = create_cache(db, invoker, max_cache_bytes=size * 2)
+    cache.save("1", IntegerOutput(value=1))
+    cache.save("2", IntegerOutput(value=2))
+    assert cache.get("1") is not None
+    cache.save("3", IntegerOutput(value=3))
+    assert cache.get("2") is None
+    assert cache.get("1") is not None and cache.get("3") is not None
+    status = cache.get_status()
+    assert status.size == 2 and status.size_in_bytes == size * 2
+    assert create_cache(db, invoker).get("2") is None
+
+
+def test_evicts_least_recently_used_outputs_by_count(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker, max_cache_size=1)
+    cache.save("1", IntegerOutput(value=1))
+    cache.save("2", IntegerOutput(value=2))
+    assert cache.get("1") is None
+    assert cache.get("2") is not None
+
+
+def test_deleting_a_reference_invalidates_outputs(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker)
+    cache.save("red", image_output("red.png"))
+    cache.save("blue", image_output("blue.png"))
+    invoker.services.images.delete("red.png")
+    assert cache.get("red") is None
+    assert cache.get("blue") is not None
+    assert db.conn.execute("SELECT COUNT(*) FROM invocation_cache_references;").fetchone()[0] == 1
+
+
+def test_deleting_many_references_invalidates_outputs(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker)
+    cache.save("red", image_output("red.png"))
+    cache.save("red_again", image_output("red_again.png"))
+    cache.save("blue", image_output("blue.png"))
+    invoker.services.images.delete_many(["red.png", "red_again.png"])
+    assert cache.get("red") is None
+    assert cache.get("red_again") is None
+    assert cache.get("blue") is not None
+
+
+def test_clear(db: SqliteDatabase, invoker):
+    cache = create_cache(db, invoker)
+    cache.save("red", image_output("red.png"))
+    cache.clear()
+    assert cache.get_status().size == 0
+    assert create_cache(db, invoker).get("red") is None
@@ -0,0 +1,103 @@
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+from invokeai.app.invocations.compel import ConditioningFieldData
+from invokeai.app.services.latents_storage.latents_storage_disk import DiskLatentsStorage
+from invokeai.app.services.latents_storage.latents_storage_forward_cache import ForwardCacheLatentsStorage
+from invokeai.backend.stable_diffusion.diffusion.conditioning_data import BasicConditioningInfo
+
+# 4 * 8 * 8 float32 values
+LATENTS_SIZE = 1024
+
+
+def create_latents(value: float) -> torch.Tensor:
+    return torch.full((1, 4, 8, 8), float(value))
+
+
+@pytest.fixture
+def disk_storage(tmp_path: Path) -> DiskLatentsStorage:
+    return DiskLatentsStorage(tmp_path)
+
+
+@pytest.fixture
+def storage(disk_storage: DiskLatentsStorage):
+    storage = ForwardCacheLatentsStorage(disk_storage, max_cache_bytes=LATENTS_SIZE * 2)
+    invoker = SimpleNamespace(services=SimpleNamespace(logger=MagicMock()))
+    storage.start(invoker)  # type: ignore
+    yield storage
+    storage.stop(invoker)  # type: ignore
+
+
+def test_tensors_are_stored_as_safetensors(storage: ForwardCacheLatentsStorage, disk_storage: DiskLatentsStorage):
+    storage.save("session_latents", create_latents(1))
+    storage.flush()
+    assert disk_storage.get_path("session_latents").exists()
+    assert torch.equal(disk_storage.get("session_latents"), create_latents(1))
+
+
+def test_objects_are_pickled(storage: ForwardCacheLatentsStorage, disk_storage: DiskLatentsStorage):
+    conditioning = ConditioningFieldData(
+        conditionings=[BasicConditioningInfo(embeds=torch.ones(1, 77, 8), extra_conditioning=None)]
+    )
+    storage.save("session_conditioning", conditioning)
+    storage.flush()
+    assert disk_storage.get_object_path("session_conditioning").exists()
+    assert torch.equal(disk_storage.get("session_conditioning").conditionings[0].embeds, torch.ones(1, 77, 8))
+
+
+def test_evicts_least_recently_used_latents(storage: ForwardCacheLatentsStorage, disk_storage: DiskLatentsStorage):
+    disk_storage.get = MagicMock(wraps=disk_storage.get)
+    storage.save("session_1", create_latents(1))
+    storage.save("session_2", create_latents(2))
+    storage.flush()
+    storage.get("session_1")
+    storage.save("session_3", create_latents(3))
+    storage.flush()
+    # session_1 was used more recently than session_2
+    assert torch.equal(storage.get("session_1"), create_latents(1))
+    assert torch.equal(storage.get("session_3"), create_latents(3))
+    disk_storage.get.assert_not_called()
+    assert torch.equal(storage.get("session_2"), create_latents(2))
+    disk_storage.get.assert_called_once_with("session_2")
+
+
+def test_latents_are_kept_in_memory_until_written(disk_storage: DiskLatentsStorage):
+    storage = ForwardCacheLatentsStorage(disk_storage, max_cache_bytes=0)
+    # Without the writer thread, nothing is written
+    for i in range(3):
+        storage.save(f"session_{i}", create_latents(i))
+    assert torch.equal(storage.get("session_0"), create_latents(0))
+    assert not disk_storage.get_path("session_0").exists()
+
+
+def test_delete_session(storage: ForwardCacheLatentsStorage, disk_storage: DiskLatentsStorage):
+    deleted: list[str] = []
+    storage.on_deleted(deleted.append)
+    storage.save("a_1", create_latents(1))
+    storage.save("a_2", create_latents(2))
+    storage.save("b_1", create_latents(3))
+    storage.delete_session("a")
+    # Latents saved by nodes that finish after their session was deleted are dropped
+    storage.save("a_3", create_latents(4))
+    storage.flush()
+    assert sorted(deleted) == ["a_1", "a_2"]
+    assert [path.name for path in disk_storage.get_path("b_1").parent.iterdir()] == ["b_1.safetensors"]
+    with pytest.raises(FileNotFoundError):
+        storage.get("a_1")
+
+
+def test_leftover_latents_are_deleted_on_start(tmp_path: Path):
+    torch.save(create_latents(1), tmp_path / "old_latents")
+    storage = DiskLatentsStorage(tmp_path)
+    storage.start(SimpleNamespace(services=SimpleNamespace(logger=MagicMock())))  # type: ignore
+    storage.save("new_latents", create_latents(2))
+    # The leftover latents are deleted in the background
+    deadline = time.time() + 5
+    while (tmp_path / "old_latents").exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert [path.name for path in tmp_path.iterdir()] == ["new_latents.safetensors"]
@@ -0,0 +1,143 @@
+import threading
+from types import SimpleNamespace
+from typing import Callable, Optional
+from unittest.mock import MagicMock
+
+from invokeai.app.invocations.model import (
+    LoraLoaderInvocation,
+    LoRAModelField,
+    MainModelField,
+    MainModelLoaderInvocation,
+    VaeLoaderInvocation,
+    VAEModelField,
+)
+from invokeai.app.invocations.sdxl import SDXLModelLoaderInvocation
+from invokeai.app.services.model_prefetcher.model_prefetcher_default import (
+    DefaultModelPrefetcher,
+    PrefetchModel,
+    get_prefetch_models,
+)
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from invokeai.backend.model_management import BaseModelType, ModelType, SubModelType
+
+SD1 = BaseModelType.StableDiffusion1
+SDXL = BaseModelType.StableDiffusionXL
+
+
+def create_graph() -> Graph:
+    graph = Graph()
+    graph.add_node(
+        MainModelLoaderInvocation(
+            id="main", model=MainModelField(model_name="sd", base_model=SD1, model_type=ModelType.Main)
+        )
+    )
+    graph.add_node(LoraLoaderInvocation(id="lora", lora=LoRAModelField(model_name="lora", base_model=SD1)))
+    graph.add_node(VaeLoaderInvocation(id="vae", vae_model=VAEModelField(model_name="vae", base_model=SD1)))
+    return graph
+
+
+class FakeModelManager:
+    """Prefetches every model except those named `cached`, which are already in the cache"""
+
+    def __init__(self):
+        self.prefetched: list[PrefetchModel] = []
+        self.done = threading.Event()
+
+    def prefetch_model(
+        self,
+        model_name: str,
+        base_model: BaseModelType,
+        model_type: ModelType,
+        submodel: Optional[SubModelType] = None,
+        on_load_started: Optional[Callable[[], None]] = None,
+    ):
+        if model_name == "missing":
+            raise Exception("Model not found")
+        if model_name == "cached":
+            return None
+        assert on_load_started is not None
+        on_load_started()
+        self.prefetched.append(PrefetchModel(model_name, base_model, model_type, submodel))
+        if model_name == "last":
+            self.done.set()
+        return MagicMock()
+
+
+def create_invoker(graphs: list[Graph], model_manager: FakeModelManager) -> SimpleNamespace:
+    queue_items = [
+        SimpleNamespace(queue_id="default", item_id=i, batch_id="batch", session_id=f"session_{i}", session=session)
+        for i, session in enumerate(GraphExecutionState(graph=graph) for graph in graphs)
+    ]
+    session_queue = MagicMock()
+    session_queue.get_pending.side_effect = lambda limit: queue_items[:limit]
+    return SimpleNamespace(
+        services=SimpleNamespace(
+            configuration=SimpleNamespace(prefetch_depth=2),
+            events=MagicMock(),
+            logger=MagicMock(),
+            model_manager=model_manager,
+            session_queue=session_queue,
+        )
+    )
+
+
+def test_gets_the_models_of_a_graph():
+    graph = create_graph()
+    graph.add_node(
+        SDXLModelLoaderInvocation(
+            id="sdxl", model=MainModelField(model_name="sdxl", base_model=SDXL, model_type=ModelType.Main)
+        )
+    )
+    # Models used by several nodes are only listed once
+    graph.add_node(VaeLoaderInvocation(id="vae_2", vae_model=VAEModelField(model_name="vae", base_model=SD1)))
+
+    assert get_prefetch_models(graph) == [
+        PrefetchModel("sd", SD1, ModelType.Main, SubModelType.TextEncoder),
+        PrefetchModel("sd", SD1, ModelType.Main, SubModelType.UNet),
+        PrefetchModel("sd", SD1, ModelType.Main, SubModelType.Vae),
+        PrefetchModel("lora", SD1, ModelType.Lora),
+        PrefetchModel("vae", SD1, ModelType.Vae),
+        PrefetchModel("sdxl", SDXL, ModelType.Main, SubModelType.TextEncoder),
+        PrefetchModel("sdxl", SDXL, ModelType.Main, SubModelType.TextEncoder2),
+        PrefetchModel("sdxl", SDXL, ModelType.Main, SubModelType.UNet),
+        PrefetchModel("sdxl", SDXL, ModelType.Main, SubModelType.Vae),
+    ]
+
+
+def test_prefetches_the_models_of_pending_queue_items():
+    second = Graph()
+    second.add_node(VaeLoaderInvocation(id="cached", vae_model=VAEModelField(model_name="cached", base_model=SD1)))
+    second.add_node(VaeLoaderInvocation(id="missing", vae_model=VAEModelField(model_name="missing", base_model=SD1)))
+    second.add_node(VaeLoaderInvocation(id="last", vae_model=VAEModelField(model_name="last", base_model=SD1)))
+    beyond_depth = Graph()
+    beyond_depth.add_node(VaeLoaderInvocation(id="vae", vae_model=VAEModelField(model_name="other", base_model=SD1)))
+    model_manager = FakeModelManager()
+    invoker = create_invoker([create_graph(), second, beyond_depth], model_manager)
+
+    prefetcher = DefaultModelPrefetcher()
+    prefetcher.start(invoker)  # type: ignore
+    try:
+        prefetcher.prefetch()
+        assert model_manager.done.wait(5)
+    finally:
+        prefetcher.stop()
+
+    assert [model.model_name for model in model_manager.prefetched] == ["sd", "sd", "sd", "lora", "vae", "last"]
+    events = invoker.services.events
+    assert events.emit_model_load_started.call_count == 6
+    assert events.emit_model_load_completed.call_count == 6
+    last_event = events.emit_model_load_completed.call_args.kwargs
+    assert last_event["prefetch"] is True
+    assert (last_event["queue_item_id"], last_event["model_name"]) == (1, "last")
+
+
+def test_does_not_start_when_disabled():
+    model_manager = FakeModelManager()
+    invoker = create_invoker([create_graph()], model_manager)
+    invoker.services.configuration.prefetch_depth = 0
+
+    prefetcher = DefaultModelPrefetcher()
+    prefetcher.start(invoker)  # type: ignore
+    prefetcher.prefetch()
+    prefetcher.stop()
+    invoker.services.session_queue.get_pending.assert_not_called()
@@ -0,0 +1,246 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from invokeai.app.invocations.primitives import StringInvocation
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_queue import session_queue_sqlite
+from invokeai.app.services.session_queue.session_queue_common import DEFAULT_QUEUE_ID, Batch, BatchDatum
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+
+
+@pytest.fixture
+def db() -> SqliteDatabase:
+    config = InvokeAIAppConfig(use_memory_db=True)
+    return create_mock_sqlite_database(config, InvokeAILogger.get_logger(config=config))
+
+
+@pytest.fixture
+def invoker():
+    return SimpleNamespace(
+        services=SimpleNamespace(
+            configuration=InvokeAIAppConfig(use_memory_db=True),
+            events=MagicMock(),
+            logger=MagicMock(),
+            queue=MagicMock(),
+        )
+    )
+
+
+@pytest.fixture
+def batch() -> Batch:
+    graph = Graph()
+    graph.add_node(StringInvocation(id="1", value="Chevy"))
+    graph.add_node(StringInvocation(id="2", value="Toyota"))
+    return Batch(
+        graph=graph,
+        data=[[BatchDatum(node_path="1", field_name="value", items=["Banana sushi", "Grape sushi"])]],
+        runs=2,
+    )
+
+
+def create_queue(db: SqliteDatabase, invoker, batch_templates: bool = True) -> SqliteSessionQueue:
+    queue = SqliteSessionQueue(db=db, batch_templates=batch_templates)
+    queue.start(invoker)
+    return queue
+
+
+def count_rows(db: SqliteDatabase, table: str) -> int:
+    with db.read() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.parametrize("batch_templates", [True, False])
+def test_sessions_are_materialized_when_dequeued(db: SqliteDatabase, invoker, batch: Batch, batch_templates: bool):
+    queue = create_queue(db, invoker, batch_templates=batch_templates)
+    assert queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False).enqueued == 4
+    assert count_rows(db, "session_queue_batches") == (1 if batch_templates else 0)
+
+    prompts = []
+    session_ids = set()
+    while (queue_item := queue.dequeue()) is not None:
+        assert queue_item.session.id == queue_item.session_id
+        assert queue_item.status == "in_progress"
+        prompts.append(queue_item.session.graph.get_node("1").value)
+        assert queue_item.session.graph.get_node("2").value == "Toyota"
+        session_ids.add(queue_item.session_id)
+        # Reading it again gives the same session
+        session = queue.get_queue_item(queue_item.item_id).session
+        assert session.id == queue_item.session.id
+        assert session.graph == queue_item.session.graph
+    assert prompts == ["Banana sushi", "Grape sushi"] * 2
+    assert len(session_ids) == 4
+    # The template is not modified by materializing sessions from it
+    assert batch.graph.get_node("1").value == "Chevy"
+
+
+def test_templates_are_deleted_with_their_last_queue_item(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+    queue_item = queue.dequeue()
+    assert queue_item is not None
+    queue.delete_queue_item(queue_item.item_id)
+    assert count_rows(db, "session_queue_batches") == 1
+
+    queue.clear(DEFAULT_QUEUE_ID)
+    assert count_rows(db, "session_queue_batches") == 0
+
+
+def test_reused_batch_ids_keep_their_templates(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+    other_batch = batch.model_copy(deep=True)
+    other_batch.graph.get_node("2").value = "Subaru"  # type: ignore [attr-defined]
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, other_batch, prepend=False)
+
+    prompts = []
+    while (queue_item := queue.dequeue()) is not None:
+        prompts.append(queue_item.session.graph.get_node("2").value)
+    assert prompts == ["Toyota"] * 4 + ["Subaru"] * 4
+
+
+def test_queue_status_counts_follow_the_queue_items(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+    queue.enqueue_batch("other_queue", batch.model_copy(update={"batch_id": "other_batch"}), prepend=False)
+    first = queue.dequeue()
+    second = queue.dequeue()
+    assert first is not None and second is not None
+    queue.cancel_queue_item(first.item_id)
+    queue.delete_queue_item(second.item_id)
+
+    status = queue.get_queue_status(DEFAULT_QUEUE_ID)
+    assert (status.pending, status.in_progress, status.canceled, status.total) == (2, 0, 1, 3)
+    batch_status = queue.get_batch_status(DEFAULT_QUEUE_ID, batch.batch_id)
+    assert (batch_status.pending, batch_status.canceled, batch_status.total) == (2, 1, 3)
+    assert queue.get_queue_status("other_queue").pending == 4
+    assert not queue.is_empty(DEFAULT_QUEUE_ID).is_empty
+
+    assert queue.prune(DEFAULT_QUEUE_ID).deleted == 1
+    assert queue.get_queue_status(DEFAULT_QUEUE_ID).total == 2
+    queue.clear(DEFAULT_QUEUE_ID)
+    assert queue.get_queue_status(DEFAULT_QUEUE_ID).total == 0
+    assert queue.is_empty(DEFAULT_QUEUE_ID).is_empty
+    assert queue.get_queue_status("other_queue").total == 4
+    # Only the count of the pending items of the other batch is left
+    assert count_rows(db, "session_queue_counts") == 1
+
+
+def test_queue_items_are_dequeued_once(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    for i in range(5):
+        queue.enqueue_batch(DEFAULT_QUEUE_ID, batch.model_copy(update={"batch_id": f"batch_{i}"}), prepend=False)
+    dequeued: list[int] = []
+
+    def dequeue() -> None:
+        while (queue_item := queue.dequeue()) is not None:
+            dequeued.append(queue_item.item_id)
+
+    threads = [threading.Thread(target=dequeue) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(dequeued) == 20
+    assert len(set(dequeued)) == 20
+
+
+def test_list_queue_items_by_status(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch.model_copy(update={"batch_id": "prepended"}), prepend=True)
+    items = queue.list_queue_items(DEFAULT_QUEUE_ID, limit=8, priority=0).items
+    assert [item.batch_id for item in items] == ["prepended"] * 4 + [batch.batch_id] * 4
+    queue.cancel_queue_item(items[-1].item_id)
+
+    first_page = queue.list_queue_items(DEFAULT_QUEUE_ID, limit=5, priority=0, status="pending")
+    assert [item.batch_id for item in first_page.items] == ["prepended"] * 4 + [batch.batch_id]
+    assert first_page.has_more
+    last = first_page.items[-1]
+    second_page = queue.list_queue_items(
+        DEFAULT_QUEUE_ID, limit=5, priority=last.priority, cursor=last.item_id, status="pending"
+    )
+    assert [item.item_id for item in second_page.items] == [item.item_id for item in items[5:7]]
+    assert not second_page.has_more
+
+
+def test_batches_are_enqueued_in_chunks(db: SqliteDatabase, invoker, batch: Batch, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(session_queue_sqlite, "ENQUEUE_CHUNK_SIZE", 3)
+    queue = create_queue(db, invoker)
+    dequeued = []
+    emit_progress = invoker.services.events.emit_batch_enqueue_progress
+    emit_progress.side_effect = lambda **kwargs: dequeued.append(queue.dequeue())
+
+    assert queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False).enqueued == 4
+    emit_progress.assert_called_once_with(queue_id=DEFAULT_QUEUE_ID, batch_id=batch.batch_id, enqueued=3, total=4)
+    # The first items can be dequeued while the others are enqueued
+    assert dequeued[0] is not None
+    assert queue.get_queue_status(DEFAULT_QUEUE_ID).pending == 3
+
+
+def dequeue_all(queue: SqliteSessionQueue) -> list[str]:
+    """Dequeues and completes every item, returning the batch IDs in the order they were dequeued"""
+    batch_ids = []
+    while (queue_item := queue.dequeue()) is not None:
+        batch_ids.append(queue_item.batch_id)
+        queue._set_queue_item_status(queue_item.item_id, "completed")
+    return batch_ids
+
+
+def test_round_robin_scheduling(db: SqliteDatabase, invoker, batch: Batch):
+    invoker.services.configuration = InvokeAIAppConfig(use_memory_db=True, queue_scheduling="round_robin")
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch("a", batch.model_copy(update={"batch_id": "a"}), prepend=False)
+    queue.enqueue_batch("b", batch.model_copy(update={"batch_id": "b", "runs": 1}), prepend=False)
+    assert dequeue_all(queue) == ["a", "b", "a", "b", "a", "a"]
+
+
+def test_fair_scheduling(db: SqliteDatabase, invoker, batch: Batch):
+    invoker.services.configuration = InvokeAIAppConfig(use_memory_db=True, queue_scheduling="fair")
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch.model_copy(update={"batch_id": "large"}), prepend=False)
+    queue_item = queue.dequeue()
+    assert queue_item is not None
+    queue._set_queue_item_status(queue_item.item_id, "completed")
+    single = batch.model_copy(update={"data": None, "runs": 1})
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, single.model_copy(update={"batch_id": "single"}), prepend=False)
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, single.model_copy(update={"batch_id": "prepended"}), prepend=True)
+    # Items enqueued at the front still come first
+    assert dequeue_all(queue) == ["prepended", "single", "large", "large", "large"]
+
+
+def test_max_in_flight_per_queue(db: SqliteDatabase, invoker, batch: Batch):
+    invoker.services.configuration = InvokeAIAppConfig(use_memory_db=True, max_in_flight_per_queue=1)
+    queue = create_queue(db, invoker)
+    queue.enqueue_batch("a", batch.model_copy(update={"batch_id": "a"}), prepend=False)
+    queue.enqueue_batch("b", batch.model_copy(update={"batch_id": "b"}), prepend=False)
+    first = queue.dequeue()
+    second = queue.dequeue()
+    assert first is not None and second is not None
+    assert (first.queue_id, second.queue_id) == ("a", "b")
+    assert queue.dequeue() is None
+
+    queue._set_queue_item_status(first.item_id, "completed")
+    third = queue.dequeue()
+    assert third is not None and third.queue_id == "a"
+
+
+def test_wait_times(db: SqliteDatabase, invoker, batch: Batch):
+    queue = create_queue(db, invoker)
+    assert queue.get_wait_times(DEFAULT_QUEUE_ID).dequeued == 0
+    queue.enqueue_batch(DEFAULT_QUEUE_ID, batch, prepend=False)
+    queue.dequeue()
+    queue.dequeue()
+
+    wait_times = queue.get_wait_times(DEFAULT_QUEUE_ID)
+    assert wait_times.dequeued == 2
+    assert wait_times.mean is not None and wait_times.max is not None
+    assert 0 <= wait_times.mean <= wait_times.max < 60
+    assert wait_times.oldest_pending is not None
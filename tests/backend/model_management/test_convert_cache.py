@@ -0,0 +1,139 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from invokeai.backend.model_management.convert_cache import GIG, TEMP_PREFIX, ConvertCache
+
+SETTINGS = {"base_model": "sd-1", "config": "v1-inference.yaml"}
+
+
+class FakeConverter:
+    """Writes a converted model of `size` bytes, counting the conversions"""
+
+    def __init__(self, size: int = 1000, delay: float = 0.0, fail: bool = False):
+        self.size = size
+        self.delay = delay
+        self.fail = fail
+        self.conversions = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, output_path: Path) -> Path:
+        with self.lock:
+            self.conversions += 1
+        output_path.mkdir()
+        (output_path / "model.safetensors").write_bytes(b"0" * self.size)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Unable to convert the model")
+        return output_path
+
+
+def create_checkpoint(path: Path, content: bytes = b"checkpoint") -> Path:
+    path.write_bytes(content)
+    return path
+
+
+def test_conversions_are_cached(tmp_path: Path):
+    cache = ConvertCache(tmp_path / "cache")
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+    convert = FakeConverter()
+
+    path = cache.get(checkpoint, SETTINGS, convert)
+    assert (path / "model.safetensors").exists()
+    assert cache.get(checkpoint, SETTINGS, convert) == path
+    assert convert.conversions == 1
+
+    # Other settings are another conversion
+    assert cache.get(checkpoint, {**SETTINGS, "config": "v1-inpainting-inference.yaml"}, convert) != path
+    assert convert.conversions == 2
+
+
+def test_conversions_are_keyed_by_content(tmp_path: Path):
+    cache = ConvertCache(tmp_path / "cache")
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+    convert = FakeConverter()
+    path = cache.get(checkpoint, SETTINGS, convert)
+
+    # Moving the checkpoint keeps its conversion
+    moved = tmp_path / "renamed.safetensors"
+    shutil.move(checkpoint, moved)
+    assert cache.get(moved, SETTINGS, convert) == path
+    assert convert.conversions == 1
+
+    # Changing it converts it again
+    create_checkpoint(moved, b"another checkpoint")
+    assert cache.get(moved, SETTINGS, convert) != path
+    assert convert.conversions == 2
+
+
+def test_hashes_are_kept_across_restarts(tmp_path: Path):
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+    path = ConvertCache(tmp_path / "cache").get(checkpoint, SETTINGS, FakeConverter())
+
+    cache = ConvertCache(tmp_path / "cache")
+    assert str(checkpoint) in cache._hashes
+    assert cache.get(checkpoint, SETTINGS, FakeConverter(fail=True)) == path
+
+
+def test_concurrent_requests_convert_once(tmp_path: Path):
+    cache = ConvertCache(tmp_path / "cache")
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+    convert = FakeConverter(delay=0.1)
+    paths: list[Path] = []
+
+    def get():
+        paths.append(cache.get(checkpoint, SETTINGS, convert))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert convert.conversions == 1
+    assert len(set(paths)) == 1 and len(paths) == 4
+
+
+def test_failed_conversions_leave_nothing_behind(tmp_path: Path):
+    cache = ConvertCache(tmp_path / "cache")
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+
+    with pytest.raises(RuntimeError):
+        cache.get(checkpoint, SETTINGS, FakeConverter(fail=True))
+    assert not any(entry.is_dir() for entry in (tmp_path / "cache").iterdir())
+
+    # The next request converts it again
+    convert = FakeConverter()
+    cache.get(checkpoint, SETTINGS, convert)
+    assert convert.conversions == 1
+
+
+def test_least_recently_used_conversions_are_removed(tmp_path: Path):
+    # Room for two of the conversions
+    cache = ConvertCache(tmp_path / "cache", max_size=2500 / GIG)
+    checkpoints = [create_checkpoint(tmp_path / f"model_{i}.safetensors", f"checkpoint {i}".encode()) for i in range(3)]
+    paths = []
+    for i, checkpoint in enumerate(checkpoints[:2]):
+        paths.append(cache.get(checkpoint, SETTINGS, FakeConverter()))
+        # Modification times are not precise enough to order conversions made in quick succession
+        os.utime(paths[-1], (i, i))
+    cache.get(checkpoints[0], SETTINGS, FakeConverter())
+
+    paths.append(cache.get(checkpoints[2], SETTINGS, FakeConverter()))
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+    assert cache.cache_size() * GIG == 2000
+
+
+def test_uncache(tmp_path: Path):
+    cache = ConvertCache(tmp_path / "cache")
+    checkpoint = create_checkpoint(tmp_path / "model.safetensors")
+    path = cache.get(checkpoint, SETTINGS, FakeConverter())
+
+    cache.uncache(checkpoint)
+    assert not path.exists()
+    assert not any(entry.name.startswith(TEMP_PREFIX) for entry in (tmp_path / "cache").iterdir())
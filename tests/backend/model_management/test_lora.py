@@ -2,10 +2,15 @@
 
 # test that LoRA patching works on both CPU and CUDA
 
+import json
+from pathlib import Path
+
 import pytest
 import torch
+from transformers import CLIPTextConfig, CLIPTextModel, CLIPTokenizer
 
-from invokeai.backend.model_management.lora import ModelPatcher
+from invokeai.backend.model_management.lora import ModelPatcher, TextualInversionModel
+from invokeai.backend.model_management.model_cache import ModelCache
 from invokeai.backend.model_management.models.lora import LoRALayer, LoRAModelRaw
 
 
@@ -100,3 +105,148 @@ def test_apply_lora_change_device():
     # After unpatching, the original model weights should have been restored on the GPU.
     assert model["linear_layer_1"].weight.data.device.type == "cuda"
     torch.testing.assert_close(model["linear_layer_1"].weight.data, orig_linear_weight, check_device=False)
+
+
+@torch.no_grad()
+def test_lora_keys_are_resolved_once_per_architecture(monkeypatch: pytest.MonkeyPatch):
+    def create_model() -> torch.nn.Module:
+        return torch.nn.ModuleDict(
+            {"down_blocks": torch.nn.ModuleList([torch.nn.ModuleDict({"proj_in": torch.nn.Linear(4, 8)})])}
+        )
+
+    lora_layers = {
+        "lora_unet_down_blocks_0_proj_in": LoRALayer(
+            layer_key="lora_unet_down_blocks_0_proj_in",
+            values={"lora_down.weight": torch.ones((2, 4)), "lora_up.weight": torch.ones((8, 2))},
+        ),
+        "lora_te_text_model": LoRALayer(
+            layer_key="lora_te_text_model",
+            values={"lora_down.weight": torch.ones((2, 4)), "lora_up.weight": torch.ones((8, 2))},
+        ),
+    }
+    lora = LoRAModelRaw("lora_name", lora_layers)
+
+    resolved_keys: list[str] = []
+    resolve_lora_key = ModelPatcher._resolve_lora_key
+
+    def count_resolve_lora_key(model, lora_key, prefix):
+        resolved_keys.append(lora_key)
+        return resolve_lora_key(model, lora_key, prefix)
+
+    monkeypatch.setattr(ModelPatcher, "_resolve_lora_key", count_resolve_lora_key)
+
+    model = create_model()
+    orig_weight = model["down_blocks"][0]["proj_in"].weight.detach().clone()
+    for _ in range(2):
+        with ModelPatcher.apply_lora_unet(model, [(lora, 0.5)]):
+            torch.testing.assert_close(model["down_blocks"][0]["proj_in"].weight, orig_weight + 1.0)
+        torch.testing.assert_close(model["down_blocks"][0]["proj_in"].weight, orig_weight)
+
+    # Another model of the same architecture reuses the keys
+    with ModelPatcher.apply_lora_unet(create_model(), [(lora, 0.5)]):
+        pass
+    assert resolved_keys == ["lora_unet_down_blocks_0_proj_in"]
+
+
+def create_linear_lora(name: str, value: float = 1.0) -> LoRAModelRaw:
+    layer = LoRALayer(
+        layer_key="linear_layer_1",
+        values={"lora_down.weight": torch.full((2, 4), value), "lora_up.weight": torch.ones((8, 2))},
+    )
+    return LoRAModelRaw(name, {"linear_layer_1": layer})
+
+
+@torch.no_grad()
+def test_apply_lora_sums_loras():
+    model = torch.nn.ModuleDict({"linear_layer_1": torch.nn.Linear(4, 8, dtype=torch.float16)})
+    orig_weight = model["linear_layer_1"].weight.detach().clone()
+    loras = [(create_linear_lora("lora_1"), 0.5), (create_linear_lora("lora_2", 2.0), 0.25)]
+
+    with ModelPatcher.apply_lora(model, loras, prefix=""):
+        torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 2.0)
+    torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight)
+
+
+@torch.no_grad()
+def test_sticky_lora(monkeypatch: pytest.MonkeyPatch):
+    model = torch.nn.ModuleDict({"linear_layer_1": torch.nn.Linear(4, 8)})
+    orig_weight = model["linear_layer_1"].weight.detach().clone()
+    lora_1 = create_linear_lora("lora_1")
+    lora_2 = create_linear_lora("lora_2")
+
+    patches = []
+    patch_weights = ModelPatcher._patch_weights
+
+    def count_patch_weights(model, loras, prefix, original_weights):
+        patches.append([lora.name for lora, _ in loras])
+        return patch_weights(model, loras, prefix, original_weights)
+
+    monkeypatch.setattr(ModelPatcher, "_patch_weights", count_patch_weights)
+
+    # The LoRAs stay applied while the same ones are applied with the same weights
+    for _ in range(2):
+        with ModelPatcher.apply_lora(model, [(lora_1, 0.5)], prefix="", sticky=True):
+            torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 1.0)
+        torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 1.0)
+    assert patches == [["lora_1"]]
+
+    # Other weights, or other LoRAs, restore the model before being applied
+    with ModelPatcher.apply_lora(model, [(lora_1, 1.0)], prefix="", sticky=True):
+        torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 2.0)
+    with ModelPatcher.apply_lora(model, [(lora_2, 0.5)], prefix="", sticky=True):
+        torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 1.0)
+    assert patches == [["lora_1"], ["lora_1"], ["lora_2"]]
+
+    # Applying the same LoRAs without sticky reuses the patch, and restores the model on exit
+    with ModelPatcher.apply_lora(model, [(lora_2, 0.5)], prefix=""):
+        torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight + 1.0)
+    torch.testing.assert_close(model["linear_layer_1"].weight, orig_weight)
+    assert len(patches) == 3
+
+
+def create_tokenizer(path: Path) -> CLIPTokenizer:
+    vocab = ["<|startoftext|>", "<|endoftext|>", "a</w>", "b</w>", "c</w>", "d</w>"]
+    (path / "vocab.json").write_text(json.dumps({token: i for i, token in enumerate(vocab)}))
+    (path / "merges.txt").write_text("#version: 0.2\n")
+    return CLIPTokenizer(path / "vocab.json", path / "merges.txt")
+
+
+@torch.no_grad()
+def test_apply_ti(tmp_path: Path):
+    tokenizer = create_tokenizer(tmp_path)
+    text_encoder = CLIPTextModel(
+        CLIPTextConfig(hidden_size=8, intermediate_size=16, num_attention_heads=2, num_hidden_layers=1, vocab_size=6)
+    )
+    orig_embeddings = text_encoder.get_input_embeddings()
+    cache = ModelCache(max_cache_size=1.0, execution_device=torch.device("cpu"))
+
+    ti = TextualInversionModel()
+    ti.embedding = torch.randn(2, 8)
+    ti_list = [("style", ti)]
+
+    ti_tokenizers = []
+    for _ in range(2):
+        with ModelPatcher.apply_ti(tokenizer, text_encoder, ti_list, cache=cache, tokenizer_key="tokenizer") as (
+            ti_tokenizer,
+            ti_manager,
+        ):
+            ti_tokenizers.append(ti_tokenizer)
+            token_ids = ti_tokenizer("a <style> b", add_special_tokens=False).input_ids
+            assert token_ids == [2, 6, 3]
+            assert ti_manager.pad_tokens == {6: [7]}
+
+            embeddings = text_encoder.get_input_embeddings()(torch.tensor([[2, 6, 7, 3]]))
+            torch.testing.assert_close(embeddings[0, 1:3], ti.embedding)
+            torch.testing.assert_close(embeddings[0, [0, 3]], orig_embeddings(torch.tensor([2, 3])))
+            text_encoder(torch.tensor([[0, 2, 6, 7, 3, 1]]))
+
+        assert text_encoder.get_input_embeddings() is orig_embeddings
+        assert len(tokenizer) == 6
+
+    # The tokenizer with the textual inversion is kept in the cache for the next prompts
+    assert ti_tokenizers[0] is ti_tokenizers[1]
+    assert cache.cache_size() > 0
+
+    # Without textual inversions, the tokenizer is used as is
+    with ModelPatcher.apply_ti(tokenizer, text_encoder, []) as (ti_tokenizer, _):
+        assert ti_tokenizer is tokenizer
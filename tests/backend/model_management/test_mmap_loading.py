@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+import safetensors.torch
+import torch
+from diffusers import UNet2DConditionModel
+from transformers import CLIPTextConfig, CLIPTextModel
+
+from invokeai.backend.model_management.models.base import load_pretrained_mmap, load_safetensors_mmap
+
+
+def create_unet() -> UNet2DConditionModel:
+    return UNet2DConditionModel(
+        block_out_channels=(32, 64),
+        down_block_types=("CrossAttnDownBlock2D", "DownBlock2D"),
+        up_block_types=("UpBlock2D", "CrossAttnUpBlock2D"),
+        cross_attention_dim=32,
+        layers_per_block=1,
+        sample_size=8,
+        attention_head_dim=4,
+    )
+
+
+def create_text_encoder() -> CLIPTextModel:
+    config = CLIPTextConfig(
+        hidden_size=32, intermediate_size=37, num_attention_heads=4, num_hidden_layers=2, vocab_size=100
+    )
+    return CLIPTextModel(config)
+
+
+def assert_same_weights(model: torch.nn.Module, expected: torch.nn.Module) -> None:
+    state_dict = model.state_dict()
+    expected_state_dict = expected.state_dict()
+    assert state_dict.keys() == expected_state_dict.keys()
+    for key, tensor in expected_state_dict.items():
+        assert torch.equal(state_dict[key], tensor), key
+
+
+def test_load_safetensors_mmap(tmp_path: Path):
+    path = tmp_path / "model.safetensors"
+    tensors = {"weight": torch.randn(4, 8), "index": torch.arange(3), "half": torch.randn(5).half()}
+    safetensors.torch.save_file(tensors, path)
+
+    loaded = load_safetensors_mmap(path)
+    assert loaded.keys() == tensors.keys()
+    for key, tensor in tensors.items():
+        assert loaded[key].dtype == tensor.dtype
+        assert torch.equal(loaded[key], tensor)
+
+    # The mapping is copy-on-write: the file is left as it was
+    loaded["weight"].zero_()
+    assert torch.equal(safetensors.torch.load_file(path)["weight"], tensors["weight"])
+
+
+@pytest.mark.parametrize(["create_model", "subfolder"], [(create_unet, "unet"), (create_text_encoder, "text_encoder")])
+def test_load_pretrained_mmap(tmp_path: Path, create_model, subfolder: str):
+    model = create_model()
+    model.save_pretrained(tmp_path / subfolder, safe_serialization=True)
+    expected = type(model).from_pretrained(tmp_path / subfolder)
+
+    loaded = load_pretrained_mmap(type(model), tmp_path / subfolder, torch_dtype=torch.float32)
+    assert loaded is not None
+    mmap_model, mapped_size = loaded
+    assert not mmap_model.training
+    assert_same_weights(mmap_model, expected)
+    assert mapped_size == sum(tensor.nbytes for tensor in expected.state_dict().values())
+
+
+def test_load_pretrained_mmap_converts_dtype(tmp_path: Path):
+    create_unet().save_pretrained(tmp_path, variant="fp16")
+    expected = UNet2DConditionModel.from_pretrained(tmp_path, variant="fp16", torch_dtype=torch.float16)
+
+    assert load_pretrained_mmap(UNet2DConditionModel, tmp_path, torch_dtype=torch.float16) is None, "no such variant"
+    loaded = load_pretrained_mmap(UNet2DConditionModel, tmp_path, torch_dtype=torch.float16, variant="fp16")
+    assert loaded is not None
+    mmap_model, mapped_size = loaded
+    assert all(param.dtype == torch.float16 for param in mmap_model.parameters())
+    assert_same_weights(mmap_model, expected)
+    assert mapped_size == 0, "converted weights are in private memory"
+
+
+def test_load_pretrained_mmap_skips_other_formats(tmp_path: Path):
+    create_unet().save_pretrained(tmp_path, safe_serialization=False)
+    assert load_pretrained_mmap(UNet2DConditionModel, tmp_path, torch_dtype=torch.float32) is None
@@ -0,0 +1,271 @@
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+import torch
+
+from invokeai.backend.model_management.model_cache import MB, ModelCache
+from invokeai.backend.model_management.models.base import BaseModelType, ModelBase, ModelType, SubModelType
+
+# Submodels of the fake model, each 100MB
+SUBMODELS = [SubModelType.UNet, SubModelType.TextEncoder, SubModelType.Vae, SubModelType.Tokenizer]
+
+
+class FakeModel:
+    """A model without a `to()` method, which the cache keeps in RAM"""
+
+    def __init__(self, child_type: Optional[SubModelType]):
+        self.child_type = child_type
+
+
+class FakeModelInfo(ModelBase):
+    load_counts: dict[Optional[SubModelType], int] = {}
+    load_counts_lock = threading.Lock()
+    fail: bool = False
+    slow_submodels: set[Optional[SubModelType]] = set()
+
+    @classmethod
+    def detect_format(cls, path: str) -> str:
+        return "fake"
+
+    @classmethod
+    def save_to_config(cls) -> bool:
+        return False
+
+    def get_size(self, child_type: Optional[SubModelType] = None) -> int:
+        return 100 * MB
+
+    def get_model(self, torch_dtype: Optional[torch.dtype], child_type: Optional[SubModelType] = None) -> FakeModel:
+        # Long enough for concurrent requests of the same model to overlap
+        time.sleep(0.2 if child_type in FakeModelInfo.slow_submodels else 0.02)
+        if FakeModelInfo.fail:
+            raise RuntimeError("Unable to load the model")
+        with FakeModelInfo.load_counts_lock:
+            FakeModelInfo.load_counts[child_type] = FakeModelInfo.load_counts.get(child_type, 0) + 1
+        return FakeModel(child_type)
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_model_info():
+    FakeModelInfo.load_counts = {}
+    FakeModelInfo.fail = False
+    FakeModelInfo.slow_submodels = set()
+
+
+def get_model(cache: ModelCache, model_path: Path, submodel: SubModelType) -> ModelCache.ModelLocker:
+    return cache.get_model(
+        model_path=model_path,
+        model_class=FakeModelInfo,
+        base_model=BaseModelType.StableDiffusion1,
+        model_type=ModelType.Main,
+        submodel=submodel,
+    )
+
+
+def assert_totals(cache: ModelCache) -> None:
+    """Checks the running totals of the cache against its records"""
+    assert cache._cache_bytes == sum(entry.size for entry in cache._cached_models.values())
+    assert cache._pending_bytes == sum(load.size for load in cache._pending_loads.values())
+    assert cache._mapped_bytes == sum(entry.mapped_size for entry in cache._cached_models.values())
+    assert cache._locked_models == sum(entry.locked for entry in cache._cached_models.values())
+    assert all(entry._handles == 0 for entry in cache._cached_models.values())
+
+
+def hammer(thread_count: int, target) -> None:
+    errors: list[BaseException] = []
+
+    def run():
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_concurrent_requests_load_a_model_once(tmp_path: Path):
+    cache = ModelCache(max_cache_size=1.0, execution_device=torch.device("cpu"))
+    models: dict[SubModelType, set[int]] = {submodel: set() for submodel in SUBMODELS}
+    models_lock = threading.Lock()
+
+    def use_models():
+        for _ in range(20):
+            submodel = random.choice(SUBMODELS)
+            with get_model(cache, tmp_path, submodel) as model:
+                assert model.child_type == submodel
+                with models_lock:
+                    models[submodel].add(id(model))
+
+    hammer(16, use_models)
+
+    assert FakeModelInfo.load_counts == {submodel: 1 for submodel in SUBMODELS if models[submodel]}
+    assert all(len(ids) <= 1 for ids in models.values())
+
+
+def test_cache_stays_within_its_size_under_contention(tmp_path: Path):
+    # Room for two of the four submodels
+    cache = ModelCache(max_cache_size=250 * MB / 2**30, execution_device=torch.device("cpu"))
+
+    def use_models():
+        for _ in range(20):
+            submodel = random.choice(SUBMODELS)
+            with get_model(cache, tmp_path, submodel) as model:
+                assert model.child_type == submodel
+
+    hammer(8, use_models)
+    assert_totals(cache)
+    assert not cache._pending_loads
+
+    # Models in use cannot be evicted, so the cache may grow past its size while threads hold them. Once they are
+    # released, the next load brings it back within its size.
+    cache.uncache_model(cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.UNet))
+    with get_model(cache, tmp_path, SubModelType.UNet):
+        assert cache.cache_size() * 2**30 <= 250 * MB
+    assert_totals(cache)
+
+
+def test_waiting_requests_get_the_load_error(tmp_path: Path):
+    cache = ModelCache(max_cache_size=1.0, execution_device=torch.device("cpu"))
+    FakeModelInfo.fail = True
+    errors: list[BaseException] = []
+
+    def use_model():
+        try:
+            get_model(cache, tmp_path, SubModelType.UNet)
+        except RuntimeError as e:
+            errors.append(e)
+
+    hammer(4, use_model)
+    assert len(errors) == 4
+
+    # The next request loads the model again
+    FakeModelInfo.fail = False
+    with get_model(cache, tmp_path, SubModelType.UNet) as model:
+        assert model.child_type == SubModelType.UNet
+
+
+def test_prefetch_only_uses_free_room(tmp_path: Path):
+    # Room for two of the four submodels
+    cache = ModelCache(max_cache_size=250 * MB / 2**30, execution_device=torch.device("cpu"))
+    with get_model(cache, tmp_path, SubModelType.UNet):
+        pass
+
+    started: list[SubModelType] = []
+
+    def prefetch(submodel: SubModelType) -> Optional[ModelCache.ModelLocker]:
+        return cache.prefetch_model(
+            model_path=tmp_path,
+            model_class=FakeModelInfo,
+            base_model=BaseModelType.StableDiffusion1,
+            model_type=ModelType.Main,
+            submodel=submodel,
+            on_load_started=lambda: started.append(submodel),
+        )
+
+    assert prefetch(SubModelType.UNet) is None, "already cached"
+    assert prefetch(SubModelType.Vae) is not None
+    # The cache is full, so the UNet is not evicted to prefetch the text encoder
+    assert prefetch(SubModelType.TextEncoder) is None
+    assert started == [SubModelType.Vae]
+    assert FakeModelInfo.load_counts == {SubModelType.UNet: 1, SubModelType.Vae: 1}
+
+    # The prefetched model is used without loading it again
+    with get_model(cache, tmp_path, SubModelType.Vae) as model:
+        assert model.child_type == SubModelType.Vae
+    assert FakeModelInfo.load_counts == {SubModelType.UNet: 1, SubModelType.Vae: 1}
+
+
+def test_models_in_use_are_not_evicted(tmp_path: Path):
+    # Room for two of the four submodels
+    cache = ModelCache(max_cache_size=250 * MB / 2**30, execution_device=torch.device("cpu"))
+    unet = get_model(cache, tmp_path, SubModelType.UNet)
+    with get_model(cache, tmp_path, SubModelType.Vae):
+        pass
+    with get_model(cache, tmp_path, SubModelType.TextEncoder):
+        pass
+
+    unet_key = cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.UNet)
+    vae_key = cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.Vae)
+    assert unet_key in cache._cached_models, "the UNet's locker is alive"
+    assert vae_key not in cache._cached_models
+    decisions = [(decision.key, decision.evicted, decision.reason) for decision in cache.get_eviction_log()]
+    assert decisions == [(unet_key, False, "in use"), (vae_key, True, "next to evict (lru)")]
+
+    # Once its locker is released, the UNet is the least recently used
+    del unet
+    with get_model(cache, tmp_path, SubModelType.Vae):
+        pass
+    assert unet_key not in cache._cached_models
+    assert cache.get_eviction_log()[-1].key == unet_key
+    assert_totals(cache)
+
+
+def test_reload_cost_policy_keeps_slow_models(tmp_path: Path):
+    # Room for two of the four submodels
+    cache = ModelCache(
+        max_cache_size=250 * MB / 2**30, execution_device=torch.device("cpu"), eviction_policy="reload_cost"
+    )
+    FakeModelInfo.slow_submodels = {SubModelType.UNet}
+    for submodel in [SubModelType.UNet, SubModelType.Vae, SubModelType.TextEncoder]:
+        with get_model(cache, tmp_path, submodel):
+            pass
+
+    # The VAE was used more recently, but is quicker to load again
+    unet_key = cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.UNet)
+    vae_key = cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.Vae)
+    assert unet_key in cache._cached_models
+    assert [decision.key for decision in cache.get_eviction_log()] == [vae_key]
+    assert_totals(cache)
+
+
+def test_requests_are_traced(tmp_path: Path):
+    trace_path = tmp_path / "trace.jsonl"
+    cache = ModelCache(max_cache_size=1.0, execution_device=torch.device("cpu"), trace_path=trace_path)
+    for submodel in [SubModelType.UNet, SubModelType.Vae, SubModelType.UNet]:
+        with get_model(cache, tmp_path, submodel):
+            pass
+
+    trace = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    unet_key = cache.get_key(str(tmp_path), BaseModelType.StableDiffusion1, ModelType.Main, SubModelType.UNet)
+    assert [request["key"] for request in trace] == [unet_key, trace[1]["key"], unet_key]
+    assert all(request["size"] == 100 * MB for request in trace)
+    assert trace[0]["load_time"] > 0 and trace[1]["load_time"] > 0
+    assert trace[2]["load_time"] is None, "a cache hit"
+
+
+def test_derived_objects_are_cached_like_models(tmp_path: Path):
+    # Room for two of the four submodels
+    cache = ModelCache(max_cache_size=250 * MB / 2**30, execution_device=torch.device("cpu"))
+    created: list[str] = []
+
+    def create(name: str):
+        created.append(name)
+        return FakeModel(None), 100 * MB
+
+    first = cache.get_derived("derived", lambda: create("first"))
+    assert cache.get_derived("derived", lambda: create("second")) is first
+    assert cache.cache_size() * 2**30 == 100 * MB
+
+    # An object that is no longer valid is created again
+    assert cache.get_derived("derived", lambda: create("second"), is_valid=lambda derived: derived is first) is first
+    assert cache.get_derived("derived", lambda: create("third"), is_valid=lambda derived: False) is not first
+    assert created == ["first", "third"]
+    assert_totals(cache)
+
+    # Derived objects are evicted to make room for models
+    with get_model(cache, tmp_path, SubModelType.UNet):
+        pass
+    with get_model(cache, tmp_path, SubModelType.Vae):
+        pass
+    assert "derived" not in cache._cached_models
+    assert_totals(cache)
@@ -0,0 +1,42 @@
+import pytest
+
+from invokeai.backend.model_management.model_cache_policy import (
+    LRUEvictionPolicy,
+    ReloadCostEvictionPolicy,
+    get_eviction_policy,
+)
+
+
+def test_lru_evicts_the_least_recently_used():
+    policy = LRUEvictionPolicy()
+    for key in ["a", "b", "c"]:
+        policy.add(key, size=100, load_time=1.0)
+    policy.access("a")
+    assert list(policy.eviction_order()) == ["b", "c", "a"]
+    policy.remove("c", evicted=True)
+    assert list(policy.eviction_order()) == ["b", "a"]
+
+
+def test_reload_cost_evicts_the_cheapest_to_reload_per_byte():
+    policy = ReloadCostEvictionPolicy()
+    policy.add("slow", size=100, load_time=10.0)
+    policy.add("fast", size=100, load_time=1.0)
+    policy.add("large", size=1000, load_time=5.0)
+    assert list(policy.eviction_order()) == ["large", "fast", "slow"]
+
+
+def test_reload_cost_ages_out_unused_models():
+    policy = ReloadCostEvictionPolicy()
+    policy.add("slow", size=100, load_time=2.0)
+    policy.add("fast", size=100, load_time=1.0)
+    # Each eviction raises the priority of the models added or accessed after it, so a slow model that is no longer
+    # used is evicted before fast ones that are
+    for i in range(3):
+        policy.remove(next(iter(policy.eviction_order())), evicted=True)
+        policy.add(f"fast_{i}", size=100, load_time=1.0)
+    assert "slow" not in list(policy.eviction_order())
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError, match="Unknown eviction policy"):
+        get_eviction_policy("fifo")
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 import torch
 
@@ -71,3 +73,35 @@ def test_skip_torch_weight_init_restores_base_class_behavior():
     torch.nn.modules.conv._ConvNd.reset_parameters = saved_fn
 
     assert called_monkey_patched_fn
+
+
+def test_skip_torch_weight_init_overlapping_threads():
+    """Test that `skip_torch_weight_init()` restores the original behavior when threads enter and exit it out of order,
+    as when several models are loaded at once.
+    """
+    reset_params_fn_before = torch.nn.Linear.reset_parameters
+    first_entered = threading.Event()
+    second_exited = threading.Event()
+    reset_params_fns_during = []
+
+    def first():
+        with skip_torch_weight_init():
+            first_entered.set()
+            second_exited.wait()
+            reset_params_fns_during.append(torch.nn.Linear.reset_parameters)
+
+    def second():
+        first_entered.wait()
+        with skip_torch_weight_init():
+            pass
+        second_exited.set()
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The second thread exiting first does not restore the layers while the first one is still loading.
+    assert reset_params_fns_during == [_no_op]
+    assert torch.nn.Linear.reset_parameters is reset_params_fn_before